@@ -2,9 +2,14 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
+from zaiko_be.response_cache import VersionedQuerySet
 
-class CustomUserManager(BaseUserManager):
-    """ユーザーマネージャーのカスタムクラス。メールアドレスをユーザー名として使用"""
+
+class CustomUserManager(BaseUserManager.from_queryset(VersionedQuerySet)):
+    """
+    ユーザーマネージャーのカスタムクラス。メールアドレスをユーザー名として使用
+    一括更新時にはレスポンスキャッシュのバージョン番号を進める（zaiko_be.response_cache）
+    """
 
     def create_user(self, email, password=None, **extra_fields):
         """通常ユーザーを作成"""
@@ -44,6 +49,8 @@ class CustomUser(AbstractUser):
     last_name = models.CharField(
         _("last name"), max_length=150, blank=False, null=False
     )
+    # 条件付きGET（ETag / Last-Modified）の検証子に使用する
+    updated_at = models.DateTimeField("更新日時", auto_now=True)
 
     USERNAME_FIELD = "email"  # 認証に使用するフィールド
     REQUIRED_FIELDS = [
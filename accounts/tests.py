@@ -132,3 +132,52 @@ class AuthAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["message"], "user not authenticated")
+
+
+class UserInfoConditionalGetTests(APITestCase):
+    """ユーザー情報APIの条件付きGET（ETag / Last-Modified）のテスト"""
+
+    def setUp(self):
+        """テスト用ユーザーの作成"""
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.url = reverse("user_info")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_not_modified(self):
+        """ETagが一致する場合は 304 を返すかテスト"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Authorization", response["Vary"])
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_etag_changes(self):
+        """ユーザーの更新・別のユーザー・未認証でETagが変わるかテスト"""
+        etags = [self.client.get(self.url)["ETag"]]
+        self.user.first_name = "次郎"
+        self.user.save()
+        etags.append(self.client.get(self.url)["ETag"])
+
+        other = User.objects.create_user(
+            email="other@example.com",
+            password="testpassword123",
+            first_name="花子",
+            last_name="佐藤",
+        )
+        self.client.force_authenticate(user=other)
+        etags.append(self.client.get(self.url)["ETag"])
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["message"], "user not authenticated")
+        etags.append(response["ETag"])
+        self.assertEqual(len(set(etags)), 4)
@@ -1,8 +1,14 @@
+from django.utils.cache import patch_vary_headers
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from zaiko_be.conditional import (
+    get_not_modified_response,
+    make_etag,
+    set_validators,
+)
 from .serializers import UserSerializer
 
 User = get_user_model()
@@ -12,11 +18,32 @@ class UserInfoView(APIView):
     """
     ユーザー情報を取得するAPIビュー
     認証の有無に関わらずアクセス可能だが、認証状態に応じて異なるレスポンスを返す
+
+    レスポンスには ETag / Last-Modified（ユーザーの更新日時）を付け、
+    条件付きGETで変更がない場合はシリアライズせずに 304 を返す
     """
 
     permission_classes = [AllowAny]
 
     def get(self, request):
+        user = request.user
+        authenticated = bool(user and user.is_authenticated)
+        if authenticated:
+            etag = make_etag(request.accepted_media_type, user.pk, user.updated_at)
+            last_modified = user.updated_at
+        else:
+            etag = make_etag(request.accepted_media_type, None)
+            last_modified = None
+
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = self.get_user_info(request)
+            set_validators(response, etag, last_modified)
+        # 認証情報ごとに内容が異なるため、共有キャッシュで別のユーザーに返されないようにする
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+    def get_user_info(self, request):
         # リクエストの認証情報を確認
         if request.user and request.user.is_authenticated:
             # 認証済みの場合、ユーザー情報を返す
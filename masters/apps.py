@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MastersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'masters'
+
+    def ready(self):
+        # シグナルハンドラーを登録
+        from masters import signals  # noqa: F401
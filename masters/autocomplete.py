@@ -0,0 +1,116 @@
+"""
+仕入先選択用のオートコンプリート
+
+1文字入力するごとに呼ばれるため、取得する列を id / name / supplier_code に絞り、
+結果はワーカープロセス内のLRUキャッシュに保持します。
+キャッシュは仕入先の保存・削除時（masters.signals）にクリアされ、
+他のワーカーで更新された場合に備えて有効期限も設けています。
+"""
+
+from collections import OrderedDict
+from threading import Lock
+import time
+
+from masters.models import SearchDocument, Supplier
+from masters.search import normalize, to_bigrams
+
+AUTOCOMPLETE_FIELDS = ("id", "name", "supplier_code")
+
+# 返却する最大件数
+MAX_RESULTS = 20
+
+
+class LRUCache:
+    """
+    有効期限付きのLRUキャッシュ（ワーカープロセス単位）
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+autocomplete_cache = LRUCache()
+
+
+def find_suppliers(query, limit):
+    """
+    仕入先を取引先コード・仕入先名の前方一致、仕入先名の部分一致の順に検索する
+
+    - 前方一致: UPPER(列) の text_pattern_ops インデックス
+    - 部分一致: 検索ドキュメントのバイグラムのGINインデックス（表記揺れを吸収）
+    """
+    rows = list(
+        Supplier.objects.filter(supplier_code__istartswith=query)
+        .order_by("supplier_code")
+        .values(*AUTOCOMPLETE_FIELDS)[:limit]
+    )
+    if len(rows) < limit:
+        found = [row["id"] for row in rows]
+        rows += list(
+            Supplier.objects.filter(name__istartswith=query)
+            .exclude(id__in=found)
+            .order_by("name", "id")
+            .values(*AUTOCOMPLETE_FIELDS)[: limit - len(rows)]
+        )
+
+    normalized = normalize(query)
+    if len(rows) < limit and len(normalized) > 1:
+        found = {row["id"] for row in rows}
+        candidate_ids = SearchDocument.objects.filter(
+            kind=SearchDocument.Kind.SUPPLIER, bigrams__contains=to_bigrams(normalized)
+        ).values_list("object_id", flat=True)
+        # バイグラムは担当者名・備考も含むため、仕入先名に含まれるものだけを残す
+        for row in (
+            Supplier.objects.filter(id__in=candidate_ids)
+            .exclude(id__in=found)
+            .order_by("name", "id")
+            .values(*AUTOCOMPLETE_FIELDS)
+            .iterator()
+        ):
+            if normalized in normalize(row["name"]):
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+    return rows
+
+
+def autocomplete_suppliers(query, limit=10):
+    """
+    仕入先のオートコンプリート候補をキャッシュ経由で返す
+    """
+    query = query.strip()
+    if not query:
+        return []
+    limit = min(limit, MAX_RESULTS)
+    key = (query, limit)
+    rows = autocomplete_cache.get(key)
+    if rows is None:
+        rows = find_suppliers(query, limit)
+        autocomplete_cache.set(key, rows)
+    return rows
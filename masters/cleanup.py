@@ -0,0 +1,46 @@
+"""
+削除した部品の画像ファイルの後片付け
+
+本番環境のストレージ（S3）ではファイルごとに削除のリクエストが必要なため、
+リクエストの処理中には削除せず、トランザクションの確定後にスレッドを起動して削除します。
+ロールバックした場合は削除しません。削除に失敗したファイルはログに記録して残します。
+"""
+
+import logging
+import threading
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def delete_files_on_commit(storage, names):
+    """
+    トランザクションの確定後に、ストレージのファイルを別スレッドで削除する
+    """
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(lambda: start_thread(storage, names))
+
+
+def start_thread(storage, names):
+    thread = threading.Thread(
+        target=delete_files, args=(storage, names), name="delete-files", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def delete_files(storage, names):
+    """
+    ストレージのファイルを削除し、削除した件数を返す
+    """
+    count = 0
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception("ファイル %s の削除に失敗しました", name)
+        else:
+            count += 1
+    return count
@@ -0,0 +1,338 @@
+"""
+循環棚卸の計画
+
+倉庫を止める一斉棚卸の代わりに、営業日（土日を除く）ごとに一部の部品を数えます。
+部品は在庫金額（在庫数 × 原価）の大きい順の累積構成比で A / B / C のクラスに分け
+（settings.CYCLE_COUNT の A_SHARE / B_SHARE）、クラスごとの間隔（INTERVALS、営業日）で数えます。
+
+計画の作成では、累積構成比をウィンドウ関数で求めた部品の一覧をサーバーサイドカーソルから1回だけ読み、
+部品ごとに「位相」（通算の営業日番号を間隔で割った余り）をクラス内の順番に割り当てて、
+位相が一致する期間内の営業日を COPY でまとめて保存します（モデルのインスタンスは作らない）。
+位相は通算の営業日番号に対して決めるため、間隔が計画の期間より長いクラスの部品も、
+続けて作成した計画で順番に数えられます。
+
+作成後に部品を追加・削除（アーカイブ）した場合は、計画全体を作り直さずにその部品の予定のみ変更します。
+追加した部品は残りの期間のうち最も予定の少ない日から始まる位相に割り当て、
+アーカイブした部品の今日以降の予定は削除します（空いた日には以降に追加した部品が割り当てられる）。
+日ごとの予定の件数は計画の daily_counts に保持し、予定の追加・削除と同時に更新するため、
+部品を1件登録するたびに計画全体の予定を集計することはありません。
+"""
+
+from collections import Counter
+import csv
+import datetime
+from decimal import Decimal
+import io
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Window
+from django.db.models.expressions import RowRange
+from django.utils import timezone
+
+from masters.models import CycleCountPlan, CycleCountTask, Part
+
+# 計画の作成時に1回の COPY で保存する予定の件数
+TASK_BATCH_SIZE = 20000
+
+# サーバーサイドカーソルから一度に取得する行数
+PLAN_CHUNK_SIZE = 2000
+
+DEFAULT_CYCLE_COUNT_SETTINGS = {
+    "A_SHARE": 0.8,
+    "B_SHARE": 0.95,
+    "INTERVALS": {"A": 20, "B": 60, "C": 120},
+}
+
+ValueClass = CycleCountTask.ValueClass
+
+
+def get_cycle_count_settings():
+    return {**DEFAULT_CYCLE_COUNT_SETTINGS, **getattr(settings, "CYCLE_COUNT", {})}
+
+
+def workday_number(date):
+    """
+    通算の営業日番号（土日は直前の金曜日と同じ番号）
+    """
+    # date.min（1年1月1日）は月曜日
+    days = date.toordinal() - 1
+    return days // 7 * 5 + min(days % 7, 4)
+
+
+def get_workdays(start_date, end_date):
+    """
+    期間内の営業日（土日を除く）のリスト
+    """
+    days = (end_date - start_date).days + 1
+    return [
+        day
+        for day in (start_date + datetime.timedelta(n) for n in range(max(days, 0)))
+        if day.weekday() < 5
+    ]
+
+
+def get_phase_days(workdays, interval):
+    """
+    位相 → その位相で数える営業日のリスト
+    """
+    phases = {}
+    for day in workdays:
+        phases.setdefault(workday_number(day) % interval, []).append(day)
+    return phases
+
+
+def with_stock_value(queryset):
+    return queryset.annotate(
+        stock_value=ExpressionWrapper(
+            F("stock_quantity") * F("cost_price"),
+            output_field=DecimalField(max_digits=20, decimal_places=2),
+        )
+    )
+
+
+def classify(value, a_min_value, b_min_value):
+    """
+    計画作成時の下限の在庫金額から、追加した部品のクラスを判定する
+    """
+    if a_min_value is not None and value >= a_min_value:
+        return ValueClass.A
+    if b_min_value is not None and value >= b_min_value:
+        return ValueClass.B
+    return ValueClass.C
+
+
+def copy_tasks(cursor, tasks):
+    """
+    (計画ID, 部品ID, 計数予定日, クラス) のリストを COPY でまとめて保存し、件数を返す
+    """
+    if not tasks:
+        return 0
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(tasks)
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    opts = CycleCountTask._meta
+    columns = ", ".join(
+        quote(opts.get_field(name).column)
+        for name in ("plan", "part", "scheduled_on", "value_class")
+    )
+    cursor.copy_expert(
+        f"COPY {quote(opts.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+    return len(tasks)
+
+
+def create_plan(start_date, end_date, user=None):
+    """
+    期間内の日ごとの計数予定を作成する
+
+    アーカイブされていない部品を在庫金額の大きい順に1回だけ読み、
+    クラスごとに順番に位相を割り当てて予定を保存する
+
+    Returns:
+        CycleCountPlan: 作成した計画
+    """
+    config = get_cycle_count_settings()
+    intervals = config["INTERVALS"]
+    a_share = Decimal(str(config["A_SHARE"]))
+    b_share = Decimal(str(config["B_SHARE"]))
+    workdays = get_workdays(start_date, end_date)
+    phase_days = {
+        value_class: get_phase_days(workdays, intervals[value_class])
+        for value_class in ValueClass.values
+    }
+    order = [F("stock_value").desc(), F("pk").asc()]
+    rows = (
+        with_stock_value(Part.objects.active())
+        .annotate(
+            running_value=Window(
+                Sum("stock_value"), order_by=order, frame=RowRange(end=0)
+            ),
+            total_value=Window(Sum("stock_value")),
+        )
+        .order_by(*order)
+        .values_list("pk", "stock_value", "running_value", "total_value")
+        .iterator(chunk_size=PLAN_CHUNK_SIZE)
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        plan = CycleCountPlan.objects.create(
+            start_date=start_date, end_date=end_date, created_by=user
+        )
+        counters = dict.fromkeys(ValueClass.values, 0)
+        daily_counts = Counter()
+        min_values = {}
+        tasks = []
+        for part_id, value, running, total in rows:
+            # この部品より金額の大きい部品の累積構成比でクラスを決める
+            share = (running - value) / total if total else Decimal(1)
+            if share < a_share:
+                value_class = ValueClass.A
+            elif share < b_share:
+                value_class = ValueClass.B
+            else:
+                value_class = ValueClass.C
+            min_values[value_class] = value
+            phase = counters[value_class] % intervals[value_class]
+            counters[value_class] += 1
+            days = phase_days[value_class].get(phase, ())
+            daily_counts.update(days)
+            tasks.extend(
+                (plan.pk, part_id, day.isoformat(), value_class) for day in days
+            )
+            if len(tasks) >= TASK_BATCH_SIZE:
+                plan.task_count += copy_tasks(cursor, tasks)
+                tasks = []
+        plan.task_count += copy_tasks(cursor, tasks)
+        plan.part_count = sum(counters.values())
+        plan.a_min_value = min_values.get(ValueClass.A)
+        plan.b_min_value = min_values.get(ValueClass.B)
+        plan.daily_counts = {
+            day.isoformat(): count for day, count in sorted(daily_counts.items())
+        }
+        plan.save(
+            update_fields=[
+                "task_count",
+                "part_count",
+                "a_min_value",
+                "b_min_value",
+                "daily_counts",
+            ]
+        )
+    return plan
+
+
+def get_current_plans(date=None):
+    """
+    date（既定は今日）以降に予定が残っている計画
+    """
+    date = date or timezone.localdate()
+    return CycleCountPlan.objects.filter(end_date__gte=date).order_by("pk")
+
+
+def get_plan_for_date(date):
+    """
+    date を含む計画（重なる場合は最後に作成した計画）
+    """
+    return (
+        CycleCountPlan.objects.filter(start_date__lte=date, end_date__gte=date)
+        .order_by("-pk")
+        .first()
+    )
+
+
+def schedule_parts(parts):
+    """
+    追加した部品（アーカイブを解除した部品）を実施中・今後の計画に割り当てる
+
+    部品ごとに、残りの期間に予定のある位相のうち、次の計数日の予定が最も少ない位相を選ぶ。
+    日ごとの予定の件数は計画の daily_counts から読むため、予定の件数によらず計画の行のロックと
+    追加する部品の予定の確認のみで割り当てられる。計画にすでに予定がある部品は対象外。
+
+    Args:
+        parts: 部品のクエリセット（アーカイブした部品は除外する）
+
+    Returns:
+        int: 追加した予定の件数
+    """
+    today = timezone.localdate()
+    intervals = get_cycle_count_settings()["INTERVALS"]
+    added = 0
+    with transaction.atomic():
+        # 同時に割り当てた部品で日ごとの件数が食い違わないよう、計画の行をロックする
+        plans = list(get_current_plans(today).select_for_update())
+        if not plans:
+            return 0
+        rows = list(
+            with_stock_value(parts.active())
+            .order_by("-stock_value", "pk")
+            .values_list("pk", "stock_value")
+        )
+        if not rows:
+            return 0
+
+        for plan in plans:
+            scheduled = set(
+                plan.tasks.filter(
+                    scheduled_on__gte=today, part__in=[pk for pk, _ in rows]
+                )
+                .values_list("part_id", flat=True)
+                .distinct()
+            )
+            loads = plan.daily_counts
+            workdays = get_workdays(max(plan.start_date, today), plan.end_date)
+            phase_days = {
+                value_class: list(
+                    get_phase_days(workdays, intervals[value_class]).values()
+                )
+                for value_class in ValueClass.values
+            }
+            tasks = []
+            for part_id, value in rows:
+                if part_id in scheduled:
+                    continue
+                value_class = classify(value, plan.a_min_value, plan.b_min_value)
+                if not phase_days[value_class]:
+                    continue
+                days = min(
+                    phase_days[value_class],
+                    key=lambda days: (loads.get(days[0].isoformat(), 0), days[0]),
+                )
+                for day in days:
+                    key = day.isoformat()
+                    loads[key] = loads.get(key, 0) + 1
+                    tasks.append(
+                        CycleCountTask(
+                            plan=plan,
+                            part_id=part_id,
+                            scheduled_on=day,
+                            value_class=value_class,
+                        )
+                    )
+            if tasks:
+                CycleCountTask.objects.bulk_create(tasks)
+                plan.task_count += len(tasks)
+                plan.save(update_fields=["task_count", "daily_counts"])
+                added += len(tasks)
+    return added
+
+
+def unschedule_parts(ids, include_past=False):
+    """
+    削除（アーカイブ）した部品の予定を削除し、計画の件数を減らす
+
+    Args:
+        include_past: 過去の予定も削除するか（部品の削除時）。False の場合は今日以降の予定のみ
+
+    Returns:
+        int: 削除した予定の件数
+    """
+    tasks = CycleCountTask.objects.filter(part__in=ids)
+    if not include_past:
+        tasks = tasks.filter(scheduled_on__gte=timezone.localdate())
+    with transaction.atomic():
+        # 予定を割り当てる処理（schedule_parts）と同じく、計画の行を先にロックする
+        plans = list(
+            CycleCountPlan.objects.filter(pk__in=tasks.values("plan"))
+            .order_by("pk")
+            .select_for_update()
+        )
+        counts = {}
+        for plan_id, day, count in (
+            tasks.order_by()
+            .values_list("plan", "scheduled_on")
+            .annotate(count=Count("pk"))
+        ):
+            counts.setdefault(plan_id, {})[day.isoformat()] = count
+        if not counts:
+            return 0
+        tasks.delete()
+        for plan in plans:
+            days = counts.get(plan.pk, {})
+            for key, count in days.items():
+                plan.daily_counts[key] = plan.daily_counts.get(key, 0) - count
+            plan.task_count -= sum(days.values())
+            plan.save(update_fields=["task_count", "daily_counts"])
+    return sum(sum(days.values()) for days in counts.values())
@@ -0,0 +1,158 @@
+"""
+部品・仕入先のCSVエクスポート
+
+クエリセットを values_list().iterator(chunk_size=...) でサーバーサイドカーソルから少しずつ取得し、
+一定の行数ごとにCSVの文字列にして返すため、件数に関わらずメモリ使用量は一定です。
+カーソルはトランザクション内で開き、PostgreSQLが WITH HOLD カーソルとして
+全件をサーバー側に保存してから返す（最初の行までに時間がかかる）ことを避けています。
+
+文字コードはExcelでそのまま開ける UTF-8（BOM付き）と Shift_JIS（Windows-31J）を選べます。
+Shift_JISで表せない文字は "?" に置き換えます。
+"""
+
+import csv
+import io
+from itertools import islice
+
+from django.db import models, transaction
+from django.utils import timezone
+
+# values_list() でサーバーサイドカーソルから一度に取得する行数
+EXPORT_CHUNK_SIZE = 2000
+
+# 一度に出力する行数（出力のたびに行うエンコード・送信の回数を減らす）
+EXPORT_BATCH_SIZE = 1000
+
+# エクスポートの文字コード: クエリパラメータの値 → (コーデック, Content-Typeのcharset, BOM)
+ENCODINGS = {
+    "utf-8": ("utf-8", "utf-8", "\ufeff"),
+    "shift_jis": ("cp932", "Shift_JIS", ""),
+}
+DEFAULT_ENCODING = "utf-8"
+
+# Excelで数式として解釈される先頭の文字（CSVインジェクション対策で先頭に "'" を付ける）
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+PART_COLUMNS = (
+    "id",
+    "name",
+    "category",
+    "supplier__name",
+    "cost_price",
+    "selling_price",
+    "tax_rate",
+    "stock_quantity",
+    "reorder_level",
+    "description",
+    "created_by__email",
+    "updated_by__email",
+    "created_at",
+    "updated_at",
+)
+
+SUPPLIER_COLUMNS = (
+    "id",
+    "supplier_code",
+    "name",
+    "contact_person",
+    "phone",
+    "fax",
+    "email",
+    "postal_code",
+    "prefecture",
+    "city",
+    "town",
+    "building",
+    "website",
+    "remarks",
+    "created_by__email",
+    "updated_by__email",
+    "created_at",
+    "updated_at",
+)
+
+
+def escape_text(value):
+    if value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def format_datetime(value):
+    return timezone.localtime(value).strftime(DATETIME_FORMAT)
+
+
+def resolve_field(model, lookup):
+    """
+    "supplier__name" のような参照を辿り、(先頭のフィールド, 末尾のフィールド) を返す
+    """
+    names = lookup.split("__")
+    first = field = model._meta.get_field(names[0])
+    for name in names[1:]:
+        field = field.related_model._meta.get_field(name)
+    return first, field
+
+
+def compile_column(model, lookup):
+    """
+    列の (見出し, 変換関数) を返す
+
+    見出しは先頭のフィールドの verbose_name（"supplier__name" なら「仕入先」）
+    """
+    first, field = resolve_field(model, lookup)
+    header = str(first.verbose_name)
+    if field.choices:
+        labels = {value: str(label) for value, label in field.flatchoices}
+        return header, lambda value: labels.get(value, value)
+    if isinstance(field, models.DateTimeField):
+        return header, format_datetime
+    if isinstance(field, (models.CharField, models.TextField)):
+        return header, escape_text
+    return header, None
+
+
+def convert_rows(rows, converters):
+    for row in rows:
+        yield [
+            "" if value is None else convert(value) if convert else value
+            for value, convert in zip(row, converters)
+        ]
+
+
+def iter_csv(queryset, lookups, encoding=DEFAULT_ENCODING):
+    """
+    クエリセットの lookups の列をCSVにし、エンコード済みのバイト列を順に返す
+    """
+    codec, _, bom = ENCODINGS[encoding]
+    headers, converters = zip(
+        *(compile_column(queryset.model, lookup) for lookup in lookups)
+    )
+    buffer = io.StringIO()
+    # Excelに合わせて改行はCRLF
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    buffer.write(bom)
+    writer.writerow(headers)
+
+    with transaction.atomic(using=queryset.db):
+        rows = queryset.values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        while True:
+            batch = list(islice(rows, EXPORT_BATCH_SIZE))
+            if not batch:
+                break
+            writer.writerows(convert_rows(batch, converters))
+            yield buffer.getvalue().encode(codec, errors="replace")
+            buffer.seek(0)
+            buffer.truncate()
+    # 見出しのみ（0件）の場合
+    if buffer.tell():
+        yield buffer.getvalue().encode(codec, errors="replace")
+
+
+def get_content_type(encoding):
+    return f"text/csv; charset={ENCODINGS[encoding][1]}"
+
+
+def get_filename(prefix):
+    return f"{prefix}_{timezone.localdate():%Y%m%d}.csv"
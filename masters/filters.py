@@ -0,0 +1,92 @@
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from masters.models import Part
+from masters.serializers.fields import AsOfField
+from masters.stock import annotate_stock_as_of
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    並び替えフィルター
+
+    ビューの ordering_fields に含まれるキーでのみ並び替え、
+    同じ値の行でページ間の順序が揺れないよう末尾にIDを追加します。
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        ordering = list(ordering)
+        if not any(term.lstrip("-") in ("id", "pk") for term in ordering):
+            ordering.append("-id" if ordering[-1].startswith("-") else "id")
+        return ordering
+
+
+class PartFilterSerializer(serializers.Serializer):
+    """
+    部品一覧の絞り込み条件（クエリパラメータ）のシリアライザー
+    """
+
+    category = serializers.ChoiceField(choices=Part.Category.choices, required=False)
+    supplier_id = serializers.IntegerField(min_value=1, required=False)
+    cost_price_min = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False
+    )
+    cost_price_max = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False
+    )
+    selling_price_min = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False
+    )
+    selling_price_max = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False
+    )
+    stock_quantity_min = serializers.IntegerField(min_value=0, required=False)
+    stock_quantity_max = serializers.IntegerField(min_value=0, required=False)
+    updated_since = serializers.DateTimeField(required=False)
+    # true の場合はアーカイブした部品のみ（既定ではアーカイブされていない部品のみ）
+    archived = serializers.BooleanField(required=False, default=False)
+    # 一覧でのみ使用: この日時に登録済みの部品に絞り、その時点の在庫数（stock_quantity_as_of）を付与する
+    as_of = AsOfField(required=False)
+
+
+class PartFilterBackend(BaseFilterBackend):
+    """
+    部品一覧の絞り込みフィルター
+
+    クエリパラメータを PartFilterSerializer で検証し、不正な値は400エラーにします。
+    各条件は masters.Part のインデックス（Meta.indexes）で絞り込めるものに限定しています。
+    一覧・集計など詳細以外のアクションでは、アーカイブした部品を除外します（archived=true の場合はアーカイブした部品のみ）。
+    一覧で as_of を指定した場合は masters.stock.annotate_stock_as_of でその時点の在庫数を付与します。
+    """
+
+    # クエリパラメータ名とルックアップの対応
+    lookups = {
+        "category": "category",
+        "supplier_id": "supplier_id",
+        "cost_price_min": "cost_price__gte",
+        "cost_price_max": "cost_price__lte",
+        "selling_price_min": "selling_price__gte",
+        "selling_price_max": "selling_price__lte",
+        "stock_quantity_min": "stock_quantity__gte",
+        "stock_quantity_max": "stock_quantity__lte",
+        "updated_since": "updated_at__gte",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = PartFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        validated_data = dict(serializer.validated_data)
+        archived = validated_data.pop("archived")
+        as_of = validated_data.pop("as_of", None)
+        conditions = {
+            self.lookups[name]: value for name, value in validated_data.items()
+        }
+        if not getattr(view, "detail", False):
+            queryset = queryset.archived() if archived else queryset.active()
+        if conditions:
+            queryset = queryset.filter(**conditions)
+        if as_of is not None and getattr(view, "action", None) == "list":
+            queryset = annotate_stock_as_of(queryset, as_of)
+        return queryset
@@ -0,0 +1,542 @@
+"""
+部品のCSV一括インポート
+
+1行ずつ PartSerializer で検証・保存すると、行ごとに検証・仕入先の取得・INSERTが発生するため、
+以下の手順でまとめて処理します。
+
+1. CSVをストリームとして読み、IMPORT_BATCH_SIZE 行ずつに分ける
+2. 列ごとに値の種類（重複を除いた値）だけ検証する。よくある正しい値は専用の変換関数で変換し、
+   それ以外は PartSerializer の項目で検証する（結果・エラーメッセージはAPIの登録時と同じになる）
+3. 仕入先はバッチ内のIDと取引先コードをまとめて1回のクエリで取得する
+4. 正しい行を COPY で一時テーブルに読み込み、最後に INSERT ... SELECT で部品と検索ドキュメントを作成する
+   （実施中・今後の循環棚卸の計画があれば、作成した部品を割り当てる）
+
+エラーのある行は取り込まず、行番号（見出しを1行目とした行）・項目・メッセージを報告します。
+dry_run の場合は検証のみ行い、データベースには書き込みません。
+"""
+
+import csv
+from decimal import Decimal, InvalidOperation
+import io
+from itertools import islice
+
+from django.core import validators
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.validators import ProhibitSurrogateCharactersValidator
+
+from masters.cycle_counts import schedule_parts
+from masters.models import Part, SearchDocument, Supplier
+from masters.search import build_document
+from masters.serializers import PartSerializer
+from masters.stock import clear_low_stock_count
+from zaiko_be.response_cache import bump_model_version
+
+# 一度に検証・COPYする行数
+IMPORT_BATCH_SIZE = 5000
+
+# 報告するエラーの件数の上限（None は無制限。件数は error_count で返す）
+MAX_REPORTED_ERRORS = 1000
+
+# 読み込みの文字コード: クエリパラメータの値 → コーデック（UTF-8はBOMの有無どちらも可）
+IMPORT_ENCODINGS = {
+    "utf-8": "utf-8-sig",
+    "shift_jis": "cp932",
+}
+DEFAULT_IMPORT_ENCODING = "utf-8"
+
+# 取り込む項目（PartSerializer の項目名）
+IMPORT_FIELDS = (
+    "name",
+    "category",
+    "cost_price",
+    "selling_price",
+    "tax_rate",
+    "stock_quantity",
+    "reorder_level",
+    "description",
+)
+
+# 空欄・列がない場合の値（PartSerializer.to_internal_value と同じ）
+EMPTY_VALUES = {
+    "tax_rate": "10.00",
+    "stock_quantity": "0",
+    "reorder_level": "0",
+    "description": "",
+}
+
+# 仕入先はIDまたは取引先コードで指定する（両方ある場合はID）
+SUPPLIER_FIELDS = ("supplier_id", "supplier_code")
+
+STAGING_TABLE = "part_import"
+
+# 一時テーブルの列（COPY で読み込む順）
+STAGING_COLUMNS = (
+    "supplier_id",
+    *IMPORT_FIELDS,
+    "search_text",
+    "search_bigrams",
+)
+
+
+class CSVImportError(Exception):
+    """
+    ファイル全体を取り込めない場合（見出し・文字コードの誤り）のエラー
+    """
+
+
+def get_header_names():
+    """
+    見出し → 項目名（項目名のほか、verbose_name の「部品名」「原価」なども使用できる）
+    """
+    names = {"仕入先ID": "supplier_id", "取引先コード": "supplier_code"}
+    for name in IMPORT_FIELDS:
+        names[str(Part._meta.get_field(name).verbose_name)] = name
+    for name in (*IMPORT_FIELDS, *SUPPLIER_FIELDS):
+        names[name] = name
+    return names
+
+
+def read_header(reader):
+    """
+    見出しの行を読み、項目名 → 列番号 を返す（不明な列は無視する）
+    """
+    header = next(reader, None)
+    if header is None:
+        raise CSVImportError("CSVファイルが空です")
+    header_names = get_header_names()
+    columns = {}
+    for index, title in enumerate(header):
+        name = header_names.get(title.strip())
+        if name is None:
+            continue
+        if name in columns:
+            raise CSVImportError(f"列「{title.strip()}」が重複しています")
+        columns[name] = index
+
+    missing = [
+        name
+        for name in ("name", "category", "cost_price", "selling_price")
+        if name not in columns
+    ]
+    if not any(name in columns for name in SUPPLIER_FIELDS):
+        missing.append("supplier_id または supplier_code")
+    if missing:
+        raise CSVImportError(f"必須の列がありません: {', '.join(missing)}")
+    return columns
+
+
+def format_array(values):
+    """
+    PostgreSQLの配列のリテラル（COPYで読み込む形式）
+    """
+    if not values:
+        return "{}"
+    joined = "".join(values)
+    if "\\" in joined or '"' in joined:
+        values = [value.replace("\\", "\\\\").replace('"', '\\"') for value in values]
+    return '{"' + '","'.join(values) + '"}'
+
+
+# 高速な変換で扱う項目の検証（これ以外の検証がある項目は常に run_validation で検証する）
+FAST_VALIDATORS = (
+    validators.MinValueValidator,
+    validators.MaxValueValidator,
+    validators.MaxLengthValidator,
+    validators.ProhibitNullCharactersValidator,
+    ProhibitSurrogateCharactersValidator,
+)
+
+
+def compile_fast_converter(field):
+    """
+    よくある正しい値を項目の run_validation と同じ結果に素早く変換する関数を返す
+
+    変換関数はそれ以外の値（エラーになる可能性がある値）には None を返し、
+    呼び出し側で run_validation による検証（エラーメッセージの作成）を行う。
+    対応していない項目は None を返す。
+    """
+    if not all(
+        isinstance(validator, FAST_VALIDATORS) for validator in field.validators
+    ):
+        return None
+    if isinstance(field, serializers.DecimalField):
+        if field.localize or field.max_digits is None or field.decimal_places is None:
+            return None
+        step = Decimal(1).scaleb(-field.decimal_places)
+        limit = Decimal(10) ** (field.max_digits - field.decimal_places)
+        min_exponent = -field.decimal_places
+        min_value, max_value = field.min_value, field.max_value
+
+        def convert(value):
+            try:
+                number = Decimal(value)
+            except InvalidOperation:
+                return None
+            if (
+                not number.is_finite()
+                or number.as_tuple().exponent < min_exponent
+                or abs(number) >= limit
+                or (min_value is not None and number < min_value)
+                or (max_value is not None and number > max_value)
+            ):
+                return None
+            return number.quantize(step)
+
+        return convert
+    if isinstance(field, serializers.IntegerField):
+        min_value, max_value = field.min_value, field.max_value
+
+        def convert(value):
+            if not value.isascii() or not value.isdigit():
+                return None
+            number = int(value)
+            if (min_value is not None and number < min_value) or (
+                max_value is not None and number > max_value
+            ):
+                return None
+            return number
+
+        return convert
+    if isinstance(field, serializers.ChoiceField):
+        return field.choice_strings_to_values.get
+    if isinstance(field, serializers.CharField):
+        if not field.trim_whitespace:
+            return None
+        max_length, allow_blank = field.max_length, field.allow_blank
+
+        def convert(value):
+            if (
+                (not value and not allow_blank)
+                or (max_length is not None and len(value) > max_length)
+                or "\x00" in value
+            ):
+                return None
+            return value
+
+        return convert
+    return None
+
+
+class ImportReport:
+    """
+    インポートの結果（件数と行ごとのエラー）
+    """
+
+    def __init__(self, dry_run, max_errors=MAX_REPORTED_ERRORS):
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.total_rows = 0
+        self.valid_rows = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row, field, message):
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "field": field, "message": str(message)})
+
+    def as_dict(self):
+        return {
+            "dry_run": self.dry_run,
+            "total_rows": self.total_rows,
+            "valid_rows": self.valid_rows,
+            "imported": self.imported,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+class PartImporter:
+    """
+    部品のCSVを検証し、正しい行をまとめて登録する
+
+    使い方:
+        report = PartImporter(user=request.user).run(file, "utf-8")
+    """
+
+    def __init__(self, user=None, dry_run=False, max_errors=MAX_REPORTED_ERRORS):
+        self.user = user
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.fields = PartSerializer().fields
+        self.converters = {
+            name: compile_fast_converter(self.fields[name]) for name in IMPORT_FIELDS
+        }
+        self.category_values = {
+            str(label): value for value, label in Part.Category.choices
+        }
+        # 取得済みの仕入先（見つからなかったIDとコードも含め、再度問い合わせない）
+        self.supplier_ids = {}
+        self.supplier_codes = {}
+
+    def run(self, file, encoding=DEFAULT_IMPORT_ENCODING):
+        """
+        バイナリモードのファイル file を取り込み、ImportReport を返す
+        """
+        report = ImportReport(self.dry_run, self.max_errors)
+        text = io.TextIOWrapper(file, encoding=IMPORT_ENCODINGS[encoding], newline="")
+        reader = csv.reader(text)
+        try:
+            columns = read_header(reader)
+            if self.dry_run:
+                for batch, first_row in self.read_batches(reader):
+                    self.validate_batch(batch, first_row, columns, report)
+                return report
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                self.create_staging_table(cursor)
+                for batch, first_row in self.read_batches(reader):
+                    rows = self.validate_batch(batch, first_row, columns, report)
+                    if rows:
+                        self.copy_rows(cursor, rows)
+                if report.valid_rows:
+                    report.imported = self.insert_parts(cursor)
+                    schedule_parts(
+                        Part.objects.filter(
+                            pk__in=RawSQL(f"SELECT id FROM {STAGING_TABLE}", [])
+                        )
+                    )
+                cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+        except UnicodeDecodeError:
+            raise CSVImportError(f"文字コード {encoding} として読み込めませんでした")
+        except csv.Error as exc:
+            raise CSVImportError(f"{reader.line_num}行目: {exc}")
+        finally:
+            text.detach()
+
+        if report.imported:
+            # COPY・INSERT ... SELECT ではシグナルが送られないため
+            bump_model_version(Part)
+            clear_low_stock_count()
+        return report
+
+    def read_batches(self, reader):
+        """
+        行を IMPORT_BATCH_SIZE 行ずつ (行のリスト, 先頭の行番号) で返す（見出しが1行目）
+        """
+        first_row = 2
+        while True:
+            batch = list(islice(reader, IMPORT_BATCH_SIZE))
+            if not batch:
+                return
+            yield batch, first_row
+            first_row += len(batch)
+
+    def convert_column(self, name, cells):
+        """
+        1列分の値を検証する（同じ値は1回だけ検証する）
+
+        compile_fast_converter で変換できない値のみ項目の run_validation で検証する。
+
+        Returns:
+            list: 行ごとの (変換後の値, エラーメッセージ)
+        """
+        field = self.fields[name]
+        fast_convert = self.converters[name]
+        results = {}
+        for cell in set(cells):
+            value = cell.strip()
+            if not value:
+                if name not in EMPTY_VALUES:
+                    results[cell] = (None, field.error_messages["required"])
+                    continue
+                value = EMPTY_VALUES[name]
+            if name == "category":
+                value = self.category_values.get(value, value)
+            converted = fast_convert(value) if fast_convert is not None else None
+            if converted is not None:
+                results[cell] = (converted, None)
+                continue
+            try:
+                results[cell] = (field.run_validation(value), None)
+            except ValidationError as exc:
+                results[cell] = (None, exc.detail[0])
+        return [results[cell] for cell in cells]
+
+    def resolve_suppliers(self, ids, codes):
+        """
+        まだ取得していない仕入先のID・取引先コードを1回のクエリでまとめて取得する
+        """
+        pks = {}
+        for value in ids - self.supplier_ids.keys():
+            self.supplier_ids[value] = None
+            if value.isascii() and value.isdigit() and int(value) < 2**63:
+                pks.setdefault(int(value), []).append(value)
+        codes = codes - self.supplier_codes.keys()
+        for code in codes:
+            self.supplier_codes[code] = None
+        if not pks and not codes:
+            return
+        suppliers = Supplier.objects.filter(
+            Q(pk__in=pks) | Q(supplier_code__in=codes)
+        ).values_list("pk", "supplier_code")
+        for pk, code in suppliers:
+            for value in pks.get(pk, ()):
+                self.supplier_ids[value] = pk
+            if code in codes:
+                self.supplier_codes[code] = pk
+
+    def get_supplier(self, supplier_id, supplier_code):
+        """
+        行の仕入先のIDを返す
+
+        Returns:
+            tuple: (仕入先のID, エラーの項目, エラーメッセージ)
+        """
+        if supplier_id:
+            pk = self.supplier_ids.get(supplier_id)
+            if pk is None:
+                message = self.fields["supplier_id"].error_messages["does_not_exist"]
+                return None, "supplier_id", message.format(pk_value=supplier_id)
+            return pk, None, None
+        if supplier_code:
+            pk = self.supplier_codes.get(supplier_code)
+            if pk is None:
+                message = f"取引先コード「{supplier_code}」の仕入先は存在しません。"
+                return None, "supplier_code", message
+            return pk, None, None
+        return (
+            None,
+            "supplier_id",
+            self.fields["supplier_id"].error_messages["required"],
+        )
+
+    def validate_batch(self, batch, first_row, columns, report):
+        """
+        バッチの行を列ごとに検証し、正しい行を一時テーブルの列の順のタプルで返す
+        """
+        rows = []
+        row_numbers = []
+        cells = {name: [] for name in columns}
+        row_number = first_row - 1
+        for row in batch:
+            row_number += 1
+            if not any(row):
+                continue
+            row_numbers.append(row_number)
+            for name, index in columns.items():
+                cells[name].append(row[index] if index < len(row) else "")
+        if not row_numbers:
+            return rows
+        report.total_rows += len(row_numbers)
+
+        count = len(row_numbers)
+        converted = [
+            (
+                self.convert_column(name, cells[name])
+                if name in columns
+                else [(EMPTY_VALUES[name], None)] * count
+            )
+            for name in IMPORT_FIELDS
+        ]
+        supplier_cells = [
+            [cell.strip() for cell in cells[name]] if name in columns else [""] * count
+            for name in SUPPLIER_FIELDS
+        ]
+        self.resolve_suppliers(*(set(values) - {""} for values in supplier_cells))
+
+        for index, row_number in enumerate(row_numbers):
+            supplier_id, field, message = self.get_supplier(
+                supplier_cells[0][index], supplier_cells[1][index]
+            )
+            valid = supplier_id is not None
+            if not valid:
+                report.add_error(row_number, field, message)
+            values = []
+            for name, column in zip(IMPORT_FIELDS, converted):
+                value, message = column[index]
+                if message is not None:
+                    report.add_error(row_number, name, message)
+                    valid = False
+                values.append(value)
+            if valid:
+                rows.append((supplier_id, *values))
+        report.valid_rows += len(rows)
+        return rows
+
+    def create_staging_table(self, cursor):
+        """
+        COPY で読み込む一時テーブルを作成する（部品のIDは読み込み時に採番する）
+        """
+        cursor.execute(
+            "SELECT pg_get_serial_sequence(%s, %s)",
+            [Part._meta.db_table, Part._meta.pk.column],
+        )
+        sequence = cursor.fetchone()[0]
+        cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                id bigint NOT NULL DEFAULT nextval(%s::regclass),
+                supplier_id bigint NOT NULL,
+                name varchar(200) NOT NULL,
+                category varchar(50) NOT NULL,
+                cost_price numeric(12, 2) NOT NULL,
+                selling_price numeric(12, 2) NOT NULL,
+                tax_rate numeric(5, 2) NOT NULL,
+                stock_quantity integer NOT NULL,
+                reorder_level integer NOT NULL,
+                description text NOT NULL,
+                search_text text NOT NULL,
+                search_bigrams varchar(2)[] NOT NULL
+            ) ON COMMIT DROP
+            """,
+            [sequence],
+        )
+
+    def copy_rows(self, cursor, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for row in rows:
+            name, description = row[1], row[-1]
+            text, bigrams = build_document(
+                SearchDocument.Kind.PART, {"name": name, "description": description}
+            )
+            writer.writerow((*row, text, format_array(bigrams)))
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+    def insert_parts(self, cursor):
+        """
+        一時テーブルから部品と検索ドキュメントを作成する
+
+        Returns:
+            int: 作成した部品の件数
+        """
+        opts = Part._meta
+        user_id = self.user.pk if self.user is not None else None
+        now = timezone.now()
+        columns = [
+            opts.pk.column,
+            opts.get_field("supplier").column,
+            *(opts.get_field(name).column for name in IMPORT_FIELDS),
+            opts.get_field("created_by").column,
+            opts.get_field("updated_by").column,
+            opts.get_field("created_at").column,
+            opts.get_field("updated_at").column,
+        ]
+        quote = connection.ops.quote_name
+        cursor.execute(
+            f"INSERT INTO {quote(opts.db_table)} "
+            f"({', '.join(quote(column) for column in columns)}) "
+            f"SELECT id, supplier_id, {', '.join(IMPORT_FIELDS)}, %s, %s, %s, %s "
+            f"FROM {STAGING_TABLE}",
+            [user_id, user_id, now, now],
+        )
+        imported = cursor.rowcount
+        cursor.execute(
+            f"INSERT INTO {quote(SearchDocument._meta.db_table)} "
+            "(kind, object_id, text, bigrams) "
+            f"SELECT %s, id, search_text, search_bigrams FROM {STAGING_TABLE}",
+            [SearchDocument.Kind.PART.value],
+        )
+        return imported
@@ -0,0 +1,167 @@
+"""
+棚卸表の作成ジョブの実行
+
+settings.JOB_RUNNER で実行方法を切り替えます。
+
+- "thread": 作成を受け付けたプロセスで、トランザクションの確定後にスレッドを起動して実行する
+- "worker": 待機中のまま保存し、python manage.py run_jobs を別プロセスで動かして実行する
+
+どちらの場合も、ジョブは状態を「待機中」から「作成中」に更新できた1つのプロセスだけが実行します。
+
+実行中にプロセスが再起動するとジョブは「作成中」（スレッドの起動前なら「待機中」）のまま残るため、
+settings.JOB_TIMEOUT（秒）を過ぎても完了していないジョブは止まったものとして再び実行します。
+ワーカーは待機中のジョブと同じく取得し、スレッドで実行する設定では進捗の確認時に実行し直します。
+再実行で置き換えられた元の実行は、開始日時が一致しないため状態・進捗を更新しません。
+"""
+
+import datetime
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from masters.models import StocktakingSheet
+from masters.stocktaking import build_stocktaking_sheet, get_sheet_queryset
+
+logger = logging.getLogger(__name__)
+
+
+def uses_thread_runner():
+    return getattr(settings, "JOB_RUNNER", "thread") == "thread"
+
+
+def enqueue_stocktaking_sheet(sheet):
+    """
+    棚卸表の作成ジョブを実行待ちにする
+    """
+    if uses_thread_runner():
+        transaction.on_commit(lambda: start_thread(sheet.pk))
+
+
+def resume_stocktaking_sheet(pk):
+    """
+    スレッドで実行する設定で、止まったジョブを再び実行する（進捗の確認時に呼ぶ）
+
+    Returns:
+        bool: スレッドを起動したかどうか
+    """
+    if not uses_thread_runner() or not get_stale_jobs().filter(pk=pk).exists():
+        return False
+    start_thread(pk)
+    return True
+
+
+def start_thread(pk):
+    thread = threading.Thread(
+        target=run_in_thread, args=(pk,), name=f"stocktaking-sheet-{pk}", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def run_in_thread(pk):
+    try:
+        run_stocktaking_sheet(pk)
+    finally:
+        # スレッドごとに開いたデータベース接続を閉じる
+        connections.close_all()
+
+
+def get_stale_jobs():
+    """
+    登録・開始から settings.JOB_TIMEOUT を過ぎても待機中・作成中のままのジョブ
+    """
+    stale_before = timezone.now() - datetime.timedelta(
+        seconds=getattr(settings, "JOB_TIMEOUT", 1800)
+    )
+    return StocktakingSheet.objects.filter(
+        Q(status=StocktakingSheet.Status.PENDING, created_at__lt=stale_before)
+        | Q(status=StocktakingSheet.Status.RUNNING, started_at__lt=stale_before)
+    )
+
+
+def claim(pk):
+    """
+    待機中・止まったジョブを作成中にし、開始日時を返す（他のプロセスが先に更新した場合は None）
+    """
+    started_at = timezone.now()
+    claimed = (
+        StocktakingSheet.objects.filter(pk=pk, status=StocktakingSheet.Status.PENDING)
+        | get_stale_jobs().filter(pk=pk)
+    ).update(
+        status=StocktakingSheet.Status.RUNNING, started_at=started_at, processed_rows=0
+    )
+    return started_at if claimed else None
+
+
+def run_stocktaking_sheet(pk):
+    """
+    棚卸表を作成してストレージに保存する
+
+    Returns:
+        bool: このプロセスで実行したかどうか
+    """
+    started_at = claim(pk)
+    if started_at is None:
+        return False
+    sheet = StocktakingSheet.objects.select_related("supplier").get(pk=pk)
+    # 止まったとみなされて他のプロセスが実行し直した場合は更新しない
+    jobs = StocktakingSheet.objects.filter(pk=pk, started_at=started_at)
+    try:
+        jobs.update(total_rows=get_sheet_queryset(sheet).count())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f"sheet.{sheet.format}")
+            processed = build_stocktaking_sheet(
+                sheet,
+                path,
+                on_progress=lambda count: jobs.update(processed_rows=count),
+            )
+            with open(path, "rb") as file:
+                sheet.file.save(os.path.basename(path), File(file), save=False)
+    except Exception as exc:
+        logger.exception("棚卸表 #%s の作成に失敗しました", pk)
+        jobs.update(
+            status=StocktakingSheet.Status.FAILED,
+            error=str(exc),
+            finished_at=timezone.now(),
+        )
+        return True
+
+    jobs.update(
+        status=StocktakingSheet.Status.SUCCEEDED,
+        file=sheet.file.name,
+        total_rows=processed,
+        processed_rows=processed,
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def run_pending_jobs():
+    """
+    待機中のジョブを古い順にすべて実行し、止まったジョブがあれば実行し直す
+
+    Returns:
+        int: 実行したジョブの件数
+    """
+    count = 0
+    while True:
+        pk = (
+            StocktakingSheet.objects.filter(status=StocktakingSheet.Status.PENDING)
+            .order_by("id")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is None:
+            pk = get_stale_jobs().order_by("id").values_list("pk", flat=True).first()
+        if pk is None:
+            return count
+        if run_stocktaking_sheet(pk):
+            count += 1
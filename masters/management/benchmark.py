@@ -0,0 +1,89 @@
+"""
+計測用コマンドの共通処理
+"""
+
+from contextlib import contextmanager
+from decimal import Decimal
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from masters.models import Part, Supplier
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def sample_data(rows):
+    """
+    計測用の仕入先・部品を rows 件ずつ作成し、終了時にロールバックする
+    """
+    try:
+        with transaction.atomic():
+            create_sample_rows(rows)
+            analyze()
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def create_sample_rows(rows):
+    user = User.objects.create_user(email="benchmark@example.com", password="benchmark")
+    suppliers = Supplier.objects.bulk_create(
+        Supplier(
+            name=f"計測用仕入先{i}",
+            phone="03-1234-5678",
+            email=f"benchmark{i}@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            created_by=user,
+            updated_by=user,
+        )
+        for i in range(rows)
+    )
+    Part.objects.bulk_create(
+        Part(
+            name=f"計測用部品{i}",
+            category="head",
+            supplier=suppliers[i % len(suppliers)],
+            cost_price=Decimal("1234.50"),
+            selling_price=Decimal("2469.00"),
+            stock_quantity=i % 100,
+            reorder_level=10,
+            created_by=user,
+            updated_by=user,
+        )
+        for i in range(rows)
+    )
+
+
+def analyze():
+    """
+    作成した行の統計情報を更新する（古い統計情報のままだと大量の行に不向きな実行計画になる）
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for model in (User, Supplier, Part):
+            cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+
+def measure(func, repeat):
+    """
+    最も速かった1回の所要時間（秒）を返す
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
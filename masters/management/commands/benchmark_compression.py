@@ -0,0 +1,58 @@
+"""
+レスポンス圧縮のCPU時間と削減できるサイズを圧縮方式・レベルごとに比較するコマンド
+
+1,000件の部品一覧ページ（JSON・MessagePack）を圧縮し、1回あたりの圧縮時間・圧縮後のサイズ・
+削減率・1ミリ秒あたりに削減できたバイト数を出力します。計測用のデータは終了時にロールバックします。
+
+    python manage.py benchmark_compression --repeat 10
+"""
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from masters.management.benchmark import measure, sample_data
+from masters.models import Part
+from masters.serializers import PartSerializer
+from zaiko_be.middleware.compression import compress
+from zaiko_be.renderers import FastJSONRenderer, MessagePackRenderer
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 9)
+ROWS = 1000
+
+
+class Command(BaseCommand):
+    help = "レスポンス圧縮のCPU時間と削減できるサイズを計測します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10, help="計測回数")
+
+    def handle(self, *args, **options):
+        with sample_data(ROWS):
+            self.run(options["repeat"])
+
+    def run(self, repeat):
+        rows = Part.objects.select_related(
+            "supplier", "created_by", "updated_by"
+        ).order_by("id")[:ROWS]
+        configs = [("gzip", level, {"GZIP_LEVEL": level}) for level in GZIP_LEVELS] + [
+            ("br", quality, {"BROTLI_QUALITY": quality}) for quality in BROTLI_QUALITIES
+        ]
+        for renderer in (FastJSONRenderer(), MessagePackRenderer()):
+            request = APIRequestFactory().get("/")
+            request.query_params = request.GET
+            request.accepted_renderer = renderer
+            results = PartSerializer(rows, many=True, context={"request": request}).data
+            body = renderer.render({"results": results})
+            self.stdout.write(f"{renderer.format}: {len(body) / 1024:.0f}KiB")
+
+            for encoding, level, config in configs:
+                compressed = compress(body, encoding, config)
+                elapsed = measure(lambda: compress(body, encoding, config), repeat)
+                saved = len(body) - len(compressed)
+                self.stdout.write(
+                    f"  {encoding} {level}: {elapsed * 1000:.2f}ms, "
+                    f"{len(compressed) / 1024:.0f}KiB "
+                    f"(-{saved / len(body):.0%}), "
+                    f"{saved / 1024 / (elapsed * 1000):.0f}KiB削減/ms"
+                )
@@ -0,0 +1,46 @@
+"""
+部品のCSVエクスポートの所要時間とメモリ使用量を計測するコマンド
+
+計測用の部品を作成し、エクスポートと同じ処理（masters.export.iter_csv）で全件を出力して、
+所要時間・出力サイズと、出力によるプロセスの最大RSSの増加量を文字コードごとに表示します。
+RSSの増加が件数に比例しないことを確認するため、件数は --rows で変更できます。
+計測用のデータは終了時にロールバックします。
+
+    python manage.py benchmark_export --rows 500000
+"""
+
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+
+from masters.export import ENCODINGS, PART_COLUMNS, iter_csv
+from masters.management.benchmark import sample_data
+from masters.models import Part
+
+
+class Command(BaseCommand):
+    help = "部品のCSVエクスポートの所要時間とメモリ使用量を計測します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000, help="部品の件数")
+
+    def handle(self, *args, **options):
+        with sample_data(options["rows"]):
+            for encoding in ENCODINGS:
+                self.run(encoding)
+
+    def run(self, encoding):
+        queryset = Part.objects.order_by("id")
+        # 計測用データの作成で増えた分を除くため、出力の前後の最大RSS（KiB）を比べる
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        size = 0
+        for chunk in iter_csv(queryset, PART_COLUMNS, encoding):
+            size += len(chunk)
+        elapsed = time.perf_counter() - started
+        growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+        self.stdout.write(
+            f"{encoding}: {elapsed:.2f}秒, {size / 1024 / 1024:.1f}MiB, "
+            f"最大RSSの増加 {growth}KiB"
+        )
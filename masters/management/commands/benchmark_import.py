@@ -0,0 +1,92 @@
+"""
+部品のCSV一括登録の所要時間を計測するコマンド
+
+計測用の仕入先を作成し、仕入先をID・取引先コードで指定した --rows 行のCSVを
+masters.imports.PartImporter で検証のみ（dry_run）と登録の2回処理して、所要時間と1秒あたりの行数を表示します。
+計測用のデータは終了時にロールバックします。
+
+    python manage.py benchmark_import --rows 100000
+"""
+
+import csv
+import io
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+
+from masters.imports import PartImporter
+from masters.management.benchmark import sample_data
+from masters.models import Part, Supplier
+
+
+class Command(BaseCommand):
+    help = "部品のCSV一括登録の所要時間を計測します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000, help="CSVの行数")
+        parser.add_argument("--suppliers", type=int, default=1000, help="仕入先の件数")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with sample_data(options["suppliers"]), tempfile.TemporaryFile() as file:
+            suppliers = list(Supplier.objects.values_list("pk", flat=True))
+            # 半分の仕入先は取引先コードで指定する
+            coded = set(suppliers[::2])
+            Supplier.objects.filter(pk__in=coded).update(
+                supplier_code=Concat(Value("B"), Cast("id", CharField()))
+            )
+            self.write_csv(file, rows, suppliers, coded)
+            before = Part.objects.count()
+
+            for dry_run in (True, False):
+                file.seek(0)
+                started = time.perf_counter()
+                report = PartImporter(dry_run=dry_run).run(file)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{'検証のみ' if dry_run else '登録'}: {elapsed:.2f}秒, "
+                    f"{report.total_rows / elapsed:,.0f}行/秒, "
+                    f"登録 {report.imported}件, エラー {report.error_count}件"
+                )
+            self.stdout.write(f"部品の件数: {before} → {Part.objects.count()}")
+
+    def write_csv(self, file, rows, suppliers, coded):
+        text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(
+            (
+                "部品名",
+                "カテゴリ",
+                "仕入先ID",
+                "取引先コード",
+                "原価",
+                "見積用単価",
+                "税率(%)",
+                "現在庫数",
+                "補充閾値",
+                "備考",
+            )
+        )
+        categories = [choice.label for choice in Part.Category]
+        for i in range(rows):
+            pk = suppliers[i % len(suppliers)]
+            supplier_id, code = ("", f"B{pk}") if pk in coded else (pk, "")
+            writer.writerow(
+                (
+                    f"計測用インポート部品{i}",
+                    categories[i % len(categories)],
+                    supplier_id,
+                    code,
+                    f"{i % 10000}.{i % 100:02d}",
+                    f"{i % 20000}.50",
+                    "10",
+                    i % 500,
+                    i % 50,
+                    "備考" if i % 10 == 0 else "",
+                )
+            )
+        text.flush()
+        text.detach()
@@ -0,0 +1,135 @@
+"""
+入出庫の同時登録の処理量と更新の喪失を計測するコマンド
+
+--workers 個のスレッド（それぞれ別のデータベース接続）から --parts 件の部品に入出庫を登録し、
+1秒あたりの登録件数と、在庫数と履歴の合計の差（失われた更新の件数）を表示します。
+比較のため、--batch-size 件ずつの一括登録（masters.stock.record_movements）と、
+在庫数を読み込んでから save() で書き戻す方法でも同じ件数を更新します。
+スレッドから参照できるよう計測用のデータは確定し、終了時に削除します。
+
+    python manage.py benchmark_movements --workers 8 --movements 500
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Sum
+
+from masters.models import Part, StockMovement, Supplier
+from masters.stock import record_movement, record_movements
+
+INITIAL_STOCK = 1_000_000
+
+
+class Command(BaseCommand):
+    help = "入出庫の同時登録の処理量と更新の喪失を計測します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="スレッド数")
+        parser.add_argument(
+            "--movements", type=int, default=500, help="スレッドごとの登録件数"
+        )
+        parser.add_argument(
+            "--parts", type=int, default=1, help="部品の件数（少ないほど競合する）"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=50, help="一括登録の1回あたりの件数"
+        )
+
+    def handle(self, *args, **options):
+        supplier = Supplier.objects.create(
+            name="計測用仕入先",
+            phone="03-1234-5678",
+            email="benchmark@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        parts = [
+            Part.objects.create(
+                name=f"計測用入出庫部品{i}",
+                category="other",
+                supplier=supplier,
+                cost_price=Decimal("100"),
+                selling_price=Decimal("200"),
+                stock_quantity=INITIAL_STOCK,
+            )
+            for i in range(options["parts"])
+        ]
+        try:
+            self.measure("入出庫の登録（F式）", parts, options, self.record)
+            self.measure(
+                f"一括登録（{options['batch_size']}件ずつ）",
+                parts,
+                options,
+                self.record_batch,
+                options["batch_size"],
+            )
+            self.measure("読み込み→保存", parts, options, self.read_modify_write)
+        finally:
+            StockMovement.objects.filter(part__in=parts).delete()
+            Part.objects.filter(pk__in=[part.pk for part in parts]).delete()
+            supplier.delete()
+
+    def get_kind(self, quantity):
+        return StockMovement.Kind.RECEIPT if quantity > 0 else StockMovement.Kind.ISSUE
+
+    def record(self, changes):
+        for part, quantity in changes:
+            record_movement(part, self.get_kind(quantity), quantity)
+
+    def record_batch(self, changes):
+        record_movements(
+            [
+                {"part": part, "kind": self.get_kind(quantity), "quantity": quantity}
+                for part, quantity in changes
+            ]
+        )
+
+    def read_modify_write(self, changes):
+        for part, quantity in changes:
+            with transaction.atomic():
+                part = Part.objects.get(pk=part.pk)
+                part.stock_quantity += quantity
+                part.save(update_fields=["stock_quantity", "updated_at"])
+
+    def measure(self, label, parts, options, write, batch_size=1):
+        Part.objects.filter(pk__in=[part.pk for part in parts]).update(
+            stock_quantity=INITIAL_STOCK
+        )
+        StockMovement.objects.filter(part__in=parts).delete()
+        workers = options["workers"]
+        movements = options["movements"]
+        barrier = threading.Barrier(workers)
+
+        def run(index):
+            try:
+                barrier.wait()
+                changes = [
+                    (parts[(index + i) % len(parts)], 3 if (index + i) % 2 else -2)
+                    for i in range(movements)
+                ]
+                for start in range(0, movements, batch_size):
+                    write(changes[start : start + batch_size])
+                return sum(quantity for _, quantity in changes)
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            expected = sum(executor.map(run, range(workers)))
+        elapsed = time.perf_counter() - started
+
+        actual = Part.objects.filter(pk__in=[part.pk for part in parts]).aggregate(
+            total=Sum("stock_quantity")
+        )["total"] - INITIAL_STOCK * len(parts)
+        count = workers * movements
+        self.stdout.write(
+            f"{label}: {count}件 {elapsed:.2f}秒, {count / elapsed:,.0f}件/秒, "
+            f"在庫の増減 {actual:+d}（期待値 {expected:+d}、差 {actual - expected:+d}）"
+        )
@@ -0,0 +1,100 @@
+"""
+部品一覧ページの出力・解析速度を標準のJSON・orjson・MessagePackで比較するコマンド
+
+20件・1,000件のページについて、出力時間と出力時のメモリ確保量（tracemallocのピーク値）、
+出力したデータの解析時間とサイズを計測します。計測用のデータは終了時にロールバックします。
+
+    python manage.py benchmark_renderer --repeat 20
+"""
+
+import io
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from masters.management.benchmark import measure, sample_data
+from masters.models import Part
+from masters.serializers import PartSerializer
+from zaiko_be.parsers import FastJSONParser, MessagePackParser
+from zaiko_be.renderers import FastJSONRenderer, MessagePackRenderer
+
+PAGE_SIZES = (20, 1000)
+
+
+class Command(BaseCommand):
+    help = "部品一覧ページの出力・解析速度を計測します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="計測回数")
+
+    def handle(self, *args, **options):
+        with sample_data(max(PAGE_SIZES)):
+            self.run(options["repeat"])
+
+    def run(self, repeat):
+        queryset = Part.objects.select_related(
+            "supplier", "created_by", "updated_by"
+        ).order_by("id")
+        formats = [
+            ("標準", JSONRenderer(), JSONParser()),
+            ("orjson", FastJSONRenderer(), FastJSONParser()),
+            ("MessagePack", MessagePackRenderer(), MessagePackParser()),
+        ]
+
+        for page_size in PAGE_SIZES:
+            rows = queryset[:page_size]
+            for source in ("シリアライザー", "values()"):
+                for name, renderer, parser in formats:
+                    page = self.build_page(self.get_results(source, rows, renderer))
+                    body = renderer.render(page)
+                    render_time = measure(lambda: renderer.render(page), repeat)
+                    peak = self.measure_peak(lambda: renderer.render(page))
+                    parse_time = measure(lambda: parser.parse(io.BytesIO(body)), repeat)
+                    self.stdout.write(
+                        f"{page_size}件 {source} {name}: "
+                        f"出力 {render_time * 1000:.2f}ms, "
+                        f"メモリ {peak / 1024:.0f}KiB, "
+                        f"解析 {parse_time * 1000:.2f}ms, "
+                        f"{len(body) / 1024:.1f}KiB"
+                    )
+
+    def get_results(self, source, rows, renderer):
+        """
+        シリアライザーの出力（Decimal・日時は文字列。MessagePackではDecimalのまま）、
+        または values() の辞書（Decimal・日時をレンダラーで変換）
+        """
+        if source == "values()":
+            return list(rows.values())
+        request = APIRequestFactory().get("/")
+        request.query_params = request.GET
+        request.accepted_renderer = renderer
+        return PartSerializer(rows, many=True, context={"request": request}).data
+
+    def build_page(self, results):
+        """
+        CustomPagination と同じ形式のページ
+        """
+        return {
+            "count": len(results),
+            "count_estimated": False,
+            "total_pages": 1,
+            "current": 1,
+            "page_size": len(results),
+            "next": None,
+            "previous": None,
+            "results": results,
+        }
+
+    def measure_peak(self, func):
+        """
+        実行中に確保されたメモリのピーク値（バイト）を返す
+        """
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
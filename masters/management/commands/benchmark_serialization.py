@@ -0,0 +1,68 @@
+"""
+一覧取得のシリアライズ速度を通常のシリアライザーと高速シリアライザーで比較するコマンド
+
+計測用のデータはトランザクション内で作成し、終了時にロールバックします。
+
+    python manage.py benchmark_serialization --rows 5000 --repeat 5
+"""
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from masters.management.benchmark import measure, sample_data
+from masters.models import Part, Supplier
+from masters.serializers import PartSerializer, SupplierSerializer
+from masters.serializers.fast import compile_fast_serializer
+
+
+class Command(BaseCommand):
+    help = "部品・仕入先一覧のシリアライズ速度（行/秒）を計測します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="計測する行数")
+        parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+
+    def handle(self, *args, **options):
+        with sample_data(options["rows"]):
+            self.run(options["repeat"])
+
+    def run(self, repeat):
+        request = APIRequestFactory().get("/")
+        request.query_params = request.GET
+        context = {"request": request}
+        renderer = JSONRenderer()
+        targets = [
+            (
+                "部品",
+                PartSerializer,
+                Part.objects.select_related("supplier", "created_by", "updated_by"),
+            ),
+            (
+                "仕入先",
+                SupplierSerializer,
+                Supplier.objects.select_related("created_by", "updated_by"),
+            ),
+        ]
+        for label, serializer_class, queryset in targets:
+            fast = compile_fast_serializer(serializer_class(context=context))
+
+            def slow_path():
+                return renderer.render(
+                    serializer_class(queryset.all(), many=True, context=context).data
+                )
+
+            def fast_path():
+                return renderer.render(
+                    fast.to_representation(fast.values(queryset.all()))
+                )
+
+            rows = queryset.count()
+            slow_time = measure(slow_path, repeat)
+            fast_time = measure(fast_path, repeat)
+            self.stdout.write(
+                f"{label}: {rows}行 "
+                f"通常 {rows / slow_time:,.0f}行/秒, "
+                f"高速 {rows / fast_time:,.0f}行/秒 "
+                f"({slow_time / fast_time:.1f}倍)"
+            )
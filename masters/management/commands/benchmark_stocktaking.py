@@ -0,0 +1,106 @@
+"""
+棚卸の実施（開始・実棚数の登録・集計・確定）の処理時間を計測するコマンド
+
+--parts 件の部品を作成して棚卸を開始し、--batch-size 件ずつ実棚数を登録（1回は同じ内容を再送）した後、
+集計と確定（差のある部品の在庫数の調整と入出庫の登録）にかかる時間を表示します。
+計測用のデータは終了時に削除します。
+
+    python manage.py benchmark_stocktaking --parts 50000
+"""
+
+from decimal import Decimal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from masters.models import (
+    Part,
+    StockMovement,
+    StocktakingCount,
+    StocktakingSession,
+    Supplier,
+)
+from masters.stocktaking_sessions import (
+    finalize_session,
+    save_counts,
+    start_session,
+    summarize_session,
+)
+
+
+class Command(BaseCommand):
+    help = "棚卸の実施の処理時間を計測します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--parts", type=int, default=50000, help="部品の件数")
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="実棚数の1回あたりの登録件数"
+        )
+
+    def handle(self, *args, **options):
+        supplier = Supplier.objects.create(
+            name="計測用仕入先",
+            phone="03-1234-5678",
+            email="benchmark@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        parts = Part.objects.bulk_create(
+            Part(
+                name=f"計測用棚卸部品{i}",
+                category="other",
+                supplier=supplier,
+                cost_price=Decimal("100"),
+                selling_price=Decimal("200"),
+                stock_quantity=100,
+            )
+            for i in range(options["parts"])
+        )
+        session = None
+        try:
+            session = self.measure(
+                "開始",
+                lambda: self.start(supplier),
+            )
+            batch_size = options["batch_size"]
+            # 3件に1件は実棚数を帳簿在庫数と変える
+            counts = [(part, 100 - i % 3) for i, part in enumerate(parts)]
+
+            def save_all():
+                for start in range(0, len(counts), batch_size):
+                    with transaction.atomic():
+                        save_counts(session, counts[start : start + batch_size])
+
+            self.measure(f"実棚数の登録（{batch_size}件ずつ）", save_all)
+            self.measure("実棚数の再送", save_all)
+            summary = self.measure("集計", lambda: summarize_session(session))
+            self.stdout.write(
+                f"  差異 {summary['variance_count']}件, "
+                f"差異金額 {summary['net_value']:,}"
+            )
+            adjusted = self.measure("確定", lambda: finalize_session(session))
+            self.stdout.write(f"  調整 {adjusted}件")
+        finally:
+            if session is not None:
+                session.delete()
+            StockMovement.objects.filter(part__supplier=supplier).delete()
+            StocktakingCount.objects.filter(part__supplier=supplier).delete()
+            Part.objects.filter(supplier=supplier).raw_delete()
+            supplier.delete()
+
+    def start(self, supplier):
+        session = StocktakingSession.objects.create(
+            name="計測用棚卸", supplier=supplier
+        )
+        start_session(session)
+        return session
+
+    def measure(self, label, run):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label}: {elapsed:.2f}秒")
+        return result
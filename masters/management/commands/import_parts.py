@@ -0,0 +1,75 @@
+"""
+部品のCSVを一括登録するコマンド（masters.imports）
+
+    python manage.py import_parts parts.csv
+    python manage.py import_parts parts.csv --encoding shift_jis --dry-run --errors errors.csv
+
+エラーのある行は登録せず、--errors を指定するとすべてのエラーをCSV（行番号・項目・メッセージ）に出力します。
+"""
+
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from masters.imports import (
+    DEFAULT_IMPORT_ENCODING,
+    IMPORT_ENCODINGS,
+    CSVImportError,
+    PartImporter,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "部品のCSVを一括登録します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSVファイルのパス")
+        parser.add_argument(
+            "--encoding",
+            choices=list(IMPORT_ENCODINGS),
+            default=DEFAULT_IMPORT_ENCODING,
+            help="文字コード",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="検証のみ行い、登録しない"
+        )
+        parser.add_argument(
+            "--user", help="作成者・更新者にするユーザーのメールアドレス"
+        )
+        parser.add_argument("--errors", help="エラーを出力するCSVファイルのパス")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = User.objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f"ユーザー {options['user']} が見つかりません")
+
+        # コマンドではすべてのエラーを出力する
+        importer = PartImporter(user=user, dry_run=options["dry_run"], max_errors=None)
+        try:
+            with open(options["path"], "rb") as file:
+                report = importer.run(file, options["encoding"])
+        except CSVImportError as exc:
+            raise CommandError(str(exc))
+
+        if options["errors"]:
+            with open(options["errors"], "w", encoding="utf-8-sig", newline="") as file:
+                writer = csv.writer(file, lineterminator="\r\n")
+                writer.writerow(("行", "項目", "メッセージ"))
+                writer.writerows(
+                    (error["row"], error["field"], error["message"])
+                    for error in report.errors
+                )
+
+        self.stdout.write(
+            f"{report.total_rows}行中 {report.valid_rows}行が正しく、"
+            f"{report.imported}件を登録しました（エラー {report.error_count}件）"
+        )
+        for error in report.errors[:20]:
+            self.stdout.write(
+                f"  {error['row']}行目 {error['field']}: {error['message']}"
+            )
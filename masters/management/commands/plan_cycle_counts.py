@@ -0,0 +1,49 @@
+"""
+循環棚卸の計画を作成するコマンド
+
+--start（既定は今日）から --days 日間（または --end まで）の営業日ごとの計数予定を作成します。
+前の計画の終了日の前後に cron などで実行してください。
+
+    python manage.py plan_cycle_counts --start 2026-11-01 --days 90
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from masters.cycle_counts import create_plan
+from masters.serializers import CycleCountPlanSerializer
+
+
+class Command(BaseCommand):
+    help = "循環棚卸の計画を作成します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", type=datetime.date.fromisoformat, help="開始日（YYYY-MM-DD）"
+        )
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--days", type=int, default=90, help="期間の日数")
+        group.add_argument(
+            "--end", type=datetime.date.fromisoformat, help="終了日（YYYY-MM-DD）"
+        )
+
+    def handle(self, *args, **options):
+        start_date = options["start"] or timezone.localdate()
+        end_date = options["end"] or start_date + datetime.timedelta(
+            options["days"] - 1
+        )
+        serializer = CycleCountPlanSerializer(
+            data={"start_date": start_date, "end_date": end_date}
+        )
+        if not serializer.is_valid():
+            raise CommandError(
+                " ".join(str(error) for error in serializer.errors["end_date"])
+            )
+        plan = create_plan(start_date, end_date)
+        self.stdout.write(
+            f"循環棚卸の計画 #{plan.pk} を作成しました"
+            f"（{start_date}〜{end_date}、部品 {plan.part_count}件、"
+            f"計数予定 {plan.task_count}件）"
+        )
@@ -0,0 +1,36 @@
+"""
+待機中の棚卸表の作成ジョブを実行するワーカー（settings.JOB_RUNNER = "worker" の場合に使用）
+
+    python manage.py run_jobs            # 待機中のジョブを待ち続けて実行する
+    python manage.py run_jobs --once     # 待機中のジョブをすべて実行して終了する
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from masters.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "待機中の棚卸表の作成ジョブを実行します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="待機中のジョブを実行したら終了する"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="待機中のジョブを確認する間隔（秒）",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write(f"{count}件のジョブを実行しました")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
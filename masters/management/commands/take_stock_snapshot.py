@@ -0,0 +1,24 @@
+"""
+すべての部品の在庫数のスナップショットを作成するコマンド
+
+cron などで定期的に（日次・月次など）実行します。過去の日時の在庫数は直前のスナップショットから
+求めるため（masters.stock.annotate_stock_as_of）、間隔が短いほど集計する入出庫が少なくなります。
+
+    python manage.py take_stock_snapshot
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from masters.stock import take_stock_snapshot
+
+
+class Command(BaseCommand):
+    help = "すべての部品の在庫数のスナップショットを作成します"
+
+    def handle(self, *args, **options):
+        snapshot = take_stock_snapshot()
+        self.stdout.write(
+            f"{timezone.localtime(snapshot.taken_at):%Y-%m-%d %H:%M:%S} の在庫数を"
+            f"{snapshot.part_count}件保存しました"
+        )
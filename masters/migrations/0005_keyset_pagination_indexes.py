@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0004_part_tax_rate"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(fields=["name", "id"], name="part_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(
+                fields=["updated_at", "id"], name="part_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(fields=["name", "id"], name="supplier_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                fields=["updated_at", "id"], name="supplier_updated_at_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0005_keyset_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(fields=["category", "id"], name="part_category_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(
+                fields=["cost_price", "id"], name="part_cost_price_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(
+                fields=["selling_price", "id"], name="part_selling_price_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(
+                fields=["stock_quantity", "id"], name="part_stock_quantity_id_idx"
+            ),
+        ),
+    ]
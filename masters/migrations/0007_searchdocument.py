@@ -0,0 +1,128 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:01
+
+import unicodedata
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# 作成時点の masters.search の検索対象フィールドと正規化の規則
+# （以降のアプリのコードの変更がこのマイグレーションに影響しないよう、ここに写している）
+SEARCH_FIELDS = {
+    "part": ("name", "description"),
+    "supplier": ("name", "contact_person", "remarks"),
+}
+
+SMALL_KANA = str.maketrans("ぁぃぅぇぉっゃゅょゎゕゖ", "あいうえおつやゆよわかけ")
+
+BATCH_SIZE = 2000
+
+
+def normalize(text):
+    """
+    NFKC正規化・カタカナのひらがな化・濁点と空白の除去・小書き文字と大文字小文字の統一
+    """
+    result = []
+    for char in text:
+        decomposed = unicodedata.normalize("NFD", unicodedata.normalize("NFKC", char))
+        for c in decomposed:
+            if unicodedata.combining(c) or c.isspace():
+                continue
+            code = ord(c)
+            if 0x30A1 <= code <= 0x30F6:
+                c = chr(code - 0x60)
+            result.append(c.translate(SMALL_KANA).casefold())
+    return "".join(result)
+
+
+def to_bigrams(normalized):
+    return {normalized[i : i + 2] for i in range(len(normalized) - 1)}
+
+
+def build_search_documents(apps, schema_editor):
+    """
+    既存の部品・仕入先の検索ドキュメントを作成（BATCH_SIZE 件ずつ読み込み・保存する）
+    """
+    SearchDocument = apps.get_model("masters", "SearchDocument")
+    models_by_kind = {
+        "part": apps.get_model("masters", "Part"),
+        "supplier": apps.get_model("masters", "Supplier"),
+    }
+    for kind, model in models_by_kind.items():
+        fields = SEARCH_FIELDS[kind]
+        documents = []
+        rows = model.objects.order_by().values("id", *fields)
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            text = "\n".join(normalize(row[field] or "") for field in fields)
+            bigrams = sorted({b for line in text.split("\n") for b in to_bigrams(line)})
+            documents.append(
+                SearchDocument(
+                    kind=kind, object_id=row["id"], text=text, bigrams=bigrams
+                )
+            )
+            if len(documents) >= BATCH_SIZE:
+                SearchDocument.objects.bulk_create(documents, batch_size=BATCH_SIZE)
+                documents = []
+        SearchDocument.objects.bulk_create(documents, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0006_part_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("part", "部品"), ("supplier", "仕入先")],
+                        max_length=20,
+                        verbose_name="種別",
+                    ),
+                ),
+                ("object_id", models.BigIntegerField(verbose_name="対象ID")),
+                (
+                    "text",
+                    models.TextField(default="", verbose_name="正規化済みテキスト"),
+                ),
+                (
+                    "bigrams",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(max_length=2),
+                        default=list,
+                        size=None,
+                        verbose_name="バイグラム",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "検索ドキュメント",
+                "verbose_name_plural": "検索ドキュメント",
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["bigrams"], name="search_document_bigrams_gin"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "object_id"),
+                        name="search_document_unique_object",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:07
+
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0008_supplier_prefix_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(
+                models.OrderBy(
+                    django.db.models.expressions.CombinedExpression(
+                        models.F("reorder_level"), "-", models.F("stock_quantity")
+                    ),
+                    descending=True,
+                ),
+                models.F("id"),
+                condition=models.Q(("stock_quantity__lte", models.F("reorder_level"))),
+                name="part_low_stock_idx",
+            ),
+        ),
+    ]
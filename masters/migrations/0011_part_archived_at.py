@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0010_stocktakingsheet"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="part",
+            name="archived_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="アーカイブ日時"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(
+                condition=models.Q(("archived_at__isnull", True)),
+                fields=["id"],
+                name="part_active_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="part",
+            index=models.Index(
+                condition=models.Q(("archived_at__isnull", False)),
+                fields=["archived_at", "id"],
+                name="part_archived_at_id_idx",
+            ),
+        ),
+    ]
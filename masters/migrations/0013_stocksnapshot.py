@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0012_stockmovement"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stocktakingsheet",
+            name="as_of",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="基準日時"),
+        ),
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("taken_at", models.DateTimeField(verbose_name="取得日時")),
+                (
+                    "last_movement_id",
+                    models.BigIntegerField(
+                        default=0, verbose_name="反映済みの入出庫ID"
+                    ),
+                ),
+                (
+                    "part_count",
+                    models.PositiveIntegerField(default=0, verbose_name="部品数"),
+                ),
+            ],
+            options={
+                "verbose_name": "在庫スナップショット",
+                "verbose_name_plural": "在庫スナップショット",
+                "ordering": ["-taken_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["-taken_at"], name="stock_snapshot_taken_at_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockSnapshotItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("stock_quantity", models.IntegerField(verbose_name="在庫数")),
+                (
+                    "part",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="masters.part",
+                        verbose_name="部品",
+                    ),
+                ),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="masters.stocksnapshot",
+                        verbose_name="スナップショット",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "在庫スナップショットの明細",
+                "verbose_name_plural": "在庫スナップショットの明細",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("snapshot", "part"), name="stock_snapshot_item_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,189 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0013_stocksnapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StocktakingSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="名称"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "実施中"),
+                            ("finalized", "確定済み"),
+                            ("cancelled", "中止"),
+                        ],
+                        default="open",
+                        max_length=20,
+                        verbose_name="状態",
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("head", "ヘッド"),
+                            ("shaft", "シャフト"),
+                            ("grip", "グリップ"),
+                            ("other", "その他"),
+                        ],
+                        default="",
+                        max_length=50,
+                        verbose_name="カテゴリ",
+                    ),
+                ),
+                (
+                    "item_count",
+                    models.PositiveIntegerField(default=0, verbose_name="対象件数"),
+                ),
+                (
+                    "adjustment_count",
+                    models.PositiveIntegerField(default=0, verbose_name="調整件数"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="開始日時"),
+                ),
+                (
+                    "finalized_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="確定日時"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="stocktaking_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="開始者",
+                    ),
+                ),
+                (
+                    "finalized_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="確定者",
+                    ),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="masters.supplier",
+                        verbose_name="仕入先",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "棚卸",
+                "verbose_name_plural": "棚卸",
+                "ordering": ["-id"],
+            },
+        ),
+        migrations.CreateModel(
+            name="StocktakingCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("expected_quantity", models.IntegerField(verbose_name="帳簿在庫数")),
+                (
+                    "cost_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="原価"
+                    ),
+                ),
+                (
+                    "counted_quantity",
+                    models.IntegerField(blank=True, null=True, verbose_name="実棚数"),
+                ),
+                (
+                    "counted_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="計数日時"
+                    ),
+                ),
+                (
+                    "counted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="計数者",
+                    ),
+                ),
+                (
+                    "part",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="masters.part",
+                        verbose_name="部品",
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="counts",
+                        to="masters.stocktakingsession",
+                        verbose_name="棚卸",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "棚卸の明細",
+                "verbose_name_plural": "棚卸の明細",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("session", "part"), name="stocktaking_count_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,135 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0014_stocktakingsession"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CycleCountPlan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="開始日")),
+                ("end_date", models.DateField(verbose_name="終了日")),
+                (
+                    "a_min_value",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=20,
+                        null=True,
+                        verbose_name="Aクラスの在庫金額の下限",
+                    ),
+                ),
+                (
+                    "b_min_value",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=20,
+                        null=True,
+                        verbose_name="Bクラスの在庫金額の下限",
+                    ),
+                ),
+                (
+                    "part_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="作成時の部品数"
+                    ),
+                ),
+                (
+                    "task_count",
+                    models.PositiveIntegerField(default=0, verbose_name="計数予定数"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="cycle_count_plans",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="作成者",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "循環棚卸の計画",
+                "verbose_name_plural": "循環棚卸の計画",
+                "ordering": ["-id"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CycleCountTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("scheduled_on", models.DateField(verbose_name="計数予定日")),
+                (
+                    "value_class",
+                    models.CharField(
+                        choices=[("A", "A（高額）"), ("B", "B"), ("C", "C（低額）")],
+                        max_length=1,
+                        verbose_name="クラス",
+                    ),
+                ),
+                (
+                    "part",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="masters.part",
+                        verbose_name="部品",
+                    ),
+                ),
+                (
+                    "plan",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tasks",
+                        to="masters.cyclecountplan",
+                        verbose_name="計画",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "循環棚卸の計数予定",
+                "verbose_name_plural": "循環棚卸の計数予定",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="cyclecountplan",
+            index=models.Index(fields=["end_date"], name="cycle_count_plan_end_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="cyclecounttask",
+            constraint=models.UniqueConstraint(
+                fields=("plan", "scheduled_on", "part"), name="cycle_count_task_unique"
+            ),
+        ),
+    ]
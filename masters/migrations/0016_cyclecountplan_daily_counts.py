@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:16
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_daily_counts(apps, schema_editor):
+    """
+    既存の計画の日ごとの計数予定数を予定から集計する
+    """
+    CycleCountPlan = apps.get_model("masters", "CycleCountPlan")
+    CycleCountTask = apps.get_model("masters", "CycleCountTask")
+    for plan in CycleCountPlan.objects.all():
+        rows = (
+            CycleCountTask.objects.filter(plan=plan)
+            .order_by("scheduled_on")
+            .values_list("scheduled_on")
+            .annotate(count=Count("pk"))
+        )
+        plan.daily_counts = {day.isoformat(): count for day, count in rows}
+        plan.save(update_fields=["daily_counts"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("masters", "0015_cyclecountplan"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cyclecountplan",
+            name="daily_counts",
+            field=models.JSONField(default=dict, verbose_name="日ごとの計数予定数"),
+        ),
+        migrations.RunPython(fill_daily_counts, migrations.RunPython.noop),
+    ]
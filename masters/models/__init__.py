@@ -1,4 +1,25 @@
 from masters.models.supplier import Supplier
 from masters.models.part import Part
+from masters.models.search import SearchDocument
+from masters.models.stocktaking import (
+    StocktakingCount,
+    StocktakingSession,
+    StocktakingSheet,
+)
+from masters.models.movement import StockMovement
+from masters.models.snapshot import StockSnapshot, StockSnapshotItem
+from masters.models.cycle_count import CycleCountPlan, CycleCountTask
 
-__all__ = ["Supplier", "Part"]
+__all__ = [
+    "Supplier",
+    "Part",
+    "SearchDocument",
+    "StocktakingSheet",
+    "StocktakingSession",
+    "StocktakingCount",
+    "StockMovement",
+    "StockSnapshot",
+    "StockSnapshotItem",
+    "CycleCountPlan",
+    "CycleCountTask",
+]
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db import models
+
+
+class CycleCountPlan(models.Model):
+    """
+    循環棚卸の計画
+
+    期間内の営業日（土日を除く）ごとに数える部品を masters.cycle_counts で事前に割り当て、
+    CycleCountTask に保存します。部品は在庫金額（在庫数 × 原価）の大きい順の累積構成比で
+    A / B / C のクラスに分け、金額の大きいクラスほど短い間隔で数えます。
+    a_min_value / b_min_value は作成時の A・B クラスの在庫金額の下限で、
+    後から追加した部品のクラスの判定に使用します（該当する部品がない場合は NULL）。
+    """
+
+    start_date = models.DateField("開始日")
+    end_date = models.DateField("終了日")
+    a_min_value = models.DecimalField(
+        "Aクラスの在庫金額の下限", max_digits=20, decimal_places=2, null=True
+    )
+    b_min_value = models.DecimalField(
+        "Bクラスの在庫金額の下限", max_digits=20, decimal_places=2, null=True
+    )
+    part_count = models.PositiveIntegerField("作成時の部品数", default=0)
+    task_count = models.PositiveIntegerField("計数予定数", default=0)
+    # 計数予定日（ISO形式の文字列）→ その日の計数予定数（予定の追加・削除時に更新する）
+    daily_counts = models.JSONField("日ごとの計数予定数", default=dict)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="cycle_count_plans",
+        verbose_name="作成者",
+    )
+    created_at = models.DateTimeField("作成日時", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "循環棚卸の計画"
+        verbose_name_plural = "循環棚卸の計画"
+        ordering = ["-id"]
+        indexes = [
+            # 実施中・今後の計画を取得する
+            models.Index(fields=["end_date"], name="cycle_count_plan_end_idx"),
+        ]
+
+    def __str__(self):
+        return f"循環棚卸 {self.start_date}〜{self.end_date}"
+
+
+class CycleCountTask(models.Model):
+    """
+    循環棚卸の日ごとの計数予定
+    """
+
+    class ValueClass(models.TextChoices):
+        A = "A", "A（高額）"
+        B = "B", "B"
+        C = "C", "C（低額）"
+
+    plan = models.ForeignKey(
+        CycleCountPlan,
+        on_delete=models.CASCADE,
+        related_name="tasks",
+        verbose_name="計画",
+        # (plan, scheduled_on, part) のインデックスで検索する
+        db_index=False,
+    )
+    part = models.ForeignKey(
+        "masters.Part",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="部品",
+    )
+    scheduled_on = models.DateField("計数予定日")
+    value_class = models.CharField("クラス", max_length=1, choices=ValueClass.choices)
+
+    class Meta:
+        verbose_name = "循環棚卸の計数予定"
+        verbose_name_plural = "循環棚卸の計数予定"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["plan", "scheduled_on", "part"],
+                name="cycle_count_task_unique",
+            ),
+        ]
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import models
+
+
+class StockMovement(models.Model):
+    """
+    入出庫の履歴（追記のみ）
+
+    登録時に masters.stock.record_movement で部品の在庫数を同じトランザクション内で増減します。
+    quantity は在庫の増減数で、出庫は負の値、調整は正負どちらも取ります。
+    """
+
+    class Kind(models.TextChoices):
+        RECEIPT = "receipt", "入庫"
+        ISSUE = "issue", "出庫"
+        ADJUSTMENT = "adjustment", "調整"
+
+    part = models.ForeignKey(
+        "masters.Part",
+        on_delete=models.PROTECT,
+        related_name="movements",
+        verbose_name="部品",
+    )
+    kind = models.CharField("種別", max_length=20, choices=Kind.choices)
+    quantity = models.IntegerField("増減数")
+    reason = models.CharField("理由", max_length=200, blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="stock_movements",
+        verbose_name="登録者",
+    )
+    created_at = models.DateTimeField("登録日時", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "入出庫"
+        verbose_name_plural = "入出庫"
+        ordering = ["-id"]
+        indexes = [
+            # 部品ごとの履歴を新しい順に取得する
+            models.Index(fields=["part", "-id"], name="stock_movement_part_id_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=~models.Q(quantity=0), name="stock_movement_nonzero"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.part_id}: {self.quantity:+d}"
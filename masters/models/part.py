@@ -3,6 +3,31 @@ from django.conf import settings
 from decimal import Decimal
 from django.core.validators import MinValueValidator
 
+from zaiko_be.response_cache import VersionedQuerySet
+
+
+class PartQuerySet(VersionedQuerySet):
+    def active(self):
+        """
+        アーカイブされていない部品に絞り込む（条件は部分インデックス part_active_id_idx と一致させている）
+        """
+        return self.filter(archived_at__isnull=True)
+
+    def archived(self):
+        """
+        アーカイブした部品に絞り込む（部分インデックス part_archived_at_id_idx を使用）
+        """
+        return self.filter(archived_at__isnull=False)
+
+    def low_stock(self):
+        """
+        在庫数が補充閾値以下の部品に絞り込み、不足数（shortage）を付与する
+        条件・式は部分インデックス part_low_stock_idx と一致させている
+        """
+        return self.filter(stock_quantity__lte=models.F("reorder_level")).annotate(
+            shortage=models.F("reorder_level") - models.F("stock_quantity")
+        )
+
 
 class Part(models.Model):
     """
@@ -79,10 +104,48 @@ class Part(models.Model):
     created_at = models.DateTimeField("作成日時", auto_now_add=True)
     updated_at = models.DateTimeField("更新日時", auto_now=True)
 
+    # アーカイブ（論理削除）した日時。アーカイブした部品は一覧・検索などに表示しない
+    archived_at = models.DateTimeField("アーカイブ日時", null=True, blank=True)
+
+    objects = PartQuerySet.as_manager()
+
     class Meta:
         verbose_name = "部品"
         verbose_name_plural = "部品"
         ordering = ["id"]
+        # 一覧の絞り込み・並び替え、キーセット方式のページネーションで
+        # (キー, id) の範囲スキャンに使用（仕入先はForeignKeyのインデックスを使用）
+        indexes = [
+            models.Index(fields=["name", "id"], name="part_name_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="part_updated_at_id_idx"),
+            models.Index(fields=["category", "id"], name="part_category_id_idx"),
+            models.Index(fields=["cost_price", "id"], name="part_cost_price_id_idx"),
+            models.Index(
+                fields=["selling_price", "id"], name="part_selling_price_id_idx"
+            ),
+            models.Index(
+                fields=["stock_quantity", "id"], name="part_stock_quantity_id_idx"
+            ),
+            # 在庫不足の部品のみを不足数の順に保持する部分インデックス
+            models.Index(
+                (models.F("reorder_level") - models.F("stock_quantity")).desc(),
+                "id",
+                name="part_low_stock_idx",
+                condition=models.Q(stock_quantity__lte=models.F("reorder_level")),
+            ),
+            # アーカイブされていない部品のみを保持する部分インデックス（一覧の既定の並び順）
+            models.Index(
+                fields=["id"],
+                name="part_active_id_idx",
+                condition=models.Q(archived_at__isnull=True),
+            ),
+            # アーカイブした部品の一覧用（件数が少ないため、アーカイブした部品のみを保持する）
+            models.Index(
+                fields=["archived_at", "id"],
+                name="part_archived_at_id_idx",
+                condition=models.Q(archived_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.name
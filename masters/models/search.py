@@ -0,0 +1,39 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    部品・仕入先の全文検索用ドキュメント
+
+    検索対象のテキストを正規化（全角/半角・カタカナ/ひらがな・濁点の揺れを吸収）し、
+    2文字単位（バイグラム）に分割した配列をGINインデックスで検索します。
+    部品・仕入先の保存・削除時に masters.signals で自動的に更新されます。
+    """
+
+    class Kind(models.TextChoices):
+        PART = "part", "部品"
+        SUPPLIER = "supplier", "仕入先"
+
+    kind = models.CharField("種別", max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField("対象ID")
+    text = models.TextField("正規化済みテキスト", default="")
+    bigrams = ArrayField(
+        models.CharField(max_length=2), verbose_name="バイグラム", default=list
+    )
+
+    class Meta:
+        verbose_name = "検索ドキュメント"
+        verbose_name_plural = "検索ドキュメント"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="search_document_unique_object"
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["bigrams"], name="search_document_bigrams_gin"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id}"
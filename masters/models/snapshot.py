@@ -0,0 +1,59 @@
+from django.db import models
+
+
+class StockSnapshot(models.Model):
+    """
+    在庫数のスナップショット
+
+    masters.stock.take_stock_snapshot で定期的に（日次・月次など）作成し、
+    その時点のすべての部品の在庫数を StockSnapshotItem に保持します。
+    last_movement_id はスナップショットに反映済みの最後の入出庫のIDで、過去の日時の在庫数は
+    直前のスナップショットにこれより後の入出庫を足して求めます（masters.stock.annotate_stock_as_of）。
+    """
+
+    taken_at = models.DateTimeField("取得日時")
+    last_movement_id = models.BigIntegerField("反映済みの入出庫ID", default=0)
+    part_count = models.PositiveIntegerField("部品数", default=0)
+
+    class Meta:
+        verbose_name = "在庫スナップショット"
+        verbose_name_plural = "在庫スナップショット"
+        ordering = ["-taken_at"]
+        indexes = [
+            # 指定した日時の直前のスナップショットを取得する
+            models.Index(fields=["-taken_at"], name="stock_snapshot_taken_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"在庫スナップショット {self.taken_at:%Y-%m-%d %H:%M}"
+
+
+class StockSnapshotItem(models.Model):
+    """
+    スナップショットの部品ごとの在庫数
+    """
+
+    snapshot = models.ForeignKey(
+        StockSnapshot,
+        on_delete=models.CASCADE,
+        related_name="items",
+        verbose_name="スナップショット",
+        # (snapshot, part) の一意制約のインデックスで検索する
+        db_index=False,
+    )
+    part = models.ForeignKey(
+        "masters.Part",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="部品",
+    )
+    stock_quantity = models.IntegerField("在庫数")
+
+    class Meta:
+        verbose_name = "在庫スナップショットの明細"
+        verbose_name_plural = "在庫スナップショットの明細"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["snapshot", "part"], name="stock_snapshot_item_unique"
+            ),
+        ]
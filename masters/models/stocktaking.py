@@ -0,0 +1,229 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+from masters.models.part import Part
+
+
+def stocktaking_sheet_path(instance, filename):
+    """
+    棚卸表の保存先（推測されないよう乱数のファイル名にする）
+    """
+    return f"stocktaking/{uuid.uuid4().hex}.{instance.format}"
+
+
+class StocktakingSheet(models.Model):
+    """
+    棚卸表の作成ジョブ
+
+    作成はバックグラウンドで行い（masters.jobs）、進捗（processed_rows / total_rows）と
+    作成したファイルを保持します。ファイルは STORAGES の default に保存されます。
+    """
+
+    class Format(models.TextChoices):
+        XLSX = "xlsx", "Excel"
+        PDF = "pdf", "PDF"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "待機中"
+        RUNNING = "running", "作成中"
+        SUCCEEDED = "succeeded", "完了"
+        FAILED = "failed", "失敗"
+
+    format = models.CharField("形式", max_length=10, choices=Format.choices)
+    status = models.CharField(
+        "状態", max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+
+    # 絞り込み条件（未指定の場合はすべての部品）
+    category = models.CharField(
+        "カテゴリ", max_length=50, choices=Part.Category.choices, blank=True, default=""
+    )
+    supplier = models.ForeignKey(
+        "masters.Supplier",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="仕入先",
+    )
+    # 指定した場合は帳簿在庫数をこの日時の在庫数にする（masters.stock.annotate_stock_as_of）
+    as_of = models.DateTimeField("基準日時", null=True, blank=True)
+
+    # 進捗
+    total_rows = models.PositiveIntegerField("対象件数", default=0)
+    processed_rows = models.PositiveIntegerField("処理済み件数", default=0)
+
+    file = models.FileField(
+        "ファイル", upload_to=stocktaking_sheet_path, blank=True, default=""
+    )
+    error = models.TextField("エラー内容", blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="stocktaking_sheets",
+        verbose_name="作成者",
+    )
+    created_at = models.DateTimeField("作成日時", auto_now_add=True)
+    started_at = models.DateTimeField("開始日時", null=True, blank=True)
+    finished_at = models.DateTimeField("終了日時", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "棚卸表"
+        verbose_name_plural = "棚卸表"
+        ordering = ["-id"]
+        indexes = [
+            # 待機中のジョブを古い順に取得する（masters.jobs）
+            models.Index(
+                fields=["id"],
+                condition=models.Q(status="pending"),
+                name="stocktaking_pending_idx",
+            ),
+            # 作成中のまま止まったジョブを取得する（masters.jobs）
+            models.Index(
+                fields=["started_at"],
+                condition=models.Q(status="running"),
+                name="stocktaking_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"棚卸表 #{self.pk}（{self.get_format_display()}）"
+
+    @property
+    def progress(self):
+        """
+        進捗率（0〜100）
+        """
+        if self.status == self.Status.SUCCEEDED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(self.processed_rows * 100 // self.total_rows, 99)
+
+
+class StocktakingSession(models.Model):
+    """
+    棚卸（実地棚卸）の実施
+
+    開始時に対象の部品の在庫数・原価を StocktakingCount の帳簿在庫数として固定し、
+    数えた実棚数を登録していきます。確定すると実棚数と帳簿在庫数の差を調整の入出庫として
+    まとめて登録します（masters.stocktaking_sessions）。
+    """
+
+    class Status(models.TextChoices):
+        OPEN = "open", "実施中"
+        FINALIZED = "finalized", "確定済み"
+        CANCELLED = "cancelled", "中止"
+
+    name = models.CharField("名称", max_length=100, blank=True, default="")
+    status = models.CharField(
+        "状態", max_length=20, choices=Status.choices, default=Status.OPEN
+    )
+
+    # 対象の部品の絞り込み条件（未指定の場合はアーカイブされていないすべての部品）
+    category = models.CharField(
+        "カテゴリ", max_length=50, choices=Part.Category.choices, blank=True, default=""
+    )
+    supplier = models.ForeignKey(
+        "masters.Supplier",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="仕入先",
+    )
+
+    item_count = models.PositiveIntegerField("対象件数", default=0)
+    adjustment_count = models.PositiveIntegerField("調整件数", default=0)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="stocktaking_sessions",
+        verbose_name="開始者",
+    )
+    created_at = models.DateTimeField("開始日時", auto_now_add=True)
+    finalized_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="確定者",
+    )
+    finalized_at = models.DateTimeField("確定日時", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "棚卸"
+        verbose_name_plural = "棚卸"
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"棚卸 #{self.pk}（{self.get_status_display()}）"
+
+
+class StocktakingCountQuerySet(models.QuerySet):
+    def with_variance(self):
+        """
+        差異（実棚数 - 帳簿在庫数）と差異金額（差異 × 原価）を付与する（未計数の場合は NULL）
+        """
+        variance = models.F("counted_quantity") - models.F("expected_quantity")
+        return self.annotate(
+            variance=models.ExpressionWrapper(
+                variance, output_field=models.IntegerField()
+            ),
+            value_impact=models.ExpressionWrapper(
+                variance * models.F("cost_price"),
+                output_field=models.DecimalField(max_digits=20, decimal_places=2),
+            ),
+        )
+
+
+class StocktakingCount(models.Model):
+    """
+    棚卸の部品ごとの帳簿在庫数（開始時に固定）と実棚数
+    """
+
+    session = models.ForeignKey(
+        StocktakingSession,
+        on_delete=models.CASCADE,
+        related_name="counts",
+        verbose_name="棚卸",
+        # (session, part) の一意制約のインデックスで検索する
+        db_index=False,
+    )
+    part = models.ForeignKey(
+        "masters.Part",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="部品",
+    )
+    expected_quantity = models.IntegerField("帳簿在庫数")
+    cost_price = models.DecimalField("原価", max_digits=12, decimal_places=2)
+    counted_quantity = models.IntegerField("実棚数", null=True, blank=True)
+
+    counted_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="計数者",
+    )
+    counted_at = models.DateTimeField("計数日時", null=True, blank=True)
+
+    objects = StocktakingCountQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "棚卸の明細"
+        verbose_name_plural = "棚卸の明細"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["session", "part"], name="stocktaking_count_unique"
+            ),
+        ]
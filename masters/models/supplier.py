@@ -1,6 +1,10 @@
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
 
+from zaiko_be.response_cache import VersionedQuerySet
+
 
 class Supplier(models.Model):
     """
@@ -55,6 +59,8 @@ class Supplier(models.Model):
     created_at = models.DateTimeField("作成日時", auto_now_add=True)
     updated_at = models.DateTimeField("更新日時", auto_now=True)
 
+    objects = VersionedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -62,3 +68,19 @@ class Supplier(models.Model):
         verbose_name = "仕入先"
         verbose_name_plural = "仕入先"
         ordering = ["id"]  # ID順でデフォルト並び替え
+        # キーセット方式のページネーションで (ソートキー, id) の範囲スキャンに使用
+        indexes = [
+            models.Index(fields=["name", "id"], name="supplier_name_id_idx"),
+            models.Index(
+                fields=["updated_at", "id"], name="supplier_updated_at_id_idx"
+            ),
+            # オートコンプリートの前方一致（istartswith）に使用
+            models.Index(
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="supplier_name_prefix_idx",
+            ),
+            models.Index(
+                OpClass(Upper("supplier_code"), name="text_pattern_ops"),
+                name="supplier_code_prefix_idx",
+            ),
+        ]
@@ -0,0 +1,243 @@
+"""
+1ページずつファイルに書き出す最小限のPDFライター
+
+reportlab の Canvas は save() まで全ページのオブジェクトをメモリに保持するため、
+ページ数に比例してメモリ使用量が増えます。ここではページの内容を書き終えるたびに
+圧縮してファイルへ出力し、メモリには各オブジェクトのファイル上の位置だけを残します。
+
+描画できるのは文字列（日本語はPDF標準のCIDフォント、埋め込みなし）と直線のみです。
+文字幅の計算とエンコーディング名は reportlab の UnicodeCIDFont を使用し、
+PDFに書き出すフォントの定義（CID_FONTS）は reportlab のCIDフォントのデータから写しています。
+"""
+
+import zlib
+
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+# 予約するオブジェクト番号（ページより後、最後に書き出す）
+CATALOG_ID = 1
+PAGES_ID = 2
+INFO_ID = 3
+FONT_ID = 4
+FIRST_FREE_ID = 5
+
+# 使用できるフォントの子孫フォントの定義（W は半角の文字の幅、それ以外は DW の全角幅）
+CID_FONTS = {
+    "HeiseiKakuGo-W5": {
+        "Type": "/Font",
+        "Subtype": "/CIDFontType0",
+        "BaseFont": "/HeiseiKakuGo-W5",
+        "CIDSystemInfo": {
+            "Registry": "(Adobe)",
+            "Ordering": "(Japan1)",
+            "Supplement": 2,
+        },
+        "FontDescriptor": {
+            "Type": "/FontDescriptor",
+            "FontName": "/HeiseiKakuGo-W5",
+            "Flags": 4,
+            "FontBBox": [-92, -250, 1010, 922],
+            "ItalicAngle": 0,
+            "Ascent": 752,
+            "Descent": -221,
+            "CapHeight": 737,
+            "XHeight": 553,
+            "StemV": 114,
+            "StemH": 0,
+        },
+        "DW": 1000,
+        "W": (
+            "[1 [277 305 500 668 668 906 727 305 445 445 508 668 305 379 305 539]"
+            " 17 26 668"
+            " 27 [305 305 668 668 668 566 871 727 637 652 699 574 555 676 687 242"
+            " 492 664 582 789 707 734 582 734 605 605 641 668 727 945 609 609 574"
+            " 445 668 445 668 668 590 555 609 547 602 574 391 609 582 234 277 539"
+            " 234 895 582 605 602 602 387 508 441 582 562 781 531 570 555 449 246"
+            " 449 668]"
+            " 231 632 500]"
+        ),
+    },
+}
+
+
+def serialize(value):
+    """
+    PDFのオブジェクトの表記にする（文字列は "/Name" や "(text)" の表記済みのものとして扱う）
+    """
+    if isinstance(value, dict):
+        items = " ".join(f"/{key} {serialize(item)}" for key, item in value.items())
+        return f"<< {items} >>"
+    if isinstance(value, (list, tuple)):
+        return "[" + " ".join(serialize(item) for item in value) + "]"
+    return str(value)
+
+
+def encode_text(text):
+    """
+    UCS-2（UTF-16BE）の16進文字列にする（基本多言語面の外の文字は "?"）
+    """
+    if text and max(text) > "\uffff":
+        text = "".join(char if char <= "\uffff" else "?" for char in text)
+    return "<" + text.encode("utf-16-be").hex() + ">"
+
+
+def encode_title(text):
+    """
+    文書情報の文字列（BOM付きのUTF-16BE）
+    """
+    return "<feff" + text.encode("utf-16-be").hex() + ">"
+
+
+def format_number(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class StreamingPdf:
+    """
+    ページ単位で書き出すPDF
+
+    使い方:
+        pdf = StreamingPdf(file, (width, height), "HeiseiKakuGo-W5")
+        pdf.set_font(9)
+        pdf.draw_string(x, y, "文字列")
+        pdf.show_page()
+        pdf.close()
+    """
+
+    def __init__(self, file, pagesize, font_name, title=""):
+        self.file = file
+        self.width, self.height = pagesize
+        if font_name not in CID_FONTS:
+            raise ValueError(f"未対応のフォントです: {font_name}")
+        self.font_name = font_name
+        self.font = UnicodeCIDFont(font_name)
+        self.title = title
+        # オブジェクト番号 → ファイル上の位置
+        self.offsets = {}
+        self.next_id = FIRST_FREE_ID
+        self.page_ids = []
+        self.operations = []
+        self.font_size = None
+        self.position = 0
+        self.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def write_object(self, object_id, body, stream=None):
+        self.offsets[object_id] = self.position
+        self.write(f"{object_id} 0 obj\n{body}\n".encode("latin-1"))
+        if stream is not None:
+            self.write(b"stream\n" + stream + b"\nendstream\n")
+        self.write(b"endobj\n")
+
+    def allocate(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def string_width(self, text, size=None):
+        return self.font.stringWidth(text, size or self.font_size)
+
+    def set_font(self, size):
+        self.font_size = size
+
+    def draw_string(self, x, y, text):
+        self.operations.append(
+            f"BT /F1 {self.font_size} Tf {format_number(x)} {format_number(y)} Td "
+            f"{encode_text(text)} Tj ET"
+        )
+
+    def draw_right_string(self, x, y, text):
+        self.draw_string(x - self.string_width(text), y, text)
+
+    def line(self, x1, y1, x2, y2):
+        self.operations.append(
+            f"{format_number(x1)} {format_number(y1)} m "
+            f"{format_number(x2)} {format_number(y2)} l S"
+        )
+
+    def show_page(self):
+        """
+        現在のページをファイルに書き出す
+        """
+        content = zlib.compress("\n".join(self.operations).encode("ascii"))
+        self.operations = []
+        content_id = self.allocate()
+        self.write_object(
+            content_id,
+            serialize({"Length": len(content), "Filter": "/FlateDecode"}),
+            content,
+        )
+        page_id = self.allocate()
+        self.write_object(
+            page_id,
+            serialize(
+                {
+                    "Type": "/Page",
+                    "Parent": f"{PAGES_ID} 0 R",
+                    "MediaBox": [0, 0, self.width, self.height],
+                    "Resources": {"Font": {"F1": f"{FONT_ID} 0 R"}},
+                    "Contents": f"{content_id} 0 R",
+                }
+            ),
+        )
+        self.page_ids.append(page_id)
+
+    def write_font(self):
+        descendant = dict(CID_FONTS[self.font_name])
+        descriptor_id = self.allocate()
+        self.write_object(descriptor_id, serialize(descendant.pop("FontDescriptor")))
+        descendant["FontDescriptor"] = f"{descriptor_id} 0 R"
+        descendant_id = self.allocate()
+        self.write_object(descendant_id, serialize(descendant))
+        encoding = self.font.encodingName
+        self.write_object(
+            FONT_ID,
+            serialize(
+                {
+                    "Type": "/Font",
+                    "Subtype": "/Type0",
+                    "BaseFont": f"/{self.font_name}-{encoding}",
+                    "Encoding": f"/{encoding}",
+                    "DescendantFonts": [f"{descendant_id} 0 R"],
+                }
+            ),
+        )
+
+    def close(self):
+        """
+        ページツリー・フォント・相互参照表を書き出す
+        """
+        if self.operations or not self.page_ids:
+            self.show_page()
+        self.write_font()
+        self.write_object(
+            PAGES_ID,
+            serialize(
+                {
+                    "Type": "/Pages",
+                    "Kids": [f"{page_id} 0 R" for page_id in self.page_ids],
+                    "Count": len(self.page_ids),
+                }
+            ),
+        )
+        self.write_object(
+            CATALOG_ID, serialize({"Type": "/Catalog", "Pages": f"{PAGES_ID} 0 R"})
+        )
+        self.write_object(INFO_ID, serialize({"Title": encode_title(self.title)}))
+
+        xref = self.position
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        for object_id in range(1, count):
+            lines.append(f"{self.offsets[object_id]:010d} 00000 n \n")
+        lines.append(
+            "trailer\n"
+            + serialize(
+                {"Size": count, "Root": f"{CATALOG_ID} 0 R", "Info": f"{INFO_ID} 0 R"}
+            )
+            + f"\nstartxref\n{xref}\n%%EOF\n"
+        )
+        self.write("".join(lines).encode("latin-1"))
@@ -0,0 +1,276 @@
+"""
+部品・仕入先の日本語あいまい検索
+
+検索対象のテキストと検索語を同じ規則で正規化し、バイグラム（2文字単位）の
+一致度で順位付けします。正規化の規則は以下のとおりです。
+
+- NFKC正規化で全角英数字・半角カタカナを統一（ﾍｯﾄﾞ → ヘッド）
+- カタカナをひらがなに統一（ヘッド → へっど）
+- 濁点・半濁点を除去し、小書き文字を通常の文字に統一（へっど → へつと）
+- 英字の大文字・小文字の統一、空白の除去
+"""
+
+from functools import lru_cache
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+
+from masters.models import Part, SearchDocument, Supplier
+
+# 種別ごとの検索対象フィールド
+SEARCH_FIELDS = {
+    SearchDocument.Kind.PART: ("name", "description"),
+    SearchDocument.Kind.SUPPLIER: ("name", "contact_person", "remarks"),
+}
+
+SEARCH_MODELS = {
+    SearchDocument.Kind.PART: Part,
+    SearchDocument.Kind.SUPPLIER: Supplier,
+}
+
+SMALL_KANA = str.maketrans("ぁぃぅぇぉっゃゅょゎゕゖ", "あいうえおつやゆよわかけ")
+
+# バイグラムの一致率がこの値未満の候補は検索結果に含めない
+MIN_SIMILARITY = 0.5
+
+# ハイライトの前後に含める文字数
+SNIPPET_CONTEXT = 30
+
+
+@lru_cache(maxsize=4096)
+def normalize_char(char):
+    """
+    1文字を正規化する（結果は0文字以上）
+
+    文字単位で正規化することで、元のテキストとの位置の対応を保てるようにしている。
+    半角カタカナの濁点（ﾞ）は単独の文字として除去されるため、文字をまたいだ合成は不要。
+    """
+    decomposed = unicodedata.normalize("NFD", unicodedata.normalize("NFKC", char))
+    result = []
+    for c in decomposed:
+        if unicodedata.combining(c) or c.isspace():
+            continue
+        code = ord(c)
+        if 0x30A1 <= code <= 0x30F6:
+            c = chr(code - 0x60)
+        result.append(c.translate(SMALL_KANA).casefold())
+    return "".join(result)
+
+
+def normalize_with_positions(text):
+    """
+    テキストを正規化し、正規化後の各文字が元のテキストの何文字目かの対応を返す
+    """
+    chars = []
+    positions = []
+    for index, char in enumerate(text):
+        for c in normalize_char(char):
+            chars.append(c)
+            positions.append(index)
+    return "".join(chars), positions
+
+
+def normalize(text):
+    return "".join(map(normalize_char, text))
+
+
+def to_bigrams(normalized):
+    """
+    正規化済みテキストを重複のないバイグラムのリストに分割する
+    """
+    return sorted({normalized[i : i + 2] for i in range(len(normalized) - 1)})
+
+
+def build_document(kind, values):
+    """
+    検索対象のフィールドの値（フィールド名 → 値）から (正規化済みテキスト, バイグラム) を作る
+    """
+    text = "\n".join(normalize(values[field] or "") for field in SEARCH_FIELDS[kind])
+    bigrams = sorted({b for line in text.split("\n") for b in to_bigrams(line)})
+    return text, bigrams
+
+
+def update_search_document(kind, instance):
+    """
+    部品・仕入先の検索ドキュメントを作成・更新する
+    """
+    text, bigrams = build_document(
+        kind, {field: getattr(instance, field) for field in SEARCH_FIELDS[kind]}
+    )
+    SearchDocument.objects.update_or_create(
+        kind=kind,
+        object_id=instance.pk,
+        defaults={"text": text, "bigrams": bigrams},
+    )
+
+
+def update_search_documents(kind, instances):
+    """
+    複数の部品・仕入先の検索ドキュメントをまとめて作成・更新する（bulk_create / bulk_update の後に使用）
+    """
+    fields = SEARCH_FIELDS[kind]
+    documents = []
+    for instance in instances:
+        text, bigrams = build_document(
+            kind, {field: getattr(instance, field) for field in fields}
+        )
+        documents.append(
+            SearchDocument(kind=kind, object_id=instance.pk, text=text, bigrams=bigrams)
+        )
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["kind", "object_id"],
+        update_fields=["text", "bigrams"],
+    )
+
+
+def delete_search_document(kind, instance):
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rank_documents(queryset, normalized, bigrams):
+    """
+    検索語を完全に含むものを優先し、バイグラムの一致率の高い順に並べる
+    """
+    opts = SearchDocument._meta
+    quote = connection.ops.quote_name
+    column = f"{quote(opts.db_table)}.{quote(opts.get_field('bigrams').column)}"
+    similarity = RawSQL(
+        f"SELECT count(*)::float / %s FROM unnest({column}) AS b WHERE b = ANY(%s)",
+        (len(bigrams), bigrams),
+        output_field=FloatField(),
+    )
+    return queryset.annotate(
+        similarity=similarity,
+        exact=Case(
+            When(text__contains=normalized, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+    ).order_by("-exact", "-similarity", "kind", "object_id")
+
+
+def search_documents(query, kinds, limit):
+    """
+    検索語に一致する検索ドキュメントを順位順に返す
+
+    まず全バイグラムを含むもの（GINインデックスの @> で絞り込み）を取得し、
+    件数が不足する場合のみ一部のバイグラムが一致するもの（&&）で補う。
+    """
+    normalized = normalize(query)
+    if not normalized:
+        return []
+    queryset = SearchDocument.objects.filter(kind__in=kinds)
+
+    if len(normalized) == 1:
+        # 1文字の検索語はバイグラムを作れないため部分一致で検索する
+        documents = queryset.filter(text__contains=normalized).order_by(
+            "kind", "object_id"
+        )[:limit]
+        return [(document, 1.0) for document in documents]
+
+    bigrams = to_bigrams(normalized)
+    documents = list(
+        rank_documents(queryset.filter(bigrams__contains=bigrams), normalized, bigrams)[
+            :limit
+        ]
+    )
+    if len(documents) < limit and len(bigrams) > 1:
+        found = [document.pk for document in documents]
+        documents += list(
+            rank_documents(
+                queryset.filter(bigrams__overlap=bigrams).exclude(pk__in=found),
+                normalized,
+                bigrams,
+            ).filter(similarity__gte=MIN_SIMILARITY)[: limit - len(documents)]
+        )
+    return [(document, getattr(document, "similarity", 1.0)) for document in documents]
+
+
+def highlight(text, bigrams):
+    """
+    検索語のバイグラムに一致する箇所を元のテキスト上の範囲で返す
+
+    Returns:
+        dict or None: snippet（前後を省略したテキスト）と
+        ranges（snippet内でのハイライト範囲 [開始, 終了) のリスト）
+    """
+    normalized, positions = normalize_with_positions(text)
+    marked = [False] * len(text)
+    for i in range(len(normalized) - 1):
+        if normalized[i : i + 2] in bigrams:
+            for index in range(positions[i], positions[i + 1] + 1):
+                marked[index] = True
+    if len(bigrams) == 1 and len(next(iter(bigrams))) == 1:
+        for i, c in enumerate(normalized):
+            if c in bigrams:
+                marked[positions[i]] = True
+    # 半角の濁点など正規化で消える文字は直前の文字と一緒にハイライトする
+    for index in range(1, len(text)):
+        char = text[index]
+        if marked[index - 1] and not char.isspace() and not normalize_char(char):
+            marked[index] = True
+
+    ranges = []
+    for index, is_marked in enumerate(marked):
+        if not is_marked:
+            continue
+        if ranges and ranges[-1][1] == index:
+            ranges[-1][1] = index + 1
+        else:
+            ranges.append([index, index + 1])
+    if not ranges:
+        return None
+
+    start = max(ranges[0][0] - SNIPPET_CONTEXT, 0)
+    end = min(ranges[-1][1] + SNIPPET_CONTEXT, len(text))
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    offset = len(prefix) - start
+    return {
+        "snippet": f"{prefix}{text[start:end]}{suffix}",
+        "ranges": [
+            [s + offset, e + offset] for s, e in ranges if s >= start and e <= end
+        ],
+    }
+
+
+def search(query, kinds=None, limit=20):
+    """
+    部品・仕入先を検索し、順位・ハイライト付きの結果を返す
+    """
+    kinds = kinds or list(SEARCH_FIELDS)
+    matches = search_documents(query, kinds, limit)
+
+    # 種別ごとに1クエリで対象のオブジェクトを取得
+    objects = {}
+    for kind in kinds:
+        ids = [document.object_id for document, _ in matches if document.kind == kind]
+        if ids:
+            objects[kind] = SEARCH_MODELS[kind].objects.in_bulk(ids)
+
+    normalized = normalize(query)
+    terms = set(to_bigrams(normalized)) if len(normalized) > 1 else {normalized}
+    results = []
+    for document, similarity in matches:
+        instance = objects.get(document.kind, {}).get(document.object_id)
+        if instance is None:
+            continue
+        highlights = []
+        for field in SEARCH_FIELDS[document.kind]:
+            matched = highlight(getattr(instance, field) or "", terms)
+            if matched:
+                highlights.append({"field": field, **matched})
+        results.append(
+            {
+                "type": document.kind,
+                "id": instance.pk,
+                "name": instance.name,
+                "score": round(similarity, 3),
+                "highlights": highlights,
+            }
+        )
+    return results
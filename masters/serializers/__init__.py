@@ -1,7 +1,22 @@
 from masters.serializers.supplier import SupplierSerializer
-from .part import PartSerializer
+from .part import AsOfPartSerializer, PartSerializer, LowStockPartSerializer
+from .stocktaking import (
+    StocktakingCountSerializer,
+    StocktakingSessionSerializer,
+    StocktakingSheetSerializer,
+)
+from .movement import StockMovementSerializer
+from .cycle_count import CycleCountPlanSerializer, CycleCountTaskSerializer
 
 __all__ = [
     "SupplierSerializer",
     "PartSerializer",
+    "LowStockPartSerializer",
+    "AsOfPartSerializer",
+    "StocktakingSheetSerializer",
+    "StocktakingSessionSerializer",
+    "StocktakingCountSerializer",
+    "StockMovementSerializer",
+    "CycleCountPlanSerializer",
+    "CycleCountTaskSerializer",
 ]
@@ -0,0 +1,142 @@
+"""
+複数の項目をまとめて作成・更新するリストシリアライザー
+
+ListSerializer は既定では項目ごとに関連オブジェクトの取得・INSERT / UPDATE を行い、
+1件でもエラーがあると全体を検証エラーにするため、以下のように置き換えます。
+
+- 外部キーの項目（PrefetchedPrimaryKeyRelatedField）は全項目の値をまとめて1回のクエリで取得する
+- validate_items() は項目ごとに検証結果を返し、正しい項目のみを保存の対象にする
+- 保存は bulk_create / bulk_update で行う（シグナルは送られない）
+"""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    BulkListSerializer の項目として検証する場合は、まとめて取得した関連オブジェクトから値を返す外部キーの項目
+
+    単独のシリアライザーで使用した場合は PrimaryKeyRelatedField と同じ
+    """
+
+    def to_pk(self, data):
+        """
+        入力値を関連先の主キーの値にする（不正な値は None）
+        """
+        if isinstance(data, bool):
+            return None
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            return None
+
+    def to_internal_value(self, data):
+        objects = getattr(self.root, "prefetched_objects", {}).get(self.field_name)
+        if objects is None:
+            return super().to_internal_value(data)
+        pk = self.to_pk(data)
+        if pk is None:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return objects[pk]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    bulk_create / bulk_update で保存するリストシリアライザー
+
+    更新する場合は instance に data と同じ順のインスタンスのリストを渡す。
+    validate_items() の後の save() では、エラーのない項目のみを保存する。
+    """
+
+    def prefetch_related_objects(self, items):
+        """
+        PrefetchedPrimaryKeyRelatedField の項目ごとに、全項目の値の関連オブジェクトを1回のクエリで取得する
+        """
+        self.prefetched_objects = {}
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(
+                field, PrefetchedPrimaryKeyRelatedField
+            ):
+                continue
+            pks = {
+                field.to_pk(item[name])
+                for item in items
+                if isinstance(item, dict) and name in item
+            }
+            pks.discard(None)
+            self.prefetched_objects[name] = field.get_queryset().in_bulk(pks)
+
+    def validate_items(self, skip=()):
+        """
+        項目ごとに検証する
+
+        Args:
+            skip: 検証しない（エラーが確定している）項目の番号
+
+        Returns:
+            dict: 項目の番号 → エラー（エラーのない項目は含まない）
+        """
+        items = self.initial_data
+        self.prefetch_related_objects(items)
+        instances = self.instance
+        validated = []
+        valid_instances = []
+        errors = {}
+        for index, item in enumerate(items):
+            if index in skip:
+                continue
+            if not isinstance(item, dict):
+                message = self.child.error_messages["invalid"].format(
+                    datatype=type(item).__name__
+                )
+                errors[index] = {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+                continue
+            instance = instances[index] if instances is not None else None
+            self.child.instance = instance
+            self.child.initial_data = item
+            try:
+                validated.append(self.child.run_validation(item))
+            except ValidationError as exc:
+                errors[index] = exc.detail
+            else:
+                valid_instances.append(instance)
+        self.child.instance = None
+
+        self._validated_data = validated
+        self._errors = []
+        if instances is not None:
+            self.instance = valid_instances
+        return errors
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        instances = [model(**attrs) for attrs in validated_data]
+        return model.objects.bulk_create(instances)
+
+    def update(self, instances, validated_data):
+        """
+        項目に含まれるフィールドと auto_now のフィールドをまとめて更新する
+        """
+        model = self.child.Meta.model
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+        # bulk_update では auto_now のフィールドが更新されないため
+        now = timezone.now()
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False):
+                for instance in instances:
+                    setattr(instance, field.attname, now)
+                fields.add(field.name)
+        if instances:
+            model.objects.bulk_update(instances, sorted(fields))
+        return instances
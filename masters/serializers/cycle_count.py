@@ -0,0 +1,62 @@
+from rest_framework import serializers
+
+from accounts.serializers import UserSerializer
+from masters.models import CycleCountPlan, CycleCountTask
+from .part import SimplePartSerializer
+
+
+class CycleCountPlanSerializer(serializers.ModelSerializer):
+    """
+    循環棚卸の計画のシリアライザー
+
+    作成時は期間（start_date, end_date）のみ受け取る（最大 MAX_DAYS 日）
+    """
+
+    MAX_DAYS = 366
+
+    created_by = UserSerializer(read_only=True)
+
+    class Meta:
+        model = CycleCountPlan
+        fields = [
+            "id",
+            "start_date",
+            "end_date",
+            "a_min_value",
+            "b_min_value",
+            "part_count",
+            "task_count",
+            "created_by",
+            "created_at",
+        ]
+        read_only_fields = [
+            "a_min_value",
+            "b_min_value",
+            "part_count",
+            "task_count",
+            "created_at",
+        ]
+
+    def validate(self, attrs):
+        days = (attrs["end_date"] - attrs["start_date"]).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                {"end_date": "終了日は開始日以降の日付を指定してください"}
+            )
+        if days > self.MAX_DAYS:
+            raise serializers.ValidationError(
+                {"end_date": f"期間は{self.MAX_DAYS}日以内で指定してください"}
+            )
+        return attrs
+
+
+class CycleCountTaskSerializer(serializers.ModelSerializer):
+    """
+    循環棚卸の計数予定のシリアライザー
+    """
+
+    part = SimplePartSerializer(read_only=True)
+
+    class Meta:
+        model = CycleCountTask
+        fields = ["id", "part", "scheduled_on", "value_class"]
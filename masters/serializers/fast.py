@@ -0,0 +1,211 @@
+"""
+読み取り専用の高速シリアライズ
+
+ModelSerializer はモデルのインスタンス化と項目ごとの get_attribute / to_representation に
+時間がかかるため、一覧・詳細取得ではシリアライザーの項目定義から
+「values() で取得する列」と「列ごとの変換関数」を事前に組み立て、辞書から直接出力を作ります。
+出力（JSON）は元のシリアライザーと完全に一致させ、対応していない項目が含まれる場合は
+None を返して通常のシリアライザーを使用させます。
+"""
+
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+class FastSerializer:
+    """
+    シリアライザーから組み立てた高速シリアライザー
+
+    Attributes:
+        columns: values() に指定する列のリスト
+        plan: (出力キー, 列名, 変換関数) または (出力キー, 外部キー列名, ネストしたplan) のリスト
+    """
+
+    def __init__(self, columns, plan):
+        self.columns = columns
+        self.plan = plan
+
+    def values(self, queryset, extra_columns=()):
+        """
+        出力に必要な列を values() で読み込む
+        extra_columns（並び替えキーなど）は読み込むのみで、出力は plan の項目に限られる
+        """
+        return queryset.values(*dict.fromkeys([*self.columns, *extra_columns]))
+
+    def to_representation(self, rows):
+        plan = self.plan
+        return [build_row(plan, row) for row in rows]
+
+
+def build_row(plan, row):
+    data = {}
+    for key, column, convert in plan:
+        value = row[column]
+        if value is None:
+            data[key] = None
+        elif isinstance(convert, list):
+            data[key] = build_row(convert, row)
+        else:
+            data[key] = convert(value)
+    return data
+
+
+def identity(value):
+    return value
+
+
+def compile_decimal(field):
+    """
+    DecimalField.to_representation と同じ結果（小数点以下の桁数に丸めた文字列）を返す変換関数
+    """
+    coerce_to_string = getattr(
+        field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if not coerce_to_string or field.localize or field.decimal_places is None:
+        return field.to_representation
+    quantize = field.quantize
+
+    def convert(value):
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+        return "{:f}".format(quantize(value))
+
+    return convert
+
+
+def compile_datetime(field):
+    """
+    DateTimeField.to_representation と同じ結果（ISO 8601、UTCは "Z"）を返す変換関数
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    field_timezone = (
+        field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    )
+    if (
+        output_format is None
+        or output_format.lower() != ISO_8601
+        or field_timezone is None
+    ):
+        return field.to_representation
+
+    def convert(value):
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def compile_file(field, model_field, request):
+    """
+    FileField / ImageField.to_representation と同じ結果（絶対URL）を返す変換関数
+    """
+    use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+    if not use_url:
+        return lambda name: name or None
+    storage = model_field.storage
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    return convert
+
+
+def compile_field(field, model, request):
+    """
+    シリアライザーの項目に対応する変換関数を返す（未対応の項目は None）
+    """
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        model_field = None
+
+    if isinstance(field, serializers.FileField):
+        if model_field is None:
+            return None
+        return compile_file(field, model_field, request)
+    if isinstance(field, serializers.DecimalField):
+        return compile_decimal(field)
+    if isinstance(field, serializers.DateTimeField):
+        return compile_datetime(field)
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # values() は外部キーの値（関連先のID）を返す
+        if (
+            model_field is None
+            or not model_field.many_to_one
+            or not model_field.target_field.primary_key
+            or field.pk_field is not None
+        ):
+            return None
+        return identity
+    if isinstance(field, serializers.ChoiceField):
+        # 値がそのまま出力される（choicesに含まれない値も同様）
+        return identity
+    if isinstance(
+        field,
+        (serializers.IntegerField, serializers.BooleanField, serializers.CharField),
+    ):
+        # DBから取得した値（int / bool / str）は変換結果と同一になる
+        return identity
+    return None
+
+
+def compile_plan(serializer, prefix, request):
+    """
+    シリアライザーの項目定義から (列, plan) を組み立てる
+
+    Returns:
+        tuple: (列のリスト, plan)。未対応の項目がある場合は None
+    """
+    model = serializer.Meta.model
+    columns = []
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if "." in field.source or field.source == "*":
+            return None
+        if isinstance(field, serializers.ModelSerializer):
+            if prefix:
+                # 2階層以上のネストは対象外
+                return None
+            nested = compile_plan(field, f"{field.source}__", request)
+            if nested is None:
+                return None
+            nested_columns, nested_plan = nested
+            # 外部キーの列がNULLなら関連オブジェクトもNone
+            columns.append(field.source)
+            columns.extend(nested_columns)
+            plan.append((name, field.source, nested_plan))
+            continue
+        convert = compile_field(field, model, request)
+        if convert is None:
+            return None
+        column = f"{prefix}{field.source}"
+        columns.append(column)
+        plan.append((name, column, convert))
+    return columns, plan
+
+
+def compile_fast_serializer(serializer):
+    """
+    ModelSerializer のインスタンスから高速シリアライザーを組み立てる
+
+    Returns:
+        FastSerializer or None: 未対応の項目が含まれる場合は None
+    """
+    request = serializer.context.get("request")
+    compiled = compile_plan(serializer, "", request)
+    if compiled is None:
+        return None
+    columns, plan = compiled
+    return FastSerializer(list(dict.fromkeys(columns)), plan)
@@ -0,0 +1,26 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import serializers
+
+
+class AsOfField(serializers.DateTimeField):
+    """
+    基準日時の項目
+
+    日時のほか日付のみも受け付け、日付の場合はその日の終わり（現在のタイムゾーン）とする
+    （"2026-03-31" は 3月31日の業務終了時点の在庫数）
+    """
+
+    def to_internal_value(self, value):
+        if isinstance(value, str):
+            try:
+                date = parse_date(value)
+            except ValueError:
+                date = None
+            if date is not None:
+                return timezone.make_aware(
+                    datetime.datetime.combine(date, datetime.time.max)
+                )
+        return super().to_internal_value(value)
@@ -0,0 +1,112 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def get_requested_fields(request, available):
+    """
+    クエリパラメータ fields / omit から出力する項目名の集合を返す
+    どちらも指定されていない場合は None（すべての項目を出力）
+
+    - fields: 出力する項目をカンマ区切りで指定（存在しない項目は無視）
+    - omit: 出力しない項目をカンマ区切りで指定
+    """
+    fields = request.query_params.get("fields")
+    omit = request.query_params.get("omit")
+    if not fields and not omit:
+        return None
+    selected = set(available)
+    if fields:
+        selected &= {name.strip() for name in fields.split(",")}
+    if omit:
+        selected -= {name.strip() for name in omit.split(",")}
+    return selected
+
+
+class SparseFieldsMixin:
+    """
+    GETリクエストのクエリパラメータ fields / omit で出力項目を絞り込むシリアライザーのミックスイン
+
+    コンテキストにリクエストがある場合のみ有効で、書き込み時の検証には影響しない。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method not in ("GET", "HEAD"):
+            return
+        requested = get_requested_fields(request, self.fields.keys())
+        if requested is None:
+            return
+        for name in list(self.fields):
+            if name not in requested:
+                self.fields.pop(name)
+
+    def get_sparse_columns(self):
+        """
+        出力項目の表示に必要な列と、select_related する関連を返す
+
+        Returns:
+            tuple: (only() に指定する列のリスト, select_related する関連のリスト)
+        """
+        opts = self.Meta.model._meta
+        columns = {opts.pk.name}
+        related = []
+        for field in self.fields.values():
+            if field.write_only or field.source == "*":
+                continue
+            if isinstance(field, serializers.ModelSerializer):
+                related_opts = field.Meta.model._meta
+                related.append(field.source)
+                columns.add(field.source)
+                columns.update(
+                    f"{field.source}__{child.source}"
+                    for child in field.fields.values()
+                    if _is_concrete(related_opts, child.source)
+                )
+            elif _is_concrete(opts, field.source):
+                columns.add(field.source)
+        return sorted(columns), related
+
+
+class IncludedUsersMixin:
+    """
+    作成者・更新者をユーザーIDのみで出力できるようにするシリアライザーのミックスイン
+
+    コンテキストの include_users が True の場合、included_user_fields の項目を
+    ネストしたユーザー情報からユーザーIDに置き換える。
+    ユーザー情報はビュー側でレスポンスに1回だけ含める（masters.views.mixins.IncludedUsersMixin）。
+    """
+
+    included_user_fields = ("created_by", "updated_by")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get("include_users"):
+            return
+        for name in self.included_user_fields:
+            if name in self.fields:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class NativeDecimalMixin:
+    """
+    レンダラーがDecimalをそのまま出力できる場合（native_decimal = True のレンダラー）に、
+    DecimalField を文字列に変換せずDecimalのまま出力するシリアライザーのミックスイン
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        renderer = getattr(request, "accepted_renderer", None)
+        if not getattr(renderer, "native_decimal", False):
+            return
+        for field in self.fields.values():
+            if isinstance(field, serializers.DecimalField):
+                field.coerce_to_string = False
+
+
+def _is_concrete(opts, name):
+    try:
+        return opts.get_field(name).concrete
+    except FieldDoesNotExist:
+        return False
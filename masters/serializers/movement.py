@@ -0,0 +1,85 @@
+from rest_framework import serializers
+
+from accounts.serializers import UserSerializer
+from masters.models import Part, StockMovement
+from masters.stock import InsufficientStockError, record_movement, record_movements
+from .bulk import BulkListSerializer, PrefetchedPrimaryKeyRelatedField
+from .part import SimplePartSerializer
+
+
+class StockMovementListSerializer(BulkListSerializer):
+    """
+    入出庫の一括登録用のリストシリアライザー
+
+    在庫数の更新と履歴の登録は masters.stock.record_movements でまとめて行う
+    在庫数が不足する部品がある場合は InsufficientStockError を送出し、何も登録しない
+    """
+
+    def create(self, validated_data):
+        return record_movements(validated_data)
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    """
+    入出庫のシリアライザー
+
+    登録時は部品（part_id）・種別・数量・理由を受け取る
+    数量は入庫・出庫では1以上の数量、調整では在庫の増減数（負の値で減少）を指定する
+    レスポンスの quantity は在庫の増減数（出庫は負の値）で、part には登録後の在庫数を含む
+    """
+
+    part = SimplePartSerializer(read_only=True)
+    # 一括登録では全項目の部品をまとめて取得する
+    part_id = PrefetchedPrimaryKeyRelatedField(
+        queryset=Part.objects.all(), source="part", write_only=True
+    )
+    created_by = UserSerializer(read_only=True)
+
+    class Meta:
+        model = StockMovement
+        fields = [
+            "id",
+            "part",
+            "part_id",
+            "kind",
+            "quantity",
+            "reason",
+            "created_by",
+            "created_at",
+        ]
+        read_only_fields = ["created_at"]
+        list_serializer_class = StockMovementListSerializer
+
+    def validate(self, attrs):
+        """
+        入庫・出庫の数量を増減数にする
+        """
+        kind = attrs["kind"]
+        quantity = attrs["quantity"]
+        if kind == StockMovement.Kind.ADJUSTMENT:
+            if quantity == 0:
+                raise serializers.ValidationError(
+                    {"quantity": "0以外の値を入力してください。"}
+                )
+        elif quantity < 1:
+            raise serializers.ValidationError(
+                {"quantity": "1以上の値を入力してください。"}
+            )
+        elif kind == StockMovement.Kind.ISSUE:
+            attrs["quantity"] = -quantity
+        return attrs
+
+    def create(self, validated_data):
+        try:
+            movement = record_movement(
+                validated_data["part"],
+                validated_data["kind"],
+                validated_data["quantity"],
+                reason=validated_data.get("reason", ""),
+                user=validated_data.get("created_by"),
+            )
+        except InsufficientStockError:
+            raise serializers.ValidationError({"quantity": "在庫数が不足しています。"})
+        # レスポンスには登録後の在庫数を含める
+        movement.part.refresh_from_db(fields=["stock_quantity"])
+        return movement
@@ -1,17 +1,59 @@
 from rest_framework import serializers
-from ..models import Part, Supplier
+from ..cycle_counts import schedule_parts
+from ..models import Part, SearchDocument, Supplier
+from ..search import update_search_documents
+from ..stock import clear_low_stock_count
 from accounts.serializers import UserSerializer
+from .bulk import BulkListSerializer, PrefetchedPrimaryKeyRelatedField
+from .mixins import IncludedUsersMixin, NativeDecimalMixin, SparseFieldsMixin
 from .supplier import SimpleSupplierSerializer
 
 
-class PartSerializer(serializers.ModelSerializer):
+class PartListSerializer(BulkListSerializer):
+    """
+    部品の一括作成・更新用のリストシリアライザー
+
+    bulk_create / bulk_update ではシグナルが送られないため、
+    検索ドキュメントと在庫不足数のキャッシュの更新、循環棚卸の計画への割り当てをここで行う
+    """
+
+    def create(self, validated_data):
+        parts = super().create(validated_data)
+        self.updated(parts)
+        if parts:
+            schedule_parts(Part.objects.filter(pk__in=[part.pk for part in parts]))
+        return parts
+
+    def update(self, instances, validated_data):
+        parts = super().update(instances, validated_data)
+        self.updated(parts)
+        return parts
+
+    def updated(self, parts):
+        if parts:
+            # 検索ドキュメントはアーカイブされていない部品のみ保持する
+            active = [part for part in parts if part.archived_at is None]
+            update_search_documents(SearchDocument.Kind.PART, active)
+            clear_low_stock_count()
+
+
+class PartSerializer(
+    IncludedUsersMixin,
+    NativeDecimalMixin,
+    SparseFieldsMixin,
+    serializers.ModelSerializer,
+):
     """
     部品モデル用シリアライザー
+
+    一覧・詳細取得ではクエリパラメータ fields / omit で出力項目を絞り込める
+    一覧取得で include=users を指定すると作成者・更新者はユーザーIDで出力される
     """
 
     # 仕入先は簡易シリアライザーでネストし、作成時の外部キー参照はsupplier_idで受け取る
+    # （一括作成・更新では全項目の仕入先をまとめて取得する）
     supplier = SimpleSupplierSerializer(read_only=True)
-    supplier_id = serializers.PrimaryKeyRelatedField(
+    supplier_id = PrefetchedPrimaryKeyRelatedField(
         queryset=Supplier.objects.all(), source="supplier", write_only=True
     )
     # 作成者と更新者をネストされたオブジェクトとして定義
@@ -21,6 +63,9 @@ class PartSerializer(serializers.ModelSerializer):
     class Meta:
         model = Part
         fields = "__all__"
+        # アーカイブは一括アーカイブ（bulk-archive）でのみ変更する
+        read_only_fields = ["archived_at"]
+        list_serializer_class = PartListSerializer
 
     def to_internal_value(self, data):
         """
@@ -39,3 +84,30 @@ class PartSerializer(serializers.ModelSerializer):
             data["tax_rate"] = 10.00
 
         return super().to_internal_value(data)
+
+
+class LowStockPartSerializer(PartSerializer):
+    """
+    在庫不足の部品一覧用シリアライザー（不足数を含む）
+    """
+
+    shortage = serializers.IntegerField(read_only=True)
+
+
+class AsOfPartSerializer(PartSerializer):
+    """
+    一覧で as_of を指定した場合のシリアライザー（基準日時の在庫数を含む）
+    """
+
+    stock_quantity_as_of = serializers.IntegerField(read_only=True)
+
+
+class SimplePartSerializer(serializers.ModelSerializer):
+    """
+    部品の簡易シリアライザー
+    ネストされたレスポンスで使用するための最小限のフィールドのみを含む
+    """
+
+    class Meta:
+        model = Part
+        fields = ("id", "name", "stock_quantity")
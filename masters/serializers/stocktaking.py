@@ -0,0 +1,161 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from accounts.serializers import UserSerializer
+from masters.models import (
+    Part,
+    StocktakingCount,
+    StocktakingSession,
+    StocktakingSheet,
+    Supplier,
+)
+from .bulk import BulkListSerializer, PrefetchedPrimaryKeyRelatedField
+from .fields import AsOfField
+from .part import SimplePartSerializer
+from .supplier import SimpleSupplierSerializer
+
+
+class StocktakingSheetSerializer(serializers.ModelSerializer):
+    """
+    棚卸表の作成ジョブのシリアライザー
+
+    作成時は形式（xlsx / pdf）と任意の絞り込み条件（category, supplier_id）を受け取る
+    as_of（日時または日付）を指定すると、帳簿在庫数をその時点の在庫数にする
+    進捗は progress（0〜100）で、完了後は download_url からファイルを取得できる
+    """
+
+    supplier = SimpleSupplierSerializer(read_only=True)
+    supplier_id = serializers.PrimaryKeyRelatedField(
+        queryset=Supplier.objects.all(),
+        source="supplier",
+        write_only=True,
+        required=False,
+        allow_null=True,
+    )
+    as_of = AsOfField(required=False, allow_null=True)
+    created_by = UserSerializer(read_only=True)
+    progress = serializers.IntegerField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = StocktakingSheet
+        fields = [
+            "id",
+            "format",
+            "status",
+            "category",
+            "supplier",
+            "supplier_id",
+            "as_of",
+            "total_rows",
+            "processed_rows",
+            "progress",
+            "error",
+            "download_url",
+            "created_by",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "status",
+            "total_rows",
+            "processed_rows",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != StocktakingSheet.Status.SUCCEEDED:
+            return None
+        return reverse(
+            "stocktaking-sheet-download",
+            args=[obj.pk],
+            request=self.context.get("request"),
+        )
+
+
+class StocktakingSessionSerializer(serializers.ModelSerializer):
+    """
+    棚卸の実施のシリアライザー
+
+    開始時は任意の名称と対象の絞り込み条件（category, supplier_id）を受け取る
+    """
+
+    supplier = SimpleSupplierSerializer(read_only=True)
+    supplier_id = serializers.PrimaryKeyRelatedField(
+        queryset=Supplier.objects.all(),
+        source="supplier",
+        write_only=True,
+        required=False,
+        allow_null=True,
+    )
+    created_by = UserSerializer(read_only=True)
+    finalized_by = UserSerializer(read_only=True)
+
+    class Meta:
+        model = StocktakingSession
+        fields = [
+            "id",
+            "name",
+            "status",
+            "category",
+            "supplier",
+            "supplier_id",
+            "item_count",
+            "adjustment_count",
+            "created_by",
+            "created_at",
+            "finalized_by",
+            "finalized_at",
+        ]
+        read_only_fields = [
+            "status",
+            "item_count",
+            "adjustment_count",
+            "created_at",
+            "finalized_at",
+        ]
+
+
+class StocktakingCountSerializer(serializers.ModelSerializer):
+    """
+    棚卸の明細のシリアライザー
+
+    一覧では帳簿在庫数・実棚数と、差異（variance）・差異金額（value_impact）を出力する
+    実棚数の登録では part_id と counted_quantity のリストを受け取る（BulkListSerializer で項目ごとに検証する）
+    """
+
+    part = SimplePartSerializer(read_only=True)
+    part_id = PrefetchedPrimaryKeyRelatedField(
+        queryset=Part.objects.active(), source="part", write_only=True
+    )
+    counted_quantity = serializers.IntegerField(min_value=0, allow_null=True)
+    variance = serializers.IntegerField(read_only=True)
+    value_impact = serializers.DecimalField(
+        max_digits=20, decimal_places=2, read_only=True
+    )
+
+    class Meta:
+        model = StocktakingCount
+        fields = [
+            "id",
+            "part",
+            "part_id",
+            "expected_quantity",
+            "cost_price",
+            "counted_quantity",
+            "variance",
+            "value_impact",
+            "counted_by",
+            "counted_at",
+        ]
+        read_only_fields = [
+            "expected_quantity",
+            "cost_price",
+            "counted_by",
+            "counted_at",
+        ]
+        list_serializer_class = BulkListSerializer
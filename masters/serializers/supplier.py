@@ -1,12 +1,18 @@
 from rest_framework import serializers
 from masters.models import Supplier
 from accounts.serializers import UserSerializer
+from .mixins import IncludedUsersMixin, SparseFieldsMixin
 
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(
+    IncludedUsersMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """
     サプライヤーモデルのシリアライザー
 
+    一覧・詳細取得ではクエリパラメータ fields / omit で出力項目を絞り込める
+    一覧取得で include=users を指定すると作成者・更新者はユーザーIDで出力される
+
     バリデーションルール：
     - supplier_code: 任意。ユニーク
     - name: 必須
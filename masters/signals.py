@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from masters.autocomplete import autocomplete_cache
+from masters.cycle_counts import schedule_parts, unschedule_parts
+from masters.models import Part, SearchDocument, Supplier
+from masters.search import delete_search_document, update_search_document
+from masters.stock import clear_low_stock_count
+from zaiko_be.response_cache import bump_model_version
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Part)
+def update_part_search_document(sender, instance, **kwargs):
+    """
+    部品の保存時に検索ドキュメントと在庫不足数のキャッシュを更新
+    アーカイブした部品の検索ドキュメントは保持しない
+    """
+    if instance.archived_at is None:
+        update_search_document(SearchDocument.Kind.PART, instance)
+    else:
+        delete_search_document(SearchDocument.Kind.PART, instance)
+    clear_low_stock_count()
+
+
+@receiver(post_save, sender=Part)
+def schedule_part_cycle_counts(sender, instance, created, **kwargs):
+    """
+    部品の登録時に実施中・今後の循環棚卸の計画に割り当てる
+    """
+    if created and instance.archived_at is None:
+        schedule_parts(Part.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_delete, sender=Part)
+def unschedule_part_cycle_counts(sender, instance, **kwargs):
+    """
+    部品の削除時に循環棚卸の予定を削除し、計画の件数を減らす（CASCADE の削除より先に行う）
+    """
+    unschedule_parts([instance.pk], include_past=True)
+
+
+@receiver(post_delete, sender=Part)
+def delete_part_search_document(sender, instance, **kwargs):
+    """
+    部品の削除時に検索ドキュメントを削除し、在庫不足数のキャッシュをクリア
+    """
+    delete_search_document(SearchDocument.Kind.PART, instance)
+    clear_low_stock_count()
+
+
+@receiver(post_save, sender=Supplier)
+def update_supplier_search_document(sender, instance, **kwargs):
+    """
+    仕入先の保存時に検索ドキュメントを更新し、オートコンプリートのキャッシュをクリア
+    """
+    update_search_document(SearchDocument.Kind.SUPPLIER, instance)
+    autocomplete_cache.clear()
+
+
+@receiver(post_delete, sender=Supplier)
+def delete_supplier_search_document(sender, instance, **kwargs):
+    """
+    仕入先の削除時に検索ドキュメントを削除し、オートコンプリートのキャッシュをクリア
+    """
+    delete_search_document(SearchDocument.Kind.SUPPLIER, instance)
+    autocomplete_cache.clear()
+
+
+@receiver([post_save, post_delete], sender=Part)
+@receiver([post_save, post_delete], sender=Supplier)
+@receiver([post_save, post_delete], sender=User)
+def bump_response_cache_version(sender, update_fields=None, using=None, **kwargs):
+    """
+    部品・仕入先・ユーザーの保存・削除時にレスポンスキャッシュのバージョン番号を進める
+    ログイン時の最終ログイン日時の更新はレスポンスに含まれないため対象外
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    bump_model_version(sender, using=using)
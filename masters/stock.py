@@ -0,0 +1,331 @@
+"""
+部品の在庫数
+
+在庫数の増減は入出庫（masters.models.StockMovement）の登録と同じトランザクション内で、
+F() 式による1回のUPDATE文で行います。読み込んだ値を書き戻さないため、同時に登録しても更新が失われず、
+行ロックは UPDATE からトランザクションの確定までしか保持しません。
+部品の更新で在庫数を直接変更した場合も差分を調整として記録し、入出庫の履歴と在庫数を一致させます。
+
+過去の日時の在庫数は、定期的に作成するスナップショット（masters.models.StockSnapshot）の在庫数に
+その後の入出庫を足して求めます。全期間の履歴ではなく直前のスナップショット以降の入出庫のみを集計します。
+"""
+
+from collections import defaultdict
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.db.models import F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from masters.models import Part, StockMovement, StockSnapshot, StockSnapshotItem
+from zaiko_be.response_cache import bump_model_version, get_cache, get_model_versions
+
+LOW_STOCK_COUNT_CACHE_KEY = "masters:parts:low_stock_count:{}"
+
+# 部品のバージョン番号が進むと参照されなくなるため、有効期限は念のための上限
+LOW_STOCK_COUNT_CACHE_TTL = 60 * 10
+
+# プロセスごとのキャッシュ（ローカルメモリ）では他のプロセスでの更新が反映されないため、
+# 数秒で読み直す（その間のバッジの件数は概数）
+LOW_STOCK_COUNT_LOCAL_CACHE_TTL = 5
+
+
+class InsufficientStockError(Exception):
+    """
+    出庫・調整で在庫数が負になる
+
+    shortages には在庫数が不足する部品ごとに id / name / stock_quantity（現在の在庫数）/
+    quantity（登録しようとした増減数の合計）を含む
+    """
+
+    def __init__(self, message, shortages=()):
+        super().__init__(message)
+        self.shortages = list(shortages)
+
+
+def get_low_stock_count_cache_key():
+    (version,) = get_model_versions([Part])
+    return LOW_STOCK_COUNT_CACHE_KEY.format(version)
+
+
+def get_low_stock_count():
+    """
+    アーカイブされていない在庫不足の部品数を返す（ダッシュボードのバッジ表示用にキャッシュする）
+
+    レスポンスキャッシュと同じキャッシュに部品のバージョン番号をキーにして保存するため、
+    共有のキャッシュ（Redis互換のサーバー）では他のプロセスでの在庫数の変更もすぐに反映される
+    """
+    cache = get_cache()
+    key = get_low_stock_count_cache_key()
+    count = cache.get(key)
+    if count is None:
+        count = Part.objects.active().low_stock().count()
+        if isinstance(cache, LocMemCache):
+            timeout = LOW_STOCK_COUNT_LOCAL_CACHE_TTL
+        else:
+            timeout = LOW_STOCK_COUNT_CACHE_TTL
+        cache.set(key, count, timeout)
+    return count
+
+
+def clear_low_stock_count():
+    """
+    在庫不足数のキャッシュを無効にする（部品のバージョン番号を進める）
+
+    トランザクション内では確定後にもう一度進める
+    （確定前に他のリクエストが古い件数をキャッシュしても参照されないようにする）
+    """
+    bump_model_version(Part)
+
+
+def record_movement(part, kind, quantity, reason="", user=None):
+    """
+    入出庫を登録し、部品の在庫数を増減する
+
+    Args:
+        part: 部品
+        kind: StockMovement.Kind
+        quantity: 在庫の増減数（出庫は負の値）
+
+    Returns:
+        StockMovement: 登録した入出庫
+
+    Raises:
+        InsufficientStockError: 在庫数が負になる場合（何も登録しない）
+    """
+    with transaction.atomic():
+        parts = Part.objects.filter(pk=part.pk)
+        if quantity < 0:
+            # 在庫数の確認と更新を同じUPDATE文で行う
+            parts = parts.filter(stock_quantity__gte=-quantity)
+        # QuerySet.update では auto_now が更新されないため更新日時も設定する
+        if not parts.update(
+            stock_quantity=F("stock_quantity") + quantity, updated_at=timezone.now()
+        ):
+            raise InsufficientStockError(
+                f"{part} の在庫数が不足しています",
+                [
+                    {
+                        "id": part.pk,
+                        "name": part.name,
+                        "stock_quantity": Part.objects.get(pk=part.pk).stock_quantity,
+                        "quantity": quantity,
+                    }
+                ],
+            )
+        movement = StockMovement.objects.create(
+            part=part, kind=kind, quantity=quantity, reason=reason, created_by=user
+        )
+        clear_low_stock_count()
+    return movement
+
+
+def record_movements(movements):
+    """
+    複数の入出庫をまとめて登録し、部品の在庫数を増減する
+
+    在庫数は部品ごとの増減数の合計を VALUES にまとめて update_stock_quantities で更新する
+    （登録する入出庫の順序によらず、合計で在庫数が負にならないかを判定する）。
+    入出庫の履歴は bulk_create で登録する。
+
+    Args:
+        movements: StockMovement の項目（part / kind / quantity / reason / created_by）の辞書のリスト
+
+    Returns:
+        list: 登録した StockMovement（part の在庫数は更新後の値）
+
+    Raises:
+        InsufficientStockError: 在庫数が負になる部品がある場合（何も登録しない）
+    """
+    changes = defaultdict(int)
+    for movement in movements:
+        changes[movement["part"].pk] += movement["quantity"]
+    values = ", ".join(["(%s::bigint, %s::integer)"] * len(changes))
+    params = []
+    for part_id, quantity in changes.items():
+        params += [part_id, quantity]
+
+    with transaction.atomic():
+        updated = update_stock_quantities(
+            f"SELECT * FROM (VALUES {values}) AS changes (id, quantity)", params
+        )
+        if len(updated) != len(changes):
+            shortages = [
+                {**row, "quantity": changes[row["id"]]}
+                for row in Part.objects.filter(id__in=set(changes) - set(updated))
+                .order_by("id")
+                .values("id", "name", "stock_quantity")
+            ]
+            raise InsufficientStockError("在庫数が不足する部品があります", shortages)
+
+        for movement in movements:
+            movement["part"].stock_quantity = updated[movement["part"].pk]
+        created = StockMovement.objects.bulk_create(
+            StockMovement(**movement) for movement in movements
+        )
+    return created
+
+
+def update_stock_quantities(changes, params=()):
+    """
+    部品ごとの増減数で在庫数を1回の UPDATE ... FROM で増減する
+
+    在庫数が負にならないことも同じ文で確認し、負になる部品は更新しない（呼び出し側で更新した件数を確認し、
+    不足する場合は例外でトランザクションごと取り消す）。同じ部品を含む更新が同時に行われても
+    デッドロックしないよう、部品の行はIDの順にロックする。
+    トランザクション内で呼ぶこと。
+
+    Args:
+        changes: 部品ID（id）と増減数（quantity）の列を返すSELECT文（部品IDは重複しないこと）
+        params: changes のパラメータ
+
+    Returns:
+        dict: 更新した部品ID → 更新後の在庫数
+    """
+    opts = Part._meta
+    quote = connection.ops.quote_name
+    table = quote(opts.db_table)
+    pk = quote(opts.pk.column)
+    stock = quote(opts.get_field("stock_quantity").column)
+    updated_at = quote(opts.get_field("updated_at").column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH changes AS ({changes}), "
+            f"locked AS ("
+            f"SELECT {pk} FROM {table} WHERE {pk} IN (SELECT id FROM changes) "
+            f"ORDER BY {pk} FOR UPDATE"
+            f") "
+            f"UPDATE {table} AS part "
+            f"SET {stock} = part.{stock} + changes.quantity, {updated_at} = %s "
+            f"FROM changes, locked "
+            f"WHERE part.{pk} = changes.id AND locked.{pk} = changes.id "
+            f"AND part.{stock} + changes.quantity >= 0 "
+            f"RETURNING part.{pk}, part.{stock}",
+            [*params, timezone.now()],
+        )
+        updated = dict(cursor.fetchall())
+    # QuerySet.update を使用しないため、レスポンスキャッシュのバージョン番号をここで進める
+    bump_model_version(Part)
+    clear_low_stock_count()
+    return updated
+
+
+def lock_stock_quantities(ids):
+    """
+    部品の行をIDの順にロックし、部品ID → 現在の在庫数を返す
+
+    部品の更新で在庫数を書き戻す前に呼び、record_stock_edits で差分を記録する
+    """
+    return dict(
+        Part.objects.select_for_update()
+        .filter(pk__in=ids)
+        .order_by("pk")
+        .values_list("pk", "stock_quantity")
+    )
+
+
+def record_stock_edits(previous, parts, user=None):
+    """
+    部品の更新で在庫数が変わった場合に、差分を調整の入出庫として記録する
+
+    Args:
+        previous: lock_stock_quantities が返した更新前の在庫数
+        parts: 保存した部品
+
+    Returns:
+        list: 登録した StockMovement
+    """
+    movements = [
+        StockMovement(
+            part=part,
+            kind=StockMovement.Kind.ADJUSTMENT,
+            quantity=part.stock_quantity - previous[part.pk],
+            reason="部品の更新による在庫数の変更",
+            created_by=user,
+        )
+        for part in parts
+        if part.pk in previous and part.stock_quantity != previous[part.pk]
+    ]
+    return StockMovement.objects.bulk_create(movements)
+
+
+def take_stock_snapshot():
+    """
+    すべての部品の在庫数のスナップショットを作成する
+
+    入出庫のテーブルを SHARE モードでロックし、登録中の入出庫の確定を待ってから
+    在庫数と最後の入出庫のIDを読む。作成中に登録される入出庫はロックの解放まで待たされ、
+    last_movement_id より後の入出庫として扱われる。
+
+    Returns:
+        StockSnapshot: 作成したスナップショット
+    """
+    quote = connection.ops.quote_name
+    item_opts = StockSnapshotItem._meta
+    part_opts = Part._meta
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"LOCK TABLE {quote(StockMovement._meta.db_table)} IN SHARE MODE"
+        )
+        last_movement_id = StockMovement.objects.aggregate(last=Max("pk"))["last"] or 0
+        snapshot = StockSnapshot.objects.create(
+            taken_at=timezone.now(), last_movement_id=last_movement_id
+        )
+        columns = ", ".join(
+            quote(item_opts.get_field(name).column)
+            for name in ("snapshot", "part", "stock_quantity")
+        )
+        cursor.execute(
+            f"INSERT INTO {quote(item_opts.db_table)} ({columns}) "
+            f"SELECT %s, {quote(part_opts.pk.column)}, "
+            f"{quote(part_opts.get_field('stock_quantity').column)} "
+            f"FROM {quote(part_opts.db_table)}",
+            [snapshot.pk],
+        )
+        snapshot.part_count = cursor.rowcount
+        snapshot.save(update_fields=["part_count"])
+    return snapshot
+
+
+def sum_movements(movements):
+    """
+    部品ごとの入出庫の増減数の合計（履歴がない場合は0）のサブクエリ
+    """
+    total = movements.order_by().values("part").annotate(total=Sum("quantity"))
+    return Coalesce(
+        Subquery(total.values("total")), Value(0), output_field=IntegerField()
+    )
+
+
+def annotate_stock_as_of(queryset, as_of):
+    """
+    部品のクエリセットを as_of の時点で登録済みの部品に絞り、その時点の在庫数（stock_quantity_as_of）を付与する
+
+    as_of 以前の直前のスナップショットに含まれる部品は、スナップショットの在庫数に
+    その後 as_of までに登録された入出庫を足す。スナップショットの後に登録された部品
+    （スナップショットがない場合はすべての部品）は、現在の在庫数から as_of より後の入出庫を引く。
+    どちらも入出庫の集計は部品ごとのインデックス（part, -id）の範囲に限られる。
+    """
+    snapshot = (
+        StockSnapshot.objects.filter(taken_at__lte=as_of)
+        .order_by("-taken_at")
+        .values("pk", "last_movement_id")
+        .first()
+    )
+    movements = StockMovement.objects.filter(part=OuterRef("pk"))
+    stock = F("stock_quantity") - sum_movements(movements.filter(created_at__gt=as_of))
+    if snapshot is not None:
+        item = StockSnapshotItem.objects.filter(
+            snapshot=snapshot["pk"], part=OuterRef("pk")
+        ).values("stock_quantity")
+        replayed = movements.filter(
+            pk__gt=snapshot["last_movement_id"], created_at__lte=as_of
+        )
+        # スナップショットにない部品は Subquery が NULL になり、現在の在庫数から求める
+        stock = Coalesce(
+            Subquery(item) + sum_movements(replayed),
+            stock,
+            output_field=IntegerField(),
+        )
+    return queryset.filter(created_at__lte=as_of).annotate(stock_quantity_as_of=stock)
@@ -0,0 +1,357 @@
+"""
+棚卸表の作成
+
+部品をカテゴリ・仕入先ごとにまとめ、帳簿在庫数・原価・在庫金額（在庫数 × 原価）と
+記入用の実棚数の欄を出力します。仕入先・カテゴリごとの小計と総合計を含みます。
+基準日時（as_of）を指定した場合は、その時点で登録済みの部品とその時点の在庫数を出力します。
+
+部品は values_list().iterator() でサーバーサイドカーソルから少しずつ読み、
+XLSXは XlsxWriter の constant_memory モード（行を書いた順に一時ファイルへ書き出す）、
+PDFは masters.pdf で1ページずつファイルに出力するため、件数に関わらずメモリ使用量はほぼ一定です。
+進捗を他の接続から参照できるよう、カーソルはトランザクションの外で開きます。
+"""
+
+from decimal import Decimal
+
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+import xlsxwriter
+
+from masters.models import Part, StocktakingSheet
+from masters.pdf import StreamingPdf
+from masters.stock import annotate_stock_as_of
+
+# サーバーサイドカーソルから一度に取得する行数
+SHEET_CHUNK_SIZE = 2000
+
+# 進捗を保存する間隔（行数）
+PROGRESS_INTERVAL = 1000
+
+# 明細の列: (見出し, XLSXの列幅)
+COLUMNS = (
+    ("部品ID", 10),
+    ("部品名", 40),
+    ("帳簿在庫数", 12),
+    ("実棚数", 12),
+    ("原価", 14),
+    ("在庫金額", 16),
+)
+
+# カテゴリは選択肢の定義順に並べる
+CATEGORY_ORDER = Case(
+    *(
+        When(category=value, then=Value(index))
+        for index, value in enumerate(Part.Category.values)
+    ),
+    default=Value(len(Part.Category.values)),
+    output_field=IntegerField(),
+)
+CATEGORY_LABELS = dict(Part.Category.choices)
+
+
+def get_sheet_queryset(sheet):
+    """
+    棚卸表の対象の部品（カテゴリ・仕入先・IDの順）
+    棚卸（masters.stocktaking_sessions）と同じく、アーカイブした部品は含めない
+    """
+    queryset = Part.objects.active()
+    if sheet.category:
+        queryset = queryset.filter(category=sheet.category)
+    if sheet.supplier_id:
+        queryset = queryset.filter(supplier_id=sheet.supplier_id)
+    if sheet.as_of:
+        queryset = annotate_stock_as_of(queryset, sheet.as_of)
+    return queryset.annotate(category_order=CATEGORY_ORDER).order_by(
+        "category_order", "supplier__name", "supplier_id", "id"
+    )
+
+
+def describe_conditions(sheet):
+    conditions = [f"作成日時: {timezone.localtime():%Y-%m-%d %H:%M}"]
+    if sheet.category:
+        conditions.append(f"カテゴリ: {CATEGORY_LABELS[sheet.category]}")
+    if sheet.supplier_id:
+        name = sheet.supplier.name if sheet.supplier else sheet.supplier_id
+        conditions.append(f"仕入先: {name}")
+    if sheet.as_of:
+        conditions.append(f"基準日時: {timezone.localtime(sheet.as_of):%Y-%m-%d %H:%M}")
+    return "　".join(conditions)
+
+
+class Total:
+    """
+    在庫数・在庫金額の合計
+    """
+
+    def __init__(self):
+        self.quantity = 0
+        self.value = Decimal("0")
+
+    def add(self, quantity, value):
+        self.quantity += quantity
+        self.value += value
+
+
+def build_stocktaking_sheet(sheet, path, on_progress=None):
+    """
+    棚卸表を path に作成する
+
+    Args:
+        sheet: StocktakingSheet（形式・絞り込み条件）
+        path: 出力先のファイルパス
+        on_progress: 処理済みの行数を受け取る関数（PROGRESS_INTERVAL 行ごと）
+
+    Returns:
+        int: 出力した部品の件数
+    """
+    writer = WRITERS[sheet.format](path, "棚卸表", describe_conditions(sheet))
+    rows = (
+        get_sheet_queryset(sheet)
+        .values_list(
+            "category",
+            "supplier_id",
+            "supplier__name",
+            "id",
+            "name",
+            "stock_quantity_as_of" if sheet.as_of else "stock_quantity",
+            "cost_price",
+        )
+        .iterator(chunk_size=SHEET_CHUNK_SIZE)
+    )
+
+    grand_total = Total()
+    category_total = supplier_total = None
+    category = supplier_id = supplier_name = None
+    processed = 0
+    for row in rows:
+        if category_total is None or (row[0], row[1]) != (category, supplier_id):
+            if supplier_total is not None:
+                writer.write_total(f"{supplier_name} 計", supplier_total)
+            if row[0] != category:
+                if category_total is not None:
+                    writer.write_total(
+                        f"{CATEGORY_LABELS.get(category, category)} 計",
+                        category_total,
+                    )
+                category_total = Total()
+                writer.write_group(CATEGORY_LABELS.get(row[0], row[0]))
+            category, supplier_id, supplier_name = row[:3]
+            supplier_total = Total()
+            writer.write_group(supplier_name, level=1)
+
+        _, _, _, part_id, name, quantity, cost_price = row
+        value = quantity * cost_price
+        writer.write_row(part_id, name, quantity, cost_price, value)
+        supplier_total.add(quantity, value)
+        category_total.add(quantity, value)
+        grand_total.add(quantity, value)
+
+        processed += 1
+        if on_progress is not None and processed % PROGRESS_INTERVAL == 0:
+            on_progress(processed)
+
+    if supplier_total is not None:
+        writer.write_total(f"{supplier_name} 計", supplier_total)
+        writer.write_total(
+            f"{CATEGORY_LABELS.get(category, category)} 計", category_total
+        )
+    writer.write_total("総合計", grand_total)
+    writer.close()
+    return processed
+
+
+class XlsxSheetWriter:
+    """
+    XlsxWriter の constant_memory モードで棚卸表を書き出す
+
+    行は上から順に書き、1シートの行数の上限を超える場合は次のシートに続ける。
+    """
+
+    max_rows = 1048576
+    header_row = 3
+
+    def __init__(self, path, title, subtitle):
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.title = title
+        self.subtitle = subtitle
+        add_format = self.workbook.add_format
+        self.formats = {
+            "title": add_format({"bold": True, "font_size": 14}),
+            "header": add_format({"bold": True, "bottom": 1, "bg_color": "#DDDDDD"}),
+            "group": add_format({"bold": True}),
+            "subgroup": add_format({"bold": True, "indent": 1}),
+            "integer": add_format({"num_format": "#,##0"}),
+            "money": add_format({"num_format": "#,##0.00"}),
+            "blank": add_format({"bottom": 1}),
+            "total_label": add_format({"bold": True, "top": 1}),
+            "total_integer": add_format(
+                {"bold": True, "top": 1, "num_format": "#,##0"}
+            ),
+            "total_money": add_format(
+                {"bold": True, "top": 1, "num_format": "#,##0.00"}
+            ),
+        }
+        self.sheet_count = 0
+        self.add_worksheet()
+
+    def add_worksheet(self):
+        self.sheet_count += 1
+        name = (
+            self.title if self.sheet_count == 1 else f"{self.title}({self.sheet_count})"
+        )
+        worksheet = self.worksheet = self.workbook.add_worksheet(name)
+        for index, (_, width) in enumerate(COLUMNS):
+            worksheet.set_column(index, index, width)
+        worksheet.write(0, 0, self.title, self.formats["title"])
+        worksheet.write(1, 0, self.subtitle)
+        for index, (header, _) in enumerate(COLUMNS):
+            worksheet.write(self.header_row, index, header, self.formats["header"])
+        worksheet.freeze_panes(self.header_row + 1, 0)
+        worksheet.repeat_rows(self.header_row)
+        worksheet.set_paper(9)  # A4
+        worksheet.fit_to_pages(1, 0)
+        self.row = self.header_row + 1
+
+    def next_row(self):
+        if self.row >= self.max_rows:
+            self.add_worksheet()
+        row = self.row
+        self.row += 1
+        return row
+
+    def write_group(self, label, level=0):
+        self.worksheet.write(
+            self.next_row(), 0, label, self.formats["subgroup" if level else "group"]
+        )
+
+    def write_row(self, part_id, name, quantity, cost_price, value):
+        row = self.next_row()
+        write = self.worksheet.write_number
+        formats = self.formats
+        write(row, 0, part_id)
+        self.worksheet.write_string(row, 1, name)
+        write(row, 2, quantity, formats["integer"])
+        self.worksheet.write_blank(row, 3, None, formats["blank"])
+        write(row, 4, float(cost_price), formats["money"])
+        write(row, 5, float(value), formats["money"])
+
+    def write_total(self, label, total):
+        row = self.next_row()
+        formats = self.formats
+        self.worksheet.write_string(row, 1, label, formats["total_label"])
+        self.worksheet.write_number(row, 2, total.quantity, formats["total_integer"])
+        self.worksheet.write_number(row, 5, float(total.value), formats["total_money"])
+
+    def close(self):
+        self.workbook.close()
+
+
+class PdfSheetWriter:
+    """
+    棚卸表をPDFで書き出す（A4縦、日本語はPDF標準のCIDフォント）
+
+    ページは改ページのたびに圧縮してファイルに出力する（masters.pdf）。
+    """
+
+    font_name = "HeiseiKakuGo-W5"
+    font_size = 9
+    line_height = 14
+    margin = 15 * mm
+    # 各列の右端（部品名のみ左寄せで、部品IDの右から部品名の列幅まで）
+    column_rights = (25 * mm, 105 * mm, 130 * mm, 150 * mm, 170 * mm, 195 * mm)
+
+    def __init__(self, path, title, subtitle):
+        self.file = open(path, "wb")
+        self.pdf = StreamingPdf(self.file, A4, self.font_name, title=title)
+        self.title = title
+        self.subtitle = subtitle
+        self.width, self.height = A4
+        self.page = 0
+        self.new_page()
+
+    def new_page(self):
+        pdf = self.pdf
+        if self.page:
+            pdf.show_page()
+        self.page += 1
+        top = self.height - self.margin
+        pdf.set_font(14)
+        pdf.draw_string(self.margin, top, self.title)
+        pdf.set_font(self.font_size)
+        pdf.draw_right_string(self.width - self.margin, top, f"{self.page} ページ")
+        pdf.draw_string(self.margin, top - 16, self.subtitle)
+        y = top - 40
+        for index, (header, _) in enumerate(COLUMNS):
+            if index == 1:
+                pdf.draw_string(self.column_rights[0] + 3 * mm, y, header)
+            else:
+                pdf.draw_right_string(self.column_rights[index], y, header)
+        pdf.line(self.margin, y - 4, self.column_rights[-1], y - 4)
+        self.y = y - self.line_height
+
+    def next_line(self):
+        if self.y < self.margin:
+            self.new_page()
+        y = self.y
+        self.y -= self.line_height
+        return y
+
+    def fit(self, text, width):
+        """
+        列幅に収まらない文字列を末尾を省略して切り詰める
+        """
+        string_width = self.pdf.string_width
+        if string_width(text) <= width:
+            return text
+        while text and string_width(text + "…") > width:
+            text = text[:-1]
+        return text + "…"
+
+    def write_group(self, label, level=0):
+        y = self.next_line()
+        self.pdf.draw_string(
+            self.margin + level * 5 * mm, y, f"■ {label}" if not level else label
+        )
+
+    def write_row(self, part_id, name, quantity, cost_price, value):
+        y = self.next_line()
+        pdf = self.pdf
+        rights = self.column_rights
+        pdf.draw_right_string(rights[0], y, str(part_id))
+        name_left = rights[0] + 3 * mm
+        pdf.draw_string(name_left, y, self.fit(name, rights[1] - name_left))
+        pdf.draw_right_string(rights[2], y, f"{quantity:,}")
+        # 実棚数の記入欄
+        pdf.line(rights[2] + 3 * mm, y - 2, rights[3], y - 2)
+        pdf.draw_right_string(rights[4], y, f"{cost_price:,.2f}")
+        pdf.draw_right_string(rights[5], y, f"{value:,.2f}")
+
+    def write_total(self, label, total):
+        y = self.next_line()
+        pdf = self.pdf
+        rights = self.column_rights
+        pdf.line(
+            rights[0] + 3 * mm,
+            y + self.line_height - 4,
+            rights[-1],
+            y + self.line_height - 4,
+        )
+        pdf.draw_string(
+            rights[0] + 3 * mm, y, self.fit(label, rights[1] - rights[0] - 3 * mm)
+        )
+        pdf.draw_right_string(rights[2], y, f"{total.quantity:,}")
+        pdf.draw_right_string(rights[5], y, f"{total.value:,.2f}")
+
+    def close(self):
+        try:
+            self.pdf.close()
+        finally:
+            self.file.close()
+
+
+WRITERS = {
+    StocktakingSheet.Format.XLSX: XlsxSheetWriter,
+    StocktakingSheet.Format.PDF: PdfSheetWriter,
+}
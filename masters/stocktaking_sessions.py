@@ -0,0 +1,210 @@
+"""
+棚卸（実地棚卸）の実施
+
+開始時に対象の部品の在庫数・原価を INSERT ... SELECT の1文で StocktakingCount に固定し、
+実棚数は INSERT ... ON CONFLICT（bulk_create の update_conflicts）でまとめて登録します。
+同じ内容を何度送っても結果は変わらないため、通信の失敗時はそのまま再送できます。
+
+差異・差異金額の集計と確定時の在庫数の調整は、明細を Python に読み込まずにSQLで行います。
+確定では実棚数と帳簿在庫数の差を masters.stock.update_stock_quantities の1回のUPDATE文で在庫数に反映し、
+調整の入出庫を INSERT ... SELECT の1文で登録するため、5万件の部品でも文の数は変わりません。
+帳簿在庫数は開始時の値のため、実施中に登録された入出庫は差として在庫数に残ります。
+"""
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from masters.models import (
+    Part,
+    StockMovement,
+    StocktakingCount,
+    StocktakingSession,
+)
+from masters.stock import InsufficientStockError, update_stock_quantities
+
+
+def get_session_parts(session):
+    """
+    棚卸の対象の部品（アーカイブされていない部品を絞り込み条件で絞る）
+    """
+    queryset = Part.objects.active()
+    if session.category:
+        queryset = queryset.filter(category=session.category)
+    if session.supplier_id:
+        queryset = queryset.filter(supplier_id=session.supplier_id)
+    return queryset
+
+
+def insert_select(cursor, model, fields, queryset, constants=()):
+    """
+    INSERT INTO model (fields) SELECT constants, queryset の列 を実行し、登録した件数を返す
+
+    Args:
+        fields: 登録するフィールド名（constants の値、queryset の values_list の列の順）
+        queryset: values_list() のクエリセット
+        constants: すべての行に同じ値を登録するフィールドの値
+    """
+    quote = connection.ops.quote_name
+    opts = model._meta
+    columns = ", ".join(quote(opts.get_field(name).column) for name in fields)
+    sql, params = queryset.query.sql_with_params()
+    select = ", ".join([*["%s"] * len(constants), "rows.*"])
+    cursor.execute(
+        f"INSERT INTO {quote(opts.db_table)} ({columns}) "
+        f"SELECT {select} FROM ({sql}) AS rows",
+        [*constants, *params],
+    )
+    return cursor.rowcount
+
+
+def start_session(session):
+    """
+    対象の部品の現在の在庫数・原価を帳簿在庫数として固定し、対象件数を返す
+    """
+    parts = (
+        get_session_parts(session)
+        .order_by()
+        .values_list("pk", "stock_quantity", "cost_price")
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        count = insert_select(
+            cursor,
+            StocktakingCount,
+            ("session", "part", "expected_quantity", "cost_price"),
+            parts,
+            [session.pk],
+        )
+        session.item_count = count
+        session.save(update_fields=["item_count"])
+    return count
+
+
+def save_counts(session, counts, user=None):
+    """
+    実棚数をまとめて登録・更新する
+
+    対象外の部品（開始後に登録した部品など）は、最初に登録した時点の在庫数・原価を帳簿在庫数にして追加する。
+    既にある明細は実棚数・計数者・計数日時のみ更新し、帳簿在庫数は変えない。
+
+    Args:
+        counts: (部品, 実棚数) のリスト（部品は重複しないこと。実棚数 None は未計数に戻す）
+
+    Returns:
+        int: 登録・更新した件数
+    """
+    now = timezone.now()
+    objects = [
+        StocktakingCount(
+            session=session,
+            part=part,
+            expected_quantity=part.stock_quantity,
+            cost_price=part.cost_price,
+            counted_quantity=quantity,
+            counted_by=user,
+            counted_at=now,
+        )
+        for part, quantity in counts
+    ]
+    StocktakingCount.objects.bulk_create(
+        objects,
+        update_conflicts=True,
+        unique_fields=["session", "part"],
+        update_fields=["counted_quantity", "counted_by", "counted_at"],
+    )
+    return len(objects)
+
+
+def summarize_session(session):
+    """
+    件数・差異・差異金額を1回の集計クエリで求める
+    """
+    counted = Q(counted_quantity__isnull=False)
+    shortage = Q(variance__lt=0)
+    surplus = Q(variance__gt=0)
+    summary = (
+        session.counts.with_variance()
+        .order_by()
+        .aggregate(
+            item_count=Count("pk"),
+            counted_count=Count("pk", filter=counted),
+            variance_count=Count("pk", filter=shortage | surplus),
+            shortage_quantity=Sum("variance", filter=shortage, default=0),
+            surplus_quantity=Sum("variance", filter=surplus, default=0),
+            shortage_value=Sum("value_impact", filter=shortage, default=0),
+            surplus_value=Sum("value_impact", filter=surplus, default=0),
+            expected_value=Sum(
+                F("expected_quantity") * F("cost_price"), filter=counted, default=0
+            ),
+            counted_value=Sum(
+                F("counted_quantity") * F("cost_price"), filter=counted, default=0
+            ),
+        )
+    )
+    summary["uncounted_count"] = summary["item_count"] - summary["counted_count"]
+    summary["net_value"] = summary["surplus_value"] + summary["shortage_value"]
+    return summary
+
+
+def finalize_session(session, user=None):
+    """
+    実棚数と帳簿在庫数の差を調整の入出庫として登録し、棚卸を確定する
+
+    未計数の部品・差がない部品は調整しない。在庫数が負になる部品がある場合は何も登録しない。
+    呼び出し側で棚卸の行をロックし、実施中であることを確認しておくこと。
+
+    Returns:
+        int: 調整した部品の件数
+
+    Raises:
+        InsufficientStockError: 実施中の出庫などで在庫数が負になる部品がある場合
+    """
+    changes = (
+        session.counts.with_variance()
+        .filter(counted_quantity__isnull=False)
+        .exclude(counted_quantity=F("expected_quantity"))
+        .order_by()
+    )
+    sql, params = changes.values_list("part_id", "variance").query.sql_with_params()
+    now = timezone.now()
+    with transaction.atomic():
+        updated = update_stock_quantities(
+            f"SELECT * FROM ({sql}) AS counts (id, quantity)", params
+        )
+        total = changes.count()
+        if len(updated) != total:
+            shortages = [
+                {
+                    "id": row["part_id"],
+                    "name": row["part__name"],
+                    "stock_quantity": row["part__stock_quantity"],
+                    "quantity": row["variance"],
+                }
+                for row in changes.exclude(part_id__in=list(updated))
+                .order_by("part_id")
+                .values("part_id", "part__name", "part__stock_quantity", "variance")
+            ]
+            raise InsufficientStockError("在庫数が不足する部品があります", shortages)
+
+        with connection.cursor() as cursor:
+            insert_select(
+                cursor,
+                StockMovement,
+                ("kind", "reason", "created_by", "created_at", "part", "quantity"),
+                changes.values_list("part_id", "variance").order_by("part_id"),
+                [
+                    StockMovement.Kind.ADJUSTMENT,
+                    f"棚卸 #{session.pk} による調整",
+                    user.pk if user is not None else None,
+                    now,
+                ],
+            )
+
+        session.status = StocktakingSession.Status.FINALIZED
+        session.adjustment_count = total
+        session.finalized_by = user
+        session.finalized_at = now
+        session.save(
+            update_fields=["status", "adjustment_count", "finalized_by", "finalized_at"]
+        )
+    return total
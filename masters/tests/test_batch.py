@@ -0,0 +1,326 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Part, SearchDocument, Supplier
+from masters.search import search
+from masters.views.part import PartViewSet
+
+User = get_user_model()
+
+
+def create_supplier(name):
+    return Supplier.objects.create(
+        name=name,
+        phone="03-1234-5678",
+        email="supplier@example.com",
+        postal_code="100-0001",
+        prefecture="東京都",
+        city="千代田区",
+        town="丸の内1-1-1",
+    )
+
+
+class PartBatchAPITest(APITestCase):
+    """
+    部品の一括作成・更新APIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.other_user = User.objects.create_user(
+            email="other@example.com",
+            password="testpassword123",
+            first_name="花子",
+            last_name="佐藤",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.suppliers = [create_supplier(f"仕入先{i}") for i in range(3)]
+        self.url = reverse("part-batch")
+
+    def part_data(self, i, **kwargs):
+        return {
+            "name": f"一括部品{i}",
+            "category": "shaft",
+            "supplier_id": self.suppliers[i % len(self.suppliers)].id,
+            "cost_price": "1000.00",
+            "selling_price": "2000.00",
+            "stock_quantity": 10,
+            "reorder_level": 5,
+            **kwargs,
+        }
+
+    def create_parts(self, count):
+        return [
+            Part.objects.create(
+                name=f"既存部品{i}",
+                category="bearing",
+                supplier=self.suppliers[0],
+                cost_price="100.00",
+                selling_price="200.00",
+                created_by=self.other_user,
+                updated_by=self.other_user,
+            )
+            for i in range(count)
+        ]
+
+    def test_batch_create(self):
+        """
+        全項目を作成し、作成者・更新者と項目ごとの結果を返すことをテスト
+        """
+        items = [self.part_data(i) for i in range(5)]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["succeeded"], 5)
+        self.assertEqual(response.data["failed"], 0)
+        results = response.data["results"]
+        self.assertEqual([result["index"] for result in results], list(range(5)))
+        self.assertTrue(all(result["status"] == 201 for result in results))
+        self.assertEqual(results[2]["data"]["name"], "一括部品2")
+        self.assertEqual(results[2]["data"]["supplier"]["id"], self.suppliers[2].id)
+
+        parts = Part.objects.filter(name__startswith="一括部品")
+        self.assertEqual(parts.count(), 5)
+        for part in parts:
+            self.assertEqual(part.created_by, self.user)
+            self.assertEqual(part.updated_by, self.user)
+        self.assertEqual(
+            {result["data"]["id"] for result in results},
+            set(parts.values_list("id", flat=True)),
+        )
+
+    def test_batch_create_updates_search_documents(self):
+        """
+        一括作成した部品が検索できることをテスト（シグナルが送られないため）
+        """
+        self.client.post(
+            self.url,
+            [self.part_data(0, name="特殊ベアリング"), self.part_data(1)],
+            format="json",
+        )
+        part = Part.objects.get(name="特殊ベアリング")
+        self.assertTrue(
+            SearchDocument.objects.filter(
+                kind=SearchDocument.Kind.PART, object_id=part.id
+            ).exists()
+        )
+        self.assertEqual([result["id"] for result in search("ベアリング")], [part.id])
+
+    def test_batch_create_queries(self):
+        """
+        項目数によらずクエリ数が一定であることをテスト（仕入先は1回で取得する）
+        """
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(
+                self.url, [self.part_data(i) for i in range(2)], format="json"
+            )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(
+                self.url, [self.part_data(i) for i in range(50)], format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(small), len(large))
+        supplier_queries = [
+            query
+            for query in large.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "masters_supplier"' in query["sql"]
+        ]
+        self.assertEqual(len(supplier_queries), 1)
+
+    def test_batch_create_atomic_failure(self):
+        """
+        既定では1件でもエラーがあると何も保存しないことをテスト
+        """
+        items = [
+            self.part_data(0),
+            self.part_data(1, supplier_id=999999),
+            self.part_data(2, cost_price="-1"),
+        ]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.data["atomic"])
+        self.assertEqual(response.data["succeeded"], 0)
+        self.assertEqual(response.data["failed"], 2)
+        results = response.data["results"]
+        self.assertEqual(results[0]["status"], 424)
+        self.assertEqual(results[1]["status"], 400)
+        self.assertIn("supplier_id", results[1]["errors"])
+        self.assertIn("cost_price", results[2]["errors"])
+        self.assertFalse(Part.objects.filter(name__startswith="一括部品").exists())
+
+    def test_batch_create_partial_success(self):
+        """
+        atomic=false ではエラーのない項目のみ保存し、207を返すことをテスト
+        """
+        items = [
+            self.part_data(0),
+            self.part_data(1, category="unknown"),
+            self.part_data(2),
+        ]
+        response = self.client.post(f"{self.url}?atomic=false", items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertFalse(response.data["atomic"])
+        self.assertEqual(response.data["succeeded"], 2)
+        self.assertEqual(response.data["failed"], 1)
+        results = response.data["results"]
+        self.assertEqual(results[0]["data"]["name"], "一括部品0")
+        self.assertIn("category", results[1]["errors"])
+        self.assertEqual(results[2]["data"]["name"], "一括部品2")
+        self.assertEqual(
+            set(
+                Part.objects.filter(name__startswith="一括部品").values_list(
+                    "name", flat=True
+                )
+            ),
+            {"一括部品0", "一括部品2"},
+        )
+
+    def test_batch_create_partial_all_invalid(self):
+        """
+        atomic=false でもすべての項目がエラーの場合は400を返すことをテスト
+        """
+        response = self.client.post(
+            f"{self.url}?atomic=false",
+            [self.part_data(0, name=""), "部品"],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertIn("non_field_errors", response.data["results"][1]["errors"])
+
+    def test_batch_update_put(self):
+        """
+        PUT で全項目を更新し、更新者と更新日時を設定することをテスト
+        """
+        parts = self.create_parts(3)
+        items = [
+            {"id": part.id, **self.part_data(i, name=f"更新部品{i}")}
+            for i, part in enumerate(parts)
+        ]
+        response = self.client.put(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["succeeded"], 3)
+        for i, part in enumerate(parts):
+            result = response.data["results"][i]
+            self.assertEqual(result["status"], 200)
+            self.assertEqual(result["data"]["id"], part.id)
+            updated = Part.objects.get(pk=part.pk)
+            self.assertEqual(updated.name, f"更新部品{i}")
+            self.assertEqual(updated.supplier, self.suppliers[i])
+            self.assertEqual(updated.category, "shaft")
+            self.assertEqual(updated.created_by, self.other_user)
+            self.assertEqual(updated.updated_by, self.user)
+            self.assertGreater(updated.updated_at, part.updated_at)
+        self.assertEqual(
+            [result["id"] for result in search("更新部品1")][:1], [parts[1].id]
+        )
+
+    def test_batch_update_put_requires_all_fields(self):
+        """
+        PUT では必須項目がない項目をエラーにすることをテスト
+        """
+        parts = self.create_parts(1)
+        response = self.client.put(
+            self.url, [{"id": parts[0].id, "name": "名前のみ"}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("category", response.data["results"][0]["errors"])
+
+    def test_batch_update_patch(self):
+        """
+        PATCH では指定した項目のみ更新することをテスト
+        """
+        parts = self.create_parts(2)
+        items = [
+            {"id": parts[0].id, "stock_quantity": 100},
+            {"id": parts[1].id, "supplier_id": self.suppliers[2].id},
+        ]
+        response = self.client.patch(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = Part.objects.get(pk=parts[0].pk)
+        self.assertEqual(first.stock_quantity, 100)
+        self.assertEqual(first.name, "既存部品0")
+        self.assertEqual(first.updated_by, self.user)
+        second = Part.objects.get(pk=parts[1].pk)
+        self.assertEqual(second.supplier, self.suppliers[2])
+        self.assertEqual(second.stock_quantity, 0)
+
+    def test_batch_update_queries(self):
+        """
+        項目数によらずクエリ数が一定であることをテスト
+        """
+        parts = self.create_parts(30)
+        with CaptureQueriesContext(connection) as small:
+            self.client.patch(
+                self.url,
+                [{"id": part.id, "stock_quantity": 1} for part in parts[:2]],
+                format="json",
+            )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.patch(
+                self.url,
+                [{"id": part.id, "stock_quantity": 2} for part in parts],
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small), len(large))
+
+    def test_batch_update_invalid_ids(self):
+        """
+        id がない・重複・存在しない項目をエラーにすることをテスト
+        """
+        parts = self.create_parts(2)
+        items = [
+            {"id": parts[0].id, "stock_quantity": 1},
+            {"stock_quantity": 2},
+            {"id": parts[0].id, "stock_quantity": 3},
+            {"id": 999999, "stock_quantity": 4},
+            {"id": "abc", "stock_quantity": 5},
+            {"id": parts[1].id, "stock_quantity": 6},
+        ]
+        response = self.client.patch(f"{self.url}?atomic=false", items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results], [200, 400, 400, 400, 400, 200]
+        )
+        for result in results[1:5]:
+            self.assertIn("id", result["errors"])
+        self.assertEqual(Part.objects.get(pk=parts[0].pk).stock_quantity, 1)
+        self.assertEqual(Part.objects.get(pk=parts[1].pk).stock_quantity, 6)
+
+    def test_batch_invalid_payload(self):
+        """
+        リスト以外・空のリスト・件数の上限を超えるリストを400にすることをテスト
+        """
+        for data in ({"name": "部品"}, []):
+            response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("error", response.data)
+
+        items = [self.part_data(i) for i in range(PartViewSet.batch_max_items + 1)]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+        self.assertFalse(Part.objects.exists())
+
+    def test_batch_unauthenticated(self):
+        """
+        認証されていない場合は401を返すことをテスト
+        """
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, [self.part_data(0)], format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,203 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Supplier, Part
+
+User = get_user_model()
+
+
+class ConditionalGetAPITest(APITestCase):
+    """
+    部品・仕入先の一覧・詳細の条件付きGET（ETag / Last-Modified）のテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        self.part = Part.objects.create(
+            name="テスト部品",
+            category=Part.Category.HEAD.value,
+            supplier=self.supplier,
+            cost_price=Decimal("100.00"),
+            selling_price=Decimal("200.00"),
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        self.url = reverse("part-list")
+
+    def get_etag(self, url=None, params=None, **extra):
+        response = self.client.get(url or self.url, params, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header("Last-Modified"))
+        return response["ETag"]
+
+    def assertNotModified(self, etag, url=None, params=None, **extra):
+        response = self.client.get(
+            url or self.url, params, HTTP_IF_NONE_MATCH=etag, **extra
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_list_not_modified(self):
+        """
+        一覧で If-None-Match が一致する場合は集計のみで 304 を返すことをテスト
+        """
+        etag = self.get_etag()
+        self.assertTrue(etag.startswith('"'))
+        # 部品・仕入先・ユーザーの集計（1回のクエリ）のみ
+        with self.assertNumQueries(1):
+            self.assertNotModified(etag)
+
+    def test_detail_not_modified(self):
+        """
+        詳細で If-None-Match が一致する場合は 304 を返すことをテスト
+        """
+        url = reverse("part-detail", args=[self.part.id])
+        etag = self.get_etag(url)
+        self.assertNotEqual(etag, self.get_etag())
+        self.assertNotModified(etag, url)
+
+        self.part.name = "更新後"
+        self.part.save()
+        self.assertNotEqual(self.get_etag(url), etag)
+
+    def test_detail_not_found(self):
+        """
+        存在しない・不正なIDは検証子を付けずに 404 を返すことをテスト
+        """
+        for pk in (999999, "abc"):
+            response = self.client.get(f"{self.url}{pk}/")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertFalse(response.has_header("ETag"))
+
+    def test_if_modified_since(self):
+        """
+        If-Modified-Since が最終更新日時以降の場合は 304 を返すことをテスト
+        """
+        response = self.client.get(self.url)
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_on_update_create_and_delete(self):
+        """
+        部品の更新・追加・削除でETagが変わることをテスト
+        """
+        etags = [self.get_etag()]
+        self.part.stock_quantity = 10
+        self.part.save()
+        etags.append(self.get_etag())
+        other = Part.objects.create(
+            name="追加部品",
+            category=Part.Category.GRIP.value,
+            supplier=self.supplier,
+            cost_price=Decimal("1.00"),
+            selling_price=Decimal("2.00"),
+        )
+        etags.append(self.get_etag())
+        other.delete()
+        etags.append(self.get_etag())
+        self.assertEqual(len(set(etags[:3])), 3)
+        self.assertNotEqual(etags[3], etags[2])
+        # 内容が追加前と同じになった場合は同じETagになる
+        self.assertEqual(etags[3], etags[1])
+
+    def test_etag_changes_on_related_update(self):
+        """
+        仕入先・ユーザーの更新で部品一覧のETagが変わり、最終ログインでは変わらないことをテスト
+        """
+        etag = self.get_etag()
+        self.supplier.name = "サプライヤーB"
+        self.supplier.save()
+        self.assertNotEqual(self.get_etag(), etag)
+
+        etag = self.get_etag()
+        self.user.first_name = "次郎"
+        self.user.save()
+        self.assertNotEqual(self.get_etag(), etag)
+
+        etag = self.get_etag()
+        update_last_login(None, self.user)
+        self.assertNotModified(etag)
+
+    def test_etag_depends_on_representation(self):
+        """
+        クエリパラメータ・出力形式ごとにETagが異なることをテスト
+        """
+        etags = {
+            self.get_etag(),
+            self.get_etag(params={"fields": "id"}),
+            self.get_etag(params={"category": Part.Category.GRIP.value}),
+            self.get_etag(HTTP_ACCEPT="application/msgpack"),
+        }
+        self.assertEqual(len(etags), 4)
+
+    @override_settings(RESPONSE_COMPRESSION={"MIN_SIZE": 0})
+    def test_weak_etag_after_compression(self):
+        """
+        圧縮されたレスポンスの弱いETagでも 304 を返すことをテスト
+        """
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertNotModified(response["ETag"][2:], HTTP_ACCEPT_ENCODING="gzip")
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response["ETag"], HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(
+        RESPONSE_CACHE={"ENABLED": True, "ALIAS": "responses", "TIMEOUT": 300}
+    )
+    def test_cached_response_has_validators(self):
+        """
+        レスポンスキャッシュから返す場合も同じETagを付け、304 を返すことをテスト
+        """
+        caches["responses"].clear()
+        etag = self.get_etag()
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response["ETag"], etag)
+        # キャッシュにある場合は集計も行わない
+        with self.assertNumQueries(0):
+            self.assertNotModified(etag)
+
+    def test_supplier_not_modified(self):
+        """
+        仕入先の一覧・詳細でも 304 を返すことをテスト
+        """
+        for url in (
+            reverse("supplier-list"),
+            reverse("supplier-detail", args=[self.supplier.id]),
+        ):
+            etag = self.get_etag(url)
+            self.assertNotModified(etag, url)
@@ -0,0 +1,356 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from masters.cycle_counts import create_plan, get_workdays, schedule_parts
+from masters.models import CycleCountPlan, CycleCountTask, Part, Supplier
+from zaiko_be.pagination import DEFAULT_COUNT_SETTINGS
+
+User = get_user_model()
+
+# すべての部品を C クラス（5営業日ごと）にする設定
+ALL_C_CLASS = {"A_SHARE": 0, "B_SHARE": 0, "INTERVALS": {"A": 1, "B": 2, "C": 5}}
+
+
+@override_settings(
+    CYCLE_COUNT={
+        "A_SHARE": 0.8,
+        "B_SHARE": 0.95,
+        "INTERVALS": {"A": 1, "B": 2, "C": 5},
+    }
+)
+class CycleCountPlanAPITest(APITestCase):
+    """
+    循環棚卸の計画（作成・今日の計数予定・部品の追加と削除による予定の変更）のテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="テストサプライヤー",
+            phone="03-1234-5678",
+            email="supplier@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        self.start_date = timezone.localdate()
+        # 4週間（営業日は20日）
+        self.end_date = self.start_date + datetime.timedelta(27)
+        self.workdays = get_workdays(self.start_date, self.end_date)
+        self.list_url = reverse("cycle-count-plan-list")
+        self.today_url = reverse("cycle-count-plan-today")
+
+    def create_part(self, name, stock_quantity, cost_price="100.00", **kwargs):
+        return Part.objects.create(
+            name=name,
+            category="shaft",
+            supplier=self.supplier,
+            cost_price=Decimal(cost_price),
+            selling_price=Decimal("200.00"),
+            stock_quantity=stock_quantity,
+            **kwargs,
+        )
+
+    def create_plan(self):
+        response = self.client.post(
+            self.list_url,
+            {"start_date": self.start_date, "end_date": self.end_date},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return CycleCountPlan.objects.get(pk=response.data["id"])
+
+    def daily_loads(self, plan):
+        return dict(
+            plan.tasks.order_by()
+            .values_list("scheduled_on")
+            .annotate(count=Count("pk"))
+        )
+
+    def assert_counts(self, plan):
+        """
+        計画の件数・日ごとの件数が保存されている予定と一致することを確認する
+        """
+        plan.refresh_from_db()
+        self.assertEqual(plan.task_count, plan.tasks.count())
+        self.assertEqual(
+            {day: count for day, count in plan.daily_counts.items() if count},
+            {day.isoformat(): count for day, count in self.daily_loads(plan).items()},
+        )
+
+    def test_create_plan_by_value_class(self):
+        """
+        在庫金額の累積構成比でクラスを分け、クラスごとの間隔で予定を作成することをテスト
+        """
+        # 在庫金額 800 / 150 / 40 / 10（合計 1000）
+        a = self.create_part("高額部品", stock_quantity=8)
+        b = self.create_part("中額部品", stock_quantity=3, cost_price="50.00")
+        c1 = self.create_part("低額部品1", stock_quantity=4, cost_price="10.00")
+        c2 = self.create_part("低額部品2", stock_quantity=1, cost_price="10.00")
+        self.create_part(
+            "アーカイブした部品", stock_quantity=100, archived_at=timezone.now()
+        )
+
+        plan = self.create_plan()
+
+        self.assert_counts(plan)
+        self.assertEqual(plan.created_by, self.user)
+        self.assertEqual(plan.part_count, 4)
+        self.assertEqual(plan.a_min_value, Decimal("800.00"))
+        self.assertEqual(plan.b_min_value, Decimal("150.00"))
+        counts = dict(
+            plan.tasks.order_by().values_list("part").annotate(count=Count("pk"))
+        )
+        self.assertEqual(
+            counts,
+            {a.id: 20, b.id: 10, c1.id: 4, c2.id: 4},
+        )
+        self.assertEqual(plan.task_count, 38)
+        self.assertEqual(
+            set(plan.tasks.filter(part=a).values_list("scheduled_on", flat=True)),
+            set(self.workdays),
+        )
+        self.assertEqual(
+            set(plan.tasks.filter(part=b).values_list("value_class", flat=True)),
+            {CycleCountTask.ValueClass.B},
+        )
+
+    def test_daily_loads_are_even(self):
+        """
+        同じクラスの部品が営業日ごとに均等に割り当てられることをテスト
+        """
+        for i in range(10):
+            self.create_part(f"テスト部品{i}", stock_quantity=1)
+
+        with self.settings(CYCLE_COUNT=ALL_C_CLASS):
+            plan = create_plan(self.start_date, self.end_date)
+
+        loads = self.daily_loads(plan)
+        self.assertEqual(sorted(loads), self.workdays)
+        self.assertEqual(set(loads.values()), {2})
+
+    def test_create_plan_invalid_period(self):
+        """
+        期間が正しくない場合は400を返すことをテスト
+        """
+        for end_date in [
+            self.start_date - datetime.timedelta(1),
+            self.start_date + datetime.timedelta(366),
+        ]:
+            response = self.client.post(
+                self.list_url,
+                {"start_date": self.start_date, "end_date": end_date},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("end_date", response.data)
+        self.assertFalse(CycleCountPlan.objects.exists())
+
+    def test_today(self):
+        """
+        指定した日の計数予定をクラス・部品の順に返すことをテスト
+        """
+        a = self.create_part("高額部品", stock_quantity=8)
+        b = self.create_part("中額部品", stock_quantity=3, cost_price="50.00")
+        self.create_part("低額部品", stock_quantity=5, cost_price="10.00")
+        plan = self.create_plan()
+        day = plan.tasks.filter(part=b).earliest("scheduled_on").scheduled_on
+
+        # 計画・件数・予定（部品を含む）の3クエリ
+        with self.assertNumQueries(3):
+            response = self.client.get(self.today_url, {"date": day})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([task["part"]["id"] for task in results[:2]], [a.id, b.id])
+        self.assertEqual([task["value_class"] for task in results[:2]], ["A", "B"])
+        self.assertTrue(all(task["scheduled_on"] == str(day) for task in results))
+
+    def test_today_cursor_pagination(self):
+        """
+        カーソル方式でも計数予定をクラス・部品の順に辿れることをテスト
+        """
+        for i in range(30):
+            self.create_part(f"テスト部品{i}", stock_quantity=1)
+        plan = self.create_plan()
+        # 計画の作成後に追加した A クラスの部品（予定のIDは B・C クラスの予定より後）
+        self.create_part("追加部品", stock_quantity=100)
+        day = self.workdays[0]
+        expected = list(
+            plan.tasks.filter(scheduled_on=day)
+            .order_by("value_class", "part_id")
+            .values_list("part_id", flat=True)
+        )
+        self.assertGreater(len(expected), 20)
+
+        response = self.client.get(
+            self.today_url, {"date": day, "pagination": "cursor"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        part_ids = [task["part"]["id"] for task in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        part_ids += [task["part"]["id"] for task in response.data["results"]]
+
+        self.assertEqual(part_ids, expected)
+        self.assertIsNone(response.data["next"])
+
+    def test_today_without_plan(self):
+        """
+        計画がない日は空の一覧を返すことをテスト
+        """
+        self.create_part("テスト部品", stock_quantity=1)
+        self.create_plan()
+
+        response = self.client.get(
+            self.today_url, {"date": self.end_date + datetime.timedelta(1)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 0)
+
+    def test_today_without_plan_with_default_count_strategy(self):
+        """
+        本番の既定の件数の算出方法（auto）でも、計画がない日は空の一覧を返すことをテスト
+        """
+        self.create_part("テスト部品", stock_quantity=1)
+        self.create_plan()
+        date = self.end_date + datetime.timedelta(1)
+
+        with override_settings(PAGINATION_COUNT=DEFAULT_COUNT_SETTINGS):
+            for params in ({"date": date}, {"date": date, "pagination": "cursor"}):
+                response = self.client.get(self.today_url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data["count"], 0)
+                self.assertEqual(response.data["results"], [])
+
+    def test_new_part_is_scheduled_on_least_loaded_days(self):
+        """
+        計画の作成後に登録した部品は、予定の最も少ない日から始まる位相に割り当てられることをテスト
+        """
+        for i in range(9):
+            self.create_part(f"テスト部品{i}", stock_quantity=1)
+        with self.settings(CYCLE_COUNT=ALL_C_CLASS):
+            plan = create_plan(self.start_date, self.end_date)
+            response = self.client.post(
+                reverse("part-list"),
+                {
+                    "name": "追加部品",
+                    "category": "shaft",
+                    "supplier_id": self.supplier.id,
+                    "cost_price": "100.00",
+                    "selling_price": "200.00",
+                    "stock_quantity": 1,
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        tasks = plan.tasks.filter(part_id=response.data["id"])
+        self.assertEqual(tasks.count(), 4)
+        self.assertEqual(set(tasks.values_list("value_class", flat=True)), {"C"})
+        self.assertEqual(set(self.daily_loads(plan).values()), {2})
+        self.assert_counts(plan)
+
+    def test_schedule_part_does_not_aggregate_tasks(self):
+        """
+        部品の登録時の割り当てで、計画の予定を集計しないことをテスト
+        （日ごとの件数は計画の daily_counts から読む）
+        """
+        for i in range(9):
+            self.create_part(f"テスト部品{i}", stock_quantity=1)
+        plan = self.create_plan()
+
+        with CaptureQueriesContext(connection) as queries:
+            part = self.create_part("追加部品", stock_quantity=1)
+
+        self.assertTrue(plan.tasks.filter(part=part).exists())
+        self.assertFalse(
+            [query["sql"] for query in queries if "GROUP BY" in query["sql"]]
+        )
+        self.assert_counts(plan)
+
+    def test_scheduled_part_is_not_duplicated(self):
+        """
+        計画に予定がある部品は再度割り当てないことをテスト
+        """
+        self.create_part("テスト部品", stock_quantity=1)
+        plan = self.create_plan()
+
+        self.assertEqual(schedule_parts(Part.objects.all()), 0)
+        self.assertEqual(plan.tasks.count(), 20)
+
+    def test_archive_and_unarchive(self):
+        """
+        アーカイブした部品の予定は削除され、アーカイブの解除で再度割り当てられることをテスト
+        """
+        part = self.create_part("テスト部品", stock_quantity=1)
+        other = self.create_part("他の部品", stock_quantity=1)
+        plan = self.create_plan()
+        url = reverse("part-bulk-archive")
+
+        response = self.client.post(url, {"ids": [part.id]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(plan.tasks.filter(part=part).exists())
+        self.assertTrue(plan.tasks.filter(part=other).exists())
+        self.assert_counts(plan)
+
+        response = self.client.post(
+            url, {"ids": [part.id], "archived": False}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(plan.tasks.filter(part=part).exists())
+        self.assert_counts(plan)
+
+    def test_bulk_delete_scheduled_part(self):
+        """
+        予定がある部品も一括削除・削除でき、予定が削除されて計画の件数が更新されることをテスト
+        """
+        part = self.create_part("テスト部品", stock_quantity=1)
+        other = self.create_part("他の部品", stock_quantity=1)
+        plan = self.create_plan()
+
+        response = self.client.post(
+            reverse("part-bulk-delete"), {"ids": [part.id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(plan.tasks.filter(part_id=part.id).exists())
+        self.assert_counts(plan)
+
+        response = self.client.delete(reverse("part-detail", args=[other.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(plan.tasks.exists())
+        self.assert_counts(plan)
+
+    def test_unauthenticated(self):
+        """
+        未認証の場合は401を返すことをテスト
+        """
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.today_url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
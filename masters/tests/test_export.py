@@ -0,0 +1,160 @@
+import csv
+from decimal import Decimal
+import io
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters import export
+from masters.models import Supplier, Part
+
+User = get_user_model()
+
+
+class CSVExportAPITest(APITestCase):
+    """
+    部品・仕入先のCSVエクスポートのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="株式会社テスト",
+            phone="03-1234-5678",
+            email="supplier@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            remarks='=HYPERLINK("http://example.com")',
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        self.part = Part.objects.create(
+            name="ドライバーヘッド①",
+            category=Part.Category.HEAD.value,
+            supplier=self.supplier,
+            cost_price=Decimal("1234.50"),
+            selling_price=Decimal("2000.00"),
+            stock_quantity=5,
+            description='1行目\n2行目, "引用"',
+            created_by=self.user,
+        )
+        self.url = reverse("part-export")
+
+    def read_csv(self, response, codec="utf-8-sig"):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join(response.streaming_content)
+        return list(csv.reader(io.StringIO(content.decode(codec), newline="")))
+
+    def test_export_parts(self):
+        """
+        部品をBOM付きUTF-8のCSVで出力することをテスト
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertRegex(
+            response["Content-Disposition"],
+            r'^attachment; filename="parts_\d{8}\.csv"$',
+        )
+        content = b"".join(response.streaming_content)
+        self.assertTrue(content.startswith(b"\xef\xbb\xbf"))
+        self.assertIn(b"\r\n", content)
+
+        rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig"), newline="")))
+        header = dict(zip(rows[0], rows[1]))
+        self.assertEqual(rows[0][:4], ["ID", "部品名", "カテゴリ", "仕入先"])
+        self.assertEqual(header["ID"], str(self.part.id))
+        self.assertEqual(header["部品名"], "ドライバーヘッド①")
+        self.assertEqual(header["カテゴリ"], "ヘッド")
+        self.assertEqual(header["仕入先"], "株式会社テスト")
+        self.assertEqual(header["原価"], "1234.50")
+        self.assertEqual(header["備考"], '1行目\n2行目, "引用"')
+        self.assertEqual(header["作成者"], "testuser@example.com")
+        # 更新者がいない場合は空
+        self.assertEqual(header["更新者"], "")
+        self.assertRegex(header["作成日時"], r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+
+    def test_export_shift_jis(self):
+        """
+        Shift_JIS（Windows-31J）で出力することをテスト
+        """
+        self.part.name = "部品①😀"
+        self.part.save()
+        response = self.client.get(self.url, {"encoding": "shift_jis"})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=Shift_JIS")
+        rows = self.read_csv(response, codec="cp932")
+        self.assertEqual(rows[0][1], "部品名")
+        # Shift_JISで表せない文字は "?" になる
+        self.assertEqual(rows[1][1], "部品①?")
+
+    def test_invalid_encoding(self):
+        """
+        不正な文字コードの指定は400を返すことをテスト
+        """
+        response = self.client.get(self.url, {"encoding": "euc-jp"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            self.url, {"encoding": "euc-jp"}, HTTP_ACCEPT="text/csv"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+
+    def test_filters_and_many_rows(self):
+        """
+        一覧と同じ絞り込みが適用され、出力の単位をまたいで全件を出力することをテスト
+        """
+        Part.objects.bulk_create(
+            Part(
+                name=f"グリップ{i}",
+                category=Part.Category.GRIP.value,
+                supplier=self.supplier,
+                cost_price=Decimal("1.00"),
+                selling_price=Decimal("2.00"),
+            )
+            for i in range(export.EXPORT_BATCH_SIZE + 5)
+        )
+        rows = self.read_csv(
+            self.client.get(self.url, {"category": Part.Category.GRIP.value})
+        )
+        self.assertEqual(len(rows), export.EXPORT_BATCH_SIZE + 6)
+        self.assertEqual({row[2] for row in rows[1:]}, {"グリップ"})
+        ids = [int(row[0]) for row in rows[1:]]
+        self.assertEqual(ids, sorted(ids))
+
+        rows = self.read_csv(
+            self.client.get(self.url, {"category": Part.Category.SHAFT.value})
+        )
+        self.assertEqual(len(rows), 1)
+
+    def test_export_suppliers(self):
+        """
+        仕入先を出力し、数式として解釈される値は先頭に "'" を付けることをテスト
+        """
+        response = self.client.get(reverse("supplier-export"))
+        self.assertIn("suppliers_", response["Content-Disposition"])
+        rows = self.read_csv(response)
+        row = dict(zip(rows[0], rows[1]))
+        self.assertEqual(row["仕入先名"], "株式会社テスト")
+        self.assertEqual(row["取引先コード"], "")
+        self.assertEqual(row["備考"], '\'=HYPERLINK("http://example.com")')
+
+    def test_requires_authentication(self):
+        """
+        未認証の場合は401を返すことをテスト
+        """
+        response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
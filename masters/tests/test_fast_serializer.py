@@ -0,0 +1,180 @@
+from decimal import Decimal
+import os
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+
+from masters.models import Supplier, Part
+from masters.serializers import PartSerializer, SupplierSerializer
+from masters.serializers.fast import compile_fast_serializer
+from masters.views import PartViewSet, SupplierViewSet
+
+User = get_user_model()
+
+TEST_IMAGE = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01\x00\x00\x05\x00\x01\r\n-\xb4\x00\x00\x00\x00IEND\xaeB`\x82"
+
+
+class FastSerializerParityTest(APITestCase):
+    """
+    高速シリアライザーの出力が通常のシリアライザーとバイト単位で一致することをテストするクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備（NULL・空文字・画像・端数のある値を含むデータ）
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com",
+            password="testpassword123",
+            first_name="花子",
+            last_name="佐藤",
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.suppliers = [
+            Supplier.objects.create(
+                supplier_code="CODE001" if i == 0 else None,
+                name=f"テスト株式会社{i}",
+                contact_person="担当者" if i == 0 else "",
+                phone="03-1234-5678",
+                email=f"test{i}@example.com",
+                postal_code="100-0001",
+                prefecture="東京都",
+                city="千代田区",
+                town="丸の内1-1-1",
+                website="https://example.com" if i == 0 else "",
+                remarks="備考\n改行あり" if i == 0 else "",
+                created_by=self.user if i == 0 else None,
+                updated_by=self.other if i == 0 else None,
+            )
+            for i in range(3)
+        ]
+        self.parts = []
+        for i in range(5):
+            part = Part.objects.create(
+                name=f'部品"{i}"',
+                category=["head", "shaft", "grip", "other", "head"][i],
+                supplier=self.suppliers[i % 3],
+                cost_price=Decimal("1234.5") if i == 0 else Decimal(i),
+                selling_price=Decimal("9999999999.99"),
+                tax_rate=Decimal("8"),
+                stock_quantity=i,
+                reorder_level=i * 2,
+                description="説明" if i % 2 else "",
+                image=(
+                    SimpleUploadedFile("部品画像.png", TEST_IMAGE, "image/png")
+                    if i == 1
+                    else None
+                ),
+                created_by=self.user if i != 2 else None,
+                updated_by=self.other if i != 3 else None,
+            )
+            self.parts.append(part)
+
+    def tearDown(self):
+        for part in self.parts:
+            if part.image and os.path.exists(part.image.path):
+                os.remove(part.image.path)
+
+    def get_both(self, viewset, url, params=None):
+        """
+        高速シリアライザーの有無それぞれでレスポンスのボディを取得
+        """
+        fast = self.client.get(url, params)
+        with patch.object(viewset, "fast_read", False):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, slow.status_code)
+        return fast.content, slow.content
+
+    def assert_parity(self, viewset, url, params=None):
+        fast, slow = self.get_both(viewset, url, params)
+        self.assertEqual(fast, slow)
+
+    def test_part_list_parity(self):
+        """
+        部品一覧の出力が一致することをテスト
+        """
+        self.assert_parity(PartViewSet, reverse("part-list"))
+
+    def test_part_list_parity_with_params(self):
+        """
+        絞り込み・並び替え・項目指定・キーセット方式でも一致することをテスト
+        """
+        url = reverse("part-list")
+        for params in [
+            {"fields": "id,supplier,image,cost_price"},
+            {"omit": "created_by"},
+            {"category": "head", "ordering": "-cost_price"},
+            {"pagination": "cursor", "ordering": "-updated_at"},
+        ]:
+            self.assert_parity(PartViewSet, url, params)
+
+    def test_part_detail_parity(self):
+        """
+        部品詳細の出力が一致することをテスト
+        """
+        for part in self.parts:
+            self.assert_parity(PartViewSet, reverse("part-detail", args=[part.id]))
+
+    def test_part_detail_not_found(self):
+        """
+        存在しない部品の詳細取得で404が返ることをテスト
+        """
+        fast, slow = self.get_both(PartViewSet, reverse("part-detail", args=[999999]))
+        self.assertEqual(fast, slow)
+
+    def test_supplier_list_and_detail_parity(self):
+        """
+        サプライヤー一覧・詳細の出力が一致することをテスト
+        """
+        self.assert_parity(SupplierViewSet, reverse("supplier-list"))
+        for supplier in self.suppliers:
+            self.assert_parity(
+                SupplierViewSet, reverse("supplier-detail", args=[supplier.id])
+            )
+
+    def test_serializer_level_parity(self):
+        """
+        シリアライザー単体でも出力が一致することをテスト
+        """
+        request = APIRequestFactory().get("/")
+        request.query_params = request.GET
+        context = {"request": request}
+        for serializer_class, queryset in [
+            (PartSerializer, Part.objects.all()),
+            (SupplierSerializer, Supplier.objects.all()),
+        ]:
+            fast = compile_fast_serializer(serializer_class(context=context))
+            self.assertIsNotNone(fast)
+            self.assertEqual(
+                JSONRenderer().render(fast.to_representation(fast.values(queryset))),
+                JSONRenderer().render(
+                    serializer_class(queryset, many=True, context=context).data
+                ),
+            )
+
+    def test_unsupported_field_falls_back(self):
+        """
+        未対応の項目を含むシリアライザーでは高速シリアライザーを使用しないことをテスト
+        """
+        from rest_framework import serializers
+
+        class CustomPartSerializer(PartSerializer):
+            label = serializers.SerializerMethodField()
+
+            def get_label(self, obj):
+                return obj.name
+
+        self.assertIsNone(compile_fast_serializer(CustomPartSerializer()))
@@ -0,0 +1,369 @@
+from decimal import Decimal
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters import imports
+from masters.imports import PartImporter, compile_fast_converter
+from masters.models import Part, SearchDocument, Supplier
+from masters.search import search
+from zaiko_be.response_cache import get_model_versions
+
+User = get_user_model()
+
+
+def create_supplier(name, code=None):
+    return Supplier.objects.create(
+        supplier_code=code,
+        name=name,
+        phone="03-1234-5678",
+        email="supplier@example.com",
+        postal_code="100-0001",
+        prefecture="東京都",
+        city="千代田区",
+        town="丸の内1-1-1",
+    )
+
+
+def make_csv(*lines, encoding="utf-8"):
+    return ("\r\n".join(lines) + "\r\n").encode(encoding)
+
+
+class PartImportAPITest(APITestCase):
+    """
+    部品のCSV一括登録APIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = create_supplier("株式会社テスト", code="S001")
+        self.other = create_supplier("有限会社サンプル", code="S002")
+        self.url = reverse("part-import")
+
+    def upload(self, content, **params):
+        url = self.url
+        if params:
+            url += "?" + "&".join(f"{key}={value}" for key, value in params.items())
+        return self.client.post(
+            url,
+            {"file": SimpleUploadedFile("parts.csv", content, "text/csv")},
+            format="multipart",
+        )
+
+    def test_import(self):
+        """
+        仕入先をID・取引先コードで指定して一括登録できることをテスト
+        """
+        content = make_csv(
+            "name,category,supplier_id,supplier_code,cost_price,selling_price,"
+            "tax_rate,stock_quantity,reorder_level,description",
+            f"ドライバーヘッド,head,{self.supplier.id},,1234.5,2000,8,5,2,新型",
+            'アイアンシャフト,shaft,,S002,100,150,,,,"1行目\n2行目"',
+        )
+        response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "dry_run": False,
+                "total_rows": 2,
+                "valid_rows": 2,
+                "imported": 2,
+                "error_count": 0,
+                "errors": [],
+            },
+        )
+
+        head, shaft = Part.objects.order_by("id")
+        self.assertEqual(head.name, "ドライバーヘッド")
+        self.assertEqual(head.supplier, self.supplier)
+        self.assertEqual(head.cost_price, Decimal("1234.50"))
+        self.assertEqual(head.tax_rate, Decimal("8.00"))
+        self.assertEqual((head.stock_quantity, head.reorder_level), (5, 2))
+        self.assertEqual(head.created_by, self.user)
+        self.assertEqual(head.updated_by, self.user)
+        self.assertIsNotNone(head.created_at)
+        # 空欄はデフォルト値
+        self.assertEqual(shaft.supplier, self.other)
+        self.assertEqual(shaft.tax_rate, Decimal("10.00"))
+        self.assertEqual((shaft.stock_quantity, shaft.reorder_level), (0, 0))
+        self.assertEqual(shaft.description, "1行目\n2行目")
+
+        # 検索ドキュメントも作成される
+        self.assertEqual(
+            SearchDocument.objects.filter(kind=SearchDocument.Kind.PART).count(), 2
+        )
+        results = search("ﾍｯﾄﾞ")
+        self.assertEqual([result["id"] for result in results], [head.id])
+
+        # 登録後もIDの採番が続く
+        part = Part.objects.create(
+            name="グリップ",
+            category=Part.Category.GRIP,
+            supplier=self.supplier,
+            cost_price=Decimal("1"),
+            selling_price=Decimal("1"),
+        )
+        self.assertGreater(part.id, shaft.id)
+
+    def test_japanese_headers_and_shift_jis(self):
+        """
+        見出し・カテゴリに表示名を使用でき、Shift_JISのファイルを読み込めることをテスト
+        """
+        content = make_csv(
+            "部品名,カテゴリ,取引先コード,原価,見積用単価,現在庫数,その他の列",
+            "グリップ①,グリップ,S001,10,20,3,無視される",
+            encoding="cp932",
+        )
+        response = self.upload(content, encoding="shift_jis")
+        self.assertEqual(response.data["imported"], 1)
+        part = Part.objects.get()
+        self.assertEqual(part.name, "グリップ①")
+        self.assertEqual(part.category, Part.Category.GRIP)
+        self.assertEqual(part.stock_quantity, 3)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=10)
+    def test_upload_on_disk(self):
+        """
+        一時ファイルに保存された大きなアップロードも読み込めることをテスト
+        """
+        content = make_csv(
+            "name,category,supplier_id,cost_price,selling_price",
+            *(f"部品{i},head,{self.supplier.id},1,1" for i in range(100)),
+        )
+        response = self.upload(content)
+        self.assertEqual(response.data["imported"], 100)
+
+    def test_row_errors(self):
+        """
+        エラーのある行は登録せず、行番号・項目・メッセージを返すことをテスト
+        """
+        content = make_csv(
+            "name,category,supplier_id,supplier_code,cost_price,selling_price",
+            f"正しい部品,head,{self.supplier.id},,1,1",
+            f",unknown,{self.supplier.id},,-1,abc",
+            "仕入先なし,head,999999,,1,1",
+            "コード違い,head,,S999,1,1",
+            "",
+            "未指定,head,,,1.234,1",
+        )
+        response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_rows"], 5)
+        self.assertEqual(response.data["valid_rows"], 1)
+        self.assertEqual(response.data["imported"], 1)
+        self.assertEqual(response.data["error_count"], 8)
+        errors = {(error["row"], error["field"]) for error in response.data["errors"]}
+        self.assertEqual(
+            errors,
+            {
+                (3, "name"),
+                (3, "category"),
+                (3, "cost_price"),
+                (3, "selling_price"),
+                (4, "supplier_id"),
+                (5, "supplier_code"),
+                (7, "supplier_id"),
+                (7, "cost_price"),
+            },
+        )
+        messages = {
+            (error["row"], error["field"]): error["message"]
+            for error in response.data["errors"]
+        }
+        self.assertIn("必須", messages[(3, "name")])
+        self.assertIn("有効な選択肢ではありません", messages[(3, "category")])
+        self.assertIn("999999", messages[(4, "supplier_id")])
+        self.assertIn("S999", messages[(5, "supplier_code")])
+        self.assertEqual(
+            list(Part.objects.values_list("name", flat=True)), ["正しい部品"]
+        )
+
+    def test_dry_run(self):
+        """
+        dry_run では検証結果のみ返し、登録しないことをテスト
+        """
+        content = make_csv(
+            "name,category,supplier_id,cost_price,selling_price",
+            f"部品,head,{self.supplier.id},1,1",
+            f"部品,head,{self.supplier.id},x,1",
+        )
+        response = self.upload(content, dry_run="true")
+        self.assertEqual(response.data["dry_run"], True)
+        self.assertEqual(response.data["valid_rows"], 1)
+        self.assertEqual(response.data["imported"], 0)
+        self.assertEqual(response.data["error_count"], 1)
+        self.assertFalse(Part.objects.exists())
+
+    def test_invalid_files(self):
+        """
+        ファイル全体を読み込めない場合は400を返すことをテスト
+        """
+        response = self.client.post(self.url, {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # 必須の列がない
+        response = self.upload(make_csv("name,category", "部品,head"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cost_price", response.data["error"])
+        self.assertIn("supplier_id", response.data["error"])
+
+        # 空のファイル
+        response = self.upload(b"")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # 文字コードの誤り（途中の行で失敗した場合も登録しない）
+        content = make_csv(
+            "name,category,supplier_id,cost_price,selling_price",
+            f"部品,head,{self.supplier.id},1,1",
+            encoding="cp932",
+        )
+        response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Part.objects.exists())
+
+        response = self.upload(content, encoding="euc-jp")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_authentication_required(self):
+        """
+        未認証の場合は401を返すことをテスト
+        """
+        self.client.force_authenticate(user=None)
+        response = self.upload(make_csv("name"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bumps_response_cache_version(self):
+        """
+        登録するとレスポンスキャッシュのバージョン番号が進むことをテスト
+        """
+        before = get_model_versions([Part])
+        self.upload(
+            make_csv(
+                "name,category,supplier_id,cost_price,selling_price",
+                f"部品,head,{self.supplier.id},1,1",
+            )
+        )
+        self.assertNotEqual(get_model_versions([Part]), before)
+
+
+class PartImporterTest(TestCase):
+    """
+    部品の一括登録（masters.imports.PartImporter）のテストクラス
+    """
+
+    def setUp(self):
+        self.suppliers = [create_supplier(f"仕入先{i}", code=f"C{i}") for i in range(3)]
+
+    def test_suppliers_resolved_in_one_query_per_batch(self):
+        """
+        仕入先はバッチごとに1回のクエリで取得し、取得済みのものは再度取得しないことをテスト
+        """
+        lines = ["name,category,supplier_id,supplier_code,cost_price,selling_price"]
+        for i in range(30):
+            supplier = self.suppliers[i % 3]
+            if i % 2:
+                lines.append(f"部品{i},head,{supplier.id},,1,1")
+            else:
+                lines.append(f"部品{i},head,,{supplier.supplier_code},1,1")
+        content = io.BytesIO(make_csv(*lines))
+        with patch.object(imports, "IMPORT_BATCH_SIZE", 10):
+            with self.assertNumQueries(1):
+                report = PartImporter(dry_run=True).run(content)
+        self.assertEqual(report.valid_rows, 30)
+
+    def test_fast_converters_match_serializer(self):
+        """
+        高速な変換の結果が PartSerializer の項目の検証結果と一致することをテスト
+        """
+        fields = PartImporter().fields
+        samples = {
+            "name": ["部品", "a" * 200, "a" * 201, "", "a\x00b"],
+            "category": ["head", "grip", "ヘッド", "HEAD"],
+            "cost_price": ["1", "1.5", "0.00", "-0", "1e2", "1.230", "-1", "abc"]
+            + ["9999999999.99", "10000000000", "NaN", "Infinity", "１２"],
+            "stock_quantity": ["0", "007", "2147483647", "2147483648", "-1", "1.0"]
+            + ["１２", "1e3"],
+        }
+        for name, values in samples.items():
+            convert = compile_fast_converter(fields[name])
+            for value in values:
+                with self.subTest(name=name, value=value):
+                    converted = convert(value)
+                    if converted is None:
+                        continue
+                    expected = fields[name].run_validation(value)
+                    self.assertEqual(converted, expected)
+                    self.assertEqual(str(converted), str(expected))
+
+    def test_batches(self):
+        """
+        バッチをまたいで全行を登録し、行番号が続くことをテスト
+        """
+        supplier = self.suppliers[0]
+        lines = ["name,category,supplier_id,cost_price,selling_price"]
+        lines += [f"部品{i},head,{supplier.id},{i},1" for i in range(25)]
+        lines.append(f"不正,head,{supplier.id},x,1")
+        with patch.object(imports, "IMPORT_BATCH_SIZE", 10):
+            report = PartImporter().run(io.BytesIO(make_csv(*lines)))
+        self.assertEqual(report.imported, 25)
+        self.assertEqual(report.errors[0]["row"], 27)
+        self.assertEqual(
+            list(Part.objects.order_by("id").values_list("cost_price", flat=True)),
+            [Decimal(i) for i in range(25)],
+        )
+
+    def test_max_errors(self):
+        """
+        報告するエラーは上限までとし、件数はすべて数えることをテスト
+        """
+        lines = ["name,category,supplier_id,cost_price,selling_price"]
+        lines += ["部品,head,,1,1"] * 5
+        report = PartImporter(dry_run=True, max_errors=2).run(
+            io.BytesIO(make_csv(*lines))
+        )
+        self.assertEqual(report.error_count, 5)
+        self.assertEqual(len(report.errors), 2)
+
+    def test_command(self):
+        """
+        コマンドで登録し、エラーをCSVに出力できることをテスト
+        """
+        supplier = self.suppliers[0]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "parts.csv")
+            errors_path = os.path.join(directory, "errors.csv")
+            with open(path, "wb") as file:
+                file.write(
+                    make_csv(
+                        "name,category,supplier_id,cost_price,selling_price",
+                        f"部品,head,{supplier.id},1,1",
+                        "部品,head,,1,1",
+                    )
+                )
+            out = io.StringIO()
+            call_command("import_parts", path, errors=errors_path, stdout=out)
+            with open(errors_path, encoding="utf-8-sig") as file:
+                errors = file.read()
+        self.assertIn("1件を登録しました", out.getvalue())
+        self.assertIn("3,supplier_id,", errors)
+        self.assertEqual(Part.objects.count(), 1)
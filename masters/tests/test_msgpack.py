@@ -0,0 +1,225 @@
+from decimal import Decimal
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+import msgpack
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Supplier, Part
+from zaiko_be.renderers import decode_decimal, encode_decimal, msgpack_ext_hook
+
+User = get_user_model()
+
+MSGPACK = "application/msgpack"
+
+
+def unpack(content):
+    return msgpack.unpackb(content, ext_hook=msgpack_ext_hook)
+
+
+def decimals_to_str(data):
+    """
+    Decimalを文字列にする（JSONの表現と比較するため）
+    """
+    if isinstance(data, Decimal):
+        return "{:f}".format(data)
+    if isinstance(data, dict):
+        return {key: decimals_to_str(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [decimals_to_str(value) for value in data]
+    return data
+
+
+class DecimalExtTypeTest(SimpleTestCase):
+    """
+    MessagePackのDecimalの拡張型のテストクラス
+    """
+
+    def test_round_trip(self):
+        """
+        拡張型にしたDecimalが同じ値・桁数で復元されることをテスト
+        """
+        for text in [
+            "0",
+            "0.00",
+            "1234.50",
+            "-1234.50",
+            "10.00",
+            "9999999999.99",
+            "-9999999999.99",
+            "0.0001",
+            "127",
+            "128",
+            "-128",
+            "123456789012345678901234567890.12",
+        ]:
+            value = Decimal(text)
+            packed = msgpack.packb(value, default=encode_decimal)
+            decoded = msgpack.unpackb(packed, ext_hook=msgpack_ext_hook)
+            self.assertEqual(str(decoded), text)
+
+    def test_compact_size(self):
+        """
+        価格の値が文字列より小さく、fixextの長さで出力されることをテスト
+        """
+        for text, size in [("1234.50", 6), ("200.00", 6), ("9999999999.99", 10)]:
+            packed = msgpack.packb(Decimal(text), default=encode_decimal)
+            self.assertEqual(len(packed), size)
+            self.assertLess(len(packed), len(msgpack.packb(text)))
+
+    def test_unrepresentable_values(self):
+        """
+        NaN・-0 など拡張型で表せない値は文字列になることをテスト
+        """
+        for text in ["NaN", "Infinity", "-0.00"]:
+            self.assertEqual(encode_decimal(Decimal(text)), text)
+        self.assertEqual(decode_decimal(b"\xfe\x01"), Decimal("0.01"))
+
+
+class MessagePackAPITest(APITestCase):
+    """
+    Accept: application/msgpack でのAPIのレスポンス・リクエストのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            supplier_code="CODE001",
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        for i in range(5):
+            Part.objects.create(
+                name=f"テスト部品{i}",
+                category=Part.Category.HEAD.value,
+                supplier=self.supplier,
+                cost_price=Decimal("1234.5") + i,
+                selling_price=Decimal("9999999999.99"),
+                stock_quantity=i,
+                reorder_level=3,
+                created_by=self.user,
+                updated_by=self.user if i % 2 else None,
+            )
+
+    def get_both(self, url, params=None):
+        """
+        JSONとMessagePackのレスポンスを取得
+        """
+        as_json = self.client.get(url, params)
+        as_msgpack = self.client.get(url, params, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(as_msgpack["Content-Type"], MSGPACK)
+        return as_json, as_msgpack
+
+    def assert_round_trip(self, url, params=None):
+        as_json, as_msgpack = self.get_both(url, params)
+        self.assertEqual(as_json.status_code, as_msgpack.status_code)
+        self.assertEqual(
+            decimals_to_str(unpack(as_msgpack.content)), json.loads(as_json.content)
+        )
+        return as_json, as_msgpack
+
+    def test_part_list(self):
+        """
+        部品一覧がJSONと同じ内容で、価格はDecimalで出力されることをテスト
+        """
+        as_json, as_msgpack = self.assert_round_trip(reverse("part-list"))
+        row = unpack(as_msgpack.content)["results"][0]
+        self.assertIsInstance(row["cost_price"], Decimal)
+        self.assertIsInstance(row["tax_rate"], Decimal)
+        self.assertLess(len(as_msgpack.content), len(as_json.content))
+
+    def test_part_list_variants(self):
+        """
+        項目指定・ユーザー情報の集約・キーセット方式・在庫不足一覧でもJSONと同じ内容になることをテスト
+        """
+        self.assert_round_trip(reverse("part-list"), {"fields": "id,cost_price"})
+        self.assert_round_trip(reverse("part-list"), {"include": "users"})
+        self.assert_round_trip(reverse("part-list"), {"pagination": "cursor"})
+        self.assert_round_trip(reverse("part-low-stock"))
+        self.assert_round_trip(reverse("part-low-stock"), {"group_by": "supplier"})
+
+    def test_part_detail_and_not_found(self):
+        """
+        部品詳細・存在しない部品のエラーがJSONと同じ内容になることをテスト
+        """
+        part = Part.objects.first()
+        self.assert_round_trip(reverse("part-detail", args=[part.id]))
+        self.assert_round_trip(reverse("part-detail", args=[999999]))
+
+    def test_supplier_endpoints(self):
+        """
+        仕入先の一覧・詳細・入力補完がJSONと同じ内容になることをテスト
+        """
+        self.assert_round_trip(reverse("supplier-list"))
+        self.assert_round_trip(reverse("supplier-detail", args=[self.supplier.id]))
+        self.assert_round_trip(reverse("supplier-autocomplete"), {"q": "CODE"})
+
+    def test_auth_endpoints(self):
+        """
+        ログイン・ユーザー情報のAPIでMessagePackを使用できることをテスト
+        """
+        self.assert_round_trip(reverse("user_info"))
+
+        response = APIClient().post(
+            reverse("token_obtain_pair"),
+            msgpack.packb(
+                {"email": "testuser@example.com", "password": "testpassword123"}
+            ),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", unpack(response.content))
+
+    def test_create_part_with_msgpack(self):
+        """
+        MessagePackのリクエストで部品を作成できることをテスト（価格はDecimalの拡張型で送信）
+        """
+        body = msgpack.packb(
+            {
+                "name": "新規部品",
+                "category": Part.Category.SHAFT.value,
+                "supplier_id": self.supplier.id,
+                "cost_price": Decimal("10.50"),
+                "selling_price": "20.00",
+            },
+            default=encode_decimal,
+        )
+        response = self.client.post(
+            reverse("part-list"), body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = unpack(response.content)
+        self.assertEqual(data["cost_price"], Decimal("10.50"))
+        self.assertEqual(data["selling_price"], Decimal("20.00"))
+        self.assertEqual(Part.objects.get(id=data["id"]).cost_price, Decimal("10.50"))
+
+    def test_invalid_msgpack(self):
+        """
+        不正なMessagePackで400が返ることをテスト
+        """
+        response = self.client.post(
+            reverse("part-list"), b"\x85\xa4name", content_type=MSGPACK
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("MessagePack parse error", response.data["detail"])
@@ -1,11 +1,20 @@
+import base64
+import json
+
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from masters.models import Supplier, Part
+from zaiko_be.pagination import get_queryset_count
 from decimal import Decimal
 from django.core.files.uploadedfile import SimpleUploadedFile
 import os
+from unittest.mock import patch
 
 User = get_user_model()
 
@@ -543,3 +552,510 @@ class PartListAPITest(APITestCase):
         else:
             # ページネーションなしの場合
             self.assertEqual(len(response.data), 0)
+
+
+class PartKeysetPaginationAPITest(APITestCase):
+    """
+    部品一覧のキーセット（カーソル）方式ページネーションのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("part-list")
+
+        self.supplier = Supplier.objects.create(
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+
+        # 名前の重複を含む30件の部品を作成
+        for i in range(30):
+            Part.objects.create(
+                name=f"部品{i % 10}",
+                category=Part.Category.OTHER.value,
+                supplier=self.supplier,
+                cost_price=Decimal("100.00"),
+                selling_price=Decimal("200.00"),
+            )
+
+    def test_cursor_pagination_walks_all_rows(self):
+        """
+        nextリンクを辿ると全件をID順に重複なく取得できることをテスト
+        """
+        response = self.client.get(self.url, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 30)
+        self.assertIsNone(response.data["current"])
+        self.assertIsNone(response.data["previous"])
+        self.assertEqual(len(response.data["results"]), 20)
+
+        response2 = self.client.get(response.data["next"])
+        self.assertEqual(response2.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response2.data["results"]), 10)
+        self.assertIsNone(response2.data["next"])
+
+        ids = [p["id"] for p in response.data["results"] + response2.data["results"]]
+        self.assertEqual(ids, list(Part.objects.values_list("id", flat=True)))
+
+        # previousリンクで1ページ目に戻れることを確認
+        response3 = self.client.get(response2.data["previous"])
+        self.assertEqual(
+            [p["id"] for p in response3.data["results"]],
+            [p["id"] for p in response.data["results"]],
+        )
+        self.assertIsNone(response3.data["previous"])
+
+    def test_cursor_pagination_with_ordering(self):
+        """
+        重複するソートキーでもIDで順序が確定し、取りこぼしがないことをテスト
+        """
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "ordering": "-name"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response2 = self.client.get(response.data["next"])
+
+        rows = response.data["results"] + response2.data["results"]
+        expected = list(
+            Part.objects.order_by("-name", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual([p["id"] for p in rows], expected)
+
+    def test_cursor_pagination_with_sparse_fields(self):
+        """
+        fields / omit で並び替えキー・IDを出力しない場合も、カーソルで続きを取得できることをテスト
+        """
+        for params, expected_order in [
+            ({"fields": "name"}, ["id"]),
+            ({"ordering": "updated_at", "fields": "name"}, ["updated_at", "id"]),
+            ({"ordering": "name", "omit": "name"}, ["name", "id"]),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, {"pagination": "cursor", **params})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                response2 = self.client.get(response.data["next"])
+                self.assertEqual(response2.status_code, status.HTTP_200_OK)
+                self.assertIsNone(response2.data["next"])
+
+                rows = response.data["results"] + response2.data["results"]
+                # 出力される項目（name または id）で順序を確認する
+                key = "name" if "fields" in params else "id"
+                self.assertEqual(
+                    [row[key] for row in rows],
+                    list(
+                        Part.objects.order_by(*expected_order).values_list(
+                            key, flat=True
+                        )
+                    ),
+                )
+                self.assertNotIn(params.get("omit"), rows[0])
+                if "fields" in params:
+                    self.assertEqual(set(rows[0]), {"name"})
+
+    def test_cursor_pagination_ignores_unknown_ordering(self):
+        """
+        許可されていないソートキーは無視されID順になることをテスト
+        """
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "ordering": "description"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [p["id"] for p in response.data["results"]]
+        self.assertEqual(ids, sorted(ids))
+
+    def test_cursor_pagination_invalid_cursor(self):
+        """
+        不正なカーソルでは404が返ることをテスト
+        """
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "cursor": "invalid"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination_invalid_cursor_value(self):
+        """
+        ソートキーの型に合わない値のカーソルでは404が返ることをテスト
+        """
+        for ordering in ["updated_at", "-cost_price"]:
+            payload = {"o": ordering, "v": "garbage", "id": 1, "r": False}
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = self.client.get(
+                self.url,
+                {"pagination": "cursor", "ordering": ordering, "cursor": cursor},
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PartCountStrategyAPITest(APITestCase):
+    """
+    部品一覧の総件数の算出方法（推定値・キャッシュ）のテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("part-list")
+
+        self.supplier = Supplier.objects.create(
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        for i in range(30):
+            Part.objects.create(
+                name=f"部品{i}",
+                category=Part.Category.OTHER.value,
+                supplier=self.supplier,
+                cost_price=Decimal("100.00"),
+                selling_price=Decimal("200.00"),
+            )
+        # 統計情報（pg_class.reltuples）を更新
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE masters_part")
+
+    def test_exact_count_strategy(self):
+        """
+        exactでは常に正確な件数が返り、推定値フラグがFalseになることをテスト
+        """
+        with override_settings(PAGINATION_COUNT={"STRATEGY": "exact"}):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 30)
+        self.assertFalse(response.data["count_estimated"])
+
+    def test_small_table_uses_exact_count(self):
+        """
+        閾値未満のテーブルでは正確な件数が返ることをテスト
+        """
+        count_settings = {"STRATEGY": "auto", "ESTIMATE_THRESHOLD": 1000}
+        with override_settings(PAGINATION_COUNT=count_settings):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 30)
+        self.assertFalse(response.data["count_estimated"])
+
+    def test_large_table_uses_estimated_count(self):
+        """
+        閾値以上のテーブルでは推定件数が返り、ページ送りも機能することをテスト
+        """
+        count_settings = {"STRATEGY": "auto", "ESTIMATE_THRESHOLD": 10}
+        with override_settings(PAGINATION_COUNT=count_settings):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data["count_estimated"])
+            self.assertEqual(response.data["count"], 30)
+            self.assertIsNotNone(response.data["next"])
+
+            response2 = self.client.get(response.data["next"])
+            self.assertEqual(len(response2.data["results"]), 10)
+            self.assertIsNone(response2.data["next"])
+
+            # カーソル方式でも推定値フラグが返る
+            response3 = self.client.get(self.url, {"pagination": "cursor"})
+            self.assertTrue(response3.data["count_estimated"])
+
+    def test_filtered_count_is_cached(self):
+        """
+        絞り込み条件付きの件数が短時間キャッシュされることをテスト
+        """
+        count_settings = {
+            "STRATEGY": "auto",
+            "ESTIMATE_THRESHOLD": 1000,
+            "CACHE_TTL": 60,
+        }
+        qs = Part.objects.filter(category=Part.Category.OTHER.value)
+
+        with override_settings(PAGINATION_COUNT=count_settings):
+            self.assertEqual(get_queryset_count(qs), (30, False))
+            Part.objects.create(
+                name="追加部品",
+                category=Part.Category.OTHER.value,
+                supplier=self.supplier,
+                cost_price=Decimal("100.00"),
+                selling_price=Decimal("200.00"),
+            )
+            # TTL内はキャッシュされた件数が返る
+            self.assertEqual(get_queryset_count(qs), (30, False))
+            cache.clear()
+            self.assertEqual(get_queryset_count(qs), (31, False))
+
+    def test_empty_queryset_count(self):
+        """
+        結果が空と確定しているクエリセットは、件数の算出方法によらず0件を返すことをテスト
+        """
+        for threshold in (1000, 10):
+            count_settings = {"STRATEGY": "auto", "ESTIMATE_THRESHOLD": threshold}
+            with self.subTest(threshold=threshold), override_settings(
+                PAGINATION_COUNT=count_settings
+            ):
+                for qs in (Part.objects.none(), Part.objects.filter(pk__in=[])):
+                    self.assertEqual(get_queryset_count(qs), (0, False))
+
+
+class PartSparseFieldsAPITest(APITestCase):
+    """
+    部品一覧・詳細の出力項目の絞り込み（fields / omit）のテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("part-list")
+
+        self.supplier = Supplier.objects.create(
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        self.part = Part.objects.create(
+            name="テスト部品",
+            category=Part.Category.HEAD.value,
+            supplier=self.supplier,
+            cost_price=Decimal("100.00"),
+            selling_price=Decimal("200.00"),
+            created_by=self.user,
+            updated_by=self.user,
+        )
+
+    def get_list_with_sql(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        select = next(
+            q["sql"]
+            for q in queries
+            if 'FROM "masters_part"' in q["sql"] and "LIMIT" in q["sql"]
+        )
+        return response, select
+
+    def test_fields_selects_columns_and_relations(self):
+        """
+        fieldsで指定した項目のみを返し、SQLも必要な列・結合に絞られることをテスト
+        """
+        response, sql = self.get_list_with_sql({"fields": "id,name,supplier"})
+        row = response.data["results"][0]
+        self.assertEqual(set(row), {"id", "name", "supplier"})
+        self.assertEqual(
+            row["supplier"], {"id": self.supplier.id, "name": "サプライヤーA"}
+        )
+
+        self.assertIn("masters_supplier", sql)
+        self.assertNotIn("accounts_customuser", sql)
+        self.assertNotIn('"masters_part"."description"', sql)
+        self.assertNotIn('"masters_supplier"."remarks"', sql)
+
+    def test_omit_drops_user_relations(self):
+        """
+        omitで指定した項目が除かれ、ユーザーの結合も行われないことをテスト
+        """
+        response, sql = self.get_list_with_sql({"omit": "created_by,updated_by"})
+        row = response.data["results"][0]
+        self.assertNotIn("created_by", row)
+        self.assertNotIn("updated_by", row)
+        self.assertIn("description", row)
+        self.assertNotIn("accounts_customuser", sql)
+
+    def test_unknown_fields_are_ignored(self):
+        """
+        存在しない項目名は無視されることをテスト
+        """
+        response = self.client.get(self.url, {"fields": "id,unknown"})
+        self.assertEqual(set(response.data["results"][0]), {"id"})
+
+    def test_fields_on_detail_and_cursor_pagination(self):
+        """
+        詳細取得・キーセット方式のページネーションでも項目を絞れることをテスト
+        """
+        detail_url = reverse("part-detail", args=[self.part.id])
+        response = self.client.get(detail_url, {"fields": "id,stock_quantity"})
+        self.assertEqual(response.data, {"id": self.part.id, "stock_quantity": 0})
+
+        # ETag / Last-Modified の集計・件数・ページの取得
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.url,
+                {"fields": "id", "pagination": "cursor", "ordering": "-updated_at"},
+            )
+        self.assertEqual(response.data["results"], [{"id": self.part.id}])
+
+    def test_fields_do_not_affect_writes(self):
+        """
+        更新時にはfieldsの指定がバリデーションに影響しないことをテスト
+        """
+        detail_url = reverse("part-detail", args=[self.part.id])
+        response = self.client.patch(
+            f"{detail_url}?fields=id", {"name": "更新後"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "更新後")
+
+
+class PartIncludedUsersAPITest(APITestCase):
+    """
+    部品一覧のユーザー情報の集約出力（include=users）のテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備（2人のユーザーが作成・更新した部品を用意）
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com",
+            password="testpassword123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("part-list")
+
+        self.supplier = Supplier.objects.create(
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        for i in range(5):
+            Part.objects.create(
+                name=f"テスト部品{i}",
+                category=Part.Category.HEAD.value,
+                supplier=self.supplier,
+                cost_price=Decimal("100.00"),
+                selling_price=Decimal("200.00"),
+                stock_quantity=i,
+                reorder_level=3,
+                created_by=self.user,
+                updated_by=self.other if i % 2 else None,
+            )
+
+    def test_users_are_included_once(self):
+        """
+        各行はユーザーIDのみを持ち、ユーザー情報がincluded.usersに1回だけ含まれることをテスト
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"include": "users"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows = response.data["results"]
+        self.assertEqual(len(rows), 5)
+        self.assertTrue(all(row["created_by"] == self.user.id for row in rows))
+        self.assertEqual({row["updated_by"] for row in rows}, {self.other.id, None})
+        self.assertEqual(rows[0]["supplier"]["name"], "サプライヤーA")
+
+        users = response.data["included"]["users"]
+        self.assertEqual(set(users), {str(self.user.id), str(self.other.id)})
+        self.assertEqual(users[str(self.user.id)]["email"], "testuser@example.com")
+
+        # 部品の取得ではユーザーを結合しない
+        select = next(
+            q["sql"]
+            for q in queries
+            if 'FROM "masters_part"' in q["sql"] and "LIMIT" in q["sql"]
+        )
+        self.assertNotIn("accounts_customuser", select)
+
+    def test_default_response_is_unchanged(self):
+        """
+        include未指定の場合は従来どおりネストしたユーザー情報を返すことをテスト
+        """
+        response = self.client.get(self.url)
+        self.assertNotIn("included", response.data)
+        self.assertEqual(
+            response.data["results"][0]["created_by"]["email"],
+            "testuser@example.com",
+        )
+
+    def test_fast_and_serializer_output_match(self):
+        """
+        高速シリアライザーと通常のシリアライザーで同じレスポンスになることをテスト
+        """
+        from masters.views import PartViewSet
+
+        params = {"include": "users", "ordering": "-stock_quantity"}
+        fast = self.client.get(self.url, params)
+        with patch.object(PartViewSet, "fast_read", False):
+            slow = self.client.get(self.url, params)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_include_with_fields_and_cursor(self):
+        """
+        fieldsで除いたユーザーは含めず、キーセット方式でも使用できることをテスト
+        """
+        response = self.client.get(
+            self.url, {"include": "users", "fields": "id,updated_by"}
+        )
+        self.assertEqual(set(response.data["included"]["users"]), {str(self.other.id)})
+
+        response = self.client.get(
+            self.url, {"include": "users", "fields": "id,name", "pagination": "cursor"}
+        )
+        self.assertEqual(response.data["included"], {"users": {}})
+
+    def test_include_on_low_stock(self):
+        """
+        在庫不足一覧でも使用できることをテスト
+        """
+        response = self.client.get(reverse("part-low-stock"), {"include": "users"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertIn(str(self.user.id), response.data["included"]["users"])
+        self.assertIsInstance(response.data["results"][0]["created_by"], int)
+
+    def test_include_ignored_on_detail(self):
+        """
+        詳細取得ではincludeを無視して従来の形式で返すことをテスト
+        """
+        part = Part.objects.first()
+        response = self.client.get(
+            reverse("part-detail", args=[part.id]), {"include": "users"}
+        )
+        self.assertNotIn("included", response.data)
+        self.assertEqual(response.data["created_by"]["id"], self.user.id)
@@ -0,0 +1,277 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters import cleanup
+from masters.models import Part, SearchDocument, Supplier
+from masters.search import search
+from masters.stock import get_low_stock_count
+
+User = get_user_model()
+
+
+class PartBulkTestMixin:
+    """
+    部品の一括削除・一括アーカイブのテストの共通処理
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="テストサプライヤー",
+            phone="03-1234-5678",
+            email="supplier@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        self.parts = [self.create_part(f"テスト部品{i}") for i in range(5)]
+
+    def create_part(self, name, **kwargs):
+        return Part.objects.create(
+            name=name,
+            category="shaft",
+            supplier=self.supplier,
+            cost_price="100.00",
+            selling_price="200.00",
+            **{"stock_quantity": 10, **kwargs},
+        )
+
+    def search_part_ids(self, query):
+        results = search(query, kinds=[SearchDocument.Kind.PART])
+        return sorted(result["id"] for result in results)
+
+
+class PartBulkDeleteAPITest(PartBulkTestMixin, APITestCase):
+    """
+    部品の一括削除APIのテストクラス
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("part-bulk-delete")
+
+    def test_bulk_delete(self):
+        """
+        指定した部品が削除され、検索ドキュメントも削除されることをテスト
+        """
+        ids = [self.parts[0].id, self.parts[1].id]
+        response = self.client.post(self.url, {"ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("2件", response.data["message"])
+        self.assertFalse(Part.objects.filter(id__in=ids).exists())
+        self.assertEqual(Part.objects.count(), 3)
+        self.assertFalse(
+            SearchDocument.objects.filter(
+                kind=SearchDocument.Kind.PART, object_id__in=ids
+            ).exists()
+        )
+        self.assertEqual(
+            self.search_part_ids("テスト部品"), [part.id for part in self.parts[2:]]
+        )
+
+    def test_bulk_delete_queries(self):
+        """
+        件数によらずクエリ数が一定であることをテスト
+        """
+        extra = [self.create_part(f"追加部品{i}").id for i in range(20)]
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, {"ids": [self.parts[0].id]}, format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, {"ids": extra}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small), len(large))
+
+    def test_bulk_delete_images_after_commit(self):
+        """
+        画像ファイルはトランザクションの確定後に別スレッドで削除されることをテスト
+        """
+        part = self.parts[0]
+        part.image.save("bulk_delete.png", ContentFile(b"image"))
+        name = part.image.name
+        storage = Part.image.field.storage
+        self.assertTrue(storage.exists(name))
+
+        with patch.object(cleanup, "start_thread") as start_thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    self.url,
+                    {"ids": [part.id, self.parts[1].id]},
+                    format="json",
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                start_thread.assert_not_called()
+        # 画像のない部品のファイル名は含めない
+        start_thread.assert_called_once_with(storage, [name])
+
+        self.assertEqual(cleanup.delete_files(storage, [name]), 1)
+        self.assertFalse(storage.exists(name))
+
+    def test_destroy_deletes_image_after_commit(self):
+        """
+        1件の削除でも画像ファイルがトランザクションの確定後に削除されることをテスト
+        """
+        part = self.parts[0]
+        part.image.save("destroy.png", ContentFile(b"image"))
+        with patch.object(cleanup, "start_thread") as start_thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.delete(reverse("part-detail", args=[part.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        start_thread.assert_called_once_with(
+            Part.image.field.storage, [part.image.name]
+        )
+        Part.image.field.storage.delete(part.image.name)
+
+    def test_bulk_delete_invalid_ids(self):
+        """
+        空・整数でない・存在しないIDの場合は何も削除されないことをテスト
+        """
+        for ids in ([], [self.parts[0].id, "abc"], [self.parts[0].id, 999999]):
+            response = self.client.post(self.url, {"ids": ids}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("error", response.data)
+        self.assertEqual(Part.objects.count(), 5)
+
+    def test_bulk_delete_unauthenticated(self):
+        """
+        認証されていない場合は401を返すことをテスト
+        """
+        self.client.force_authenticate(user=None)
+        response = self.client.post(
+            self.url, {"ids": [self.parts[0].id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(Part.objects.count(), 5)
+
+
+class PartBulkArchiveAPITest(PartBulkTestMixin, APITestCase):
+    """
+    部品の一括アーカイブAPIのテストクラス
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("part-bulk-archive")
+        self.list_url = reverse("part-list")
+
+    def list_ids(self, **params):
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [part["id"] for part in response.data["results"]]
+
+    def test_bulk_archive(self):
+        """
+        アーカイブした部品が一覧・検索に表示されず、詳細は取得できることをテスト
+        """
+        archived = [self.parts[1].id, self.parts[3].id]
+        response = self.client.post(self.url, {"ids": archived}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("2件", response.data["message"])
+        for part in Part.objects.filter(id__in=archived):
+            self.assertIsNotNone(part.archived_at)
+            self.assertEqual(part.updated_by, self.user)
+
+        active = [self.parts[i].id for i in (0, 2, 4)]
+        self.assertEqual(self.list_ids(), active)
+        self.assertEqual(self.list_ids(archived="true"), archived)
+        self.assertEqual(self.search_part_ids("テスト部品"), active)
+
+        response = self.client.get(reverse("part-detail", args=[archived[0]]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data["archived_at"])
+
+    def test_bulk_archive_hides_low_stock(self):
+        """
+        アーカイブした部品は在庫不足の一覧・件数に含まれないことをテスト
+        """
+        low = self.create_part("在庫不足部品", stock_quantity=1, reorder_level=5)
+        self.assertEqual(get_low_stock_count(), 1)
+
+        self.client.post(self.url, {"ids": [low.id]}, format="json")
+
+        self.assertEqual(get_low_stock_count(), 0)
+        response = self.client.get(reverse("part-low-stock"))
+        self.assertEqual(response.data["results"], [])
+
+    def test_bulk_unarchive(self):
+        """
+        archived=false でアーカイブを解除すると一覧・検索に戻ることをテスト
+        """
+        ids = [self.parts[0].id, self.parts[1].id]
+        self.client.post(self.url, {"ids": ids}, format="json")
+        # すでにアーカイブされていない部品は件数に含めない
+        response = self.client.post(
+            self.url,
+            {"ids": [*ids, self.parts[2].id], "archived": False},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("2件", response.data["message"])
+        self.assertFalse(Part.objects.archived().exists())
+        self.assertEqual(self.list_ids(), [part.id for part in self.parts])
+        self.assertEqual(
+            self.search_part_ids("テスト部品"), [part.id for part in self.parts]
+        )
+
+    def test_update_archived_part_keeps_it_out_of_search(self):
+        """
+        アーカイブした部品を更新しても検索ドキュメントが作成されないことをテスト
+        """
+        part = self.parts[0]
+        self.client.post(self.url, {"ids": [part.id]}, format="json")
+        response = self.client.patch(
+            reverse("part-detail", args=[part.id]),
+            {"name": "更新部品", "archived_at": None},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        part.refresh_from_db()
+        self.assertIsNotNone(part.archived_at)
+        self.assertEqual(self.search_part_ids("更新部品"), [])
+
+    def test_bulk_archive_invalid(self):
+        """
+        存在しないID・不正な archived の場合は何も更新されないことをテスト
+        """
+        response = self.client.post(
+            self.url, {"ids": [self.parts[0].id, 999999]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            self.url, {"ids": [self.parts[0].id], "archived": "yes"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Part.objects.archived().exists())
+
+    def test_active_query_uses_partial_index(self):
+        """
+        アーカイブされていない部品の一覧が部分インデックスから取得されることを実行計画で確認
+        """
+        sql, params = Part.objects.active().order_by("id")[:20].query.sql_with_params()
+        with connection.cursor() as cursor:
+            # テストデータは少量のため、インデックスの走査を強制して確認する
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RESET enable_seqscan")
+        self.assertIn("part_active_id_idx", plan, plan)
@@ -0,0 +1,312 @@
+from datetime import timedelta
+from decimal import Decimal
+import itertools
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+
+from masters.models import Supplier, Part
+from masters.views import PartViewSet
+
+User = get_user_model()
+
+
+def create_supplier(name):
+    return Supplier.objects.create(
+        name=name,
+        phone="03-1234-5678",
+        email="supplier@example.com",
+        postal_code="100-0001",
+        prefecture="東京都",
+        city="千代田区",
+        town="丸の内1-1-1",
+    )
+
+
+class PartFilterAPITest(APITestCase):
+    """
+    部品一覧の絞り込み・並び替えAPIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("part-list")
+
+        self.supplier1 = create_supplier("サプライヤーA")
+        self.supplier2 = create_supplier("サプライヤーB")
+
+        categories = [
+            Part.Category.HEAD,
+            Part.Category.SHAFT,
+            Part.Category.GRIP,
+            Part.Category.OTHER,
+        ]
+        self.parts = []
+        for i in range(8):
+            self.parts.append(
+                Part.objects.create(
+                    name=f"テスト部品{i}",
+                    category=categories[i % 4].value,
+                    supplier=self.supplier1 if i < 4 else self.supplier2,
+                    cost_price=Decimal(f"{1000 + i * 100}.00"),
+                    selling_price=Decimal(f"{2000 + i * 200}.00"),
+                    stock_quantity=i * 10,
+                )
+            )
+
+    def get_ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [p["id"] for p in response.data["results"]]
+
+    def test_filter_by_category(self):
+        """
+        カテゴリで絞り込めることをテスト
+        """
+        ids = self.get_ids({"category": "head"})
+        self.assertEqual(ids, [self.parts[0].id, self.parts[4].id])
+
+    def test_filter_by_supplier(self):
+        """
+        仕入先IDで絞り込めることをテスト
+        """
+        ids = self.get_ids({"supplier_id": self.supplier2.id})
+        self.assertEqual(ids, [p.id for p in self.parts[4:]])
+
+    def test_filter_by_price_range(self):
+        """
+        原価・見積用単価の範囲で絞り込めることをテスト
+        """
+        ids = self.get_ids({"cost_price_min": "1200", "cost_price_max": "1400.00"})
+        self.assertEqual(ids, [p.id for p in self.parts[2:5]])
+
+        ids = self.get_ids({"selling_price_min": "3200"})
+        self.assertEqual(ids, [p.id for p in self.parts[6:]])
+
+    def test_filter_by_stock_quantity_range(self):
+        """
+        在庫数の範囲で絞り込めることをテスト
+        """
+        ids = self.get_ids({"stock_quantity_min": 20, "stock_quantity_max": 30})
+        self.assertEqual(ids, [self.parts[2].id, self.parts[3].id])
+
+    def test_filter_by_updated_since(self):
+        """
+        更新日時で絞り込めることをテスト
+        """
+        since = timezone.now() + timedelta(seconds=1)
+        Part.objects.filter(id=self.parts[5].id).update(
+            updated_at=since + timedelta(hours=1)
+        )
+        ids = self.get_ids({"updated_since": since.isoformat()})
+        self.assertEqual(ids, [self.parts[5].id])
+
+    def test_combined_filters(self):
+        """
+        複数の条件を組み合わせて絞り込めることをテスト
+        """
+        ids = self.get_ids({"supplier_id": self.supplier1.id, "stock_quantity_min": 10})
+        self.assertEqual(ids, [p.id for p in self.parts[1:4]])
+
+    def test_invalid_filter_value(self):
+        """
+        不正な絞り込み条件では400エラーになることをテスト
+        """
+        response = self.client.get(self.url, {"category": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("category", response.data)
+
+        response = self.client.get(self.url, {"cost_price_min": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cost_price_min", response.data)
+
+    def test_ordering(self):
+        """
+        許可されたキーで並び替えでき、同値はIDで順序が確定することをテスト
+        """
+        ids = self.get_ids({"ordering": "-stock_quantity"})
+        self.assertEqual(ids, [p.id for p in reversed(self.parts)])
+
+        Part.objects.update(selling_price=Decimal("100.00"))
+        ids = self.get_ids({"ordering": "selling_price"})
+        self.assertEqual(ids, [p.id for p in self.parts])
+
+    def test_ordering_ignores_unknown_field(self):
+        """
+        許可されていないキーでの並び替えは無視されることをテスト
+        """
+        ids = self.get_ids({"ordering": "description"})
+        self.assertEqual(ids, [p.id for p in self.parts])
+
+
+class PartFilterQueryPlanTest(TestCase):
+    """
+    絞り込み・並び替えの組み合わせがインデックスを使用することを実行計画で確認するテストクラス
+
+    実行計画は一覧のビュー（PartViewSet.filter_queryset）が組み立てるクエリセットから作成する
+    テストデータは少量のため、enable_seqscan / enable_bitmapscan を無効にして
+    どのインデックスで実行されるか（インデックス名・インデックス条件）を確認する
+    """
+
+    # 絞り込み条件（クエリパラメータ）と、インデックス条件に使用されるべき列
+    # supplier_id は setUpTestData で作成した仕入先のIDに置き換える
+    filters = {
+        "category": ({"category": "head"}, "category"),
+        "supplier_id": ({"supplier_id": None}, "supplier_id"),
+        "cost_price": (
+            {"cost_price_min": "100", "cost_price_max": "110"},
+            "cost_price",
+        ),
+        "selling_price": (
+            {"selling_price_min": "100", "selling_price_max": "110"},
+            "selling_price",
+        ),
+        "stock_quantity": (
+            {"stock_quantity_min": 1, "stock_quantity_max": 3},
+            "stock_quantity",
+        ),
+        "updated_since": ({"updated_since": "2099-01-01T00:00:00Z"}, "updated_at"),
+    }
+
+    # 並び替えごとに、ソートせずに取得するためのインデックス（一覧はアーカイブされていない部品のみ）
+    ordering_indexes = {
+        "id": "part_active_id_idx",
+        "name": "part_name_id_idx",
+        "updated_at": "part_updated_at_id_idx",
+        "cost_price": "part_cost_price_id_idx",
+        "selling_price": "part_selling_price_id_idx",
+        "stock_quantity": "part_stock_quantity_id_idx",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        # 統計情報のない空のテーブルではソートの費用が小さく見積もられるため、
+        # 部品を登録して ANALYZE した状態で確認する（各絞り込み条件に一致する部品は少数にする）
+        suppliers = [create_supplier(f"サプライヤー{i}") for i in range(2)]
+        Part.objects.bulk_create(
+            Part(
+                name=f"部品{i}",
+                category=Part.Category.HEAD if i % 50 == 0 else Part.Category.OTHER,
+                supplier=suppliers[0] if i % 50 == 0 else suppliers[1],
+                cost_price=Decimal(i % 1000),
+                selling_price=Decimal(i % 1000),
+                stock_quantity=i % 1000,
+            )
+            for i in range(5000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE masters_part")
+        cls.supplier_id = suppliers[0].pk
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("SET enable_bitmapscan = off")
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+            cursor.execute("RESET enable_bitmapscan")
+
+    def list_queryset(self, params):
+        """
+        一覧のビューが絞り込み・並び替えを適用したクエリセット
+        """
+        view = PartViewSet(action="list", format_kwarg=None, kwargs={})
+        if "supplier_id" in params:
+            params = {**params, "supplier_id": self.supplier_id}
+        view.request = Request(APIRequestFactory().get("/", params))
+        return view.filter_queryset(view.get_queryset())
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def walk(self, node):
+        yield node
+        for child in node.get("Plans", []):
+            yield from self.walk(child)
+
+    def part_scans(self, plan):
+        """
+        masters_part を読むノードのリスト
+        """
+        return [
+            node
+            for node in self.walk(plan)
+            if node.get("Relation Name") == "masters_part"
+        ]
+
+    def test_ordering_indexes_exist(self):
+        """
+        確認に使用するインデックスが部品モデルに定義されていることをテスト
+        """
+        names = {index.name for index in Part._meta.indexes}
+        self.assertLessEqual(set(self.ordering_indexes.values()), names)
+        self.assertEqual(set(self.ordering_indexes), set(PartViewSet.ordering_fields))
+
+    def test_each_filter_uses_index_condition(self):
+        """
+        各絞り込み条件がインデックス条件として使用されることをテスト
+        （一覧の件数の算出と同じく、並び替えなしの絞り込みで確認する）
+        """
+        for label, (params, column) in self.filters.items():
+            plan = self.explain(self.list_queryset(params).order_by().values("pk"))
+            scans = self.part_scans(plan)
+            self.assertTrue(scans, f"{label}: {plan}")
+            for node in scans:
+                self.assertIn(column, node.get("Index Cond", ""), f"{label}: {plan}")
+
+    def test_filter_and_ordering_combinations_use_index(self):
+        """
+        すべての絞り込み条件と並び替えの組み合わせで、並び替えのインデックス、
+        または絞り込み条件をインデックス条件とするインデックスが使用されることをテスト
+        （主キーのインデックスを走査して絞り込む実行計画は不可）
+        """
+        orderings = [
+            f"{prefix}{field}"
+            for field in PartViewSet.ordering_fields
+            for prefix in ("", "-")
+        ]
+        filter_sets = [({}, None), *self.filters.values()]
+        for (params, column), ordering in itertools.product(filter_sets, orderings):
+            label = f"{params} / {ordering}"
+            plan = self.explain(
+                self.list_queryset({**params, "ordering": ordering})[:20]
+            )
+            scans = self.part_scans(plan)
+            self.assertTrue(scans, f"{label}: {plan}")
+            for node in scans:
+                uses_ordering_index = (
+                    node.get("Index Name")
+                    == self.ordering_indexes[ordering.lstrip("-")]
+                )
+                uses_filter_index = column is not None and column in node.get(
+                    "Index Cond", ""
+                )
+                self.assertTrue(
+                    uses_ordering_index or uses_filter_index,
+                    f"{label}: {node['Node Type']} {node.get('Index Name')}",
+                )
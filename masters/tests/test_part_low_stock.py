@@ -0,0 +1,241 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Supplier, Part
+from masters.stock import get_low_stock_count, get_low_stock_count_cache_key
+from zaiko_be.pagination import KeysetPagination
+from zaiko_be.response_cache import get_cache
+
+User = get_user_model()
+
+
+class PartLowStockAPITest(APITestCase):
+    """
+    在庫不足の部品一覧・件数APIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("part-low-stock")
+        self.count_url = reverse("part-low-stock-count")
+
+        self.supplier1 = self.create_supplier("サプライヤーA")
+        self.supplier2 = self.create_supplier("サプライヤーB")
+
+        # (在庫数, 補充閾値, カテゴリ, 仕入先)
+        self.low1 = self.create_part(2, 10, "head", self.supplier1)  # 不足8
+        self.low2 = self.create_part(5, 5, "shaft", self.supplier1)  # 不足0
+        self.low3 = self.create_part(0, 3, "head", self.supplier2)  # 不足3
+        self.enough = self.create_part(20, 5, "grip", self.supplier2)
+
+    def create_supplier(self, name):
+        return Supplier.objects.create(
+            name=name,
+            phone="03-1234-5678",
+            email="supplier@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+
+    def create_part(self, stock_quantity, reorder_level, category, supplier):
+        return Part.objects.create(
+            name=f"部品{stock_quantity}-{reorder_level}",
+            category=category,
+            supplier=supplier,
+            cost_price=Decimal("100.00"),
+            selling_price=Decimal("200.00"),
+            stock_quantity=stock_quantity,
+            reorder_level=reorder_level,
+        )
+
+    def test_low_stock_list(self):
+        """
+        在庫不足の部品が不足数の多い順に返ることをテスト
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        results = response.data["results"]
+        self.assertEqual(
+            [p["id"] for p in results], [self.low1.id, self.low3.id, self.low2.id]
+        )
+        self.assertEqual([p["shortage"] for p in results], [8, 3, 0])
+
+    def test_low_stock_list_cursor_pagination(self):
+        """
+        カーソル方式でも不足数の多い順（同じ不足数はID順）にページを辿れることをテスト
+        """
+        for i in range(25):
+            self.create_part(i % 4, 5, "grip", self.supplier2)  # 不足5〜2
+        expected = list(
+            Part.objects.low_stock()
+            .order_by("-shortage", "id")
+            .values_list("id", flat=True)
+        )
+
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "ordering": "-id"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = [p["id"] for p in response.data["results"]]
+        self.assertEqual(first_page, expected[:20])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["id"] for p in response.data["results"]], expected[20:])
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([p["id"] for p in response.data["results"]], first_page)
+
+    def test_low_stock_list_with_filter(self):
+        """
+        一覧と同じ絞り込み条件を指定できることをテスト
+        """
+        response = self.client.get(self.url, {"supplier_id": self.supplier2.id})
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.low3.id])
+
+    def test_low_stock_grouped_by_supplier(self):
+        """
+        仕入先ごとに集計できることをテスト
+        """
+        response = self.client.get(self.url, {"group_by": "supplier"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "supplier_id": self.supplier1.id,
+                    "supplier__name": "サプライヤーA",
+                    "count": 2,
+                    "total_shortage": 8,
+                },
+                {
+                    "supplier_id": self.supplier2.id,
+                    "supplier__name": "サプライヤーB",
+                    "count": 1,
+                    "total_shortage": 3,
+                },
+            ],
+        )
+
+    def test_low_stock_grouped_by_category(self):
+        """
+        カテゴリごとに集計できることをテスト
+        """
+        response = self.client.get(self.url, {"group_by": "category"})
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"category": "head", "count": 2, "total_shortage": 11},
+                {"category": "shaft", "count": 1, "total_shortage": 0},
+            ],
+        )
+
+    def test_low_stock_invalid_group_by(self):
+        """
+        不正なgroup_byでは400エラーになることをテスト
+        """
+        response = self.client.get(self.url, {"group_by": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_low_stock_count_is_cached_and_refreshed(self):
+        """
+        在庫不足件数がキャッシュされ、在庫数の変更で更新されることをテスト
+        """
+        response = self.client.get(self.count_url)
+        self.assertEqual(response.data, {"count": 3})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.count_url)
+        self.assertEqual(response.data, {"count": 3})
+
+        # PATCHで在庫を補充すると件数が更新される
+        detail_url = reverse("part-detail", args=[self.low1.id])
+        response = self.client.patch(detail_url, {"stock_quantity": 50}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.count_url)
+        self.assertEqual(response.data, {"count": 2})
+
+    def test_low_stock_count_cleared_after_commit(self):
+        """
+        部品の保存時に在庫不足件数のキャッシュが確定後にも無効になることをテスト
+        （確定前に他のリクエストが古い件数をキャッシュしても参照されない）
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.low1.stock_quantity = 50
+            self.low1.save()
+            # 確定前に他のリクエストが古い件数をキャッシュした状態
+            get_cache().set(get_low_stock_count_cache_key(), 3)
+        self.assertEqual(get_low_stock_count(), 2)
+
+    def test_low_stock_count_follows_part_version(self):
+        """
+        在庫不足件数は部品のバージョン番号で無効になり、
+        件数のキャッシュを直接クリアしない更新（他のプロセスでの更新）も反映されることをテスト
+        """
+        self.assertEqual(get_low_stock_count(), 3)
+
+        with patch("masters.signals.clear_low_stock_count"):
+            Part.objects.filter(pk=self.low1.pk).update(stock_quantity=50)
+
+        self.assertEqual(get_low_stock_count(), 2)
+
+    def test_low_stock_query_uses_partial_index(self):
+        """
+        在庫不足の一覧がソートなしで部分インデックスから取得されることを実行計画で確認
+        """
+        queryset = Part.objects.low_stock().order_by("-shortage", "id")[:20]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # テストデータは少量のため、インデックス順の走査を強制して確認する
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("SET enable_bitmapscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RESET enable_seqscan")
+            cursor.execute("RESET enable_bitmapscan")
+        self.assertIn("Index Scan using part_low_stock_idx", plan, plan)
+        self.assertNotIn("Sort", plan, plan)
+
+    def test_low_stock_cursor_query_uses_partial_index(self):
+        """
+        カーソル方式の続きのページも部分インデックスの範囲スキャンで取得されることを実行計画で確認
+        """
+        position = KeysetPagination.build_position_filter(
+            "shortage", 3, self.low3.id, True, "id", False
+        )
+        queryset = (
+            Part.objects.low_stock().filter(position).order_by("-shortage", "id")[:21]
+        )
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("SET enable_bitmapscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RESET enable_seqscan")
+            cursor.execute("RESET enable_bitmapscan")
+        self.assertIn("Index Scan using part_low_stock_idx", plan, plan)
+        self.assertIn("Index Cond", plan, plan)
+        self.assertNotIn("Sort", plan, plan)
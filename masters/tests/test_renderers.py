@@ -0,0 +1,184 @@
+import datetime
+from decimal import Decimal
+import io
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Supplier, Part
+from zaiko_be.parsers import FastJSONParser
+from zaiko_be.renderers import FastJSONRenderer
+
+User = get_user_model()
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """
+    orjsonのレンダラーが標準のレンダラーと同じ出力になることをテストするクラス
+    """
+
+    def assert_same_output(self, data, **kwargs):
+        self.assertEqual(
+            FastJSONRenderer().render(data, **kwargs),
+            JSONRenderer().render(data, **kwargs),
+        )
+
+    def test_native_types(self):
+        """
+        Decimal・日時・UUID・遅延評価の文字列などが同じ形式で出力されることをテスト
+        """
+        tokyo = datetime.timezone(datetime.timedelta(hours=9))
+        self.assert_same_output(
+            {
+                "decimal": Decimal("1234.50"),
+                "utc": datetime.datetime(
+                    2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc
+                ),
+                "tokyo": datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=tokyo),
+                "naive": datetime.datetime(2024, 1, 2, 3, 4, 5),
+                "date": datetime.date(2024, 1, 2),
+                "time": datetime.time(1, 2, 3),
+                "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+                "lazy": gettext_lazy("部品"),
+                "nested": [{"名前": "ヘッド", "数": 1, "無": None, "真": True}],
+                1: "数値のキー",
+            }
+        )
+
+    def test_line_separators_are_escaped(self):
+        """
+        U+2028 / U+2029 がエスケープされることをテスト
+        """
+        self.assert_same_output({"text": "改行\u2028段落\u2029"})
+
+    def test_fallback_to_standard_renderer(self):
+        """
+        インデント指定・64bitを超える整数では標準のレンダラーで出力されることをテスト
+        """
+        self.assert_same_output({"big": 2**70})
+        self.assert_same_output(
+            {"a": [1, 2]}, accepted_media_type="application/json; indent=4"
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastJSONParserTest(SimpleTestCase):
+    """
+    orjsonのパーサーのテストクラス
+    """
+
+    def test_parse(self):
+        """
+        標準のパーサーと同じ結果になることをテスト
+        """
+        body = '{"name": "部品", "price": 1.5, "ids": [1, 2], "ok": null}'.encode()
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_parse_error(self):
+        """
+        不正なJSONでParseErrorになることをテスト
+        """
+        for body in [b"", b"{", b'{"a": NaN}']:
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+    def test_non_utf8_encoding(self):
+        """
+        UTF-8以外の文字コードは標準のパーサーで解析されることをテスト
+        """
+        body = '{"name": "部品"}'.encode("shift_jis")
+        self.assertEqual(
+            FastJSONParser().parse(
+                io.BytesIO(body), parser_context={"encoding": "shift_jis"}
+            ),
+            {"name": "部品"},
+        )
+
+
+class FastJSONAPITest(APITestCase):
+    """
+    APIのレスポンス・リクエストでorjsonのレンダラー・パーサーが使用されることをテストするクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        Part.objects.create(
+            name="テスト部品",
+            category=Part.Category.HEAD.value,
+            supplier=self.supplier,
+            cost_price=Decimal("100.50"),
+            selling_price=Decimal("200.00"),
+            created_by=self.user,
+            updated_by=self.user,
+        )
+
+    def test_list_response(self):
+        """
+        一覧のレスポンスが標準のレンダラーと同じ内容になることをテスト
+        """
+        response = self.client.get(reverse("part-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_user_info_response(self):
+        """
+        ユーザー情報のレスポンスが標準のレンダラーと同じ内容になることをテスト
+        """
+        response = self.client.get("/api/auth/info/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_json_request(self):
+        """
+        JSONのリクエストを解析できること、不正なJSONで400が返ることをテスト
+        """
+        url = reverse("part-list")
+        response = self.client.post(
+            url,
+            {
+                "name": "新規部品",
+                "category": Part.Category.SHAFT.value,
+                "supplier_id": self.supplier.id,
+                "cost_price": "10.00",
+                "selling_price": "20.00",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(url, b'{"name": ', content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", response.data["detail"])
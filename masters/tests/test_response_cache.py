@@ -0,0 +1,264 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Supplier, Part
+from zaiko_be.response_cache import (
+    VERSION_KEY,
+    bump_model_version,
+    get_model_versions,
+)
+
+User = get_user_model()
+
+RESPONSE_CACHE = {"ENABLED": True, "ALIAS": "responses", "TIMEOUT": 300}
+
+
+@override_settings(RESPONSE_CACHE=RESPONSE_CACHE)
+class ResponseCacheAPITest(APITestCase):
+    """
+    部品・仕入先の一覧・詳細のレスポンスキャッシュのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        caches["responses"].clear()
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="サプライヤーA",
+            phone="03-1234-5678",
+            email="supplierA@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        self.part = Part.objects.create(
+            name="テスト部品",
+            category=Part.Category.HEAD.value,
+            supplier=self.supplier,
+            cost_price=Decimal("100.00"),
+            selling_price=Decimal("200.00"),
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        self.url = reverse("part-list")
+
+    def get(self, url=None, params=None, **extra):
+        response = self.client.get(url or self.url, params, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_second_request_is_served_from_cache(self):
+        """
+        2回目のリクエストはデータベースを参照せずキャッシュから同じ内容を返すことをテスト
+        """
+        first = self.get()
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.get()
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Content-Type"], first["Content-Type"])
+
+    def test_key_includes_params_and_format(self):
+        """
+        クエリパラメータ・出力形式ごとに別のキャッシュになることをテスト
+        """
+        self.get()
+        self.assertEqual(self.get(params={"fields": "id"})["X-Cache"], "MISS")
+        self.assertEqual(self.get(HTTP_ACCEPT="application/msgpack")["X-Cache"], "MISS")
+        self.assertEqual(
+            self.get(HTTP_ACCEPT="application/msgpack")["Content-Type"],
+            "application/msgpack",
+        )
+
+    def test_detail_is_cached_and_404_is_not(self):
+        """
+        詳細はキャッシュされ、存在しない場合の404はキャッシュされないことをテスト
+        """
+        url = reverse("part-detail", args=[self.part.id])
+        self.get(url)
+        self.assertEqual(self.get(url)["X-Cache"], "HIT")
+
+        missing = reverse("part-detail", args=[999999])
+        self.client.get(missing)
+        response = self.client.get(missing)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotEqual(response.get("X-Cache"), "HIT")
+
+    def test_invalidated_on_save_and_delete(self):
+        """
+        部品の保存・削除でキャッシュが無効になることをテスト
+        """
+        self.get()
+        self.part.name = "更新後"
+        self.part.save()
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["results"][0]["name"], "更新後")
+
+        self.part.delete()
+        self.assertEqual(self.get().json()["count"], 0)
+
+    def test_invalidated_by_related_models(self):
+        """
+        仕入先・ユーザーの更新で部品のキャッシュも無効になることをテスト
+        """
+        self.get()
+        Supplier.objects.filter(pk=self.supplier.pk).update(name="サプライヤーB")
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            response.json()["results"][0]["supplier"]["name"], "サプライヤーB"
+        )
+
+        self.user.first_name = "次郎"
+        self.user.save()
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            response.json()["results"][0]["created_by"]["first_name"], "次郎"
+        )
+
+    def test_last_login_does_not_invalidate(self):
+        """
+        最終ログイン日時の更新ではキャッシュが無効にならないことをテスト
+        """
+        self.get()
+        update_last_login(None, self.user)
+        self.assertEqual(self.get()["X-Cache"], "HIT")
+
+    def test_invalidated_by_bulk_operations(self):
+        """
+        一括更新・一括作成・一括削除でキャッシュが無効になることをテスト
+        """
+        self.get()
+        Part.objects.update(stock_quantity=5)
+        self.assertEqual(self.get().json()["results"][0]["stock_quantity"], 5)
+
+        Part.objects.bulk_create(
+            [
+                Part(
+                    name="一括作成",
+                    category=Part.Category.GRIP.value,
+                    supplier=self.supplier,
+                    cost_price=Decimal("1.00"),
+                    selling_price=Decimal("2.00"),
+                )
+            ]
+        )
+        self.assertEqual(self.get().json()["count"], 2)
+
+        supplier_url = reverse("supplier-list")
+        other = Supplier.objects.create(
+            name="削除対象",
+            phone="03-1234-5678",
+            email="delete@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        self.assertEqual(self.get(supplier_url).json()["count"], 2)
+        response = self.client.post(
+            reverse("supplier-bulk-delete"), {"ids": [other.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get(supplier_url).json()["count"], 1)
+
+    def test_authentication_is_checked_before_cache(self):
+        """
+        キャッシュがあっても未認証のリクエストには401を返すことをテスト
+        """
+        self.get()
+        response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(RESPONSE_CACHE={**RESPONSE_CACHE, "ENABLED": False})
+    def test_disabled(self):
+        """
+        無効の場合はキャッシュしないことをテスト
+        """
+        self.get()
+        self.assertFalse(self.get().has_header("X-Cache"))
+
+    def test_stats(self):
+        """
+        ヒット数・ミス数を管理者が取得できることをテスト
+        """
+        self.get()
+        self.get()
+        self.get(reverse("supplier-list"))
+        url = reverse("cache-stats")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_superuser(
+            email="admin@example.com", password="adminpassword123"
+        )
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["enabled"])
+        self.assertEqual(
+            response.data["endpoints"]["part"],
+            {"hits": 1, "misses": 1, "hit_rate": 0.5},
+        )
+        self.assertEqual(response.data["endpoints"]["supplier"]["misses"], 1)
+
+
+@override_settings(RESPONSE_CACHE=RESPONSE_CACHE)
+class ModelVersionTest(APITestCase):
+    """
+    モデルのバージョン番号のテストクラス
+    """
+
+    def setUp(self):
+        caches["responses"].clear()
+
+    def test_bump_increments_version(self):
+        """
+        バージョン番号が1つずつ進むことをテスト
+        """
+        (before,) = get_model_versions([Part])
+        bump_model_version(Part)
+        self.assertEqual(get_model_versions([Part]), [before + 1])
+
+    def test_bump_again_after_commit(self):
+        """
+        トランザクション内の更新では確定後にもう一度バージョン番号が進むことをテスト
+        （確定前に他のリクエストが新しい番号で古い内容をキャッシュしても参照されない）
+        """
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Part.objects.filter(pk=0).update(stock_quantity=0)
+            (during,) = get_model_versions([Part])
+        self.assertEqual(len(callbacks), 1)
+        (after,) = get_model_versions([Part])
+        self.assertGreater(after, during)
+
+    def test_lost_version_does_not_reuse_old_number(self):
+        """
+        バージョン番号がキャッシュから消えても過去の番号と重ならないことをテスト
+        """
+        (before,) = get_model_versions([Supplier])
+        bump_model_version(Supplier)
+        caches["responses"].delete(VERSION_KEY.format("masters.supplier"))
+        (after,) = get_model_versions([Supplier])
+        self.assertGreater(after, before + 1)
@@ -0,0 +1,171 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Part, SearchDocument, Supplier
+from masters.search import highlight, normalize, to_bigrams
+
+User = get_user_model()
+
+
+class NormalizeTest(SimpleTestCase):
+    """
+    検索用の正規化のテストクラス
+    """
+
+    def test_width_kana_and_voicing_variants_are_equal(self):
+        """
+        全角/半角・カタカナ/ひらがな・濁点の有無の揺れが同じ文字列になることをテスト
+        """
+        expected = normalize("ヘッド")
+        for variant in ["ﾍｯﾄﾞ", "ヘット", "へっど", "ヘツド"]:
+            self.assertEqual(normalize(variant), expected, variant)
+
+    def test_alphanumeric_and_spaces(self):
+        """
+        全角英数字・大文字小文字・空白が統一されることをテスト
+        """
+        self.assertEqual(normalize("ＡＢＣ　１２３ Def"), "abc123def")
+
+    def test_bigrams(self):
+        """
+        重複のないバイグラムに分割されることをテスト
+        """
+        self.assertEqual(to_bigrams("abab"), ["ab", "ba"])
+        self.assertEqual(to_bigrams("a"), [])
+
+    def test_highlight_maps_back_to_original_text(self):
+        """
+        半角カタカナの元のテキスト上でハイライト範囲が求まることをテスト
+        """
+        result = highlight("新型ﾍｯﾄﾞ部品", set(to_bigrams(normalize("ヘッド"))))
+        self.assertEqual(result["snippet"], "新型ﾍｯﾄﾞ部品")
+        self.assertEqual(result["ranges"], [[2, 6]])
+
+
+class SearchAPITest(APITestCase):
+    """
+    部品・仕入先の横断検索APIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("search")
+
+        self.supplier = Supplier.objects.create(
+            name="ヘッド工業株式会社",
+            contact_person="山田太郎",
+            phone="03-1234-5678",
+            email="supplier@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            remarks="シャフトの取り扱いあり",
+        )
+        self.head = self.create_part("ドライバーヘッド", "チタン製のﾍｯﾄﾞ")
+        self.shaft = self.create_part("カーボンシャフト", "")
+        self.typo = self.create_part("ヘッダー部品", "")
+
+    def create_part(self, name, description):
+        return Part.objects.create(
+            name=name,
+            category=Part.Category.HEAD.value,
+            supplier=self.supplier,
+            cost_price=Decimal("100.00"),
+            selling_price=Decimal("200.00"),
+            description=description,
+        )
+
+    def test_search_matches_variants(self):
+        """
+        表記揺れのある検索語で部品・仕入先が検索できることをテスト
+        """
+        for query in ["ヘッド", "ﾍｯﾄﾞ", "へっと"]:
+            response = self.client.get(self.url, {"q": query})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            found = {(r["type"], r["id"]) for r in response.data["results"]}
+            self.assertIn(("part", self.head.id), found, query)
+            self.assertIn(("supplier", self.supplier.id), found, query)
+            self.assertNotIn(("part", self.shaft.id), found, query)
+
+    def test_search_ranks_exact_matches_first(self):
+        """
+        完全一致が部分一致より上位に並ぶことをテスト
+        """
+        response = self.client.get(self.url, {"q": "ヘッダー", "type": "part"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results[0]["id"], self.typo.id)
+        self.assertEqual(results[0]["score"], 1.0)
+        self.assertTrue(all(r["type"] == "part" for r in results))
+
+    def test_search_highlights(self):
+        """
+        一致箇所のハイライト情報が返ることをテスト
+        """
+        response = self.client.get(self.url, {"q": "ヘッド", "type": "part"})
+        result = next(r for r in response.data["results"] if r["id"] == self.head.id)
+        highlights = {h["field"]: h for h in result["highlights"]}
+        self.assertEqual(highlights["name"]["ranges"], [[5, 8]])
+        self.assertEqual(highlights["description"]["snippet"], "チタン製のﾍｯﾄﾞ")
+        self.assertEqual(highlights["description"]["ranges"], [[5, 9]])
+
+    def test_search_supplier_fields(self):
+        """
+        仕入先の担当者名・備考も検索対象になることをテスト
+        """
+        response = self.client.get(self.url, {"q": "山田", "type": "supplier"})
+        self.assertEqual(
+            [r["id"] for r in response.data["results"]], [self.supplier.id]
+        )
+
+        response = self.client.get(self.url, {"q": "シャフト", "type": "supplier"})
+        self.assertEqual(
+            response.data["results"][0]["highlights"][0]["field"], "remarks"
+        )
+
+    def test_search_document_follows_updates(self):
+        """
+        部品の更新・削除が検索ドキュメントに反映されることをテスト
+        """
+        self.shaft.name = "ヘッドカバー"
+        self.shaft.save()
+        response = self.client.get(self.url, {"q": "ヘッド", "type": "part"})
+        self.assertIn(self.shaft.id, [r["id"] for r in response.data["results"]])
+
+        self.shaft.delete()
+        self.assertFalse(
+            SearchDocument.objects.filter(
+                kind=SearchDocument.Kind.PART, object_id=self.shaft.id
+            ).exists()
+        )
+
+    def test_search_requires_query(self):
+        """
+        検索語がない場合は400エラーになることをテスト
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_unauthenticated(self):
+        """
+        未認証ユーザーは検索できないことをテスト
+        """
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {"q": "ヘッド"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
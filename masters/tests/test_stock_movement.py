@@ -0,0 +1,441 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters.models import Part, StockMovement, Supplier
+from masters.stock import (
+    InsufficientStockError,
+    get_low_stock_count,
+    record_movement,
+    record_movements,
+)
+
+User = get_user_model()
+
+
+def create_part(name="テスト部品", **kwargs):
+    supplier = Supplier.objects.create(
+        name="テストサプライヤー",
+        phone="03-1234-5678",
+        email="supplier@example.com",
+        postal_code="100-0001",
+        prefecture="東京都",
+        city="千代田区",
+        town="丸の内1-1-1",
+    )
+    return Part.objects.create(
+        name=name,
+        category="shaft",
+        supplier=supplier,
+        cost_price="100.00",
+        selling_price="200.00",
+        **kwargs,
+    )
+
+
+class StockMovementAPITest(APITestCase):
+    """
+    入出庫APIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.part = create_part(stock_quantity=10, reorder_level=5)
+        self.url = reverse("stock-movement-list")
+
+    def post(self, kind, quantity, **kwargs):
+        return self.client.post(
+            self.url,
+            {"part_id": self.part.id, "kind": kind, "quantity": quantity, **kwargs},
+            format="json",
+        )
+
+    def test_receipt(self):
+        """
+        入庫で在庫数が増え、履歴に登録者と理由が記録されることをテスト
+        """
+        response = self.post("receipt", 5, reason="定期納品")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["quantity"], 5)
+        self.assertEqual(response.data["part"]["stock_quantity"], 15)
+        self.assertEqual(response.data["created_by"]["id"], self.user.id)
+        movement = StockMovement.objects.get()
+        self.assertEqual(movement.kind, StockMovement.Kind.RECEIPT)
+        self.assertEqual(movement.reason, "定期納品")
+        self.assertEqual(movement.created_by, self.user)
+
+        part = Part.objects.get(pk=self.part.pk)
+        self.assertEqual(part.stock_quantity, 15)
+        # QuerySet.update でも更新日時が進む
+        self.assertGreater(part.updated_at, self.part.updated_at)
+
+    def test_issue(self):
+        """
+        出庫は数量を正の値で受け取り、負の増減数として記録することをテスト
+        """
+        response = self.post("issue", 4)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["quantity"], -4)
+        self.assertEqual(Part.objects.get(pk=self.part.pk).stock_quantity, 6)
+
+    def test_adjustment(self):
+        """
+        調整は正負どちらの増減数も受け付けることをテスト
+        """
+        self.assertEqual(self.post("adjustment", -3).status_code, 201)
+        self.assertEqual(self.post("adjustment", 1).status_code, 201)
+        self.assertEqual(Part.objects.get(pk=self.part.pk).stock_quantity, 8)
+
+    def test_insufficient_stock(self):
+        """
+        在庫数が不足する出庫・調整は400で、何も記録されないことをテスト
+        """
+        for kind, quantity in (("issue", 11), ("adjustment", -11)):
+            response = self.post(kind, quantity)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("quantity", response.data)
+        self.assertFalse(StockMovement.objects.exists())
+        self.assertEqual(Part.objects.get(pk=self.part.pk).stock_quantity, 10)
+
+        # 在庫数ちょうどの出庫はできる
+        self.assertEqual(self.post("issue", 10).status_code, 201)
+        self.assertEqual(Part.objects.get(pk=self.part.pk).stock_quantity, 0)
+
+    def test_invalid_quantity(self):
+        """
+        入庫・出庫の数量が1未満、調整の増減数が0の場合は400を返すことをテスト
+        """
+        for kind, quantity in (("receipt", 0), ("issue", -1), ("adjustment", 0)):
+            response = self.post(kind, quantity)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("quantity", response.data)
+        response = self.post("transfer", 1)
+        self.assertIn("kind", response.data)
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_low_stock_count_cleared(self):
+        """
+        入出庫の確定後に在庫不足数のキャッシュがクリアされることをテスト
+        """
+        self.assertEqual(get_low_stock_count(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post("issue", 6)
+        self.assertEqual(get_low_stock_count(), 1)
+
+    def test_list_filters(self):
+        """
+        一覧を部品・種別で絞り込めることをテスト（新しい順）
+        """
+        other = create_part("別の部品", stock_quantity=10)
+        self.post("receipt", 1)
+        self.post("issue", 2)
+        self.client.post(
+            self.url,
+            {"part_id": other.id, "kind": "receipt", "quantity": 3},
+            format="json",
+        )
+
+        response = self.client.get(self.url, {"part_id": self.part.id})
+        self.assertEqual([row["quantity"] for row in response.data["results"]], [-2, 1])
+        response = self.client.get(self.url, {"kind": "receipt"})
+        self.assertEqual([row["quantity"] for row in response.data["results"]], [3, 1])
+        response = self.client.get(self.url, {"kind": "unknown"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_append_only(self):
+        """
+        履歴は更新・削除できないことをテスト
+        """
+        movement_id = self.post("receipt", 1).data["id"]
+        detail_url = reverse("stock-movement-detail", args=[movement_id])
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_200_OK)
+        for method in (self.client.put, self.client.patch, self.client.delete):
+            response = method(detail_url, {"quantity": 100}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(StockMovement.objects.get().quantity, 1)
+
+    def test_part_with_movements_cannot_be_deleted(self):
+        """
+        入出庫の履歴がある部品は削除・一括削除できず409を返すことをテスト
+        """
+        self.post("receipt", 1)
+        self.post("issue", 1)
+
+        response = self.client.delete(reverse("part-detail", args=[self.part.id]))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        response = self.client.post(
+            reverse("part-bulk-delete"), {"ids": [self.part.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["protected"],
+            [{"id": self.part.id, "name": "テスト部品", "movement_count": 2}],
+        )
+        self.assertTrue(Part.objects.filter(pk=self.part.pk).exists())
+
+    def test_unauthenticated(self):
+        """
+        認証されていない場合は401を返すことをテスト
+        """
+        self.client.force_authenticate(user=None)
+        self.assertEqual(
+            self.post("receipt", 1).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+
+class StockMovementBatchAPITest(APITestCase):
+    """
+    入出庫の一括登録APIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.parts = [create_part(f"部品{i}", stock_quantity=10) for i in range(3)]
+        self.url = reverse("stock-movement-batch")
+
+    def item(self, index, kind, quantity, **kwargs):
+        return {
+            "part_id": self.parts[index].id,
+            "kind": kind,
+            "quantity": quantity,
+            **kwargs,
+        }
+
+    def stock(self):
+        return [Part.objects.get(pk=part.pk).stock_quantity for part in self.parts]
+
+    def test_batch(self):
+        """
+        入出庫をまとめて登録し、部品ごとの合計で在庫数が増減することをテスト
+        """
+        items = [
+            self.item(0, "receipt", 5, reason="納品"),
+            self.item(1, "issue", 3),
+            self.item(0, "issue", 2),
+            self.item(2, "adjustment", -10),
+        ]
+        response = self.client.post(self.url, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["succeeded"], 4)
+        results = response.data["results"]
+        self.assertEqual([r["data"]["quantity"] for r in results], [5, -3, -2, -10])
+        # レスポンスの在庫数は一括登録の後の値
+        self.assertEqual(results[0]["data"]["part"]["stock_quantity"], 13)
+        self.assertEqual(self.stock(), [13, 7, 0])
+
+        movements = StockMovement.objects.order_by("id")
+        self.assertEqual(
+            [(m.part_id, m.quantity) for m in movements],
+            [
+                (item["part_id"], r["data"]["quantity"])
+                for item, r in zip(items, results)
+            ],
+        )
+        self.assertTrue(all(m.created_by == self.user for m in movements))
+        self.assertEqual(movements[0].reason, "納品")
+
+    def test_batch_queries(self):
+        """
+        項目数によらずクエリ数が一定であることをテスト
+        """
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, [self.item(0, "receipt", 1)], format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(
+                self.url,
+                [self.item(i % 3, "receipt", 1) for i in range(60)],
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(self.stock(), [31, 30, 30])
+
+    def test_batch_insufficient_stock(self):
+        """
+        合計で在庫数が不足する部品がある場合は何も登録せず、部品ごとの不足を返すことをテスト
+        """
+        items = [
+            self.item(0, "issue", 6),
+            self.item(1, "receipt", 5),
+            self.item(0, "issue", 6),
+        ]
+        response = self.client.post(self.url, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["shortages"],
+            [
+                {
+                    "id": self.parts[0].id,
+                    "name": "部品0",
+                    "stock_quantity": 10,
+                    "quantity": -12,
+                }
+            ],
+        )
+        self.assertFalse(StockMovement.objects.exists())
+        self.assertEqual(self.stock(), [10, 10, 10])
+
+    def test_batch_validated_by_total(self):
+        """
+        在庫数は登録の順序ではなく部品ごとの合計で判定することをテスト
+        """
+        items = [self.item(0, "issue", 15), self.item(0, "receipt", 5)]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.stock(), [0, 10, 10])
+
+    def test_batch_item_errors(self):
+        """
+        エラーのある項目がある場合、既定では何も登録せず、atomic=false では正しい項目のみ登録することをテスト
+        """
+        items = [
+            self.item(0, "receipt", 1),
+            {"part_id": 999999, "kind": "receipt", "quantity": 1},
+            self.item(1, "issue", 0),
+        ]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data["results"]
+        self.assertIn("part_id", results[1]["errors"])
+        self.assertIn("quantity", results[2]["errors"])
+        self.assertFalse(StockMovement.objects.exists())
+
+        response = self.client.post(f"{self.url}?atomic=false", items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(StockMovement.objects.count(), 1)
+        self.assertEqual(self.stock(), [11, 10, 10])
+
+    def test_batch_append_only(self):
+        """
+        一括更新（PUT / PATCH）は受け付けないことをテスト
+        """
+        for method in (self.client.put, self.client.patch):
+            response = method(self.url, [self.item(0, "receipt", 1)], format="json")
+            self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class StockMovementConcurrencyTest(TransactionTestCase):
+    """
+    複数のスレッドから同時に入出庫を登録しても更新が失われないことのテスト
+
+    スレッドごとに別のデータベース接続・トランザクションで登録する
+    """
+
+    workers = 8
+    movements_per_worker = 25
+
+    def run_workers(self, target):
+        barrier = threading.Barrier(self.workers)
+
+        def run(index):
+            try:
+                barrier.wait()
+                return target(index)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            return list(executor.map(run, range(self.workers)))
+
+    def test_no_lost_updates(self):
+        """
+        入庫と出庫を同時に登録しても、在庫数が履歴の合計と一致することをテスト
+        """
+        part = create_part(stock_quantity=1000)
+
+        def work(index):
+            for i in range(self.movements_per_worker):
+                if (index + i) % 3:
+                    record_movement(part, StockMovement.Kind.RECEIPT, 2)
+                else:
+                    record_movement(part, StockMovement.Kind.ISSUE, -3)
+
+        self.run_workers(work)
+
+        movements = StockMovement.objects.filter(part=part)
+        self.assertEqual(movements.count(), self.workers * self.movements_per_worker)
+        total = sum(movements.values_list("quantity", flat=True))
+        self.assertEqual(Part.objects.get(pk=part.pk).stock_quantity, 1000 + total)
+
+    def test_concurrent_issues_never_oversell(self):
+        """
+        在庫数を超える出庫が同時に登録されても、在庫数が負にならないことをテスト
+        """
+        part = create_part(stock_quantity=50)
+
+        def work(index):
+            succeeded = 0
+            for _ in range(self.movements_per_worker):
+                try:
+                    record_movement(part, StockMovement.Kind.ISSUE, -1)
+                except InsufficientStockError:
+                    pass
+                else:
+                    succeeded += 1
+            return succeeded
+
+        succeeded = sum(self.run_workers(work))
+
+        self.assertEqual(succeeded, 50)
+        self.assertEqual(StockMovement.objects.filter(part=part).count(), 50)
+        self.assertEqual(Part.objects.get(pk=part.pk).stock_quantity, 0)
+
+    def test_concurrent_batches_without_deadlock(self):
+        """
+        同じ部品を異なる順序で含む一括登録を同時に行っても、デッドロックせず更新が失われないことをテスト
+        """
+        parts = [create_part(f"部品{i}", stock_quantity=1000) for i in range(5)]
+
+        def work(index):
+            order = parts if index % 2 else parts[::-1]
+            for _ in range(self.movements_per_worker // 5):
+                record_movements(
+                    [
+                        {
+                            "part": part,
+                            "kind": StockMovement.Kind.ADJUSTMENT,
+                            "quantity": 1 if index % 2 else -1,
+                        }
+                        for part in order
+                    ]
+                )
+
+        self.run_workers(work)
+
+        for part in parts:
+            movements = StockMovement.objects.filter(part=part)
+            total = sum(movements.values_list("quantity", flat=True))
+            self.assertEqual(movements.count(), self.workers * 5)
+            self.assertEqual(Part.objects.get(pk=part.pk).stock_quantity, 1000 + total)
@@ -0,0 +1,304 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+import io
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from masters import stocktaking
+from masters.models import (
+    Part,
+    StockMovement,
+    StockSnapshot,
+    StockSnapshotItem,
+    StocktakingSheet,
+    Supplier,
+)
+from masters.stock import annotate_stock_as_of, record_movement, take_stock_snapshot
+from masters.tests.test_stocktaking import RecordingWriter
+
+User = get_user_model()
+
+
+class StockAsOfTestMixin:
+    """
+    過去の日時の在庫数のテストの共通処理
+
+    入出庫・スナップショットの日時は登録後に過去の日時へ書き換える
+    """
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.supplier = Supplier.objects.create(
+            name="テストサプライヤー",
+            phone="03-1234-5678",
+            email="supplier@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        # 10日前に在庫数10で登録し、8日前に +5、4日前に -3（スナップショットは6日前）
+        self.part = self.create_part("テスト部品", days_ago=10)
+        self.move(self.part, 5, days_ago=8)
+        self.snapshot = self.take_snapshot(days_ago=6)
+        self.move(self.part, -3, days_ago=4)
+
+    def ago(self, days):
+        return self.now - timedelta(days=days)
+
+    def create_part(self, name, days_ago, stock_quantity=10):
+        part = Part.objects.create(
+            name=name,
+            category="shaft",
+            supplier=self.supplier,
+            cost_price=Decimal("100.00"),
+            selling_price=Decimal("200.00"),
+            stock_quantity=stock_quantity,
+        )
+        Part.objects.filter(pk=part.pk).update(created_at=self.ago(days_ago))
+        return part
+
+    def move(self, part, quantity, days_ago):
+        kind = StockMovement.Kind.RECEIPT if quantity > 0 else StockMovement.Kind.ISSUE
+        movement = record_movement(part, kind, quantity)
+        StockMovement.objects.filter(pk=movement.pk).update(
+            created_at=self.ago(days_ago)
+        )
+        return movement
+
+    def take_snapshot(self, days_ago):
+        snapshot = take_stock_snapshot()
+        StockSnapshot.objects.filter(pk=snapshot.pk).update(taken_at=self.ago(days_ago))
+        return snapshot
+
+    def stock_as_of(self, as_of):
+        return dict(
+            annotate_stock_as_of(Part.objects.all(), as_of).values_list(
+                "name", "stock_quantity_as_of"
+            )
+        )
+
+
+class StockAsOfTest(StockAsOfTestMixin, TestCase):
+    """
+    スナップショットと入出庫から過去の日時の在庫数を求める処理のテストクラス
+    """
+
+    def test_stock_as_of(self):
+        """
+        各時点の在庫数を求め、その時点で未登録の部品は含めないことをテスト
+        """
+        self.assertEqual(self.stock_as_of(self.ago(11)), {})
+        self.assertEqual(self.stock_as_of(self.ago(9)), {"テスト部品": 10})
+        # スナップショットより前（現在の在庫数から後の入出庫を引く）
+        self.assertEqual(self.stock_as_of(self.ago(7)), {"テスト部品": 15})
+        # スナップショットより後（スナップショットに後の入出庫を足す）
+        self.assertEqual(self.stock_as_of(self.ago(5)), {"テスト部品": 15})
+        self.assertEqual(self.stock_as_of(self.ago(1)), {"テスト部品": 12})
+
+    def test_replays_from_snapshot(self):
+        """
+        スナップショット以降は、スナップショットの在庫数と後の入出庫のみから求めることをテスト
+        """
+        StockSnapshotItem.objects.filter(snapshot=self.snapshot).update(
+            stock_quantity=100
+        )
+        self.assertEqual(self.stock_as_of(self.ago(5)), {"テスト部品": 100})
+        self.assertEqual(self.stock_as_of(self.ago(1)), {"テスト部品": 97})
+        # スナップショットより前は影響しない
+        self.assertEqual(self.stock_as_of(self.ago(7)), {"テスト部品": 15})
+
+    def test_part_created_after_snapshot(self):
+        """
+        スナップショットの後に登録した部品は現在の在庫数から求めることをテスト
+        """
+        part = self.create_part("新しい部品", days_ago=3, stock_quantity=7)
+        self.move(part, 2, days_ago=2)
+        self.assertEqual(
+            self.stock_as_of(self.ago(2.5)), {"テスト部品": 12, "新しい部品": 7}
+        )
+        self.assertEqual(
+            self.stock_as_of(self.ago(1)), {"テスト部品": 12, "新しい部品": 9}
+        )
+
+    def test_take_stock_snapshot(self):
+        """
+        すべての部品の在庫数と最後の入出庫のIDを保存することをテスト
+        """
+        self.create_part("在庫なし", days_ago=1, stock_quantity=0)
+        last = self.move(self.part, 1, days_ago=0)
+        call_command("take_stock_snapshot", stdout=io.StringIO())
+
+        snapshot = StockSnapshot.objects.order_by("-pk").first()
+        self.assertEqual(snapshot.part_count, 2)
+        self.assertEqual(snapshot.last_movement_id, last.pk)
+        self.assertEqual(
+            dict(snapshot.items.values_list("part__name", "stock_quantity")),
+            {"テスト部品": 13, "在庫なし": 0},
+        )
+
+    def test_snapshot_query_count(self):
+        """
+        部品・入出庫の件数によらず、クエリ数が一定であることをテスト
+        """
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.stock_as_of(self.ago(1))
+            return len(queries)
+
+        before = count_queries()
+        for i in range(5):
+            part = self.create_part(f"追加部品{i}", days_ago=9)
+            self.move(part, 1, days_ago=2)
+        self.assertEqual(count_queries(), before)
+
+
+class StockAsOfAPITest(StockAsOfTestMixin, APITestCase):
+    """
+    部品一覧・棚卸表の基準日時（as_of）と、部品の更新での在庫数の変更の記録のテストクラス
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("part-list")
+
+    def test_list_as_of(self):
+        """
+        一覧で as_of を指定すると、その時点の在庫数を stock_quantity_as_of に出力することをテスト
+        """
+        self.create_part("新しい部品", days_ago=1)
+        response = self.client.get(self.list_url, {"as_of": self.ago(5).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["stock_quantity"], 12)
+        self.assertEqual(results[0]["stock_quantity_as_of"], 15)
+
+        response = self.client.get(self.list_url)
+        self.assertNotIn("stock_quantity_as_of", response.data["results"][0])
+
+    def test_list_as_of_date(self):
+        """
+        日付のみの場合はその日の終わりの在庫数になることをテスト
+        """
+        day = timezone.localdate(self.ago(4))
+        StockMovement.objects.filter(part=self.part, quantity=-3).update(
+            created_at=timezone.make_aware(datetime.combine(day, time.min))
+        )
+        response = self.client.get(self.list_url, {"as_of": day.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["stock_quantity_as_of"], 12)
+
+        response = self.client.get(self.list_url, {"as_of": "2026-13-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_records_adjustment(self):
+        """
+        部品の更新で在庫数を変更すると、差分が調整の入出庫として記録されることをテスト
+        """
+        url = reverse("part-detail", args=[self.part.id])
+        response = self.client.patch(url, {"stock_quantity": 20}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        movement = StockMovement.objects.filter(part=self.part).first()
+        self.assertEqual(movement.kind, StockMovement.Kind.ADJUSTMENT)
+        self.assertEqual(movement.quantity, 8)
+        self.assertEqual(movement.created_by, self.user)
+        self.assertEqual(
+            self.stock_as_of(self.now + timedelta(seconds=1)), {"テスト部品": 20}
+        )
+
+        # 在庫数を変更しない更新は記録しない
+        self.client.patch(url, {"name": "名前の変更"}, format="json")
+        self.assertEqual(StockMovement.objects.filter(part=self.part).count(), 3)
+
+    def test_update_keeps_concurrent_movements(self):
+        """
+        在庫数を指定しない更新では、読み込んだ後に登録された入出庫を上書きしないことをテスト
+        """
+        url = reverse("part-detail", args=[self.part.id])
+        original = Part.objects.get(pk=self.part.pk)
+
+        def get_object(view):
+            # 更新対象を読み込んだ後に別のリクエストで入庫された状況
+            record_movement(self.part, StockMovement.Kind.RECEIPT, 4)
+            return original
+
+        with patch("masters.views.part.PartViewSet.get_object", get_object):
+            response = self.client.patch(url, {"name": "名前の変更"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.part.refresh_from_db()
+        self.assertEqual(self.part.stock_quantity, 16)
+        self.assertFalse(
+            StockMovement.objects.filter(kind=StockMovement.Kind.ADJUSTMENT).exists()
+        )
+
+    def test_batch_update_records_adjustments(self):
+        """
+        一括更新で在庫数を変更した部品のみ調整の入出庫が記録されることをテスト
+        """
+        other = self.create_part("他の部品", days_ago=1)
+        response = self.client.patch(
+            reverse("part-batch"),
+            [
+                {"id": self.part.id, "stock_quantity": 2},
+                {"id": other.id, "name": "変更"},
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        adjustments = StockMovement.objects.filter(
+            kind=StockMovement.Kind.ADJUSTMENT
+        ).values_list("part_id", "quantity")
+        self.assertEqual(list(adjustments), [(self.part.id, -10)])
+
+    def test_bulk_delete_part_in_snapshot(self):
+        """
+        スナップショットに含まれる（入出庫の履歴がない）部品も一括削除できることをテスト
+        """
+        part = self.create_part("削除する部品", days_ago=9)
+        take_stock_snapshot()
+        response = self.client.post(
+            reverse("part-bulk-delete"), {"ids": [part.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(StockSnapshotItem.objects.filter(part_id=part.id).exists())
+
+    def test_stocktaking_sheet_as_of(self):
+        """
+        棚卸表の作成で as_of を指定すると、その時点の部品と在庫数を出力することをテスト
+        """
+        self.create_part("新しい部品", days_ago=1)
+        with patch("masters.views.stocktaking.enqueue_stocktaking_sheet"):
+            response = self.client.post(
+                reverse("stocktaking-sheet-list"),
+                {"format": "xlsx", "as_of": self.ago(5).isoformat()},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIsNotNone(response.data["as_of"])
+
+        sheet = StocktakingSheet.objects.get(pk=response.data["id"])
+        with patch.dict(stocktaking.WRITERS, {sheet.format: RecordingWriter}):
+            count = stocktaking.build_stocktaking_sheet(sheet, "unused")
+        self.assertEqual(count, 1)
+        rows = [call for call in RecordingWriter.instance.calls if call[0] == "row"]
+        self.assertEqual(rows, [("row", "テスト部品", 15, Decimal("1500.00"))])
+        self.assertIn("基準日時", stocktaking.describe_conditions(sheet))
@@ -0,0 +1,364 @@
+import datetime
+from decimal import Decimal
+import io
+from unittest.mock import patch
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from masters import jobs, stocktaking
+from masters.pdf import StreamingPdf
+from masters.models import Supplier, Part, StocktakingSheet
+
+User = get_user_model()
+
+
+def create_supplier(name, user=None):
+    return Supplier.objects.create(
+        name=name,
+        phone="03-1234-5678",
+        email="supplier@example.com",
+        postal_code="100-0001",
+        prefecture="東京都",
+        city="千代田区",
+        town="丸の内1-1-1",
+        created_by=user,
+        updated_by=user,
+    )
+
+
+def create_part(name, category, supplier, quantity, cost_price):
+    return Part.objects.create(
+        name=name,
+        category=category,
+        supplier=supplier,
+        cost_price=Decimal(cost_price),
+        selling_price=Decimal("0.00"),
+        stock_quantity=quantity,
+    )
+
+
+class RecordingWriter:
+    """
+    書き出しの呼び出しを記録するテスト用のライター
+    """
+
+    def __init__(self, path, title, subtitle):
+        self.calls = [("title", title)]
+        RecordingWriter.instance = self
+
+    def write_group(self, label, level=0):
+        self.calls.append(("group", level, label))
+
+    def write_row(self, part_id, name, quantity, cost_price, value):
+        self.calls.append(("row", name, quantity, value))
+
+    def write_total(self, label, total):
+        self.calls.append(("total", label, total.quantity, total.value))
+
+    def close(self):
+        self.calls.append(("close",))
+
+
+class StocktakingSheetBuildTest(TestCase):
+    """
+    棚卸表の内容（グループ・小計・合計）のテストクラス
+    """
+
+    def setUp(self):
+        self.supplier_a = create_supplier("A商事")
+        self.supplier_b = create_supplier("B工業")
+        create_part("シャフト1", Part.Category.SHAFT, self.supplier_a, 3, "100.00")
+        create_part("ヘッド1", Part.Category.HEAD, self.supplier_b, 2, "1000.50")
+        create_part("ヘッド2", Part.Category.HEAD, self.supplier_a, 1, "10.00")
+        create_part("ヘッド3", Part.Category.HEAD, self.supplier_a, 4, "0.25")
+
+    def build(self, **conditions):
+        sheet = StocktakingSheet(format=StocktakingSheet.Format.XLSX, **conditions)
+        progress = []
+        with patch.dict(stocktaking.WRITERS, {sheet.format: RecordingWriter}):
+            count = stocktaking.build_stocktaking_sheet(
+                sheet, "unused", progress.append
+            )
+        return count, RecordingWriter.instance.calls[1:], progress
+
+    def test_groups_and_totals(self):
+        """
+        カテゴリ（選択肢の順）・仕入先ごとにまとめ、小計・総合計を出力することをテスト
+        """
+        count, calls, _ = self.build()
+        self.assertEqual(count, 4)
+        self.assertEqual(
+            calls,
+            [
+                ("group", 0, "ヘッド"),
+                ("group", 1, "A商事"),
+                ("row", "ヘッド2", 1, Decimal("10.00")),
+                ("row", "ヘッド3", 4, Decimal("1.00")),
+                ("total", "A商事 計", 5, Decimal("11.00")),
+                ("group", 1, "B工業"),
+                ("row", "ヘッド1", 2, Decimal("2001.00")),
+                ("total", "B工業 計", 2, Decimal("2001.00")),
+                ("total", "ヘッド 計", 7, Decimal("2012.00")),
+                ("group", 0, "シャフト"),
+                ("group", 1, "A商事"),
+                ("row", "シャフト1", 3, Decimal("300.00")),
+                ("total", "A商事 計", 3, Decimal("300.00")),
+                ("total", "シャフト 計", 3, Decimal("300.00")),
+                ("total", "総合計", 10, Decimal("2312.00")),
+                ("close",),
+            ],
+        )
+
+    def test_conditions(self):
+        """
+        カテゴリ・仕入先で絞り込めることをテスト
+        """
+        count, calls, _ = self.build(
+            category=Part.Category.HEAD, supplier=self.supplier_a
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual(calls[-2], ("total", "総合計", 5, Decimal("11.00")))
+
+    def test_archived_parts_are_excluded(self):
+        """
+        アーカイブした部品は棚卸表に含めないことをテスト
+        """
+        archived = create_part(
+            "アーカイブした部品", Part.Category.HEAD, self.supplier_a, 9, "1.00"
+        )
+        Part.objects.filter(pk=archived.pk).update(archived_at=timezone.now())
+
+        count, calls, _ = self.build()
+
+        self.assertEqual(count, 4)
+        self.assertNotIn("アーカイブした部品", [call[1] for call in calls[:-1]])
+        self.assertEqual(calls[-2], ("total", "総合計", 10, Decimal("2312.00")))
+
+    def test_empty(self):
+        """
+        対象の部品がない場合は総合計のみ出力することをテスト
+        """
+        count, calls, _ = self.build(category=Part.Category.GRIP)
+        self.assertEqual(count, 0)
+        self.assertEqual(calls, [("total", "総合計", 0, Decimal("0")), ("close",)])
+
+    def test_progress(self):
+        """
+        一定の行数ごとに進捗を通知することをテスト
+        """
+        with patch.object(stocktaking, "PROGRESS_INTERVAL", 2):
+            _, _, progress = self.build()
+        self.assertEqual(progress, [2, 4])
+
+
+class StreamingPdfTest(SimpleTestCase):
+    """
+    1ページずつ書き出すPDFライターのテストクラス
+    """
+
+    def test_structure(self):
+        """
+        ページ数・日本語の文字列・相互参照表の位置が正しいことをテスト
+        """
+        buffer = io.BytesIO()
+        pdf = StreamingPdf(buffer, (595, 842), "HeiseiKakuGo-W5", title="棚卸表")
+        pdf.set_font(9)
+        for _ in range(3):
+            pdf.draw_string(10, 800, "在庫")
+            pdf.draw_right_string(500, 800, "1,234")
+            pdf.line(10, 790, 500, 790)
+            pdf.show_page()
+        pdf.close()
+        content = buffer.getvalue()
+
+        self.assertTrue(content.startswith(b"%PDF-1.4"))
+        self.assertTrue(content.endswith(b"%%EOF\n"))
+        self.assertIn(b"/Count 3", content)
+        self.assertIn(b"/Encoding /UniJIS-UCS2-H", content)
+        self.assertIn(b"/DW 1000 /W [1 [277 305", content)
+        xref = int(content.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+        lines = content[xref:].split(b"\n")
+        count = int(lines[1].split()[1])
+        for object_id in range(1, count):
+            offset = int(lines[2 + object_id][:10])
+            self.assertTrue(content[offset:].startswith(b"%d 0 obj" % object_id))
+
+    def test_right_aligned_width(self):
+        """
+        右寄せの文字幅は全角・半角の幅で計算することをテスト
+        """
+        pdf = StreamingPdf(io.BytesIO(), (595, 842), "HeiseiKakuGo-W5")
+        pdf.set_font(10)
+        self.assertEqual(pdf.string_width("在庫"), 20)
+        self.assertLess(pdf.string_width("12"), 20)
+
+    def test_unsupported_font(self):
+        """
+        フォントの定義を持たないフォントは指定できないことをテスト
+        """
+        with self.assertRaises(ValueError):
+            StreamingPdf(io.BytesIO(), (595, 842), "HeiseiMin-W3")
+
+
+class StocktakingSheetAPITest(APITestCase):
+    """
+    棚卸表の作成ジョブAPIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = create_supplier("A商事", self.user)
+        for i in range(3):
+            create_part(f"ヘッド{i}", Part.Category.HEAD, self.supplier, i, "100.00")
+        self.url = reverse("stocktaking-sheet-list")
+
+    def create_sheet(self, **data):
+        response = self.client.post(self.url, {"format": "xlsx", **data}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        return response.data["id"]
+
+    def download(self, pk):
+        response = self.client.get(reverse("stocktaking-sheet-detail", args=[pk]))
+        self.assertEqual(response.data["status"], "succeeded")
+        self.assertEqual(response.data["progress"], 100)
+        self.assertEqual(response.data["processed_rows"], 3)
+        response = self.client.get(response.data["download_url"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, b"".join(response.streaming_content)
+
+    def test_create_and_download_xlsx(self):
+        """
+        XLSXの棚卸表を作成してダウンロードできることをテスト
+        """
+        pk = self.create_sheet()
+        self.assertEqual(jobs.run_pending_jobs(), 1)
+
+        response, content = self.download(pk)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        self.assertIn(".xlsx", response["Content-Disposition"])
+        with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+            xml = "".join(
+                workbook.read(name).decode("utf-8")
+                for name in workbook.namelist()
+                if name.startswith("xl/worksheets/") or name == "xl/sharedStrings.xml"
+            )
+        for text in ("棚卸表", "A商事", "ヘッド2", "総合計"):
+            self.assertIn(text, xml)
+
+    def test_create_and_download_pdf(self):
+        """
+        PDFの棚卸表を作成してダウンロードできることをテスト
+        """
+        pk = self.create_sheet(format="pdf", supplier_id=self.supplier.id)
+        jobs.run_pending_jobs()
+        response, content = self.download(pk)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(content.startswith(b"%PDF"))
+
+    def test_download_before_finished(self):
+        """
+        作成が完了する前のダウンロードは409を返すことをテスト
+        """
+        pk = self.create_sheet()
+        detail = self.client.get(reverse("stocktaking-sheet-detail", args=[pk]))
+        self.assertIsNone(detail.data["download_url"])
+        response = self.client.get(reverse("stocktaking-sheet-download", args=[pk]))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_invalid_request(self):
+        """
+        不正な形式・条件は400、未認証は401を返すことをテスト
+        """
+        for data in ({"format": "csv"}, {"format": "xlsx", "category": "unknown"}):
+            response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = APIClient().post(self.url, {"format": "xlsx"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_failed_job(self):
+        """
+        作成に失敗した場合は状態を failed にしてエラー内容を保存することをテスト
+        """
+        pk = self.create_sheet()
+        with patch.object(
+            jobs, "build_stocktaking_sheet", side_effect=RuntimeError("書き込みエラー")
+        ), self.assertLogs("masters.jobs", level="ERROR"):
+            jobs.run_pending_jobs()
+        sheet = StocktakingSheet.objects.get(pk=pk)
+        self.assertEqual(sheet.status, StocktakingSheet.Status.FAILED)
+        self.assertEqual(sheet.error, "書き込みエラー")
+
+    def test_job_runs_once(self):
+        """
+        実行中・完了したジョブは再び実行されないことをテスト
+        """
+        pk = self.create_sheet()
+        self.assertTrue(jobs.run_stocktaking_sheet(pk))
+        self.assertFalse(jobs.run_stocktaking_sheet(pk))
+        self.assertEqual(jobs.run_pending_jobs(), 0)
+
+    @override_settings(JOB_TIMEOUT=600)
+    def test_stale_running_job_is_reclaimed(self):
+        """
+        開始から JOB_TIMEOUT を過ぎても作成中のままのジョブは実行し直すことをテスト
+        """
+        pk = self.create_sheet()
+        stale_started_at = timezone.now() - datetime.timedelta(seconds=601)
+        StocktakingSheet.objects.filter(pk=pk).update(
+            status=StocktakingSheet.Status.RUNNING, started_at=timezone.now()
+        )
+        self.assertEqual(jobs.run_pending_jobs(), 0)
+
+        StocktakingSheet.objects.filter(pk=pk).update(started_at=stale_started_at)
+        self.assertEqual(jobs.run_pending_jobs(), 1)
+        self.download(pk)
+        sheet = StocktakingSheet.objects.get(pk=pk)
+        self.assertGreater(sheet.started_at, stale_started_at)
+
+    @override_settings(JOB_RUNNER="thread", JOB_TIMEOUT=600)
+    def test_thread_runner_resumes_stale_job(self):
+        """
+        スレッドで実行する設定では、止まったジョブを進捗の確認時に実行し直すことをテスト
+        """
+        with patch.object(jobs, "start_thread"):
+            pk = self.create_sheet()
+        url = reverse("stocktaking-sheet-detail", args=[pk])
+        sheets = StocktakingSheet.objects.filter(pk=pk)
+        sheets.update(status=StocktakingSheet.Status.RUNNING, started_at=timezone.now())
+
+        with patch.object(jobs, "start_thread") as start_thread:
+            self.client.get(url)
+            start_thread.assert_not_called()
+
+            sheets.update(started_at=timezone.now() - datetime.timedelta(seconds=601))
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        start_thread.assert_called_once_with(pk)
+
+    @override_settings(JOB_RUNNER="thread")
+    def test_thread_runner_starts_after_commit(self):
+        """
+        スレッドで実行する設定では、トランザクションの確定後にスレッドを起動することをテスト
+        """
+        with patch.object(jobs, "start_thread") as start_thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                pk = self.create_sheet()
+                start_thread.assert_not_called()
+        start_thread.assert_called_once_with(pk)
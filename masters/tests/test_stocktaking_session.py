@@ -0,0 +1,344 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from masters.models import (
+    Part,
+    StockMovement,
+    StocktakingCount,
+    StocktakingSession,
+    Supplier,
+)
+from masters.stock import record_movement
+
+User = get_user_model()
+
+
+class StocktakingSessionAPITest(APITestCase):
+    """
+    棚卸の実施（開始・実棚数の登録・集計・確定）のAPIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="太郎",
+            last_name="山田",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.supplier = Supplier.objects.create(
+            name="テストサプライヤー",
+            phone="03-1234-5678",
+            email="supplier@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+        )
+        self.parts = [
+            self.create_part(f"テスト部品{i}", stock_quantity=10, cost_price="100.00")
+            for i in range(3)
+        ]
+        self.list_url = reverse("stocktaking-session-list")
+
+    def create_part(self, name, stock_quantity, cost_price, **kwargs):
+        return Part.objects.create(
+            name=name,
+            supplier=self.supplier,
+            cost_price=Decimal(cost_price),
+            selling_price=Decimal("200.00"),
+            stock_quantity=stock_quantity,
+            **{"category": "shaft", **kwargs},
+        )
+
+    def start(self, **data):
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def url(self, session, name):
+        return reverse(f"stocktaking-session-{name}", args=[session["id"]])
+
+    def post_counts(self, session, counts):
+        return self.client.post(
+            self.url(session, "counts"),
+            [
+                {"part_id": part.id, "counted_quantity": quantity}
+                for part, quantity in counts
+            ],
+            format="json",
+        )
+
+    def test_start_freezes_expected_quantities(self):
+        """
+        開始時の在庫数・原価が帳簿在庫数として固定され、アーカイブした部品は含まれないことをテスト
+        """
+        self.create_part("アーカイブ部品", 5, "10.00", archived_at="2026-01-01T00:00Z")
+        session = self.start(name="期末棚卸")
+        self.assertEqual(session["status"], StocktakingSession.Status.OPEN)
+        self.assertEqual(session["item_count"], 3)
+
+        record_movement(self.parts[0], StockMovement.Kind.RECEIPT, 5)
+        Part.objects.filter(pk=self.parts[1].pk).update(cost_price=Decimal("999"))
+
+        counts = StocktakingCount.objects.filter(session_id=session["id"])
+        self.assertEqual(
+            sorted(counts.values_list("expected_quantity", "cost_price")),
+            [(10, Decimal("100.00"))] * 3,
+        )
+
+    def test_start_with_conditions(self):
+        """
+        カテゴリ・仕入先で対象の部品を絞り込めることをテスト
+        """
+        self.create_part("ヘッド", 1, "1.00", category="head")
+        session = self.start(category="head")
+        self.assertEqual(session["item_count"], 1)
+
+    def test_counts_are_idempotent(self):
+        """
+        同じ実棚数を再送しても結果が変わらず、後から送った値で上書きされることをテスト
+        """
+        session = self.start()
+        counts = [(self.parts[0], 8), (self.parts[1], 10)]
+        for _ in range(2):
+            response = self.post_counts(session, counts)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["saved"], 2)
+        self.assertEqual(
+            StocktakingCount.objects.filter(session_id=session["id"]).count(), 3
+        )
+
+        self.post_counts(session, [(self.parts[0], 9)])
+        count = StocktakingCount.objects.get(
+            session_id=session["id"], part=self.parts[0]
+        )
+        self.assertEqual(count.counted_quantity, 9)
+        self.assertEqual(count.expected_quantity, 10)
+        self.assertEqual(count.counted_by, self.user)
+
+    def test_count_part_outside_session(self):
+        """
+        対象外の部品は登録時の在庫数を帳簿在庫数として追加されることをテスト
+        """
+        session = self.start()
+        extra = self.create_part("開始後の部品", 4, "50.00")
+        response = self.post_counts(session, [(extra, 6)])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        count = StocktakingCount.objects.get(session_id=session["id"], part=extra)
+        self.assertEqual(count.expected_quantity, 4)
+        self.assertEqual(count.cost_price, Decimal("50.00"))
+
+    def test_counts_invalid(self):
+        """
+        エラーのある項目がある場合は何も登録せず、項目ごとのエラーを返すことをテスト
+        """
+        session = self.start()
+        response = self.client.post(
+            self.url(session, "counts"),
+            [
+                {"part_id": self.parts[0].id, "counted_quantity": 5},
+                {"part_id": self.parts[1].id, "counted_quantity": -1},
+                {"part_id": 999999, "counted_quantity": 1},
+                {"part_id": self.parts[0].id, "counted_quantity": 6},
+                "abc",
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [error["index"] for error in response.data["errors"]], [1, 2, 3, 4]
+        )
+        self.assertFalse(
+            StocktakingCount.objects.filter(
+                session_id=session["id"], counted_quantity__isnull=False
+            ).exists()
+        )
+
+        response = self.client.post(self.url(session, "counts"), [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_counts_queries(self):
+        """
+        実棚数の登録のクエリ数が件数によらず一定であることをテスト
+        """
+        extra = [self.create_part(f"追加部品{i}", 1, "1.00") for i in range(20)]
+        session = self.start()
+        with CaptureQueriesContext(connection) as small:
+            self.post_counts(session, [(self.parts[0], 1)])
+        with CaptureQueriesContext(connection) as large:
+            response = self.post_counts(session, [(part, 2) for part in extra])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small), len(large))
+
+    def test_list_counts_with_variance(self):
+        """
+        明細の一覧に差異・差異金額が含まれ、状態で絞り込めることをテスト
+        """
+        session = self.start()
+        self.post_counts(session, [(self.parts[0], 7), (self.parts[1], 10)])
+
+        response = self.client.get(self.url(session, "counts"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {row["part"]["id"]: row for row in response.data["results"]}
+        self.assertEqual(rows[self.parts[0].id]["variance"], -3)
+        self.assertEqual(rows[self.parts[0].id]["value_impact"], "-300.00")
+        self.assertEqual(rows[self.parts[1].id]["variance"], 0)
+        self.assertIsNone(rows[self.parts[2].id]["variance"])
+
+        def ids(state):
+            response = self.client.get(self.url(session, "counts"), {"status": state})
+            return [row["part"]["id"] for row in response.data["results"]]
+
+        self.assertEqual(ids("variance"), [self.parts[0].id])
+        self.assertEqual(ids("counted"), [self.parts[0].id, self.parts[1].id])
+        self.assertEqual(ids("uncounted"), [self.parts[2].id])
+        response = self.client.get(self.url(session, "counts"), {"status": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_summary(self):
+        """
+        件数・差異・差異金額の集計をテスト
+        """
+        expensive = self.create_part("高額部品", 2, "1000.00")
+        session = self.start()
+        self.post_counts(
+            session, [(self.parts[0], 7), (self.parts[1], 12), (expensive, 1)]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url(session, "summary"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = response.data
+        self.assertEqual(summary["item_count"], 4)
+        self.assertEqual(summary["counted_count"], 3)
+        self.assertEqual(summary["uncounted_count"], 1)
+        self.assertEqual(summary["variance_count"], 3)
+        self.assertEqual(summary["shortage_quantity"], -4)
+        self.assertEqual(summary["surplus_quantity"], 2)
+        self.assertEqual(Decimal(summary["shortage_value"]), Decimal("-1300.00"))
+        self.assertEqual(Decimal(summary["surplus_value"]), Decimal("200.00"))
+        self.assertEqual(Decimal(summary["net_value"]), Decimal("-1100.00"))
+        self.assertEqual(Decimal(summary["expected_value"]), Decimal("4000.00"))
+        self.assertEqual(Decimal(summary["counted_value"]), Decimal("2900.00"))
+        # 認証・棚卸の取得・集計
+        self.assertLessEqual(len(queries), 3)
+
+    def test_finalize_posts_adjustments(self):
+        """
+        確定で差のある部品のみ在庫数が調整され、調整の入出庫が登録されることをテスト
+        """
+        session = self.start()
+        self.post_counts(session, [(self.parts[0], 7), (self.parts[1], 10)])
+        # 実施中の入庫は在庫数に残る
+        record_movement(self.parts[0], StockMovement.Kind.RECEIPT, 5)
+
+        response = self.client.post(self.url(session, "finalize"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], StocktakingSession.Status.FINALIZED)
+        self.assertEqual(response.data["adjustment_count"], 1)
+        self.assertEqual(response.data["finalized_by"]["id"], self.user.id)
+
+        stocks = dict(Part.objects.values_list("id", "stock_quantity"))
+        self.assertEqual(stocks[self.parts[0].id], 12)
+        self.assertEqual(stocks[self.parts[1].id], 10)
+        self.assertEqual(stocks[self.parts[2].id], 10)
+        adjustment = StockMovement.objects.get(kind=StockMovement.Kind.ADJUSTMENT)
+        self.assertEqual(adjustment.part_id, self.parts[0].id)
+        self.assertEqual(adjustment.quantity, -3)
+        self.assertEqual(adjustment.created_by, self.user)
+        self.assertIn(f"棚卸 #{session['id']}", adjustment.reason)
+
+        # 確定後は登録・確定・中止できない
+        response = self.post_counts(session, [(self.parts[2], 1)])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        for name in ("finalize", "cancel"):
+            response = self.client.post(self.url(session, name))
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(StockMovement.objects.count(), 2)
+
+    def test_finalize_queries(self):
+        """
+        確定のクエリ数が調整する部品の件数によらず一定であることをテスト
+        """
+
+        def finalize(parts):
+            session = self.start()
+            self.post_counts(session, [(part, 1) for part in parts])
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url(session, "finalize"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        small = finalize(self.parts[:1])
+        extra = [self.create_part(f"追加部品{i}", 5, "1.00") for i in range(20)]
+        self.assertEqual(finalize(extra), small)
+
+    def test_finalize_insufficient_stock(self):
+        """
+        実施中の出庫で在庫数が負になる部品がある場合は何も調整せず409を返すことをテスト
+        """
+        session = self.start()
+        self.post_counts(session, [(self.parts[0], 2), (self.parts[1], 12)])
+        record_movement(self.parts[0], StockMovement.Kind.ISSUE, -9)
+
+        response = self.client.post(self.url(session, "finalize"))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["shortages"],
+            [
+                {
+                    "id": self.parts[0].id,
+                    "name": "テスト部品0",
+                    "stock_quantity": 1,
+                    "quantity": -8,
+                }
+            ],
+        )
+        self.assertEqual(Part.objects.get(pk=self.parts[1].pk).stock_quantity, 10)
+        self.assertFalse(
+            StockMovement.objects.filter(kind=StockMovement.Kind.ADJUSTMENT).exists()
+        )
+        self.assertEqual(
+            StocktakingSession.objects.get(pk=session["id"]).status,
+            StocktakingSession.Status.OPEN,
+        )
+
+    def test_cancel(self):
+        """
+        中止した棚卸には実棚数を登録できないことをテスト
+        """
+        session = self.start()
+        response = self.client.post(self.url(session, "cancel"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], StocktakingSession.Status.CANCELLED)
+        response = self.post_counts(session, [(self.parts[0], 1)])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_bulk_delete_counted_part(self):
+        """
+        棚卸の明細がある部品も一括削除できることをテスト
+        """
+        self.start()
+        response = self.client.post(
+            reverse("part-bulk-delete"), {"ids": [self.parts[2].id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(StocktakingCount.objects.filter(part=self.parts[2]).exists())
+
+    def test_unauthenticated(self):
+        """
+        認証されていない場合は401を返すことをテスト
+        """
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.list_url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -2,7 +2,16 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
-from masters.models import Supplier
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from masters.autocomplete import autocomplete_cache
+from masters.models import (
+    Part,
+    SearchDocument,
+    StocktakingSession,
+    StocktakingSheet,
+    Supplier,
+)
 from unittest.mock import patch
 
 User = get_user_model()
@@ -502,6 +511,135 @@ class SupplierBulkDeleteAPITest(APITestCase):
         # データベースのレコードが削除されていないことを確認
         self.assertEqual(Supplier.objects.count(), 5)
 
+    def create_part(self, supplier):
+        return Part.objects.create(
+            name="テスト部品",
+            category="shaft",
+            supplier=supplier,
+            cost_price="100.00",
+            selling_price="200.00",
+        )
+
+    def test_bulk_delete_protected(self):
+        """部品が登録されている仕入先を含む場合、409と仕入先ごとの部品数が返され、何も削除されないことを確認"""
+        for _ in range(3):
+            self.create_part(self.suppliers[1])
+        self.create_part(self.suppliers[3])
+        ids = [self.suppliers[i].id for i in range(4)]
+
+        response = self.client.post(
+            self.bulk_delete_url, data={"ids": ids}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("error", response.data)
+        self.assertEqual(
+            response.data["protected"],
+            [
+                {
+                    "id": self.suppliers[1].id,
+                    "name": "テストサプライヤー1",
+                    "part_count": 3,
+                },
+                {
+                    "id": self.suppliers[3].id,
+                    "name": "テストサプライヤー3",
+                    "part_count": 1,
+                },
+            ],
+        )
+        self.assertEqual(Supplier.objects.count(), 5)
+
+    def test_bulk_delete_invalid_ids(self):
+        """整数でないIDを含む場合、400が返されることを確認"""
+        response = self.client.post(
+            self.bulk_delete_url,
+            data={"ids": [self.suppliers[0].id, "abc"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Supplier.objects.count(), 5)
+
+    def test_bulk_delete_ids_not_list(self):
+        """
+        IDをリスト以外（文字列・数値・オブジェクト）で指定した場合、400が返され何も削除されないことを確認
+        """
+        for ids in [str(self.suppliers[0].id), self.suppliers[0].id, {"1": 1}]:
+            response = self.client.post(
+                self.bulk_delete_url, data={"ids": ids}, format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                response.data["error"], "IDは整数のリストで指定してください"
+            )
+        self.assertEqual(Supplier.objects.count(), 5)
+
+    def test_bulk_delete_set_based(self):
+        """件数によらずクエリ数が一定で、削除時の後処理も行われることを確認"""
+        for i in range(20):
+            Supplier.objects.create(
+                name=f"追加サプライヤー{i}",
+                phone="03-1234-5678",
+                email="supplier@example.com",
+                postal_code="100-0001",
+                prefecture="東京都",
+                city="千代田区",
+                town="丸の内1-1-1",
+            )
+        sheet = StocktakingSheet.objects.create(
+            format=StocktakingSheet.Format.PDF, supplier=self.suppliers[0]
+        )
+        extra = list(
+            Supplier.objects.filter(name__startswith="追加").values_list(
+                "id", flat=True
+            )
+        )
+
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(
+                self.bulk_delete_url,
+                data={"ids": [self.suppliers[0].id]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(
+                self.bulk_delete_url, data={"ids": extra}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("20件", response.data["message"])
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Supplier.objects.count(), 4)
+
+        # 棚卸表の仕入先は解除され、検索ドキュメントも削除される
+        sheet.refresh_from_db()
+        self.assertIsNone(sheet.supplier)
+        self.assertFalse(
+            SearchDocument.objects.filter(
+                kind=SearchDocument.Kind.SUPPLIER,
+                object_id__in=[self.suppliers[0].id, *extra],
+            ).exists()
+        )
+
+    def test_bulk_delete_supplier_referenced_by_session(self):
+        """
+        棚卸の絞り込み条件の仕入先も削除でき、棚卸の仕入先が解除されることを確認
+        """
+        session = StocktakingSession.objects.create(
+            name="テスト棚卸", supplier=self.suppliers[0]
+        )
+
+        response = self.client.post(
+            self.bulk_delete_url,
+            data={"ids": [self.suppliers[0].id]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Supplier.objects.filter(id=self.suppliers[0].id).exists())
+        session.refresh_from_db()
+        self.assertIsNone(session.supplier)
+
 
 class SupplierRetrieveAPITest(APITestCase):
     """
@@ -842,3 +980,298 @@ class SupplierUpdateAPITest(APITestCase):
 
         # supplier_codeがNoneになっていることを確認
         self.assertIsNone(self.supplier.supplier_code)
+
+
+class SupplierKeysetPaginationAPITest(APITestCase):
+    """
+    サプライヤー一覧のキーセット（カーソル）方式ページネーションのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("supplier-list")
+
+        for i in range(25):
+            Supplier.objects.create(
+                name=f"テスト株式会社{i:02d}",
+                phone=f"03-1234-{i:04d}",
+                email=f"test{i}@example.com",
+                postal_code="100-0001",
+                prefecture="東京都",
+                city="千代田区",
+                town="丸の内1-1-1",
+            )
+
+    def test_cursor_pagination_by_updated_at(self):
+        """
+        更新日時の降順で全件を辿れることをテスト
+        """
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "ordering": "-updated_at"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 20)
+
+        response2 = self.client.get(response.data["next"])
+        self.assertEqual(len(response2.data["results"]), 5)
+        self.assertIsNone(response2.data["next"])
+
+        rows = response.data["results"] + response2.data["results"]
+        expected = list(
+            Supplier.objects.order_by("-updated_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual([s["id"] for s in rows], expected)
+
+
+class SupplierAutocompleteAPITest(APITestCase):
+    """
+    仕入先の入力補完APIのテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        autocomplete_cache.clear()
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("supplier-autocomplete")
+
+        self.suppliers = {}
+        for code, name in [
+            ("ABC001", "ヘッド工業株式会社"),
+            ("ABC002", "株式会社ﾍｯﾄﾞﾊﾟｰﾂ"),
+            ("XYZ001", "シャフト商事"),
+            (None, "グリップ製作所"),
+        ]:
+            self.suppliers[name] = Supplier.objects.create(
+                supplier_code=code,
+                name=name,
+                contact_person="ヘッド担当",
+                phone="03-1234-5678",
+                email="supplier@example.com",
+                postal_code="100-0001",
+                prefecture="東京都",
+                city="千代田区",
+                town="丸の内1-1-1",
+            )
+
+    def test_autocomplete_by_code_prefix(self):
+        """
+        取引先コードの前方一致（大文字小文字を区別しない）で候補が返ることをテスト
+        """
+        response = self.client.get(self.url, {"q": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["supplier_code"] for r in response.data["results"]],
+            ["ABC001", "ABC002"],
+        )
+        # id / name / supplier_code のみを返す
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "name", "supplier_code"}
+        )
+
+    def test_autocomplete_by_name_prefix_and_infix(self):
+        """
+        仕入先名の前方一致が先に、表記揺れを含む部分一致が後に返ることをテスト
+        """
+        response = self.client.get(self.url, {"q": "ヘッド"})
+        self.assertEqual(
+            [r["name"] for r in response.data["results"]],
+            ["ヘッド工業株式会社", "株式会社ﾍｯﾄﾞﾊﾟｰﾂ"],
+        )
+
+        response = self.client.get(self.url, {"q": "グリップ"})
+        self.assertEqual(
+            [r["id"] for r in response.data["results"]],
+            [self.suppliers["グリップ製作所"].id],
+        )
+
+    def test_autocomplete_limit(self):
+        """
+        件数の上限が適用されることをテスト
+        """
+        response = self.client.get(self.url, {"q": "ABC", "limit": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.get(self.url, {"q": "ABC", "limit": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autocomplete_empty_query(self):
+        """
+        空の入力では候補が返らないことをテスト
+        """
+        response = self.client.get(self.url, {"q": " "})
+        self.assertEqual(response.data["results"], [])
+
+    def test_autocomplete_cache_is_invalidated_on_save(self):
+        """
+        仕入先の保存時にキャッシュがクリアされることをテスト
+        """
+        response = self.client.get(self.url, {"q": "XYZ"})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        # キャッシュされた結果が返ること（DBを参照しない）
+        with self.assertNumQueries(0):
+            autocomplete_cache_hit = self.client.get(self.url, {"q": "XYZ"})
+        self.assertEqual(len(autocomplete_cache_hit.data["results"]), 1)
+
+        supplier = self.suppliers["グリップ製作所"]
+        supplier.supplier_code = "XYZ002"
+        supplier.save()
+
+        response = self.client.get(self.url, {"q": "XYZ"})
+        self.assertEqual(
+            [r["supplier_code"] for r in response.data["results"]],
+            ["XYZ001", "XYZ002"],
+        )
+
+    def test_autocomplete_prefix_query_uses_index(self):
+        """
+        前方一致の検索がインデックスを使用することを実行計画で確認
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            for lookup in ["supplier_code__istartswith", "name__istartswith"]:
+                sql, params = (
+                    Supplier.objects.filter(**{lookup: "AB"})
+                    .values("id")
+                    .query.sql_with_params()
+                )
+                cursor.execute("EXPLAIN " + sql, params)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                self.assertIn("prefix_idx", plan, plan)
+            cursor.execute("RESET enable_seqscan")
+
+
+class SupplierSparseFieldsAPITest(APITestCase):
+    """
+    サプライヤー一覧の出力項目の絞り込み（fields / omit）のテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("supplier-list")
+        Supplier.objects.create(
+            supplier_code="CODE001",
+            name="テスト株式会社",
+            phone="03-1234-5678",
+            email="test@example.com",
+            postal_code="100-0001",
+            prefecture="東京都",
+            city="千代田区",
+            town="丸の内1-1-1",
+            created_by=self.user,
+            updated_by=self.user,
+        )
+
+    def test_fields(self):
+        """
+        fieldsで指定した項目のみが返ることをテスト
+        """
+        response = self.client.get(self.url, {"fields": "id,name,supplier_code"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "name", "supplier_code"}
+        )
+
+    def test_omit(self):
+        """
+        omitで指定した項目が除かれることをテスト
+        """
+        response = self.client.get(self.url, {"omit": "created_by,updated_by,remarks"})
+        row = response.data["results"][0]
+        self.assertNotIn("created_by", row)
+        self.assertNotIn("remarks", row)
+        self.assertIn("phone", row)
+
+
+class SupplierIncludedUsersAPITest(APITestCase):
+    """
+    サプライヤー一覧のユーザー情報の集約出力（include=users）のテストクラス
+    """
+
+    def setUp(self):
+        """
+        テスト前の準備
+        """
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("supplier-list")
+        for i in range(3):
+            Supplier.objects.create(
+                name=f"テスト株式会社{i}",
+                phone="03-1234-5678",
+                email=f"test{i}@example.com",
+                postal_code="100-0001",
+                prefecture="東京都",
+                city="千代田区",
+                town="丸の内1-1-1",
+                created_by=self.user,
+                updated_by=self.user,
+            )
+
+    def test_users_are_included_once(self):
+        """
+        各行はユーザーIDのみを持ち、ユーザー情報がincluded.usersに1回だけ含まれることをテスト
+        """
+        response = self.client.get(self.url, {"include": "users"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for row in response.data["results"]:
+            self.assertEqual(row["created_by"], self.user.id)
+            self.assertEqual(row["updated_by"], self.user.id)
+        self.assertEqual(
+            response.data["included"]["users"],
+            {
+                str(self.user.id): {
+                    "id": self.user.id,
+                    "email": "testuser@example.com",
+                    "first_name": "Test",
+                    "last_name": "User",
+                    "is_active": True,
+                    "is_staff": False,
+                    "is_superuser": False,
+                }
+            },
+        )
+
+    def test_unknown_include_is_ignored(self):
+        """
+        users以外のincludeは無視されることをテスト
+        """
+        response = self.client.get(self.url, {"include": "suppliers"})
+        self.assertNotIn("included", response.data)
+        self.assertEqual(response.data["results"][0]["created_by"]["id"], self.user.id)
@@ -1,14 +1,35 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SupplierViewSet, PartViewSet
+from .views import (
+    SupplierViewSet,
+    PartViewSet,
+    SearchView,
+    ResponseCacheStatsView,
+    StocktakingSheetViewSet,
+    StocktakingSessionViewSet,
+    StockMovementViewSet,
+    CycleCountPlanViewSet,
+)
 
 # DRFのルーターを設定
 router = DefaultRouter()
 router.register(r"suppliers", SupplierViewSet, basename="supplier")
 router.register(r"parts", PartViewSet, basename="part")
+router.register(
+    r"stocktaking-sheets", StocktakingSheetViewSet, basename="stocktaking-sheet"
+)
+router.register(
+    r"stocktaking-sessions", StocktakingSessionViewSet, basename="stocktaking-session"
+)
+router.register(r"stock-movements", StockMovementViewSet, basename="stock-movement")
+router.register(
+    r"cycle-count-plans", CycleCountPlanViewSet, basename="cycle-count-plan"
+)
 
 # 将来的に他のマスタモデルも追加可能
 
 urlpatterns = [
+    path("search/", SearchView.as_view(), name="search"),
+    path("cache-stats/", ResponseCacheStatsView.as_view(), name="cache-stats"),
     path("", include(router.urls)),
 ]
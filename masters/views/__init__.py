@@ -1,7 +1,21 @@
 from masters.views.supplier import SupplierViewSet
 from masters.views.part import PartViewSet
+from masters.views.search import SearchView
+from masters.views.cache import ResponseCacheStatsView
+from masters.views.stocktaking import (
+    StocktakingSessionViewSet,
+    StocktakingSheetViewSet,
+)
+from masters.views.movement import StockMovementViewSet
+from masters.views.cycle_count import CycleCountPlanViewSet
 
 __all__ = [
     "SupplierViewSet",
     "PartViewSet",
+    "SearchView",
+    "ResponseCacheStatsView",
+    "StocktakingSheetViewSet",
+    "StocktakingSessionViewSet",
+    "StockMovementViewSet",
+    "CycleCountPlanViewSet",
 ]
@@ -0,0 +1,29 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from zaiko_be.response_cache import (
+    get_response_cache_settings,
+    get_response_cache_stats,
+)
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    レスポンスキャッシュのヒット数・ミス数を返すAPIビュー（管理者のみ）
+
+    GET /api/masters/cache-stats/
+
+    {"enabled": true, "endpoints": {"part": {"hits": 10, "misses": 2, "hit_rate": 0.833}, ...}}
+    """
+
+    permission_classes = [IsAdminUser]
+    # ResponseCacheMixin を使用しているビューセットの basename
+    endpoints = ("part", "supplier")
+
+    def get(self, request):
+        return Response(
+            {
+                "enabled": get_response_cache_settings()["ENABLED"],
+                "endpoints": get_response_cache_stats(self.endpoints),
+            }
+        )
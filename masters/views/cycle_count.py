@@ -0,0 +1,75 @@
+from django.utils import timezone
+from rest_framework import mixins, serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+
+from masters.cycle_counts import create_plan, get_plan_for_date
+from masters.models import CycleCountPlan, CycleCountTask
+from masters.serializers import CycleCountPlanSerializer, CycleCountTaskSerializer
+
+
+class CycleCountDateSerializer(serializers.Serializer):
+    """
+    計数予定を取得する日（クエリパラメータ）のシリアライザー
+    """
+
+    date = serializers.DateField(required=False)
+
+
+class CycleCountPlanViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    循環棚卸の計画のビューセット（masters.cycle_counts）
+
+    - 作成（POST /api/masters/cycle-count-plans/）
+      {"start_date": "2026-11-01", "end_date": "2027-01-31"}
+      期間内の営業日ごとの計数予定をまとめて作成する
+    - 一覧・詳細（GET /api/masters/cycle-count-plans/ , /{id}/）
+    - 今日の計数予定（GET /api/masters/cycle-count-plans/today/?date=任意）
+      date を含む計画の計数予定を、クラス（A → C）・部品の順に返す
+      保存済みの予定を読むのみのため、部品の件数によらずすぐに返せる
+
+    作成後に登録・削除・アーカイブした部品は、その部品の予定のみ追加・削除される
+    """
+
+    queryset = CycleCountPlan.objects.select_related("created_by").all()
+    serializer_class = CycleCountPlanSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_keyset_ordering(self):
+        """
+        カーソル方式のページネーションで、今日の計数予定をクラス・部品の順に辿るキー
+        （同じ日の予定は部品ごとに1件のため、部品IDで順序が確定する）
+        """
+        if self.action == "today":
+            return "value_class", "part_id"
+        return None
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        serializer.instance = create_plan(
+            data["start_date"], data["end_date"], user=self.request.user
+        )
+
+    @action(methods=["get"], detail=False)
+    def today(self, request):
+        params = CycleCountDateSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        date = params.validated_data.get("date") or timezone.localdate()
+        plan = get_plan_for_date(date)
+        queryset = CycleCountTask.objects.none()
+        if plan is not None:
+            queryset = (
+                plan.tasks.filter(scheduled_on=date)
+                .select_related("part")
+                .order_by("value_class", "part_id")
+            )
+        page = self.paginate_queryset(queryset)
+        serializer = CycleCountTaskSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,469 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from accounts.serializers import UserSerializer
+from masters.export import (
+    DEFAULT_ENCODING,
+    ENCODINGS,
+    get_content_type,
+    get_filename,
+    iter_csv,
+)
+from masters.serializers.fast import compile_fast_serializer
+from zaiko_be.conditional import (
+    get_cached_conditional_response,
+    get_not_modified_response,
+    get_table_validators,
+    latest,
+    make_etag,
+    set_validators,
+)
+from zaiko_be.renderers import CSVRenderer
+from zaiko_be.response_cache import (
+    get_cache,
+    get_model_versions,
+    get_response_cache_settings,
+    record_response_cache,
+)
+
+User = get_user_model()
+
+
+class SparseFieldsQuerySetMixin:
+    """
+    クエリパラメータ fields / omit で出力項目が絞られた場合に、
+    クエリセットの読み込み列と select_related も同じ項目に絞るビューセットのミックスイン
+
+    シリアライザーは masters.serializers.mixins.SparseFieldsMixin を使用していること。
+    並び替えキー（ordering_fields）はキーセット方式のページネーションで参照するため常に読み込む。
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.request
+        if request is None or request.method not in ("GET", "HEAD"):
+            return queryset
+        if "fields" not in request.query_params and "omit" not in request.query_params:
+            return queryset
+
+        columns, related = self.get_serializer().get_sparse_columns()
+        columns += [
+            name for name in getattr(self, "ordering_fields", ()) if name not in columns
+        ]
+        return queryset.select_related(None).select_related(*related).only(*columns)
+
+
+class FastReadMixin:
+    """
+    一覧・詳細取得を masters.serializers.fast の高速シリアライザーで返すビューセットのミックスイン
+
+    モデルのインスタンスを作らず values() の辞書から出力を組み立てる。
+    出力は通常のシリアライザーと同一で、シリアライザーに未対応の項目が含まれる場合や
+    fast_read = False の場合は通常の処理を行う。
+    """
+
+    fast_read = True
+
+    def get_fast_serializer(self):
+        if not self.fast_read:
+            return None
+        return compile_fast_serializer(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        fast = self.get_fast_serializer()
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+
+        # fields / omit で出力項目を絞っても、キーセット方式のページネーションが
+        # カーソルに埋め込む並び替えキーとIDは読み込む
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = fast.values(
+            queryset,
+            [queryset.model._meta.pk.attname, *getattr(self, "ordering_fields", ())],
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.to_representation(page))
+        return Response(fast.to_representation(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        fast = self.get_fast_serializer()
+        if fast is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        queryset = fast.values(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        return Response(fast.to_representation([row])[0])
+
+
+class IncludedUsersMixin:
+    """
+    一覧取得でクエリパラメータ include=users が指定された場合に、
+    各行の作成者・更新者をユーザーIDにし、ユーザー情報をレスポンスの included.users に
+    1回だけ含めるビューセットのミックスイン
+
+    シリアライザーは masters.serializers.mixins.IncludedUsersMixin を使用していること。
+    ページネーションされた一覧（include_users_actions のアクション）のみが対象で、
+    ユーザーの結合（select_related）も行わない。
+
+    レスポンス例:
+        {"count": 1, ..., "results": [{"id": 1, "created_by": 3, ...}],
+         "included": {"users": {"3": {"id": 3, "email": ...}}}}
+    """
+
+    include_query_param = "include"
+    include_users_actions = ("list",)
+
+    @property
+    def include_users(self):
+        request = self.request
+        if request is None or request.method not in ("GET", "HEAD"):
+            return False
+        if self.action not in self.include_users_actions:
+            return False
+        include = request.query_params.get(self.include_query_param, "")
+        return "users" in {name.strip() for name in include.split(",")}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include_users"] = self.include_users
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.include_users:
+            return queryset
+        _, related = self.get_serializer().get_sparse_columns()
+        return queryset.select_related(None).select_related(*related)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.include_users:
+            response.data["included"] = {"users": self.get_included_users(data)}
+        return response
+
+    def get_included_users(self, rows):
+        """
+        行に含まれるユーザーIDのユーザー情報を {ID（文字列）: ユーザー情報} で返す
+        """
+        names = self.get_serializer_class().included_user_fields
+        ids = {row[name] for row in rows for name in names if row.get(name) is not None}
+        if not ids:
+            return {}
+        users = User.objects.filter(pk__in=ids).order_by("pk")
+        return {str(user["id"]): user for user in UserSerializer(users, many=True).data}
+
+
+class ResponseCacheMixin:
+    """
+    一覧・詳細取得のレスポンスをキャッシュするビューセットのミックスイン（zaiko_be.response_cache）
+
+    キーはURL（ホスト・クエリパラメータを含む）・出力形式と、response_cache_models の
+    各モデルのバージョン番号から作るため、いずれかのモデルが更新されると参照されなくなる。
+    認証・権限の確認はキャッシュの有無に関わらず行い、ブラウザブルAPIはキャッシュしない。
+    レスポンスの X-Cache ヘッダーに HIT / MISS を設定する。
+    """
+
+    # レスポンスの内容が依存するモデル
+    response_cache_models = ()
+    # キャッシュに保存するヘッダー（ETag / Last-Modified はキャッシュから返す場合の条件付きGETに使用）
+    response_cache_headers = ("Content-Type", "ETag", "Last-Modified")
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_response_cache_key(self, request):
+        versions = get_model_versions(self.response_cache_models)
+        raw = repr(
+            (request.build_absolute_uri(), request.accepted_media_type, versions)
+        )
+        digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+        return f"response:{self.basename}:{digest}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        config = get_response_cache_settings()
+        if not config["ENABLED"] or request.accepted_renderer.format == "api":
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        # データの取得より前にキーを作り、取得中の更新で古い内容が新しい番号で保存されないようにする
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            record_response_cache(self.basename, hit=True)
+            status_code, headers, content = cached
+            response = HttpResponse(content, status=status_code, headers=headers)
+            response["X-Cache"] = "HIT"
+            return get_cached_conditional_response(request, response)
+
+        record_response_cache(self.basename, hit=False)
+        response = handler(request, *args, **kwargs)
+        response["X-Cache"] = "MISS"
+        if response.status_code == 200:
+
+            def store(rendered):
+                headers = {
+                    name: rendered[name]
+                    for name in self.response_cache_headers
+                    if rendered.has_header(name)
+                }
+                cache.set(
+                    key,
+                    (rendered.status_code, headers, rendered.content),
+                    config["TIMEOUT"],
+                )
+
+            response.add_post_render_callback(store)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    一覧・詳細取得に ETag / Last-Modified を付け、条件付きGETに 304 を返すビューセットのミックスイン
+    （zaiko_be.conditional）
+
+    検証子は一覧では絞り込み後のクエリセット全体、詳細では対象の行の (件数, 更新日時の最大値) と、
+    conditional_related_models（出力に含まれる関連モデル）のテーブル全体の (件数, 更新日時の最大値)
+    から作る。URL（クエリパラメータを含む）・出力形式もETagに含めるため、ページ・出力項目ごとに
+    ETagは異なる。検証子は1回のクエリで集計し、条件に一致した場合はシリアライズせずに 304 を返す。
+    ResponseCacheMixin より後に継承すると、キャッシュしたレスポンスの検証子で判定するため
+    キャッシュにある場合は集計も行わない。
+    """
+
+    # 出力に含まれる関連モデル（updated_at を持つこと）
+    conditional_related_models = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            queryset, super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # 不正なIDは通常の処理で404にする
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            queryset, super().retrieve, request, *args, **kwargs
+        )
+
+    def get_validators(self, request, queryset):
+        """
+        (ETag, 最終更新日時) を返す
+        """
+        validators = get_table_validators(
+            [queryset]
+            + [
+                model._default_manager.all()
+                for model in self.conditional_related_models
+            ]
+        )
+        etag = make_etag(
+            request.build_absolute_uri(), request.accepted_media_type, validators
+        )
+        return etag, latest(*(last_modified for _, last_modified in validators))
+
+    def conditional_response(self, queryset, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, queryset)
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+
+class CSVExportMixin:
+    """
+    一覧と同じ絞り込み・並び順の全件をCSVで返すビューセットのミックスイン（masters.export）
+
+    GET {一覧のURL}export/?encoding=utf-8|shift_jis
+    ページネーションせず、StreamingHttpResponse でサーバーサイドカーソルから読んだ順に出力する。
+    """
+
+    # 出力する列（values_list() に指定する参照）
+    export_columns = ()
+    # ダウンロードするファイル名の接頭辞（{接頭辞}_{日付}.csv）
+    export_filename = "export"
+    encoding_query_param = "encoding"
+
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path="export",
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer],
+    )
+    def export(self, request):
+        """
+        CSVをダウンロードさせる（文字コードは UTF-8（BOM付き）または Shift_JIS）
+        """
+        encoding = request.query_params.get(
+            self.encoding_query_param, DEFAULT_ENCODING
+        ).lower()
+        if encoding not in ENCODINGS:
+            return Response(
+                {"error": "encodingにはutf-8またはshift_jisを指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            iter_csv(queryset, self.export_columns, encoding),
+            content_type=get_content_type(encoding),
+        )
+        response["Content-Disposition"] = content_disposition_header(
+            True, get_filename(self.export_filename)
+        )
+        return response
+
+
+class BatchWriteMixin:
+    """
+    複数の項目をまとめて作成・更新するビューセットのミックスイン
+
+    POST {一覧のURL}batch/          項目のリストを作成する
+    PUT / PATCH {一覧のURL}batch/   id を含む項目のリストを更新する（PATCHは指定した項目のみ）
+
+    全項目をまとめて検証し（対象・関連オブジェクトはそれぞれ1回のクエリで取得）、
+    1つのトランザクションで bulk_create / bulk_update により保存する。
+    シリアライザーの list_serializer_class は masters.serializers.bulk.BulkListSerializer を使用していること。
+
+    クエリパラメータ atomic=false を指定するとエラーのない項目のみ保存し、
+    指定しない場合は1件でもエラーがあれば何も保存しない。
+    レスポンスの results には項目ごとの status（201 / 200 / 400、保存しなかった正しい項目は424）と
+    data（保存した項目）または errors を、送信した順に含める。
+    """
+
+    # 1回のリクエストで送信できる項目数
+    batch_max_items = 1000
+
+    def perform_batch_create(self, serializer):
+        serializer.save()
+
+    def perform_batch_update(self, serializer):
+        serializer.save()
+
+    @action(methods=["post", "put", "patch"], detail=False, url_path="batch")
+    def batch(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "1件以上の項目のリストを送信してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.batch_max_items:
+            return Response(
+                {"error": f"一度に送信できる項目は{self.batch_max_items}件までです"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        atomic = request.query_params.get("atomic", "true").lower() != "false"
+        creating = request.method == "POST"
+
+        if creating:
+            instances, errors = None, {}
+        else:
+            instances, errors = self.get_batch_instances(items)
+        serializer = self.get_serializer(
+            instances, data=items, many=True, partial=request.method == "PATCH"
+        )
+        errors.update(serializer.validate_items(skip=errors))
+
+        saved = []
+        if not errors or (not atomic and len(errors) < len(items)):
+            with transaction.atomic():
+                if creating:
+                    self.perform_batch_create(serializer)
+                else:
+                    self.perform_batch_update(serializer)
+            saved = serializer.data
+
+        success = status.HTTP_201_CREATED if creating else status.HTTP_200_OK
+        results = []
+        data = iter(saved)
+        for index in range(len(items)):
+            if index in errors:
+                results.append(
+                    {
+                        "index": index,
+                        "status": status.HTTP_400_BAD_REQUEST,
+                        "errors": errors[index],
+                    }
+                )
+            elif saved:
+                results.append({"index": index, "status": success, "data": next(data)})
+            else:
+                results.append(
+                    {"index": index, "status": status.HTTP_424_FAILED_DEPENDENCY}
+                )
+
+        if not saved:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = success
+        return Response(
+            {
+                "atomic": atomic,
+                "succeeded": len(saved),
+                "failed": len(errors),
+                "results": results,
+            },
+            status=response_status,
+        )
+
+    def get_batch_instances(self, items):
+        """
+        更新する項目の id から対象を1回のクエリで取得する
+
+        Returns:
+            tuple: (items と同じ順のインスタンスのリスト（エラーの項目は None）, 項目の番号 → エラー)
+        """
+        pk_field = self.get_queryset().model._meta.pk
+        errors = {}
+        # 項目の番号 → 主キー（オブジェクトでない項目のエラーはシリアライザーの検証で返す）
+        pks = {}
+        seen = set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            if item.get("id") is None:
+                errors[index] = {"id": ["この項目は必須です。"]}
+                continue
+            try:
+                pk = pk_field.to_python(item["id"])
+            except ValidationError:
+                errors[index] = {"id": ["有効な整数を入力してください。"]}
+                continue
+            if pk in seen:
+                errors[index] = {"id": ["同じIDが複数回指定されています。"]}
+                continue
+            seen.add(pk)
+            pks[index] = pk
+
+        objects = self.get_queryset().in_bulk(seen)
+        instances = [objects.get(pks.get(index)) for index in range(len(items))]
+        for index, pk in pks.items():
+            if instances[index] is None:
+                errors[index] = {"id": [f"ID {pk} の項目が見つかりません。"]}
+        return instances, errors
@@ -0,0 +1,72 @@
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from masters.models import StockMovement
+from masters.serializers import StockMovementSerializer
+from masters.stock import InsufficientStockError
+from masters.views.mixins import BatchWriteMixin
+
+
+class StockMovementFilterSerializer(serializers.Serializer):
+    """
+    入出庫一覧の絞り込み条件（クエリパラメータ）のシリアライザー
+    """
+
+    part_id = serializers.IntegerField(min_value=1, required=False)
+    kind = serializers.ChoiceField(choices=StockMovement.Kind.choices, required=False)
+
+
+class StockMovementViewSet(
+    BatchWriteMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    入出庫のビューセット（履歴は追記のみで、更新・削除はできない）
+
+    - 登録（POST /api/masters/stock-movements/）
+      {"part_id": 1, "kind": "receipt" | "issue" | "adjustment", "quantity": 10, "reason": 任意}
+      部品の在庫数を同じトランザクション内で増減し、在庫数が不足する場合は400
+    - 一括登録（POST /api/masters/stock-movements/batch/?atomic=false）
+      登録と同じ項目のリスト（最大 batch_max_items 件）を1つのトランザクションで登録する
+      在庫数は部品ごとの合計で判定し、不足する部品がある場合は何も登録せず400と shortages を返す
+    - 一覧（GET /api/masters/stock-movements/?part_id=&kind=）新しい順
+    - 詳細（GET /api/masters/stock-movements/{id}/）
+    """
+
+    queryset = StockMovement.objects.select_related("part", "created_by").all()
+    serializer_class = StockMovementSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+        serializer = StockMovementFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data:
+            queryset = queryset.filter(**serializer.validated_data)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    def perform_batch_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    @action(methods=["post"], detail=False, url_path="batch")
+    def batch(self, request):
+        """
+        入出庫をまとめて登録する（履歴は追記のみのため、一括更新の PUT / PATCH は受け付けない）
+        """
+        try:
+            return super().batch(request)
+        except InsufficientStockError as exc:
+            return Response(
+                {"error": str(exc), "shortages": exc.shortages},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
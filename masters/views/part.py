@@ -1,17 +1,121 @@
-from rest_framework import viewsets
-from ..models import Part
-from ..serializers import PartSerializer
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ProtectedError, Sum
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from ..cleanup import delete_files_on_commit
+from ..cycle_counts import schedule_parts, unschedule_parts
+from ..export import PART_COLUMNS
+from ..imports import (
+    DEFAULT_IMPORT_ENCODING,
+    IMPORT_ENCODINGS,
+    CSVImportError,
+    PartImporter,
+)
+from ..filters import PartFilterBackend, StableOrderingFilter
+from .mixins import (
+    BatchWriteMixin,
+    ConditionalGetMixin,
+    CSVExportMixin,
+    FastReadMixin,
+    IncludedUsersMixin,
+    ResponseCacheMixin,
+    SparseFieldsQuerySetMixin,
+)
+from ..models import (
+    Part,
+    SearchDocument,
+    StockSnapshotItem,
+    StocktakingCount,
+    Supplier,
+)
+from ..search import update_search_documents
+from ..serializers import AsOfPartSerializer, LowStockPartSerializer, PartSerializer
+from ..stock import (
+    clear_low_stock_count,
+    get_low_stock_count,
+    lock_stock_quantities,
+    record_stock_edits,
+)
 from rest_framework.permissions import IsAuthenticated
 
+User = get_user_model()
 
-class PartViewSet(viewsets.ModelViewSet):
+
+class PartViewSet(
+    BatchWriteMixin,
+    ResponseCacheMixin,
+    ConditionalGetMixin,
+    CSVExportMixin,
+    FastReadMixin,
+    IncludedUsersMixin,
+    SparseFieldsQuerySetMixin,
+    viewsets.ModelViewSet,
+):
     """
     部品モデルのCRUD操作用ビューセット
+
+    一覧取得では以下のクエリパラメータで絞り込み・並び替えができる
+    - category, supplier_id
+    - cost_price_min / cost_price_max, selling_price_min / selling_price_max
+    - stock_quantity_min / stock_quantity_max
+    - updated_since（この日時以降に更新された部品）
+    - ordering（ordering_fields のいずれか。降順は先頭に "-"）
+    - fields / omit（出力する・しない項目をカンマ区切りで指定）
+    - include=users（作成者・更新者をIDで出力し、ユーザー情報は included.users にまとめる）
+    - archived=true（アーカイブした部品のみ。既定ではアーカイブした部品は一覧に含めない）
+    - as_of（日時または日付。この時点で登録済みの部品に絞り、その時点の在庫数を stock_quantity_as_of に出力する）
+
+    一覧・詳細のレスポンスは部品・仕入先・ユーザーの更新までキャッシュされる（ResponseCacheMixin）
+    一覧・詳細のレスポンスには ETag / Last-Modified が付き、条件付きGETには 304 を返す（ConditionalGetMixin）
+
+    - CSVエクスポート（GET /api/masters/parts/export/?encoding=utf-8|shift_jis）
+    - CSV一括登録（POST /api/masters/parts/import/?encoding=utf-8|shift_jis&dry_run=true）
+    - 一括作成・更新（POST / PUT / PATCH /api/masters/parts/batch/?atomic=false）
+    - 一括削除（POST /api/masters/parts/bulk-delete/）
+    - 一括アーカイブ・アーカイブの解除（POST /api/masters/parts/bulk-archive/）
+    - 在庫不足一覧（GET /api/masters/parts/low-stock/）
+    - 在庫不足件数（GET /api/masters/parts/low-stock/count/）
     """
 
     queryset = Part.objects.select_related("supplier", "created_by", "updated_by").all()
     serializer_class = PartSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [PartFilterBackend, StableOrderingFilter]
+    # 並び替えに使用できるキー（キーセット方式のページネーションでも使用）
+    ordering_fields = (
+        "id",
+        "name",
+        "updated_at",
+        "cost_price",
+        "selling_price",
+        "stock_quantity",
+    )
+    include_users_actions = ("list", "low_stock")
+    # 一覧・詳細のレスポンスキャッシュが依存するモデル（仕入先名・ユーザー情報を含むため）
+    response_cache_models = (Part, Supplier, User)
+    # ETag / Last-Modified の検証子に含める関連モデル
+    conditional_related_models = (Supplier, User)
+    # CSVエクスポートの列とファイル名
+    export_columns = PART_COLUMNS
+    export_filename = "parts"
+
+    def get_keyset_ordering(self):
+        """
+        カーソル方式のページネーションで、並び順が決まっているアクションのキー
+        在庫不足の一覧は部分インデックス part_low_stock_idx と同じ (不足数の降順, ID) で辿る
+        """
+        if self.action == "low_stock":
+            return "-shortage", "id"
+        return None
+
+    def get_serializer_class(self):
+        if self.action == "list" and "as_of" in self.request.query_params:
+            return AsOfPartSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
         """
@@ -22,5 +126,292 @@ class PartViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         """
         部品を更新する際に、現在のユーザーを更新者として設定
+
+        在庫数は行をロックして読み直した値に項目の値を上書きして保存し、
+        変更した場合は差分を調整の入出庫として記録する
         """
+        with transaction.atomic():
+            self.save_with_stock_edits(serializer, [serializer.instance])
+
+    def save_with_stock_edits(self, serializer, parts):
+        previous = lock_stock_quantities([part.pk for part in parts])
+        # 在庫数を指定していない項目で、読み込んだ後の入出庫を古い値で上書きしない
+        for part in parts:
+            part.stock_quantity = previous[part.pk]
         serializer.save(updated_by=self.request.user)
+        record_stock_edits(previous, parts, self.request.user)
+
+    def perform_batch_create(self, serializer):
+        """
+        一括作成でも現在のユーザーを作成者・更新者として設定
+        """
+        serializer.save(created_by=self.request.user, updated_by=self.request.user)
+
+    def perform_batch_update(self, serializer):
+        """
+        一括更新でも現在のユーザーを更新者として設定し、在庫数の変更を調整の入出庫として記録する
+        """
+        self.save_with_stock_edits(serializer, serializer.instance)
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        入出庫の履歴がある部品は削除せず、409を返す
+        """
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return self.protected_response()
+
+    def protected_response(self, protected=None):
+        data = {
+            "error": "入出庫の履歴がある部品は削除できません。アーカイブしてください"
+        }
+        if protected is not None:
+            data["protected"] = protected
+        return Response(data, status=status.HTTP_409_CONFLICT)
+
+    def perform_destroy(self, instance):
+        """
+        部品を削除し、画像ファイルはトランザクションの確定後に別スレッドで削除する
+        """
+        image = instance.image.name
+        instance.delete()
+        delete_files_on_commit(Part.image.field.storage, [image])
+
+    def get_bulk_ids(self, request):
+        """
+        リクエストボディの ids を検証する
+
+        Returns:
+            tuple: (IDの集合, エラーのレスポンス（正しい場合は None）)
+        """
+        ids = request.data.get("ids", [])
+        if not ids or not isinstance(ids, list):
+            return None, Response(
+                {"error": "対象のIDリストが空です"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            return {int(pk) for pk in ids}, None
+        except (TypeError, ValueError):
+            return None, Response(
+                {"error": "IDは整数のリストで指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    @action(methods=["post"], detail=False, url_path="bulk-delete")
+    def bulk_delete(self, request):
+        """
+        複数の部品を一括で削除する
+
+        リクエストボディに以下の形式でIDリストを含める:
+        {
+            "ids": [1, 2, 3]
+        }
+
+        削除は1回のDELETE文で行い、画像ファイルはトランザクションの確定後に別スレッドで削除する
+        存在しないIDが含まれる場合は何も削除せず400を返す
+        入出庫の履歴がある部品が含まれる場合は何も削除せず、409 と部品ごとの入出庫の件数を返す:
+        {
+            "error": "...",
+            "protected": [{"id": 1, "name": "...", "movement_count": 3}]
+        }
+
+        Returns:
+            Response: 削除結果のレスポンス
+        """
+        ids, error = self.get_bulk_ids(request)
+        if error is not None:
+            return error
+
+        try:
+            with transaction.atomic():
+                # 存在確認・画像ファイル名・入出庫の件数の取得を1回のクエリで行う
+                parts = list(
+                    Part.objects.filter(id__in=ids)
+                    .annotate(movement_count=Count("movements"))
+                    .values("id", "name", "image", "movement_count")
+                    .order_by("id")
+                )
+                if len(parts) != len(ids):
+                    return Response(
+                        {"error": "指定されたIDの一部が存在しません"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                protected = [
+                    {key: part[key] for key in ("id", "name", "movement_count")}
+                    for part in parts
+                    if part["movement_count"]
+                ]
+                if protected:
+                    return self.protected_response(protected)
+                count = self.delete_parts(ids, [part["image"] for part in parts])
+        except IntegrityError:
+            # 確認の後に別のリクエストで入出庫が登録された場合（外部キー制約の違反）
+            return self.protected_response()
+
+        return Response(
+            {"message": f"{count}件の部品を削除しました"}, status=status.HTTP_200_OK
+        )
+
+    def delete_parts(self, ids, images):
+        """
+        部品を1回のDELETE文で削除し、削除した件数を返す
+
+        raw_delete ではシグナルが送られないため、削除時のシグナルで行う処理
+        （検索ドキュメントの削除、在庫不足数のキャッシュのクリア）をまとめて行う
+        （入出庫の PROTECT は事前に確認済み。在庫スナップショット・棚卸の明細・循環棚卸の予定は CASCADE のため先に削除する）
+        """
+        StockSnapshotItem.objects.filter(part__in=ids).delete()
+        unschedule_parts(ids, include_past=True)
+        StocktakingCount.objects.filter(part__in=ids).delete()
+        count = Part.objects.filter(id__in=ids).raw_delete()
+        SearchDocument.objects.filter(
+            kind=SearchDocument.Kind.PART, object_id__in=ids
+        ).delete()
+        clear_low_stock_count()
+        delete_files_on_commit(Part.image.field.storage, images)
+        return count
+
+    @action(methods=["post"], detail=False, url_path="bulk-archive")
+    def bulk_archive(self, request):
+        """
+        複数の部品を一括でアーカイブ（論理削除）する
+
+        リクエストボディに以下の形式でIDリストを含める（archived に false を指定するとアーカイブを解除する）:
+        {
+            "ids": [1, 2, 3],
+            "archived": true
+        }
+
+        アーカイブした部品は一覧・在庫不足・CSVエクスポート・検索に表示されず、
+        詳細の取得・更新・削除と一覧の archived=true では参照できる
+        更新は1回のUPDATE文で行い、状態が変わる部品の件数を返す
+
+        Returns:
+            Response: 更新結果のレスポンス
+        """
+        ids, error = self.get_bulk_ids(request)
+        if error is not None:
+            return error
+        archived = request.data.get("archived", True)
+        if not isinstance(archived, bool):
+            return Response(
+                {"error": "archivedにはtrueまたはfalseを指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            parts = Part.objects.filter(id__in=ids)
+            if parts.count() != len(ids):
+                return Response(
+                    {"error": "指定されたIDの一部が存在しません"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            now = timezone.now()
+            count = parts.filter(archived_at__isnull=archived).update(
+                archived_at=now if archived else None,
+                updated_by=request.user,
+                updated_at=now,
+            )
+            # 検索ドキュメント・循環棚卸の今日以降の予定はアーカイブされていない部品のみ保持する
+            if archived:
+                SearchDocument.objects.filter(
+                    kind=SearchDocument.Kind.PART, object_id__in=ids
+                ).delete()
+                unschedule_parts(ids)
+            else:
+                update_search_documents(SearchDocument.Kind.PART, parts)
+                schedule_parts(parts)
+            clear_low_stock_count()
+
+        done = "アーカイブしました" if archived else "アーカイブを解除しました"
+        return Response(
+            {"message": f"{count}件の部品を{done}"}, status=status.HTTP_200_OK
+        )
+
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_csv(self, request):
+        """
+        multipart/form-data の file で送られたCSVの部品を一括登録する（masters.imports）
+
+        クエリパラメータ
+        - encoding: utf-8（BOMの有無どちらも可）または shift_jis
+        - dry_run: true の場合は検証のみ行い、登録しない
+
+        エラーのある行は登録せず、行番号・項目・メッセージを errors で返す
+        見出しや文字コードの誤りでファイル全体を読み込めない場合は400を返す
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "fileにCSVファイルを指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        encoding = request.query_params.get("encoding", DEFAULT_IMPORT_ENCODING).lower()
+        if encoding not in IMPORT_ENCODINGS:
+            return Response(
+                {"error": "encodingにはutf-8またはshift_jisを指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        dry_run = request.query_params.get("dry_run", "").lower() in ("true", "1")
+
+        importer = PartImporter(user=request.user, dry_run=dry_run)
+        try:
+            report = importer.run(upload.file, encoding)
+        except CSVImportError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report.as_dict())
+
+    @action(methods=["get"], detail=False, url_path="low-stock")
+    def low_stock(self, request):
+        """
+        在庫数が補充閾値以下の部品を不足数の多い順に返す
+
+        クエリパラメータ group_by に supplier または category を指定すると、
+        仕入先・カテゴリごとの件数と不足数の合計を返す
+        一覧と同じ絞り込み条件（category, supplier_id など）も指定できる
+
+        Returns:
+            Response: 在庫不足の部品一覧、またはグループごとの集計結果
+        """
+        queryset = self.filter_queryset(self.get_queryset().low_stock())
+        group_by = request.query_params.get("group_by")
+
+        if group_by is None:
+            queryset = queryset.order_by("-shortage", "id")
+            page = self.paginate_queryset(queryset)
+            serializer = LowStockPartSerializer(
+                page, many=True, context=self.get_serializer_context()
+            )
+            return self.get_paginated_response(serializer.data)
+
+        group_fields = {
+            "supplier": ("supplier_id", "supplier__name"),
+            "category": ("category",),
+        }
+        if group_by not in group_fields:
+            return Response(
+                {"error": "group_byにはsupplierまたはcategoryを指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        groups = (
+            queryset.order_by()
+            .values(*group_fields[group_by])
+            .annotate(count=Count("id"), total_shortage=Sum("shortage"))
+            .order_by("-total_shortage", *group_fields[group_by])
+        )
+        return Response({"results": list(groups)})
+
+    @action(methods=["get"], detail=False, url_path="low-stock/count")
+    def low_stock_count(self, request):
+        """
+        在庫不足の部品数を返す（ダッシュボードのバッジ表示用）
+        """
+        return Response({"count": get_low_stock_count()})
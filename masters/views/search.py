@@ -0,0 +1,37 @@
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from masters.models import SearchDocument
+from masters.search import search
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """
+    検索条件（クエリパラメータ）のシリアライザー
+    """
+
+    q = serializers.CharField(max_length=100)
+    type = serializers.ChoiceField(choices=SearchDocument.Kind.choices, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class SearchView(APIView):
+    """
+    部品・仕入先の横断検索APIビュー
+
+    GET /api/masters/search/?q=ヘッド&type=part&limit=20
+
+    全角/半角・カタカナ/ひらがな・濁点の有無を区別せずに検索し、
+    一致度の高い順に、一致箇所のハイライト情報付きで返す
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = SearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        kinds = [params["type"]] if "type" in params else None
+        results = search(params["q"], kinds=kinds, limit=params["limit"])
+        return Response({"count": len(results), "results": results})
@@ -0,0 +1,271 @@
+from django.db import transaction
+from django.db.models import F
+from django.http import FileResponse
+from django.utils import timezone
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from masters.jobs import enqueue_stocktaking_sheet, resume_stocktaking_sheet
+from masters.models import StocktakingSession, StocktakingSheet
+from masters.serializers import (
+    StocktakingCountSerializer,
+    StocktakingSessionSerializer,
+    StocktakingSheetSerializer,
+)
+from masters.stock import InsufficientStockError
+from masters.stocktaking_sessions import (
+    finalize_session,
+    save_counts,
+    start_session,
+    summarize_session,
+)
+
+
+class StocktakingSheetViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    棚卸表の作成ジョブのビューセット
+
+    - 作成開始（POST /api/masters/stocktaking-sheets/）
+      {"format": "xlsx" | "pdf", "category": 任意, "supplier_id": 任意, "as_of": 任意} → 202
+    - 一覧（GET /api/masters/stocktaking-sheets/）
+    - 進捗の確認（GET /api/masters/stocktaking-sheets/{id}/）
+    - ダウンロード（GET /api/masters/stocktaking-sheets/{id}/download/）
+
+    作成はバックグラウンドで行い（masters.jobs）、クライアントは status が succeeded になるまで
+    進捗を確認してからダウンロードする（止まったジョブは settings.JOB_TIMEOUT を過ぎると実行し直す）
+    """
+
+    queryset = StocktakingSheet.objects.select_related("supplier", "created_by").all()
+    serializer_class = StocktakingSheetSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        """
+        作成ジョブを登録し、完了を待たずに 202 Accepted を返す
+        """
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    def perform_create(self, serializer):
+        sheet = serializer.save(created_by=self.request.user)
+        enqueue_stocktaking_sheet(sheet)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        進捗を返す
+        スレッドで実行する設定では、プロセスの再起動などで止まったジョブをここで実行し直す
+        """
+        response = super().retrieve(request, *args, **kwargs)
+        resume_stocktaking_sheet(response.data["id"])
+        return response
+
+    @action(methods=["get"], detail=True)
+    def download(self, request, pk=None):
+        """
+        作成した棚卸表のファイルを返す（作成が完了していない場合は409）
+        """
+        sheet = self.get_object()
+        if sheet.status != StocktakingSheet.Status.SUCCEEDED:
+            return Response(
+                {"error": "棚卸表の作成が完了していません"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        created_at = timezone.localtime(sheet.created_at)
+        return FileResponse(
+            sheet.file.open("rb"),
+            as_attachment=True,
+            filename=f"棚卸表_{created_at:%Y%m%d}_{sheet.pk}.{sheet.format}",
+        )
+
+
+class StocktakingCountFilterSerializer(serializers.Serializer):
+    """
+    棚卸の明細の絞り込み条件（クエリパラメータ）のシリアライザー
+    """
+
+    status = serializers.ChoiceField(
+        choices=[
+            ("uncounted", "未計数"),
+            ("counted", "計数済み"),
+            ("variance", "差異あり"),
+        ],
+        required=False,
+    )
+
+
+class StocktakingSessionViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    棚卸の実施のビューセット（masters.stocktaking_sessions）
+
+    - 開始（POST /api/masters/stocktaking-sessions/）
+      {"name": 任意, "category": 任意, "supplier_id": 任意}
+      対象の部品の現在の在庫数・原価を帳簿在庫数として固定する
+    - 一覧・詳細（GET /api/masters/stocktaking-sessions/ , /{id}/）
+    - 明細の一覧（GET /api/masters/stocktaking-sessions/{id}/counts/?status=uncounted|counted|variance）
+      部品の順に帳簿在庫数・実棚数・差異・差異金額を返す
+    - 実棚数の登録（POST /api/masters/stocktaking-sessions/{id}/counts/）
+      [{"part_id": 1, "counted_quantity": 10}, ...]（最大 count_max_items 件）
+      既に登録した部品は上書きするため、同じ内容を再送しても結果は変わらない
+      エラーのある項目が1件でもあれば何も登録せず、400と項目ごとのエラーを返す
+    - 集計（GET /api/masters/stocktaking-sessions/{id}/summary/）
+    - 確定（POST /api/masters/stocktaking-sessions/{id}/finalize/）
+      差のある部品の在庫数を調整し、調整の入出庫を登録する
+      在庫数が負になる部品がある場合は何も登録せず、409と shortages を返す
+    - 中止（POST /api/masters/stocktaking-sessions/{id}/cancel/）
+
+    実施中でない棚卸への登録・確定・中止は409を返す
+    """
+
+    queryset = StocktakingSession.objects.select_related(
+        "supplier", "created_by", "finalized_by"
+    ).all()
+    serializer_class = StocktakingSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    # 1回のリクエストで登録できる実棚数の件数
+    count_max_items = 5000
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            session = serializer.save(created_by=self.request.user)
+            start_session(session)
+
+    def lock_session(self):
+        """
+        棚卸の行をロックして取得する（実棚数の登録・確定・中止を同時に行わないため）
+        """
+        return get_object_or_404(
+            StocktakingSession.objects.select_for_update(), pk=self.kwargs["pk"]
+        )
+
+    def closed_response(self, session):
+        return Response(
+            {"error": f"{session.get_status_display()}の棚卸は変更できません"},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    @action(methods=["get", "post"], detail=True)
+    def counts(self, request, pk=None):
+        if request.method == "POST":
+            return self.save_counts(request)
+        session = self.get_object()
+        filters = StocktakingCountFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = (
+            session.counts.with_variance().select_related("part").order_by("part_id")
+        )
+        state = filters.validated_data.get("status")
+        if state == "uncounted":
+            queryset = queryset.filter(counted_quantity__isnull=True)
+        elif state == "counted":
+            queryset = queryset.filter(counted_quantity__isnull=False)
+        elif state == "variance":
+            queryset = queryset.filter(counted_quantity__isnull=False).exclude(
+                counted_quantity=F("expected_quantity")
+            )
+        page = self.paginate_queryset(queryset)
+        serializer = StocktakingCountSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    def save_counts(self, request):
+        """
+        実棚数をまとめて登録する（全項目を検証してから1文で登録・更新する）
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "1件以上の項目のリストを送信してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.count_max_items:
+            return Response(
+                {"error": f"一度に送信できる項目は{self.count_max_items}件までです"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        errors = {}
+        seen = set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or "part_id" not in item:
+                continue
+            key = str(item["part_id"])
+            if key in seen:
+                errors[index] = {"part_id": ["同じ部品が複数回指定されています。"]}
+            seen.add(key)
+        serializer = StocktakingCountSerializer(
+            data=items, many=True, context=self.get_serializer_context()
+        )
+        errors.update(serializer.validate_items(skip=errors))
+        if errors:
+            return Response(
+                {
+                    "error": "エラーのある項目があるため登録しませんでした",
+                    "errors": [
+                        {"index": index, "errors": errors[index]}
+                        for index in sorted(errors)
+                    ],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            session = self.lock_session()
+            if session.status != StocktakingSession.Status.OPEN:
+                return self.closed_response(session)
+            count = save_counts(
+                session,
+                [
+                    (attrs["part"], attrs["counted_quantity"])
+                    for attrs in serializer.validated_data
+                ],
+                request.user,
+            )
+        return Response({"saved": count})
+
+    @action(methods=["get"], detail=True)
+    def summary(self, request, pk=None):
+        """
+        件数・差異の数量・差異金額（不足・超過・正味）の集計を返す
+        """
+        return Response(summarize_session(self.get_object()))
+
+    @action(methods=["post"], detail=True)
+    def finalize(self, request, pk=None):
+        try:
+            with transaction.atomic():
+                session = self.lock_session()
+                if session.status != StocktakingSession.Status.OPEN:
+                    return self.closed_response(session)
+                finalize_session(session, request.user)
+        except InsufficientStockError as exc:
+            return Response(
+                {"error": str(exc), "shortages": exc.shortages},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(self.get_serializer(session).data)
+
+    @action(methods=["post"], detail=True)
+    def cancel(self, request, pk=None):
+        with transaction.atomic():
+            session = self.lock_session()
+            if session.status != StocktakingSession.Status.OPEN:
+                return self.closed_response(session)
+            session.status = StocktakingSession.Status.CANCELLED
+            session.save(update_fields=["status"])
+        return Response(self.get_serializer(session).data)
@@ -2,12 +2,35 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db import transaction
-from masters.models import Supplier
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count
+from masters.autocomplete import autocomplete_cache, autocomplete_suppliers
+from masters.export import SUPPLIER_COLUMNS
+from masters.filters import StableOrderingFilter
+from masters.models import SearchDocument, Supplier
 from masters.serializers import SupplierSerializer
+from masters.views.mixins import (
+    ConditionalGetMixin,
+    CSVExportMixin,
+    FastReadMixin,
+    IncludedUsersMixin,
+    ResponseCacheMixin,
+    SparseFieldsQuerySetMixin,
+)
 
+User = get_user_model()
 
-class SupplierViewSet(viewsets.ModelViewSet):
+
+class SupplierViewSet(
+    ResponseCacheMixin,
+    ConditionalGetMixin,
+    CSVExportMixin,
+    FastReadMixin,
+    IncludedUsersMixin,
+    SparseFieldsQuerySetMixin,
+    viewsets.ModelViewSet,
+):
     """
     サプライヤー情報のCRUD操作を提供するビューセット
 
@@ -18,12 +41,30 @@ class SupplierViewSet(viewsets.ModelViewSet):
     - 部分更新（PATCH /api/masters/suppliers/{id}/）
     - 削除（DELETE /api/masters/suppliers/{id}/）
     - 一括削除（POST /api/masters/suppliers/bulk-delete/）
+    - 入力補完（GET /api/masters/suppliers/autocomplete/?q=）
+    - CSVエクスポート（GET /api/masters/suppliers/export/?encoding=utf-8|shift_jis）
+
+    一覧・詳細取得ではクエリパラメータ fields / omit で出力項目を絞り込める
+    一覧取得で include=users を指定すると作成者・更新者はIDで出力し、
+    ユーザー情報はレスポンスの included.users にまとめる
+    一覧・詳細のレスポンスは仕入先・ユーザーの更新までキャッシュされる（ResponseCacheMixin）
+    一覧・詳細のレスポンスには ETag / Last-Modified が付き、条件付きGETには 304 を返す（ConditionalGetMixin）
     """
 
     # N+1問題を回避するためselect_relatedを使用
     queryset = Supplier.objects.select_related("created_by", "updated_by").all()
     serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [StableOrderingFilter]
+    # 並び替えに使用できるキー（キーセット方式のページネーションでも使用）
+    ordering_fields = ("id", "name", "updated_at")
+    # 一覧・詳細のレスポンスキャッシュが依存するモデル
+    response_cache_models = (Supplier, User)
+    # ETag / Last-Modified の検証子に含める関連モデル
+    conditional_related_models = (User,)
+    # CSVエクスポートの列とファイル名
+    export_columns = SUPPLIER_COLUMNS
+    export_filename = "suppliers"
 
     def perform_create(self, serializer):
         """
@@ -47,6 +88,14 @@ class SupplierViewSet(viewsets.ModelViewSet):
             "ids": [1, 2, 3]
         }
 
+        部品が登録されている仕入先が含まれる場合は何も削除せず、409 と以下の形式で仕入先ごとの部品数を返す:
+        {
+            "error": "...",
+            "protected": [{"id": 1, "name": "...", "part_count": 3}]
+        }
+
+        存在確認と部品数の集計は1回のクエリで行い、削除は関連オブジェクトを取得せずに1回のDELETE文で行う
+
         Returns:
             Response: 削除結果のレスポンス
         """
@@ -56,29 +105,117 @@ class SupplierViewSet(viewsets.ModelViewSet):
                 {"error": "削除対象のIDリストが空です"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        # 対象のサプライヤーが存在するか確認
-        suppliers = Supplier.objects.filter(id__in=ids)
-        count_to_delete = suppliers.count()  # 削除前にカウント
-
-        if count_to_delete != len(ids):
+        try:
+            if not isinstance(ids, list):
+                # 文字列などを1文字ずつIDとして扱わないようにする
+                raise TypeError
+            ids = {int(pk) for pk in ids}
+        except (TypeError, ValueError):
             return Response(
-                {"error": "指定されたIDの一部が存在しません"},
+                {"error": "IDは整数のリストで指定してください"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         try:
             # トランザクションを使用して一括削除
             with transaction.atomic():
-                # 削除前に参照整合性チェックなどが必要な場合はここで実装
-                suppliers.delete()
+                # 対象のサプライヤーの存在と登録されている部品数を1回のクエリで取得
+                suppliers = list(
+                    Supplier.objects.filter(id__in=ids)
+                    .annotate(part_count=Count("parts"))
+                    .values("id", "name", "part_count")
+                    .order_by("id")
+                )
+                if len(suppliers) != len(ids):
+                    return Response(
+                        {"error": "指定されたIDの一部が存在しません"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                protected = [
+                    supplier for supplier in suppliers if supplier["part_count"]
+                ]
+                if protected:
+                    return self.protected_response(protected)
+
+                count_deleted = self.delete_suppliers(ids)
 
             return Response(
-                {"message": f"{count_to_delete}件のサプライヤーを削除しました"},
+                {"message": f"{count_deleted}件のサプライヤーを削除しました"},
                 status=status.HTTP_200_OK,
             )
+        except IntegrityError:
+            # 確認の後に別のリクエストで部品が登録された場合
+            protected = list(
+                Supplier.objects.filter(id__in=ids, parts__isnull=False)
+                .annotate(part_count=Count("parts"))
+                .values("id", "name", "part_count")
+                .order_by("id")
+            )
+            return self.protected_response(protected)
         except Exception as e:
             return Response(
                 {"error": f"削除中にエラーが発生しました: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+    def protected_response(self, protected):
+        return Response(
+            {
+                "error": "部品が登録されている仕入先は削除できません",
+                "protected": protected,
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    def delete_suppliers(self, ids):
+        """
+        仕入先を1回のDELETE文で削除し、削除した件数を返す
+
+        raw_delete では on_delete とシグナルの処理が行われないため、
+        仕入先を参照する外部キーの解除（SET_NULL。棚卸表・棚卸など）と、削除時のシグナルで行う処理をまとめて行う
+        （部品の PROTECT は事前に確認済み。確認後に登録された部品は外部キー制約で IntegrityError になる）
+        """
+        # 外部キーを追加しても漏れないよう、SET_NULL の関連はモデルの定義から求める
+        for relation in Supplier._meta.get_fields(include_hidden=True):
+            if (
+                relation.auto_created
+                and not relation.concrete
+                and relation.on_delete is models.SET_NULL
+            ):
+                name = relation.field.name
+                relation.related_model._default_manager.filter(
+                    **{f"{name}__in": ids}
+                ).update(**{name: None})
+        count = Supplier.objects.filter(id__in=ids).raw_delete()
+        SearchDocument.objects.filter(
+            kind=SearchDocument.Kind.SUPPLIER, object_id__in=ids
+        ).delete()
+        autocomplete_cache.clear()
+        return count
+
+    @action(methods=["get"], detail=False, url_path="autocomplete")
+    def autocomplete(self, request):
+        """
+        仕入先選択用の入力補完候補を返す
+
+        クエリパラメータ:
+            q: 入力中の文字列（取引先コード・仕入先名の前方一致、仕入先名の部分一致）
+            limit: 最大件数（デフォルト10件、最大20件）
+
+        Returns:
+            Response: id / name / supplier_code のみを含む候補のリスト
+        """
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response(
+                {"error": "limitは整数で指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if limit < 1:
+            return Response(
+                {"error": "limitは1以上で指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        results = autocomplete_suppliers(request.query_params.get("q", ""), limit)
+        return Response({"results": results})
@@ -8,6 +8,9 @@ echo "Database is ready!"
 
 python manage.py migrate --noinput
 
+# CSVエクスポートなどの長いストリーミング中も同じワーカーで他のリクエストを処理できるようスレッドで動かす
 exec gunicorn zaiko_be.wsgi:application \
     -w 4 \
+    -k gthread \
+    --threads "${GUNICORN_THREADS:-4}" \
     -b 0.0.0.0:8000 
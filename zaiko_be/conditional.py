@@ -0,0 +1,105 @@
+"""
+条件付きGET（ETag / Last-Modified）
+
+レスポンスの内容を決める値（更新日時の最大値・件数など）から検証子を作り、
+リクエストの If-None-Match / If-Modified-Since と一致する場合は
+データの取得・シリアライズを行わずに 304 Not Modified を返します。
+判定は django.utils.cache.get_conditional_response（RFC 9110 13.2.2）で行います。
+
+QuerySet.update() では auto_now の updated_at が更新されないため、
+一括更新する場合は updated_at も合わせて更新すること（検証子が変わらなくなる）。
+"""
+
+from datetime import timezone
+import hashlib
+
+from django.db.models import Count, IntegerField, Max, Value
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.utils.timezone import is_naive, make_aware
+
+
+def make_etag(*values):
+    """
+    値の組から強いETag（ダブルクォートで囲んだ文字列）を作る
+    """
+    digest = hashlib.md5(repr(values).encode("utf-8")).hexdigest()
+    return quote_etag(digest)
+
+
+def get_table_validators(querysets):
+    """
+    各クエリセットの (件数, 更新日時の最大値) のリストを1回のクエリ（UNION ALL）で返す
+
+    追加・更新では更新日時の最大値が、削除では件数が変わる。
+    """
+    selects = [
+        queryset.order_by()
+        .annotate(validator_index=Value(index, output_field=IntegerField()))
+        .values("validator_index")
+        .annotate(
+            validator_count=Count("pk"), validator_last_modified=Max("updated_at")
+        )
+        .values_list("validator_index", "validator_count", "validator_last_modified")
+        for index, queryset in enumerate(querysets)
+    ]
+    validators = [(0, None)] * len(selects)
+    for index, count, last_modified in selects[0].union(*selects[1:], all=True):
+        validators[index] = (count, last_modified)
+    return validators
+
+
+def latest(*values):
+    """
+    日時のうち最も新しいものを返す（すべて None の場合は None）
+    """
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """
+    リクエストの条件に一致する場合は 304（または 412）のレスポンスを、一致しない場合は None を返す
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=to_timestamp(last_modified)
+    )
+    if response is not None:
+        # 304 には 200 の場合と同じ検証子を含める（RFC 9110 15.4.5）
+        set_validators(response, etag, last_modified, statuses=(304,))
+    return response
+
+
+def get_cached_conditional_response(request, response):
+    """
+    保存済みのレスポンスの検証子でリクエストの条件を判定し、304 または元のレスポンスを返す
+    """
+    last_modified = response.get("Last-Modified")
+    return get_conditional_response(
+        request,
+        etag=response.get("ETag"),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+        response=response,
+    )
+
+
+def set_validators(response, etag, last_modified, statuses=range(200, 300)):
+    """
+    成功したレスポンスに ETag / Last-Modified ヘッダーを設定する
+    """
+    if response.status_code not in statuses:
+        return response
+    response.headers.setdefault("ETag", etag)
+    if last_modified is not None:
+        response.headers.setdefault(
+            "Last-Modified", http_date(to_timestamp(last_modified))
+        )
+    return response
+
+
+def to_timestamp(value):
+    if value is None:
+        return None
+    if is_naive(value):
+        value = make_aware(value, timezone.utc)
+    return int(value.timestamp())
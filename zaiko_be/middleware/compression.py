@@ -0,0 +1,186 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # brotliが未インストールの場合はgzipのみ
+    brotli = None
+
+# 圧縮のデフォルト設定（settings.RESPONSE_COMPRESSION で上書き可能）
+#   MIN_SIZE: この長さ（バイト）未満のレスポンスは圧縮しない
+#   GZIP_LEVEL: gzipの圧縮レベル（1〜9）
+#   BROTLI_QUALITY: brotliの圧縮品質（0〜11）
+#   EXCLUDED_CONTENT_TYPES: 圧縮しないContent-Type（前方一致。圧縮済みの形式）
+DEFAULT_COMPRESSION_SETTINGS = {
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 4,
+    "EXCLUDED_CONTENT_TYPES": (
+        "image/png",
+        "image/jpeg",
+        "image/gif",
+        "image/webp",
+        "video/",
+        "audio/",
+        "font/woff",
+        "application/zip",
+        "application/gzip",
+        "application/x-gzip",
+        "application/pdf",
+        "application/vnd.openxmlformats-officedocument.",
+    ),
+}
+
+# JWT（X-Access-Token と同じ形式のトークン）
+TOKEN_PATTERN = re.compile(rb"eyJ[\w-]+\.eyJ[\w-]+\.[\w-]+")
+
+
+def get_compression_settings():
+    return {
+        **DEFAULT_COMPRESSION_SETTINGS,
+        **getattr(settings, "RESPONSE_COMPRESSION", {}),
+    }
+
+
+def parse_accept_encoding(header):
+    """
+    Accept-Encoding ヘッダーを {エンコーディング: q値} にする
+    """
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """
+    クライアントが受け付けるエンコーディングのうち、q値が最も高いもの（同じ場合はbrを優先）を返す
+    """
+    accepted = parse_accept_encoding(header)
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding, config):
+    if encoding == "br":
+        return brotli.compress(content, quality=config["BROTLI_QUALITY"])
+    return gzip.compress(content, compresslevel=config["GZIP_LEVEL"], mtime=0)
+
+
+def make_compressor(encoding, config):
+    """
+    ストリーミング用の圧縮器を (compress, finish) で返す
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config["BROTLI_QUALITY"])
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(config["GZIP_LEVEL"], zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compress_sequence(sequence, encoding, config):
+    """
+    ストリーミングレスポンスを1チャンクずつ圧縮する
+    """
+    process, finish = make_compressor(encoding, config)
+    for chunk in sequence:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def compress_async_sequence(sequence, encoding, config):
+    process, finish = make_compressor(encoding, config)
+    async for chunk in sequence:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    レスポンスをAccept-Encodingに応じてbrotliまたはgzipで圧縮するミドルウェア
+
+    以下のレスポンスは圧縮しない。
+
+    - MIN_SIZE 未満のレスポンス、Content-Encoding 設定済み・部分レスポンス・no-transform 指定
+    - EXCLUDED_CONTENT_TYPES の形式（画像・PDF・XLSXなど圧縮済みのもの）
+    - 本文にJWT（X-Access-Token と同じ形式のトークン）を含むレスポンス（ログインなど）。
+      秘密情報とリクエスト由来の文字列を一緒に圧縮すると、圧縮後のサイズから
+      秘密情報を推測される（BREACH）ため。ヘッダーの X-Access-Token は圧縮されない。
+
+    ストリーミングレスポンスはチャンクごとに圧縮して送り出す。
+    """
+
+    def process_response(self, request, response):
+        config = get_compression_settings()
+        if not response.streaming and len(response.content) < config["MIN_SIZE"]:
+            return response
+        if (
+            response.has_header("Content-Encoding")
+            or response.has_header("Content-Range")
+            or "no-transform" in response.get("Cache-Control", "")
+        ):
+            return response
+        content_type = response.get("Content-Type", "").lower()
+        if content_type.startswith(config["EXCLUDED_CONTENT_TYPES"]):
+            return response
+        if not response.streaming and b"eyJ" in response.content:
+            if TOKEN_PATTERN.search(response.content):
+                return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_sequence(
+                    response.streaming_content, encoding, config
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, encoding, config
+                )
+            # 圧縮後のサイズは送り終えるまでわからない
+            del response.headers["Content-Length"]
+        else:
+            # 圧縮しても小さくならない場合はそのまま返す
+            compressed = compress(response.content, encoding, config)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # 強いETagは圧縮後の内容とは一致しないため弱いETagにする（RFC 9110 8.8.1）
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
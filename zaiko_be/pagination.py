@@ -1,5 +1,336 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# 総件数の算出方法のデフォルト設定（settings.PAGINATION_COUNT で上書き可能）
+#   STRATEGY: "exact"（常にCOUNT(*)） / "auto"（件数に応じて推定値・キャッシュを使用）
+#   ESTIMATE_THRESHOLD: この件数以上のテーブル・検索結果は推定値を返す
+#   CACHE_TTL: 絞り込み条件付きの件数をキャッシュする秒数
+DEFAULT_COUNT_SETTINGS = {
+    "STRATEGY": "auto",
+    "ESTIMATE_THRESHOLD": 100000,
+    "CACHE_TTL": 30,
+}
+
+
+def get_count_settings():
+    return {**DEFAULT_COUNT_SETTINGS, **getattr(settings, "PAGINATION_COUNT", {})}
+
+
+def get_queryset_count(queryset):
+    """
+    クエリセットの総件数を設定された方法で算出する
+
+    - 絞り込みなし: pg_class.reltuples が閾値未満ならCOUNT(*)、閾値以上なら推定値
+    - 絞り込みあり: 短時間キャッシュした件数を使用し、キャッシュがなければ
+      実行計画の推定行数が閾値以上なら推定値、閾値未満ならCOUNT(*)
+
+    Returns:
+        tuple: (件数, 推定値かどうか)
+    """
+    config = get_count_settings()
+    connection = connections[queryset.db]
+    if config["STRATEGY"] == "exact" or connection.vendor != "postgresql":
+        return queryset.count(), False
+
+    threshold = config["ESTIMATE_THRESHOLD"]
+    queryset = queryset.order_by()
+    if not queryset.query.where and not queryset.query.distinct:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # 一度もANALYZEされていないテーブルは -1 になる
+        if row is None or row[0] < threshold:
+            return queryset.count(), False
+        return int(row[0]), True
+
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        # none() や空のリストでの __in など、結果が空と確定しているクエリセット
+        return 0, False
+    cache_key = (
+        "pagination:count:"
+        + hashlib.md5(repr((sql, params)).encode("utf-8")).hexdigest()
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return tuple(cached)
+
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimated_rows = int(plan[0]["Plan"]["Plan Rows"])
+    if estimated_rows >= threshold:
+        result = (estimated_rows, True)
+    else:
+        result = (queryset.count(), False)
+    cache.set(cache_key, result, config["CACHE_TTL"])
+    return result
+
+
+class EstimatedPage(Page):
+    """
+    推定件数でのページ
+
+    総ページ数が確定しないため、次ページの有無は実際に1件多く取得した結果で判定します。
+    """
+
+    has_more = False
+
+    def has_next(self):
+        return self.has_more
+
+
+class CountStrategyPaginator(Paginator):
+    """
+    総件数を get_queryset_count で算出するページネーター
+    """
+
+    count_estimated = False
+
+    @cached_property
+    def count(self):
+        count, self.count_estimated = get_queryset_count(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        """
+        推定件数の場合は最終ページを確定できないため、下限のみ検証する
+        """
+        self.count  # 件数と推定値かどうかを確定させる
+        if not self.count_estimated:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        page = EstimatedPage(rows[: self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+
+class KeysetPagination(BasePagination):
+    """
+    キーセット（カーソル）方式のページネーションクラス
+
+    OFFSETを使わず、直前ページの端の行の「ソートキー + ID」を起点に続きを取得するため、
+    深いページでも取得コストが一定になります。
+    ソートキーはビューの ordering_fields に含まれるものだけを受け付け、
+    同じ値の行はIDで順序を確定させます。
+    アクションごとに並び順が決まっている一覧では、ビューの get_keyset_ordering() が返す
+    (ソートキー, 順序を確定させる一意なキー) を使います（ordering パラメータは無視する）。
+    """
+
+    page_size = 20
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    default_ordering = "id"
+    invalid_cursor_message = "カーソルが不正です"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        カーソル位置以降のページを取得する
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering, self.tiebreaker = self.get_keyset(request, view)
+        self.count, self.count_estimated = get_queryset_count(queryset)
+
+        cursor = self.decode_cursor(request, queryset)
+        self.reverse = bool(cursor and cursor["r"])
+
+        field = self.ordering.lstrip("-")
+        tiebreaker = self.tiebreaker.lstrip("-")
+        descending = self.ordering.startswith("-") != self.reverse
+        tiebreaker_descending = self.tiebreaker.startswith("-") != self.reverse
+
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.build_position_filter(
+                    field,
+                    cursor["v"],
+                    cursor["id"],
+                    descending,
+                    tiebreaker,
+                    tiebreaker_descending,
+                )
+            )
+        order_by = [f"{'-' if descending else ''}{field}"]
+        if field != tiebreaker:
+            order_by.append(f"{'-' if tiebreaker_descending else ''}{tiebreaker}")
+
+        # 次ページの有無を判定するため1件多く取得する
+        rows = list(queryset.order_by(*order_by)[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        if self.reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        self.field = field
+        self.tiebreaker_field = tiebreaker
+        return rows
+
+    def get_keyset(self, request, view):
+        """
+        (ソートキー, 順序を確定させるキー) を返す
+        ビューが get_keyset_ordering() で並び順を指定していればそれを使い、
+        なければリクエストのorderingと、同じ向きのIDとする
+        """
+        get_keyset_ordering = getattr(view, "get_keyset_ordering", None)
+        keyset = get_keyset_ordering() if get_keyset_ordering else None
+        if keyset is not None:
+            return keyset
+        ordering = self.get_ordering(request, view)
+        return ordering, "-id" if ordering.startswith("-") else "id"
+
+    def get_ordering(self, request, view):
+        """
+        リクエストのordering（先頭のキーのみ）を許可リストで検証して返す
+        許可されていないキーは無視してIDの昇順とする
+        """
+        allowed = getattr(view, "ordering_fields", None) or (self.default_ordering,)
+        value = request.query_params.get(self.ordering_query_param, "")
+        term = value.split(",")[0].strip()
+        if term.lstrip("-") in allowed:
+            return term
+        return self.default_ordering
+
+    @staticmethod
+    def build_position_filter(
+        field, value, pk, descending, tiebreaker="id", tiebreaker_descending=None
+    ):
+        """
+        (field, tiebreaker) がカーソル位置より後ろにある行の条件を組み立てる
+        先頭の範囲条件は (field, tiebreaker) のインデックスで範囲スキャンさせるためのもの
+        tiebreaker の向きを省略した場合は field と同じ向きとする
+        """
+        if tiebreaker_descending is None:
+            tiebreaker_descending = descending
+        after_pk = Q(**{f"{tiebreaker}__{'lt' if tiebreaker_descending else 'gt'}": pk})
+        if field == tiebreaker:
+            return after_pk
+        if descending:
+            return Q(**{f"{field}__lte": value}) & (
+                Q(**{f"{field}__lt": value}) | after_pk
+            )
+        return Q(**{f"{field}__gte": value}) & (Q(**{f"{field}__gt": value}) | after_pk)
+
+    def decode_cursor(self, request, queryset):
+        """
+        クエリパラメータのカーソルを復元する
+        ソートキーの値はフィールド（注釈の場合は出力の型）で型変換し、変換できない場合は不正なカーソルとする
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            if cursor["o"] != self.ordering:
+                raise ValueError
+            name = self.ordering.lstrip("-")
+            annotation = queryset.query.annotations.get(name)
+            if annotation is not None:
+                field = annotation.output_field
+            else:
+                field = queryset.model._meta.get_field(name)
+            return {
+                "v": field.to_python(cursor["v"]),
+                "id": int(cursor["id"]),
+                "r": bool(cursor["r"]),
+            }
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            UnicodeEncodeError,
+            FieldDoesNotExist,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        """
+        行の位置をカーソル文字列にしてURLに埋め込む
+        行はモデルのインスタンス、または values() の辞書
+        """
+        if isinstance(row, dict):
+            value, pk = row[self.field], row[self.tiebreaker_field]
+        else:
+            value, pk = getattr(row, self.field), getattr(row, self.tiebreaker_field)
+        if not isinstance(value, (int, str)):
+            # Decimal・日時は文字列で保持し、フィルタ時にフィールド側で型変換させる
+            value = str(value)
+        payload = {"o": self.ordering, "v": value, "id": pk, "r": reverse}
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.encode_cursor(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_row, reverse=True)
+
+    def get_paginated_response(self, data):
+        """
+        ページ番号方式と同じキーでレスポンスを返す（currentはカーソル方式では常にNone）
+        """
+        return Response(
+            {
+                "count": self.count,
+                "count_estimated": self.count_estimated,
+                "total_pages": math.ceil(self.count / self.page_size),
+                "current": None,
+                "page_size": self.page_size,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
 
 
 class CustomPagination(PageNumberPagination):
@@ -7,17 +338,37 @@ class CustomPagination(PageNumberPagination):
     カスタムページネーションクラス
 
     ページネーションのレスポンスに現在のページ番号と固定のページサイズを追加します。
+    クエリパラメータ pagination=cursor を指定した場合はキーセット方式に切り替わります。
+    総件数は settings.PAGINATION_COUNT の設定に応じて推定値になる場合があり、
+    その場合は count_estimated が True になります。
     """
 
     page_size = 20  # 固定のページサイズ（20件/ページ）
+    django_paginator_class = CountStrategyPaginator
+    pagination_mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        リクエストで指定されたモードに応じてページを取得
+        """
+        if request.query_params.get(self.pagination_mode_query_param) == "cursor":
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
         """
         ページネーションのレスポンス形式をカスタマイズ
         """
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
         return Response(
             {
                 "count": self.page.paginator.count,  # 総件数
+                "count_estimated": self.page.paginator.count_estimated,  # 推定値か
                 "total_pages": self.page.paginator.num_pages,  # 総ページ数
                 "current": self.page.number,  # 現在のページ番号
                 "page_size": self.page_size,  # 固定のページサイズ
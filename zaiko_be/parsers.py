@@ -0,0 +1,42 @@
+from django.conf import settings
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from zaiko_be.renderers import msgpack_ext_hook
+
+
+class FastJSONParser(JSONParser):
+    """
+    orjsonを使用したJSONパーサー
+
+    UTF-8以外の文字コードが指定されたリクエストは標準の JSONParser で解析します。
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """
+    MessagePack形式のパーサー（Content-Type: application/msgpack）
+
+    Decimalの拡張型（zaiko_be.renderers.encode_decimal）はDecimalに復元します。
+    """
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), ext_hook=msgpack_ext_hook)
+        except ValueError as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
@@ -0,0 +1,171 @@
+import csv
+from decimal import Decimal
+from functools import lru_cache
+import io
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+# MessagePackでDecimalを表す拡張型の番号
+MSGPACK_DECIMAL_EXT_TYPE = 1
+
+# データ長ごとの、ヘッダーが1バイトで済む拡張型（fixext: 1, 2, 4, 8, 16バイト）の長さ
+MSGPACK_FIXEXT_LENGTHS = [1, 1, 2, 4, 4, 8, 8, 8, 8, 16, 16, 16, 16, 16, 16, 16, 16]
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    orjsonを使用したJSONレンダラー
+
+    出力はDRFの JSONRenderer（UNICODE_JSON / COMPACT_JSON が有効な既定の設定）と同一です。
+    日時・日付・UUIDはorjsonが直接出力し（UTCは "Z"）、Decimalは標準と同じく数値で出力します。
+    それ以外のorjsonが扱えない値（遅延評価の文字列など）はDRFの JSONEncoder で変換します。
+    以下の場合は標準の JSONRenderer で出力します。
+
+    - インデントの指定がある場合（ブラウザブルAPIなど）
+    - UNICODE_JSON / COMPACT_JSON が無効な場合
+    - 64bitを超える整数やタイムゾーン付きの時刻など orjson で出力できない値を含む場合
+
+    標準との違いは以下のとおり（APIの出力には含まれない値）。
+
+    - NaN・Infinity は標準ではエラーになるが、null で出力される
+    - 秒単位のUTCオフセット（+00:00:30 など）は分単位に丸められる
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            self.get_indent(accepted_media_type, renderer_context)
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder_default = self.encoder_class().default
+
+        def default(obj):
+            if type(obj) is Decimal:
+                return float(obj)
+            return encoder_default(obj)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # 標準のレンダラーと同様に、JavaScriptで改行として扱われる文字をエスケープする
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+def encode_decimal(value):
+    """
+    DecimalをMessagePackの拡張型にする
+
+    データは「指数（符号付き1バイト）+ 仮数（符号付き整数のビッグエンディアン）」で、
+    1234.50 は指数 -2・仮数 123450 の4バイト（ヘッダーを含め6バイト）になる。
+    仮数は符号拡張してfixextの長さに揃える。
+    NaN・Infinity・指数表記になる値・-0 など表せない値は文字列にする。
+    """
+    return encode_decimal_text(str(value))
+
+
+@lru_cache(maxsize=4096)
+def encode_decimal_text(text):
+    """
+    encode_decimal の本体（価格・税率は同じ値が繰り返し現れるため文字列表現でキャッシュする）
+    """
+    integer, _, fraction = text.partition(".")
+    if not integer.lstrip("-").isdigit() or (fraction and not fraction.isdigit()):
+        return text
+    exponent = -len(fraction)
+    unscaled = int(integer + fraction)
+    if exponent < -128 or (not unscaled and text[0] == "-"):
+        return text
+    length = unscaled.bit_length() // 8 + 2
+    if length <= 16:
+        length = MSGPACK_FIXEXT_LENGTHS[length]
+    data = exponent.to_bytes(1, "big", signed=True) + unscaled.to_bytes(
+        length - 1, "big", signed=True
+    )
+    return msgpack.ExtType(MSGPACK_DECIMAL_EXT_TYPE, data)
+
+
+@lru_cache(maxsize=4096)
+def decode_decimal(data):
+    """
+    encode_decimal で拡張型にしたDecimalを復元する
+    """
+    exponent = int.from_bytes(data[:1], "big", signed=True)
+    unscaled = int.from_bytes(data[1:], "big", signed=True)
+    return Decimal(f"{unscaled}E{exponent}")
+
+
+def msgpack_ext_hook(code, data):
+    if code == MSGPACK_DECIMAL_EXT_TYPE:
+        return decode_decimal(data)
+    return msgpack.ExtType(code, data)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack形式のレンダラー（Accept: application/msgpack）
+
+    JSONと同じ構造をMessagePackで出力します。Decimalは拡張型（MSGPACK_DECIMAL_EXT_TYPE）で
+    出力し、native_decimal が True のため DecimalField は文字列に変換されずに
+    Decimalのまま渡されます（masters.serializers.mixins.NativeDecimalMixin）。
+    日時など他の値はJSONと同じ規則で文字列にします。
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    native_decimal = True
+    encoder_class = encoders.JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        encoder_default = self.encoder_class().default
+
+        def default(obj):
+            if isinstance(obj, Decimal):
+                return encode_decimal(obj)
+            return encoder_default(obj)
+
+        return msgpack.packb(data, default=default, use_bin_type=True)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSVエクスポートのエンドポイント用のレンダラー（Accept: text/csv）
+
+    エクスポートの本体はビューが StreamingHttpResponse で返すため、このレンダラーは
+    エラーの内容のみを「項目,メッセージ」の行で出力します（Accept: text/csv を 406 にしないため）。
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\r\n")
+        items = data.items() if isinstance(data, dict) else enumerate(data)
+        for key, value in items:
+            writer.writerow([key, value])
+        return buffer.getvalue().encode(self.charset)
@@ -0,0 +1,155 @@
+"""
+APIレスポンスのキャッシュとモデルのバージョン番号
+
+レスポンスはエンドポイントのURL（クエリパラメータを含む）・出力形式と、内容が依存する
+モデルのバージョン番号をキーにして保存します。モデルの保存・削除・一括更新時には
+バージョン番号を1つ進めるだけで（O(1)）、古い番号のキャッシュは参照されなくなり
+有効期限で消えます。トランザクション内の更新では確定後にもう一度番号を進めるため、
+確定前に他のリクエストが新しい番号で古い内容をキャッシュしても参照されません。
+
+バージョン番号・ヒット数は settings.RESPONSE_CACHE の ALIAS のキャッシュに保存するため、
+複数のプロセスで動かす場合は共有できるキャッシュ（Redis互換のサーバー）を指定すること。
+ローカルメモリのキャッシュではプロセスごとに番号を持つため、他のプロセスでの更新は
+有効期限まで反映されない。
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+
+# レスポンスキャッシュのデフォルト設定（settings.RESPONSE_CACHE で上書き可能）
+#   ENABLED: レスポンスをキャッシュするか（バージョン番号は常に更新する）
+#   ALIAS: 使用するキャッシュ（settings.CACHES のキー）
+#   TIMEOUT: レスポンスを保存する秒数
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    "ENABLED": False,
+    "ALIAS": "default",
+    "TIMEOUT": 300,
+}
+
+VERSION_KEY = "version:{}"
+STATS_KEY = "response_cache:{}:{}"
+
+
+def get_response_cache_settings():
+    return {
+        **DEFAULT_RESPONSE_CACHE_SETTINGS,
+        **getattr(settings, "RESPONSE_CACHE", {}),
+    }
+
+
+def get_cache():
+    return caches[get_response_cache_settings()["ALIAS"]]
+
+
+def incr(cache, key, initial):
+    """
+    キーの値を1つ増やす（キーがない場合は initial にする）
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+def get_model_versions(model_classes):
+    """
+    モデルのバージョン番号のリストを返す
+    """
+    cache = get_cache()
+    keys = [VERSION_KEY.format(model._meta.label_lower) for model in model_classes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # 追い出し・再起動で番号が失われても過去の番号と重ならないよう時刻から始める
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model, using=None):
+    """
+    モデルのバージョン番号を進め、そのモデルに依存するレスポンスのキャッシュを無効にする
+
+    トランザクション内では確定後にもう一度進める（using はトランザクションを確認するデータベース）
+    """
+    key = VERSION_KEY.format(model._meta.label_lower)
+    incr(get_cache(), key, time.time_ns())
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(
+            lambda: incr(get_cache(), key, time.time_ns()), using=using
+        )
+
+
+def record_response_cache(name, hit):
+    """
+    レスポンスキャッシュのヒット・ミスを記録する
+    """
+    incr(get_cache(), STATS_KEY.format(name, "hits" if hit else "misses"), 1)
+
+
+def get_response_cache_stats(names):
+    """
+    エンドポイントごとのヒット数・ミス数・ヒット率を返す
+    """
+    cache = get_cache()
+    stats = {}
+    for name in names:
+        counts = cache.get_many(
+            [STATS_KEY.format(name, "hits"), STATS_KEY.format(name, "misses")]
+        )
+        hits = counts.get(STATS_KEY.format(name, "hits"), 0)
+        misses = counts.get(STATS_KEY.format(name, "misses"), 0)
+        total = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else None,
+        }
+    return stats
+
+
+class VersionedQuerySet(models.QuerySet):
+    """
+    一括更新・一括作成でもモデルのバージョン番号を進めるクエリセット
+
+    保存・削除（クエリセットの delete を含む）はシグナルで番号を進めるが、
+    update / bulk_create / bulk_update / raw_delete はシグナルが送られないためここで進める。
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        bump_model_version(self.model, using=self.db)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        bump_model_version(self.model, using=self.db)
+        return objs
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        bump_model_version(self.model, using=self.db)
+        return rows
+
+    bulk_update.alters_data = True
+
+    def raw_delete(self):
+        """
+        関連オブジェクトの取得・シグナルの送信をせずに1回のDELETE文で削除し、削除した件数を返す
+
+        on_delete（PROTECT / SET_NULL など）やシグナルで行う処理は呼び出し側で行うこと
+        """
+        rows = self._raw_delete(self.db)
+        bump_model_version(self.model, using=self.db)
+        return rows
+
+    raw_delete.alters_data = True
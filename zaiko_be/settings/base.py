@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "corsheaders",
     "accounts",
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 # 共通のミドルウェア
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "zaiko_be.middleware.compression.CompressionMiddleware",  # レスポンスの圧縮
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -114,6 +116,86 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PAGINATION_CLASS": "zaiko_be.pagination.CustomPagination",
     "PAGE_SIZE": 20,
+    # JSONの入出力はorjsonを使用（標準に戻す場合は rest_framework.renderers.JSONRenderer /
+    # rest_framework.parsers.JSONParser を指定）
+    # Accept / Content-Type が application/msgpack の場合はMessagePackで入出力する
+    "DEFAULT_RENDERER_CLASSES": (
+        "zaiko_be.renderers.FastJSONRenderer",
+        "zaiko_be.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "zaiko_be.parsers.FastJSONParser",
+        "zaiko_be.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+}
+
+# レスポンスの圧縮（zaiko_be.middleware.compression を参照）
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024")),
+    "GZIP_LEVEL": int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", "6")),
+    "BROTLI_QUALITY": int(os.getenv("RESPONSE_COMPRESSION_BROTLI_QUALITY", "4")),
+}
+
+# キャッシュ
+# レスポンスキャッシュ（responses）は RESPONSE_CACHE_URL にRedis互換のサーバーのURL
+# （redis://cache:6379/0 など）を指定するとそのサーバーを、未指定の場合はローカルメモリを使用
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": RESPONSE_CACHE_URL,
+            "KEY_PREFIX": "zaiko",
+        }
+        if RESPONSE_CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "responses",
+            "OPTIONS": {"MAX_ENTRIES": 1000},
+        }
+    ),
+}
+
+# レスポンスキャッシュ（zaiko_be.response_cache を参照）
+# ローカルメモリはプロセス間で無効化が共有されないため、Redis互換のサーバーを
+# 指定した場合のみデフォルトで有効（RESPONSE_CACHE_ENABLED で変更可能）
+RESPONSE_CACHE = {
+    "ENABLED": os.getenv(
+        "RESPONSE_CACHE_ENABLED", "true" if RESPONSE_CACHE_URL else "false"
+    ).lower()
+    == "true",
+    "ALIAS": "responses",
+    "TIMEOUT": int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300")),
+}
+
+# バックグラウンドジョブ（棚卸表の作成）の実行方法（masters.jobs を参照）
+#   "thread": 受け付けたプロセスのスレッドで実行する
+#   "worker": python manage.py run_jobs を別プロセスで動かして実行する
+JOB_RUNNER = os.getenv("JOB_RUNNER", "thread")
+# 登録・開始からこの秒数を過ぎても完了していないジョブは、止まったものとして実行し直す
+# （棚卸表の作成にかかる時間より十分長くする）
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", "1800"))
+
+# ページネーションの総件数の算出方法（zaiko_be.pagination を参照）
+PAGINATION_COUNT = {
+    "STRATEGY": os.getenv("PAGINATION_COUNT_STRATEGY", "auto"),
+    "ESTIMATE_THRESHOLD": int(os.getenv("PAGINATION_COUNT_THRESHOLD", "100000")),
+    "CACHE_TTL": 30,
+}
+
+# 循環棚卸のクラス分けと計数の間隔（masters.cycle_counts を参照）
+#   A_SHARE / B_SHARE: 在庫金額の累積構成比がこの値に達するまでの部品を A / B クラスにする
+#   INTERVALS: クラスごとの計数の間隔（営業日）
+CYCLE_COUNT = {
+    "A_SHARE": 0.8,
+    "B_SHARE": 0.95,
+    "INTERVALS": {"A": 20, "B": 60, "C": 120},
 }
 
 # Simple JWTの設定
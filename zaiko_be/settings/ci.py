@@ -16,3 +16,12 @@ MEDIA_URL = "/media/"
 
 # テスト用のファイルストレージ
 DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+
+# テスト間で件数キャッシュが共有されないよう、常に正確な件数を返す
+PAGINATION_COUNT = {**PAGINATION_COUNT, "STRATEGY": "exact"}
+
+# テスト間でレスポンスキャッシュが共有されないよう無効にする（キャッシュのテストでは個別に有効化）
+RESPONSE_CACHE = {**RESPONSE_CACHE, "ENABLED": False}
+
+# テストのトランザクション外のスレッドで実行しないよう、ジョブはテストから直接実行する
+JOB_RUNNER = "worker"
@@ -15,6 +15,7 @@ INSTALLED_APPS += [
 # 開発環境専用のミドルウェアを追加
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "zaiko_be.middleware.compression.CompressionMiddleware",  # レスポンスの圧縮
     "debug_toolbar.middleware.DebugToolbarMiddleware",  # Debug Toolbarを追加
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -28,12 +29,11 @@ MIDDLEWARE = [
 
 # 開発環境専用の認証設定 - SessionAuthenticationを追加
 REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",  # 開発環境のみ
     ),
-    "DEFAULT_PAGINATION_CLASS": "zaiko_be.pagination.CustomPagination",
-    "PAGE_SIZE": 20,
 }
 
 # Debug Toolbar設定